@@ -64,6 +64,8 @@ if DEBUG and not IS_PRODUCTION:
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.RequestInstrumentationMiddleware',  # Opt-in timing/SQL stats
+    'core.middleware.ReadReplicaMiddleware',  # GET reads from the replica when configured
     'core.middleware.MaintenanceModeMiddleware',  # Enterprise maintenance mode
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -129,6 +131,30 @@ else:
             'NAME': BASE_DIR / 'db.sqlite3',
         }
     }
+    # Covering (INCLUDE) columns of the hot-path indexes only apply on PostgreSQL
+    SILENCED_SYSTEM_CHECKS = ['models.W040']
+
+# Optional read replica for dashboard, report and export reads (core.db_router).
+# PostgreSQL: DB_REPLICA_HOST (other DB_* settings shared with the primary);
+# SQLite: DB_REPLICA_NAME, a copy of the database file kept in sync externally.
+if USE_POSTGRESQL and os.environ.get('DB_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': os.environ['DB_REPLICA_HOST'],
+        'PORT': os.environ.get('DB_REPLICA_PORT', DATABASES['default']['PORT']),
+    }
+elif not USE_POSTGRESQL and os.environ.get('DB_REPLICA_NAME'):
+    DATABASES['replica'] = {**DATABASES['default'], 'NAME': os.environ['DB_REPLICA_NAME']}
+if 'replica' in DATABASES:
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+
+REPLICA_SETTINGS = {
+    'ALIAS': 'replica' if 'replica' in DATABASES else None,
+    'MAX_LAG_SECONDS': float(os.environ.get('REPLICA_MAX_LAG_SECONDS', '30')),  # Fall back to primary beyond this
+    'LAG_CHECK_SECONDS': 5,     # How often each process re-measures replica lag
+    'PIN_SECONDS': 10,          # Reads stay on the primary this long after a client's write
+}
+DATABASE_ROUTERS = ['core.db_router.ReadReplicaRouter']
 
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
@@ -438,6 +464,25 @@ FILE_UPLOAD_MAX_MEMORY_SIZE = 50 * 1024 * 1024  # 50MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 50 * 1024 * 1024  # 50MB
 FILE_UPLOAD_PERMISSIONS = 0o644
 
+# Upload pipeline (portfolio.services.upload_pipeline_service)
+UPLOAD_SETTINGS = {
+    'WORKERS': int(os.environ.get('UPLOAD_WORKERS', '4')),  # Files staged and validated concurrently
+}
+
+# Modified Dietz result cache (portfolio.utils.dietz_cache)
+DIETZ_CACHE_SETTINGS = {
+    'ENABLED': os.environ.get('DIETZ_CACHE', 'True').lower() == 'true',
+    'LOCAL_SIZE': 4096,              # Results kept in each process's LRU
+    'TIMEOUT': 7 * 24 * 60 * 60,     # Shared cache expiry (safety net; invalidation is version based)
+}
+
+# Background data exports (portfolio.services.export_job_service)
+EXPORT_SETTINGS = {
+    'EXPORT_DIR': MEDIA_ROOT / 'exports',
+    'BACKGROUND_ROWS': int(os.environ.get('EXPORT_BACKGROUND_ROWS', '100000')),  # Larger exports run as jobs
+    'RETENTION_HOURS': 24,
+}
+
 # Custom settings for Aurum Finance
 AURUM_SETTINGS = {
     'SUPPORTED_BANKS': [
@@ -468,6 +513,9 @@ AURUM_SETTINGS = {
     'ALLOWED_FILE_EXTENSIONS': ['.xlsx', '.xls'],
     'MAX_PROCESSING_TIME_MINUTES': 3,
     'REPORTS_DIR': BASE_DIR / 'reports',
+    # Absolute base URL of /static/ as seen from the browser; when set, reports reference
+    # the shared logo instead of inlining it (e.g. https://aurum.dndpi.cl/static/)
+    'REPORT_STATIC_URL': os.environ.get('REPORT_STATIC_URL', ''),
     'DATA_DIR': BASE_DIR / 'data',
     'ENABLE_FILE_CLEANUP': IS_PRODUCTION,  # Only cleanup files in production
     'MOCK_BANK_PROCESSING': False,  # Always use real processing
@@ -488,6 +536,9 @@ BACKUP_SETTINGS = {
     'MAX_BACKUP_SIZE_GB': 10,
     'CREATE_PRE_RESTORE_BACKUP': True,
     'REQUIRE_CONFIRMATION': True,
+    'PARALLEL_JOBS': min(4, os.cpu_count() or 1),  # pg_dump / pg_restore --jobs
+    'COMPRESSION': 'zstd',          # zstd (pg_dump 16+, else gzip), gzip or none
+    'SQLITE_PAGES_PER_STEP': 1024,  # Pages copied per sqlite3 backup step
 }
 
 BACKUP_SCHEDULE = {
@@ -503,6 +554,21 @@ BACKUP_SCHEDULE = {
     'CLEANUP_FREQUENCY': 'daily',      # Run cleanup daily
 }
 
+# How often each process re-checks the maintenance flag file (core.maintenance)
+MAINTENANCE_POLL_INTERVAL_MS = int(os.environ.get('MAINTENANCE_POLL_INTERVAL_MS', '1000'))
+
+# Per-request timing/SQL instrumentation (core.middleware.RequestInstrumentationMiddleware)
+INSTRUMENTATION_SETTINGS = {
+    'ENABLED': os.environ.get('REQUEST_INSTRUMENTATION', 'False').lower() == 'true',
+    'WINDOW_SIZE': 500,             # Recent requests per view used for percentiles
+    'SLOW_QUERIES': 5,              # Slowest queries kept per view
+    # Fraction of requests to profile, optionally only for the listed view names
+    # (e.g. portfolio:admin_dashboard_data,portfolio:generate_report)
+    'PROFILE_SAMPLE_RATE': float(os.environ.get('PROFILE_SAMPLE_RATE', '0')),
+    'PROFILE_VIEWS': [v for v in os.environ.get('PROFILE_VIEWS', '').split(',') if v],
+    'PROFILER': os.environ.get('PROFILER', 'cprofile'),  # cprofile or pyinstrument (if installed)
+}
+
 # Ensure required directories exist
 for directory in [AURUM_SETTINGS['REPORTS_DIR'], AURUM_SETTINGS['DATA_DIR'], BACKUP_SETTINGS['BACKUP_LOCATION']]:
     directory.mkdir(exist_ok=True)
@@ -0,0 +1,170 @@
+"""
+Read Replica Routing for AurumFinance
+Sends reads of GET requests and read-only service calls to a replica database,
+while writes (and reads that must see them) stay on the primary.
+
+Configured by REPLICA_SETTINGS; routing is off while no replica ALIAS is set.
+
+- ReadReplicaMiddleware opens a replica scope for safe (GET/HEAD/OPTIONS) requests.
+- replica_reads() does the same for read-only service calls outside requests.
+- Any write inside a scope pins the rest of it to the primary, and a short-lived
+  cookie pins the client's next requests after a mutation (read your writes).
+- When the replica lags more than MAX_LAG_SECONDS, or cannot be checked, reads
+  fall back to the primary.
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+logger = logging.getLogger(__name__)
+
+PIN_COOKIE = 'aurum_primary_pin'
+
+DEFAULT_SETTINGS = {
+    'ALIAS': None,
+    'MAX_LAG_SECONDS': 30,
+    'LAG_CHECK_SECONDS': 5,
+    'PIN_SECONDS': 10,
+}
+
+# Whether reads in the current scope may use the replica (None outside any scope) /
+# have been pinned to the primary by a write
+_replica_allowed: ContextVar[Optional[bool]] = ContextVar('aurum_replica_allowed', default=None)
+_pinned: ContextVar[bool] = ContextVar('aurum_primary_pinned', default=False)
+
+# Last measured replica lag per alias: alias -> (checked_at, lag_seconds)
+_lag_checks: Dict[str, tuple] = {}
+
+_LAG_SQL = {
+    'postgresql': (
+        "SELECT CASE WHEN pg_is_in_recovery() "
+        "THEN COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) ELSE 0 END"
+    ),
+}
+
+
+def get_settings() -> Dict:
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'REPLICA_SETTINGS', {})}
+
+
+def measure_replica_lag(alias: str) -> float:
+    """Seconds the replica is behind the primary (0 for backends without replication)."""
+    connection = connections[alias]
+    sql = _LAG_SQL.get(connection.vendor)
+    if sql is None:
+        return 0.0
+    with connection.cursor() as cursor:
+        cursor.execute(sql)
+        return float(cursor.fetchone()[0] or 0)
+
+
+def replica_lag(alias: str, config: Dict) -> float:
+    """Replica lag, re-measured at most every LAG_CHECK_SECONDS; inf when unavailable."""
+    now = time.monotonic()
+    checked = _lag_checks.get(alias)
+    if checked and now - checked[0] < config['LAG_CHECK_SECONDS']:
+        return checked[1]
+
+    try:
+        lag = measure_replica_lag(alias)
+    except Exception as e:
+        logger.warning(f"Replica {alias} unavailable, reading from primary: {e}")
+        lag = float('inf')
+    else:
+        if lag > config['MAX_LAG_SECONDS']:
+            logger.warning(f"Replica {alias} lag {lag:.1f}s exceeds {config['MAX_LAG_SECONDS']}s, reading from primary")
+    _lag_checks[alias] = (now, lag)
+    return lag
+
+
+def read_alias() -> str:
+    """Database alias that reads in the current context should use."""
+    if not _replica_allowed.get() or _pinned.get():
+        return DEFAULT_DB_ALIAS
+    config = get_settings()
+    alias = config['ALIAS']
+    if not alias or alias == DEFAULT_DB_ALIAS:
+        return DEFAULT_DB_ALIAS
+    # Reads inside a primary transaction must see its uncommitted writes
+    if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+        return DEFAULT_DB_ALIAS
+    if replica_lag(alias, config) > config['MAX_LAG_SECONDS']:
+        return DEFAULT_DB_ALIAS
+    return alias
+
+
+def pin_to_primary() -> None:
+    """Send the remaining reads of the current scope to the primary."""
+    _pinned.set(True)
+
+
+def is_pinned() -> bool:
+    return _pinned.get()
+
+
+@contextmanager
+def replica_scope(allowed: bool = True):
+    """Allow (or forbid) replica reads within the block; writes inside pin it to the primary."""
+    outer = _replica_allowed.get()
+    allowed_token = _replica_allowed.set(allowed)
+    pinned_token = _pinned.set(False)
+    try:
+        yield
+    finally:
+        wrote = _pinned.get()
+        _pinned.reset(pinned_token)
+        _replica_allowed.reset(allowed_token)
+        if wrote and outer is not None:
+            # A nested scope's writes must be visible to the rest of the enclosing one
+            _pinned.set(True)
+
+
+def replica_reads(func):
+    """
+    Run a read-only service method in a replica scope.
+
+    Only opens a scope where there is none: inside a request (or an enclosing scope)
+    the caller's decision stands, so services called by mutations, by requests pinned
+    after a write, or after a write in the same scope read from the primary.
+    """
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if _replica_allowed.get() is not None:
+            return func(*args, **kwargs)
+        with replica_scope():
+            return func(*args, **kwargs)
+    return wrapper
+
+
+class ReadReplicaRouter:
+    """Database router: reads follow read_alias(), writes always go to the primary."""
+
+    def db_for_read(self, model, **hints) -> Optional[str]:
+        return read_alias()
+
+    def db_for_write(self, model, **hints) -> str:
+        # Later reads in the scope must see this write; explicit alias so instances
+        # loaded from the replica are still saved to the primary
+        if _replica_allowed.get() is not None:
+            pin_to_primary()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints) -> Optional[bool]:
+        databases = {DEFAULT_DB_ALIAS, get_settings()['ALIAS']}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints) -> Optional[bool]:
+        # The replica gets its schema through replication
+        alias = get_settings()['ALIAS']
+        if alias and db == alias and alias != DEFAULT_DB_ALIAS:
+            return False
+        return None
@@ -0,0 +1,227 @@
+"""
+Request Instrumentation for AurumFinance
+Per-request wall time and SQL capture, rolling per-view percentiles kept in the cache,
+and sampled profiling of selected requests.
+
+Enabled with REQUEST_INSTRUMENTATION=true (see INSTRUMENTATION_SETTINGS); the
+middleware in core.middleware feeds it and /api/portfolio/health/performance/ reads it.
+"""
+
+import cProfile
+import io
+import logging
+import pstats
+import random
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+try:
+    import pyinstrument
+except ImportError:
+    pyinstrument = None
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'aurum:instrumentation'
+VIEWS_KEY = f'{KEY_PREFIX}:views'
+PROFILES_KEY = f'{KEY_PREFIX}:profiles'
+STATS_TIMEOUT = 60 * 60 * 24
+MAX_DUPLICATES = 20   # Duplicate-query fingerprints kept per view
+MAX_PROFILES = 20     # Most recent profiles kept
+PERCENTILES = (50, 90, 95, 99)
+
+DEFAULT_SETTINGS = {
+    'ENABLED': False,
+    'WINDOW_SIZE': 500,
+    'SLOW_QUERIES': 5,
+    'PROFILE_SAMPLE_RATE': 0.0,
+    'PROFILE_VIEWS': [],
+    'PROFILER': 'cprofile',
+}
+
+# Serialises read-modify-write of cache entries within one process; entries may still
+# lose an occasional sample under concurrent workers, which is fine for percentiles
+_lock = threading.Lock()
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LISTS = re.compile(r'\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)')
+_WHITESPACE = re.compile(r'\s+')
+
+
+def get_settings() -> Dict:
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'INSTRUMENTATION_SETTINGS', {})}
+
+
+def fingerprint(sql: str) -> str:
+    """Normalise a query so repeats with different parameters compare equal."""
+    sql = _LITERALS.sub('?', sql)
+    sql = _PLACEHOLDER_LISTS.sub('(...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+class QueryRecorder:
+    """Database execute_wrapper collecting every query and its duration."""
+
+    def __init__(self):
+        self.queries: List[tuple] = []  # (sql, duration_ms)
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, (time.perf_counter() - start) * 1000))
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    @property
+    def total_ms(self) -> float:
+        return sum(duration for _, duration in self.queries)
+
+    def duplicates(self) -> Dict[str, int]:
+        """Fingerprint -> executions, for fingerprints run more than once (N+1 candidates)."""
+        counts = Counter(fingerprint(sql) for sql, _ in self.queries)
+        return {fp: count for fp, count in counts.items() if count > 1}
+
+    def slowest(self, limit: int) -> List[Dict]:
+        ranked = sorted(self.queries, key=lambda query: query[1], reverse=True)[:limit]
+        return [{'sql': sql[:1000], 'ms': round(duration, 2)} for sql, duration in ranked]
+
+
+def _stats_key(view_name: str) -> str:
+    return f'{KEY_PREFIX}:view:{view_name}'
+
+
+def record_request(view_name: str, method: str, status_code: int, wall_ms: float,
+                   recorder: QueryRecorder, config: Optional[Dict] = None) -> None:
+    """Add one request to the rolling window of its view."""
+    config = config or get_settings()
+    window = config['WINDOW_SIZE']
+    slow_limit = config['SLOW_QUERIES']
+
+    with _lock:
+        stats = cache.get(_stats_key(view_name)) or {'samples': [], 'duplicates': {}, 'slow_queries': []}
+
+        stats['samples'].append((round(wall_ms, 2), recorder.count, round(recorder.total_ms, 2), status_code, method))
+        del stats['samples'][:-window]
+
+        for fp, count in recorder.duplicates().items():
+            entry = stats['duplicates'].setdefault(fp, {'requests': 0, 'max_per_request': 0})
+            entry['requests'] += 1
+            entry['max_per_request'] = max(entry['max_per_request'], count)
+        if len(stats['duplicates']) > MAX_DUPLICATES:
+            ranked = sorted(stats['duplicates'].items(), key=lambda item: item[1]['requests'], reverse=True)
+            stats['duplicates'] = dict(ranked[:MAX_DUPLICATES])
+
+        stats['slow_queries'] = sorted(
+            stats['slow_queries'] + recorder.slowest(slow_limit), key=lambda q: q['ms'], reverse=True
+        )[:slow_limit]
+
+        cache.set(_stats_key(view_name), stats, STATS_TIMEOUT)
+        views = cache.get(VIEWS_KEY) or []
+        if view_name not in views:
+            cache.set(VIEWS_KEY, views + [view_name], STATS_TIMEOUT)
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    ordered = sorted(values)
+    result = {}
+    for p in PERCENTILES:
+        index = min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered))) - 1))
+        result[f'p{p}'] = ordered[index]
+    result['max'] = ordered[-1]
+    return result
+
+
+def get_request_stats() -> Dict:
+    """Per-view percentiles, duplicate-query fingerprints and slowest queries."""
+    views = []
+    for view_name in cache.get(VIEWS_KEY) or []:
+        stats = cache.get(_stats_key(view_name))
+        if not stats or not stats['samples']:
+            continue
+        samples = stats['samples']
+        views.append({
+            'view': view_name,
+            'requests': len(samples),
+            'errors': sum(1 for sample in samples if sample[3] >= 500),
+            'wall_ms': _percentiles([sample[0] for sample in samples]),
+            'sql_count': _percentiles([sample[1] for sample in samples]),
+            'sql_ms': _percentiles([sample[2] for sample in samples]),
+            'duplicate_queries': [
+                {'fingerprint': fp, **entry}
+                for fp, entry in sorted(stats['duplicates'].items(),
+                                        key=lambda item: item[1]['requests'], reverse=True)
+            ],
+            'slow_queries': stats['slow_queries'],
+        })
+
+    views.sort(key=lambda view: view['wall_ms']['p95'], reverse=True)
+    return {'enabled': get_settings()['ENABLED'], 'views': views}
+
+
+def get_profiles() -> List[Dict]:
+    return cache.get(PROFILES_KEY) or []
+
+
+def reset_request_stats() -> None:
+    with _lock:
+        cache.delete_many([_stats_key(view) for view in cache.get(VIEWS_KEY) or []] + [VIEWS_KEY, PROFILES_KEY])
+
+
+def should_profile(view_name: str, config: Dict) -> bool:
+    """Sample a request for profiling when its view is selected (or none are listed)."""
+    if config['PROFILE_SAMPLE_RATE'] <= 0:
+        return False
+    if config['PROFILE_VIEWS'] and view_name not in config['PROFILE_VIEWS']:
+        return False
+    return random.random() < config['PROFILE_SAMPLE_RATE']
+
+
+class RequestProfiler:
+    """cProfile, or pyinstrument when configured and installed, around one request."""
+
+    def __init__(self, config: Dict):
+        self.kind = 'pyinstrument' if config['PROFILER'] == 'pyinstrument' and pyinstrument else 'cprofile'
+        if config['PROFILER'] == 'pyinstrument' and pyinstrument is None:
+            logger.warning("pyinstrument is not installed; profiling with cProfile")
+        self._profiler = pyinstrument.Profiler() if self.kind == 'pyinstrument' else cProfile.Profile()
+
+    def start(self) -> None:
+        if self.kind == 'pyinstrument':
+            self._profiler.start()
+        else:
+            self._profiler.enable()
+
+    def stop(self) -> str:
+        """Stop profiling and return the text report."""
+        if self.kind == 'pyinstrument':
+            self._profiler.stop()
+            return self._profiler.output_text()
+        self._profiler.disable()
+        output = io.StringIO()
+        pstats.Stats(self._profiler, stream=output).sort_stats('cumulative').print_stats(40)
+        return output.getvalue()
+
+
+def save_profile(view_name: str, path: str, wall_ms: float, profiler: RequestProfiler, report: str) -> None:
+    with _lock:
+        profiles = get_profiles()
+        profiles.insert(0, {
+            'view': view_name,
+            'path': path,
+            'timestamp': datetime.now().isoformat(),
+            'profiler': profiler.kind,
+            'wall_ms': round(wall_ms, 2),
+            'report': report,
+        })
+        cache.set(PROFILES_KEY, profiles[:MAX_PROFILES], STATS_TIMEOUT)
@@ -3,15 +3,46 @@ Maintenance Mode System for AurumFinance
 Provides controlled application downtime during database operations.
 """
 
+import os
 import time
 import json
 import logging
+import threading
+from dataclasses import dataclass
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
 
+from django.conf import settings
+
 logger = logging.getLogger(__name__)
 
+
+@dataclass(frozen=True)
+class MaintenanceState:
+    """Snapshot of the maintenance flag file, identified by its (mtime, size) version."""
+    version: Optional[tuple] = None
+    info: Optional[Dict[str, Any]] = None
+    expires_at: Optional[datetime] = None
+
+    @property
+    def active(self) -> bool:
+        return self.info is not None
+
+    @classmethod
+    def from_info(cls, version: tuple, info: Optional[Dict[str, Any]]) -> 'MaintenanceState':
+        if info is None:
+            # Flag present but unreadable: still in maintenance, with default details
+            return cls(version, {})
+        expires_at = None
+        if info.get('start_time'):
+            expires_at = (datetime.fromisoformat(info['start_time']) +
+                          timedelta(minutes=info.get('timeout_minutes', 10)))
+        return cls(version, info, expires_at)
+
+
+INACTIVE = MaintenanceState()
+
 class MaintenanceMode:
     """
     Enterprise-grade maintenance mode system for controlled downtime.
@@ -29,6 +60,64 @@ class MaintenanceMode:
         self.flag_file = Path('/var/lib/aurumfinance/maintenance_mode')
         self.default_message = "System maintenance in progress. Please try again in a few minutes."
         self.max_maintenance_duration = 600  # 10 minutes safety timeout
+        
+        # Process-local snapshot of the flag file, re-checked at most every poll interval
+        self._state = INACTIVE
+        self._checked_at = None
+        self._refresh_lock = threading.Lock()
+    
+    @property
+    def poll_interval(self) -> float:
+        """Seconds between flag file checks (MAINTENANCE_POLL_INTERVAL_MS)."""
+        return getattr(settings, 'MAINTENANCE_POLL_INTERVAL_MS', 1000) / 1000
+    
+    def current_state(self) -> MaintenanceState:
+        """
+        Current maintenance state without touching the filesystem between polls.
+        
+        The flag file is stat'ed at most once per poll interval and only re-read when
+        its mtime or size changed; enable()/disable() in this process take effect at once,
+        other processes see changes within one interval.
+        
+        Returns:
+            MaintenanceState (inactive when no maintenance is in progress)
+        """
+        now = time.monotonic()
+        if self._checked_at is None or now - self._checked_at >= self.poll_interval:
+            with self._refresh_lock:
+                if self._checked_at is None or now - self._checked_at >= self.poll_interval:
+                    self._state = self._read_state(self._state)
+                    self._checked_at = time.monotonic()
+        
+        state = self._state
+        if state.expires_at and datetime.now() > state.expires_at:
+            # Timeout protection (safety feature)
+            logger.warning(f"⚠️ Maintenance mode auto-timeout after {state.info.get('timeout_minutes', 10)} minutes")
+            self.disable()
+            return INACTIVE
+        return state
+    
+    def _read_state(self, previous: MaintenanceState) -> MaintenanceState:
+        try:
+            stat = os.stat(self.flag_file)
+        except FileNotFoundError:
+            return INACTIVE
+        except OSError as e:
+            logger.error(f"❌ Error checking maintenance mode status: {str(e)}")
+            # Fail safe - assume not in maintenance if we can't determine
+            return INACTIVE
+        
+        version = (stat.st_mtime_ns, stat.st_size)
+        if version == previous.version:
+            return previous
+        try:
+            return MaintenanceState.from_info(version, self.get_info())
+        except (TypeError, ValueError) as e:
+            logger.error(f"❌ Invalid maintenance mode info: {str(e)}")
+            return MaintenanceState(version, {})
+    
+    def _invalidate(self) -> None:
+        self._checked_at = None
     
     def enable(self, message: Optional[str] = None, admin_bypass: bool = True, timeout_minutes: int = 10) -> Dict[str, Any]:
         """
@@ -58,6 +147,7 @@ class MaintenanceMode:
             # Write maintenance flag file
             with open(self.flag_file, 'w') as f:
                 json.dump(maintenance_data, f, indent=2)
+            self._invalidate()
             
             logger.info(f"✅ Maintenance mode ENABLED: {message or self.default_message}")
             
@@ -88,7 +178,8 @@ class MaintenanceMode:
                 maintenance_info = self.get_info()
                 
                 # Remove flag file
-                self.flag_file.unlink()
+                self.flag_file.unlink(missing_ok=True)
+                self._invalidate()
                 
                 duration = None
                 if maintenance_info and maintenance_info.get('start_time'):
@@ -124,21 +215,7 @@ class MaintenanceMode:
             True if maintenance mode is active, False otherwise
         """
         try:
-            if not self.flag_file.exists():
-                return False
-            
-            # Check for timeout (safety feature)
-            maintenance_info = self.get_info()
-            if maintenance_info and maintenance_info.get('start_time'):
-                start_time = datetime.fromisoformat(maintenance_info['start_time'])
-                timeout_minutes = maintenance_info.get('timeout_minutes', 10)
-                
-                if (datetime.now() - start_time).total_seconds() > (timeout_minutes * 60):
-                    logger.warning(f"⚠️ Maintenance mode auto-timeout after {timeout_minutes} minutes")
-                    self.disable()
-                    return False
-            
-            return True
+            return self.current_state().active
             
         except Exception as e:
             logger.error(f"❌ Error checking maintenance mode status: {str(e)}")
@@ -174,8 +251,8 @@ class MaintenanceMode:
             True if request should bypass maintenance, False otherwise
         """
         try:
-            maintenance_info = self.get_info()
-            if not maintenance_info or not maintenance_info.get('admin_bypass', True):
+            state = self.current_state()
+            if not state.active or not state.info.get('admin_bypass', True):
                 return False
             
             # Allow admin panel access
@@ -4,9 +4,14 @@ Handles requests during maintenance periods with enterprise-grade features.
 """
 
 import logging
+import time
+from contextlib import ExitStack
+from django.db import connections
 from django.http import JsonResponse, HttpResponse
 from django.template import Template, Context
+from django.urls import Resolver404, resolve
 from django.utils.deprecation import MiddlewareMixin
+from . import db_router, instrumentation
 from .maintenance import maintenance_mode
 
 logger = logging.getLogger(__name__)
@@ -29,6 +34,10 @@ class MaintenanceModeMiddleware(MiddlewareMixin):
         self.get_response = get_response
         self.maintenance = maintenance_mode
         
+        # Pre-rendered 503 bodies for the current maintenance state version
+        self._rendered_version = None
+        self._rendered = {}
+        
         # HTML template for maintenance page
         self.maintenance_html_template = """
         <!DOCTYPE html>
@@ -139,8 +148,9 @@ class MaintenanceModeMiddleware(MiddlewareMixin):
             HttpResponse if in maintenance mode, None to continue normally
         """
         try:
-            # Check if maintenance mode is active
-            if not self.maintenance.is_active():
+            # Check if maintenance mode is active (process-local snapshot, no syscall per request)
+            state = self.maintenance.current_state()
+            if not state.active:
                 return None
             
             # Check for admin bypass
@@ -148,34 +158,58 @@ class MaintenanceModeMiddleware(MiddlewareMixin):
                 logger.debug(f"🔐 Admin bypass for {request.path} - {request.user}")
                 return None
             
-            # Get maintenance information
-            maintenance_info = self.maintenance.get_info()
-            if not maintenance_info:
-                # If we can't get info but maintenance is active, use defaults
-                maintenance_info = {
-                    'message': 'System maintenance in progress. Please try again in a few minutes.',
-                    'start_time': 'Unknown'
-                }
-            
             # Log maintenance request (throttled to avoid spam)
-            if not hasattr(self, '_last_log_time') or \
-               hasattr(self, '_last_log_time') and (
-                   __import__('time').time() - getattr(self, '_last_log_time', 0) > 60
-               ):
+            if time.time() - getattr(self, '_last_log_time', 0) > 60:
                 logger.info(f"⚠️ Maintenance mode active - blocking request to {request.path}")
-                self._last_log_time = __import__('time').time()
+                self._last_log_time = time.time()
             
             # Return appropriate response based on request type
             if self._is_api_request(request):
-                return self._create_api_maintenance_response(maintenance_info)
+                return self._maintenance_response(state, 'api')
             else:
-                return self._create_html_maintenance_response(maintenance_info)
+                return self._maintenance_response(state, 'html')
                 
         except Exception as e:
             logger.error(f"❌ Error in maintenance middleware: {str(e)}")
             # Fail safe - allow request to continue if middleware fails
             return None
     
+    def _maintenance_response(self, state, kind):
+        """
+        Build the 503 response for a maintenance state, rendering its body only once per
+        state version.
+        
+        Args:
+            state: MaintenanceState currently in effect
+            kind: 'api' for JSON, 'html' for the maintenance page
+            
+        Returns:
+            Fresh HttpResponse with the cached body
+        """
+        if self._rendered_version != state.version:
+            self._rendered_version = state.version
+            self._rendered = {}
+        
+        cached = self._rendered.get(kind)
+        if cached is None:
+            maintenance_info = state.info or {
+                # If we can't get info but maintenance is active, use defaults
+                'message': 'System maintenance in progress. Please try again in a few minutes.',
+                'start_time': 'Unknown'
+            }
+            if kind == 'api':
+                rendered = self._create_api_maintenance_response(maintenance_info)
+            else:
+                rendered = self._create_html_maintenance_response(maintenance_info)
+            cached = (rendered.content, rendered['Content-Type'], dict(rendered.items()))
+            self._rendered[kind] = cached
+        
+        content, content_type, headers = cached
+        response = HttpResponse(content, content_type=content_type, status=503)
+        for header, value in headers.items():
+            response[header] = value
+        return response
+    
     def _is_api_request(self, request):
         """
         Determine if request is an API request that should get JSON response.
@@ -300,4 +334,91 @@ class MaintenanceModeMiddleware(MiddlewareMixin):
             return dt.strftime('%Y-%m-%d %H:%M:%S UTC')
             
         except Exception:
-            return start_time_iso or 'Unknown'
\ No newline at end of file
+            return start_time_iso or 'Unknown'
+
+
+class RequestInstrumentationMiddleware:
+    """
+    Opt-in per-request instrumentation (INSTRUMENTATION_SETTINGS['ENABLED']).
+
+    Records view name, wall time, SQL query count/time, duplicate-query fingerprints
+    and the slowest queries into rolling per-view stats, adds a Server-Timing header,
+    and profiles a sample of requests when PROFILE_SAMPLE_RATE is set.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        config = instrumentation.get_settings()
+        if not config['ENABLED']:
+            return self.get_response(request)
+
+        try:
+            view_name = resolve(request.path_info).view_name
+        except Resolver404:
+            return self.get_response(request)
+
+        profiler = None
+        if instrumentation.should_profile(view_name, config):
+            try:
+                profiler = instrumentation.RequestProfiler(config)
+                profiler.start()
+            except Exception as e:
+                # e.g. another request in this process is already being profiled
+                logger.warning(f"Could not start profiler for {view_name}: {e}")
+                profiler = None
+
+        recorder = instrumentation.QueryRecorder()
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(recorder))
+                response = self.get_response(request)
+        finally:
+            wall_ms = (time.perf_counter() - start) * 1000
+            report = profiler.stop() if profiler else None
+
+        try:
+            instrumentation.record_request(view_name, request.method, response.status_code,
+                                           wall_ms, recorder, config)
+            if report:
+                instrumentation.save_profile(view_name, request.path, wall_ms, profiler, report)
+        except Exception as e:
+            logger.warning(f"Failed to record request instrumentation for {view_name}: {e}")
+
+        response['Server-Timing'] = (
+            f'app;dur={wall_ms:.1f}, db;dur={recorder.total_ms:.1f};desc="{recorder.count} queries"'
+        )
+        return response
+
+
+class ReadReplicaMiddleware:
+    """
+    Route reads of safe requests to the read replica (REPLICA_SETTINGS['ALIAS']).
+
+    Mutations, and safe requests that wrote anyway, set a short-lived cookie so the
+    client's following requests read from the primary and see their own writes.
+    """
+
+    SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        config = db_router.get_settings()
+        if not config['ALIAS']:
+            return self.get_response(request)
+
+        safe = request.method in self.SAFE_METHODS
+        pinned = db_router.PIN_COOKIE in request.COOKIES
+        with db_router.replica_scope(allowed=safe and not pinned):
+            response = self.get_response(request)
+            wrote = db_router.is_pinned()
+
+        if (not safe or wrote) and response.status_code < 400:
+            response.set_cookie(db_router.PIN_COOKIE, '1', max_age=config['PIN_SECONDS'],
+                                httponly=True, samesite='Lax')
+        return response
@@ -4,4 +4,7 @@ from django.apps import AppConfig
 class PortfolioConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'portfolio'
-    verbose_name = 'Aurum Finance Portfolio'
\ No newline at end of file
+    verbose_name = 'Aurum Finance Portfolio'
+
+    def ready(self):
+        from . import signals  # noqa: F401
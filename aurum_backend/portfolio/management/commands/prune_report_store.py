@@ -0,0 +1,31 @@
+"""
+Django management command to delete report store objects no report references.
+Run with: python manage.py prune_report_store [--min-age-hours 1] [--dry-run]
+"""
+
+from django.core.management.base import BaseCommand
+
+from portfolio.utils.report_store import prune_unreferenced_objects
+
+
+class Command(BaseCommand):
+    help = 'Delete stored report objects that no report reference points at'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-age-hours',
+            type=float,
+            default=1,
+            help='Keep objects written more recently than this (default: 1)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Count unreferenced objects without deleting them',
+        )
+
+    def handle(self, *args, **options):
+        removed = prune_unreferenced_objects(int(options['min_age_hours'] * 3600), dry_run=options['dry_run'])
+
+        prefix = 'Would prune' if options['dry_run'] else 'Pruned'
+        self.stdout.write(self.style.SUCCESS(f"{prefix} {removed} unreferenced report objects"))
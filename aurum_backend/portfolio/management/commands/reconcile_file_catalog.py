@@ -0,0 +1,34 @@
+"""
+Django management command to reconcile the bank file catalog with the disk.
+Run with: python manage.py reconcile_file_catalog [--stage upload input output] [--dry-run]
+"""
+
+from django.core.management.base import BaseCommand
+
+from portfolio.services.file_catalog_service import FileCatalogService, STAGES
+
+
+class Command(BaseCommand):
+    help = 'Add, refresh and remove bank file catalog entries to match the files on disk'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--stage',
+            nargs='+',
+            choices=STAGES,
+            help='Only reconcile these stages (default: all)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report the drift without changing the catalog',
+        )
+
+    def handle(self, *args, **options):
+        stats = FileCatalogService().reconcile(options['stage'], dry_run=options['dry_run'])
+
+        prefix = 'Would reconcile' if options['dry_run'] else 'Reconciled'
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix} file catalog: {stats['added']} added, {stats['updated']} updated, "
+            f"{stats['removed']} removed, {stats['unchanged']} unchanged"
+        ))
@@ -0,0 +1,31 @@
+"""
+Django management command to refresh the local ETF look-through store from FMP.
+Run with: python manage.py refresh_etf_holdings [--tickers SPY QQQ]
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from portfolio.services.etf_lookthrough_service import ETFLookthroughService
+
+
+class Command(BaseCommand):
+    help = 'Refresh ETF holdings and ticker reference data used for equity look-through'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tickers',
+            nargs='+',
+            help='Only refresh these tickers (default: every held equity ticker plus SPY)',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            stats = ETFLookthroughService().refresh(options['tickers'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Refreshed {stats['tickers']} tickers ({stats['etfs']} ETFs, "
+            f"{stats['constituents']} constituents), {stats['unresolved']} without profile "
+            f"(retried next run), {stats['errors']} errors"
+        ))
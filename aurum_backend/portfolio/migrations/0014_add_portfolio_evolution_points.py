@@ -0,0 +1,56 @@
+# Generated by Django 4.2.23 on 2026-10-18 20:46
+
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import migrations, models
+
+
+def backfill_evolution_points(apps, schema_editor):
+    """Seed the series from the total_value already stored on each snapshot."""
+    PortfolioSnapshot = apps.get_model('portfolio', 'PortfolioSnapshot')
+    PortfolioEvolutionPoint = apps.get_model('portfolio', 'PortfolioEvolutionPoint')
+
+    points = []
+    firm_totals = defaultdict(Decimal)
+    snapshots = PortfolioSnapshot.objects.values_list(
+        'client__code', 'snapshot_date', 'portfolio_metrics'
+    ).iterator()
+    for client_code, snapshot_date, metrics in snapshots:
+        total_value = Decimal(str((metrics or {}).get('total_value', 0)))
+        points.append(PortfolioEvolutionPoint(
+            client_filter=client_code, snapshot_date=snapshot_date, total_value=total_value
+        ))
+        firm_totals[snapshot_date] += total_value
+
+    points.extend(
+        PortfolioEvolutionPoint(client_filter='ALL', snapshot_date=snapshot_date, total_value=total)
+        for snapshot_date, total in firm_totals.items()
+    )
+    PortfolioEvolutionPoint.objects.bulk_create(points, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0013_add_monthly_returns_to_cache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PortfolioEvolutionPoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('snapshot_date', models.DateField(db_index=True)),
+                ('client_filter', models.CharField(db_index=True, default='ALL', max_length=10)),
+                ('total_value', models.DecimalField(decimal_places=2, max_digits=20)),
+                ('last_updated', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'portfolio_evolution_point',
+                'indexes': [models.Index(fields=['client_filter', 'snapshot_date'], name='portfolio_e_client__6b2574_idx')],
+                'unique_together': {('client_filter', 'snapshot_date')},
+            },
+        ),
+        migrations.RunPython(backfill_evolution_points, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.23 on 2026-10-18 21:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0014_add_portfolio_evolution_points'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SecurityReference',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ticker', models.CharField(max_length=20, unique=True)),
+                ('name', models.CharField(blank=True, default='', max_length=200)),
+                ('sector', models.CharField(default='Unknown', max_length=100)),
+                ('is_etf', models.BooleanField(default=False)),
+                ('sector_weightings', models.JSONField(blank=True, default=dict, help_text='ETF sector allocation (percent)')),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'security_reference',
+            },
+        ),
+        migrations.CreateModel(
+            name='ETFConstituent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('etf_ticker', models.CharField(db_index=True, max_length=20)),
+                ('constituent_ticker', models.CharField(max_length=20)),
+                ('constituent_name', models.CharField(blank=True, default='', max_length=200)),
+                ('weight', models.FloatField()),
+                ('rank', models.PositiveIntegerField(default=0)),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'etf_constituent',
+                'ordering': ['etf_ticker', 'rank'],
+                'unique_together': {('etf_ticker', 'constituent_ticker')},
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.23 on 2026-10-18 21:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0015_add_etf_lookthrough_store'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='position',
+            index=models.Index(condition=models.Q(('bank', 'ALT'), _negated=True), fields=['snapshot'], include=('asset', 'market_value', 'quantity'), name='position_nonalt_snapshot_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transaction',
+            index=models.Index(condition=models.Q(('bank', 'ALT'), _negated=True), fields=['client', 'date'], include=('amount', 'transaction_type'), name='transaction_nonalt_date_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.23 on 2026-10-18 21:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0016_add_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BankFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path', models.CharField(max_length=500, unique=True)),
+                ('directory', models.CharField(db_index=True, max_length=500)),
+                ('filename', models.CharField(max_length=255)),
+                ('bank', models.CharField(blank=True, db_index=True, default='', max_length=20)),
+                ('file_date', models.CharField(blank=True, default='', help_text='DD_MM_YYYY from the filename', max_length=10)),
+                ('file_type', models.CharField(blank=True, default='', max_length=20)),
+                ('size', models.BigIntegerField(default=0)),
+                ('mtime', models.DateTimeField()),
+                ('content_hash', models.CharField(blank=True, default='', max_length=64)),
+                ('stage', models.CharField(choices=[('upload', 'Uploaded'), ('input', 'Input'), ('output', 'Output')], max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'bank_file_catalog',
+                'indexes': [models.Index(fields=['stage', 'file_date'], name='bank_file_c_stage_1273af_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.23 on 2026-10-18 21:47
+
+import django.core.serializers.json
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0017_add_bank_file_catalog'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClientDashboardDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('client_code', models.CharField(max_length=10, unique=True)),
+                ('data_version', models.CharField(help_text='Client data version the payload was built from', max_length=50)),
+                ('payload', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder, help_text="{'dashboard': charts endpoint body, 'data': summary endpoint body}")),
+                ('generated_at', models.DateTimeField(auto_now=True)),
+                ('snapshot', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='portfolio.portfoliosnapshot')),
+            ],
+            options={
+                'db_table': 'client_dashboard_document',
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.23 on 2026-10-18 21:58
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0018_add_client_dashboard_document'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_id', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('export_type', models.CharField(default='transactions', max_length=20)),
+                ('client_code', models.CharField(max_length=10)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('export_format', models.CharField(default='xlsx', max_length=10)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('RUNNING', 'Running'), ('COMPLETED', 'Completed'), ('ERROR', 'Error')], default='PENDING', max_length=20)),
+                ('total_rows', models.IntegerField(default=0)),
+                ('rows_written', models.IntegerField(default=0)),
+                ('error_message', models.TextField(blank=True)),
+                ('filename', models.CharField(blank=True, max_length=255)),
+                ('file_path', models.CharField(blank=True, max_length=500)),
+                ('file_size', models.BigIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'portfolio_export_job',
+                'indexes': [models.Index(fields=['status', 'created_at'], name='portfolio_e_status_2eb052_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.23 on 2026-10-18 22:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0019_add_export_job'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='position',
+            name='position_nonalt_snapshot_idx',
+        ),
+        migrations.AddIndex(
+            model_name='position',
+            index=models.Index(fields=['snapshot'], include=('asset', 'market_value', 'quantity'), name='position_snapshot_cover_idx'),
+        ),
+    ]
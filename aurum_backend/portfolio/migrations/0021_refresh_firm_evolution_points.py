@@ -0,0 +1,52 @@
+# Generated by Django 4.2.23 on 2026-10-18 22:50
+
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import migrations
+
+MIN_CLIENT_POINTS = 2
+
+
+def refresh_firm_points(apps, schema_editor):
+    """
+    Recompute the 'ALL' points: drop points of snapshots that no longer exist and
+    only count clients with at least MIN_CLIENT_POINTS points, as the live chart did.
+    """
+    PortfolioSnapshot = apps.get_model('portfolio', 'PortfolioSnapshot')
+    PortfolioEvolutionPoint = apps.get_model('portfolio', 'PortfolioEvolutionPoint')
+
+    existing = set(PortfolioSnapshot.objects.values_list('client__code', 'snapshot_date'))
+    client_points = defaultdict(list)
+    stale = []
+    for point_id, client_code, snapshot_date, total_value in PortfolioEvolutionPoint.objects.exclude(
+        client_filter='ALL'
+    ).values_list('id', 'client_filter', 'snapshot_date', 'total_value'):
+        if (client_code, snapshot_date) in existing:
+            client_points[client_code].append((snapshot_date, total_value))
+        else:
+            stale.append(point_id)
+    PortfolioEvolutionPoint.objects.filter(id__in=stale).delete()
+
+    firm_totals = defaultdict(Decimal)
+    for points in client_points.values():
+        if len(points) >= MIN_CLIENT_POINTS:
+            for snapshot_date, total_value in points:
+                firm_totals[snapshot_date] += total_value
+
+    PortfolioEvolutionPoint.objects.filter(client_filter='ALL').delete()
+    PortfolioEvolutionPoint.objects.bulk_create([
+        PortfolioEvolutionPoint(client_filter='ALL', snapshot_date=snapshot_date, total_value=total)
+        for snapshot_date, total in firm_totals.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0020_replace_position_nonalt_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(refresh_firm_points, migrations.RunPython.noop),
+    ]
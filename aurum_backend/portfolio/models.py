@@ -6,7 +6,9 @@ Clean snapshot-based architecture with proper client isolation.
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
 from decimal import Decimal
+import uuid
 
 
 class User(AbstractUser):
@@ -179,6 +181,17 @@ class PortfolioSnapshot(models.Model):
         return f"Snapshot for {self.client.code} on {self.snapshot_date}"
 
 
+class PositionQuerySet(models.QuerySet):
+    def exclude_alt(self):
+        """
+        Exclude ALT (alternative investments) positions.
+        
+        ALT is decided by the asset's custody bank, the source of truth; the position's
+        own bank is the parsed custody value and is not kept in sync with it.
+        """
+        return self.exclude(asset__bank='ALT')
+
+
 class Position(models.Model):
     """
     Position model representing asset holdings at specific dates.
@@ -216,17 +229,31 @@ class Position(models.Model):
     
     created_at = models.DateTimeField(auto_now_add=True)
     
+    objects = PositionQuerySet.as_manager()
+    
     class Meta:
         db_table = 'portfolio_position'
         indexes = [
             models.Index(fields=['snapshot']),
             models.Index(fields=['asset']),
             models.Index(fields=['snapshot', 'asset']),
+            # Positions of a snapshot with the values totals and the ALT join need (covering on PostgreSQL)
+            models.Index(fields=['snapshot'], include=['asset', 'market_value', 'quantity'],
+                         name='position_snapshot_cover_idx'),
         ]
         unique_together = [['snapshot', 'asset']]
     
     def save(self, *args, **kwargs):
         """Calculate estimated_annual_income before saving."""
+        self.calculate_estimated_annual_income()
+        super().save(*args, **kwargs)
+    
+    def calculate_estimated_annual_income(self):
+        """
+        Set estimated_annual_income from coupon_rate and quantity.
+        
+        Called by save(); bulk_create skips save(), so bulk writers call it themselves.
+        """
         if self.coupon_rate and self.quantity:
             # Convert percentage to decimal - all coupon rates are stored as percentages
             coupon_rate = float(self.coupon_rate) / 100
@@ -235,8 +262,6 @@ class Position(models.Model):
             self.estimated_annual_income = Decimal(str(coupon_rate)) * self.quantity
         else:
             self.estimated_annual_income = None
-        
-        super().save(*args, **kwargs)
     
     def __str__(self):
         return f"{self.asset.ticker} - {self.quantity} shares in {self.snapshot}"
@@ -277,6 +302,9 @@ class Transaction(models.Model):
             models.Index(fields=['client', 'asset', 'date']),
             models.Index(fields=['client', 'transaction_type']),
             models.Index(fields=['transaction_id']),
+            # Non-ALT transactions of a client by date range (cash flows, Modified Dietz)
+            models.Index(fields=['client', 'date'], include=['amount', 'transaction_type'],
+                         condition=~models.Q(bank='ALT'), name='transaction_nonalt_date_idx'),
         ]
     
     def __str__(self):
@@ -401,4 +429,180 @@ class DateAggregatedMetrics(models.Model):
         ]
     
     def __str__(self):
-        return f"Aggregated data for {self.snapshot_date} ({self.client_filter})"
\ No newline at end of file
+        return f"Aggregated data for {self.snapshot_date} ({self.client_filter})"
+
+class PortfolioEvolutionPoint(models.Model):
+    """
+    Pre-computed portfolio value series, one point per client per snapshot date.
+    client_filter holds a client code, or 'ALL' for the firm-wide total.
+    Maintained incrementally as metrics are calculated and snapshots deleted, so
+    evolution charts never have to re-read every snapshot's metrics JSON.
+    """
+    snapshot_date = models.DateField(db_index=True)
+    client_filter = models.CharField(max_length=10, default='ALL', db_index=True)
+    total_value = models.DecimalField(max_digits=20, decimal_places=2)
+    
+    # Metadata
+    last_updated = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'portfolio_evolution_point'
+        unique_together = ['client_filter', 'snapshot_date']
+        indexes = [
+            models.Index(fields=['client_filter', 'snapshot_date']),
+        ]
+    
+    def __str__(self):
+        return f"Evolution point for {self.snapshot_date} ({self.client_filter})"
+
+
+class SecurityReference(models.Model):
+    """
+    Local reference data per equity ticker, refreshed periodically from FMP
+    (manage.py refresh_etf_holdings) so equity analysis needs no API calls per request.
+    """
+    ticker = models.CharField(max_length=20, unique=True)
+    name = models.CharField(max_length=200, blank=True, default='')
+    sector = models.CharField(max_length=100, default='Unknown')
+    is_etf = models.BooleanField(default=False)
+    sector_weightings = models.JSONField(default=dict, blank=True, help_text="ETF sector allocation (percent)")
+    
+    # Metadata
+    refreshed_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'security_reference'
+    
+    def __str__(self):
+        return f"{self.ticker} ({'ETF' if self.is_etf else self.sector})"
+
+
+class ETFConstituent(models.Model):
+    """
+    One non-zero entry of the ETF x constituent weight matrix (weight in percent).
+    Only the top holdings used for look-through are stored.
+    """
+    etf_ticker = models.CharField(max_length=20, db_index=True)
+    constituent_ticker = models.CharField(max_length=20)
+    constituent_name = models.CharField(max_length=200, blank=True, default='')
+    weight = models.FloatField()
+    rank = models.PositiveIntegerField(default=0)
+    
+    # Metadata
+    refreshed_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'etf_constituent'
+        unique_together = ['etf_ticker', 'constituent_ticker']
+        ordering = ['etf_ticker', 'rank']
+    
+    def __str__(self):
+        return f"{self.etf_ticker} -> {self.constituent_ticker} ({self.weight}%)"
+
+
+class BankFile(models.Model):
+    """
+    Catalog of the bank files on disk - uploads, organized input files and preprocessing
+    outputs - so polled status and date endpoints query one table instead of globbing
+    every bank directory. Updated where files are written; reconcile_file_catalog
+    repairs drift.
+    """
+    STAGE_CHOICES = [
+        ('upload', 'Uploaded'),   # uploads directory, not yet organized
+        ('input', 'Input'),       # data/excel/input_files, awaiting preprocessing
+        ('output', 'Output'),     # data/excel, preprocessed
+    ]
+    
+    path = models.CharField(max_length=500, unique=True)
+    directory = models.CharField(max_length=500, db_index=True)
+    filename = models.CharField(max_length=255)
+    bank = models.CharField(max_length=20, blank=True, default='', db_index=True)
+    file_date = models.CharField(max_length=10, blank=True, default='', help_text="DD_MM_YYYY from the filename")
+    file_type = models.CharField(max_length=20, blank=True, default='')
+    size = models.BigIntegerField(default=0)
+    mtime = models.DateTimeField()
+    content_hash = models.CharField(max_length=64, blank=True, default='')
+    stage = models.CharField(max_length=10, choices=STAGE_CHOICES)
+    
+    # Metadata
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'bank_file_catalog'
+        indexes = [
+            models.Index(fields=['stage', 'file_date']),
+        ]
+    
+    def __str__(self):
+        return f"{self.stage}: {self.path}"
+
+
+class ClientDashboardDocument(models.Model):
+    """
+    Ready-to-serve client dashboard for a client's latest snapshot, written by
+    update_database so client logins do not rebuild metrics and charts. A document
+    is only served while it matches the latest snapshot and the client's data version;
+    otherwise the endpoints fall back to the live calculation.
+    """
+    client_code = models.CharField(max_length=10, unique=True)
+    snapshot = models.ForeignKey(PortfolioSnapshot, on_delete=models.CASCADE, related_name='+')
+    data_version = models.CharField(max_length=50, help_text="Client data version the payload was built from")
+    payload = models.JSONField(encoder=DjangoJSONEncoder,
+                               help_text="{'dashboard': charts endpoint body, 'data': summary endpoint body}")
+    
+    # Metadata
+    generated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'client_dashboard_document'
+    
+    def __str__(self):
+        return f"Dashboard document for {self.client_code} ({self.snapshot_id})"
+
+
+class ExportJob(models.Model):
+    """
+    Background data export. Large transaction exports are written to a file by a worker
+    instead of being streamed inside the request; the job row reports progress and,
+    once completed, where the downloadable file is.
+    """
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('RUNNING', 'Running'),
+        ('COMPLETED', 'Completed'),
+        ('ERROR', 'Error'),
+    ]
+    
+    job_id = models.UUIDField(unique=True, default=uuid.uuid4, editable=False)
+    export_type = models.CharField(max_length=20, default='transactions')
+    client_code = models.CharField(max_length=10)
+    start_date = models.DateField()
+    end_date = models.DateField()
+    export_format = models.CharField(max_length=10, default='xlsx')
+    requested_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    
+    # Progress
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
+    total_rows = models.IntegerField(default=0)
+    rows_written = models.IntegerField(default=0)
+    error_message = models.TextField(blank=True)
+    
+    # Result
+    filename = models.CharField(max_length=255, blank=True)
+    file_path = models.CharField(max_length=500, blank=True)
+    file_size = models.BigIntegerField(null=True, blank=True)
+    
+    # Metadata
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'portfolio_export_job'
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.export_type} export {self.job_id}: {self.status}"
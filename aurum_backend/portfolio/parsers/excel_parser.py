@@ -153,6 +153,25 @@ class ExcelParser:
         
         return True
     
+    def filter_client(self, df: pd.DataFrame, client_code: Optional[str]) -> pd.DataFrame:
+        """
+        Keep only one client's rows, before they are parsed row by row.
+        
+        Args:
+            df: DataFrame with a mapped client column
+            client_code: Client to keep (None keeps every row)
+            
+        Returns:
+            The client's rows, in file order
+        """
+        if not client_code:
+            return df
+        client_col = self.column_map.get('client', 'client')
+        codes = df[client_col].where(df[client_col].notna(), '').astype(str).str.strip().str.upper()
+        filtered = df[codes == client_code.strip().upper()]
+        logger.info(f"Kept {len(filtered)} of {len(df)} rows for client {client_code}")
+        return filtered
+    
     def parse(self) -> List[Dict[str, Any]]:
         """
         Parse the Excel file.
@@ -223,10 +242,13 @@ class StatementParser(ExcelParser):
             'client': ['Client', 'client', 'Client Code', 'ClientCode', 'Client Id', 'ClientId']
         }
     
-    def parse(self) -> Dict[str, List[Dict[str, Any]]]:
+    def parse(self, client_code: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
         """
         Parse the securities Excel file and group by client.
         
+        Args:
+            client_code: Only parse this client's rows (default: every client)
+        
         Returns:
             Dictionary with client codes as keys and lists of security dictionaries as values
         """
@@ -241,6 +263,8 @@ class StatementParser(ExcelParser):
         if client_col not in df.columns:
             raise ValueError(f"Excel file must include a client column. Available columns: {', '.join(df.columns)}")
         
+        df = self.filter_client(df, client_code)
+        
         # Group records by client
         securities_by_client = {}
         
@@ -424,10 +448,13 @@ class TransactionParser(ExcelParser):
             'client': ['Client', 'client', 'Client Code', 'ClientCode', 'Client Id', 'ClientId']
         }
     
-    def parse(self) -> Dict[str, List[Dict[str, Any]]]:
+    def parse(self, client_code: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
         """
         Parse the transactions Excel file and group by client.
         
+        Args:
+            client_code: Only parse this client's rows (default: every client)
+        
         Returns:
             Dictionary with client codes as keys and lists of transaction dictionaries as values
         """
@@ -442,6 +469,8 @@ class TransactionParser(ExcelParser):
         if client_col not in df.columns:
             raise ValueError(f"Excel file must include a client column. Available columns: {', '.join(df.columns)}")
         
+        df = self.filter_client(df, client_code)
+        
         # Group records by client
         transactions_by_client = {}
         
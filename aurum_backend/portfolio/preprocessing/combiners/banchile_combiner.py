@@ -19,6 +19,7 @@ project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
 from preprocessing.bank_detector import BankDetector
+from preprocessing.combiners.combiner_runtime import CombinerRuntime, FileReadResult
 
 logger = logging.getLogger(__name__)
 
@@ -26,9 +27,10 @@ logger = logging.getLogger(__name__)
 class BanchileCombiner:
     """Combines individual Banchile client files with dual sheets into unified bank files."""
     
-    def __init__(self):
+    def __init__(self, progress_tracker=None):
         """Initialize the Banchile combiner."""
         self.bank_code = 'Banchile'
+        self.runtime = CombinerRuntime(self.bank_code, progress_tracker=progress_tracker)
         self.securities_sheet_name = 'Posiciones'
         self.transactions_sheet_name = 'Movimientos'
         self.header_row = 4  # Row 5 in Excel (0-indexed)
@@ -209,13 +211,34 @@ class BanchileCombiner:
         
         return df
     
-    def combine_securities_files(self, files: List[Dict], output_path: Path) -> bool:
+    def _read_account_file(self, file_info: Dict) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Read both sheets of one account file with bank, client, account columns (runs in a worker)."""
+        bank, client, account = file_info['bank'], file_info['client'], file_info['account']
+        securities_df, transactions_df = self.process_single_file(file_info['file'], client, account)
+        return (self.add_bank_client_account_columns(securities_df, bank, client, account),
+                self.add_bank_client_account_columns(transactions_df, bank, client, account))
+    
+    def read_files(self, files: List[Dict]) -> List[FileReadResult]:
+        """
+        Read every account file once, concurrently, for both combinations.
+        
+        Args:
+            files: List of file info dictionaries
+            
+        Returns:
+            Results in file order, each holding (securities_df, transactions_df)
+        """
+        return self.runtime.read_all(files, self._read_account_file, 'account')
+    
+    def combine_securities_files(self, files: List[Dict], output_path: Path,
+                              results: Optional[List[FileReadResult]] = None) -> bool:
         """
         Combine individual securities files into unified file.
         
         Args:
             files: List of file info dictionaries
             output_path: Path for output file
+            results: Files already read by read_files (read here when None)
             
         Returns:
             True if successful, False otherwise
@@ -231,33 +254,29 @@ class BanchileCombiner:
         failed_files = 0
         total_records = 0
         
-        for file_info in files:
-            file_path = file_info['file']
-            client = file_info['client']
-            account = file_info['account']
-            bank = file_info['bank']
-            
-            try:
-                # Process single file to get securities data
-                securities_df, _ = self.process_single_file(file_path, client, account)
-                
-                if securities_df.empty:
-                    logger.warning(f"  ⚠️ Empty securities data: {client}_{account}")
-                    continue
-                
-                # Add bank, client, account columns
-                securities_df = self.add_bank_client_account_columns(securities_df, bank, client, account)
-                
-                combined_data.append(securities_df)
-                successful_files += 1
-                record_count = len(securities_df)
-                total_records += record_count
-                logger.info(f"  ✅ Added {record_count} securities records from {client}_{account}")
-                
-            except Exception as e:
-                logger.error(f"  ❌ Error processing securities from {file_path.name}: {str(e)}")
+        if results is None:
+            results = self.read_files(files)
+        
+        for result in results:
+            file_path = result.file_info['file']
+            client = result.file_info['client']
+            account = result.file_info['account']
+            
+            if not result.ok:
+                logger.error(f"  ❌ Error processing securities from {file_path.name}: {result.error}")
                 failed_files += 1
                 continue
+            
+            securities_df = result.data[0]
+            if securities_df.empty:
+                logger.warning(f"  ⚠️ Empty securities data: {client}_{account}")
+                continue
+            
+            combined_data.append(securities_df)
+            successful_files += 1
+            record_count = len(securities_df)
+            total_records += record_count
+            logger.info(f"  ✅ Added {record_count} securities records from {client}_{account}")
         
         if not combined_data:
             logger.error("❌ No valid securities data to combine")
@@ -283,13 +302,15 @@ class BanchileCombiner:
             logger.error(f"❌ Error saving combined securities file: {str(e)}")
             return False
     
-    def combine_transactions_files(self, files: List[Dict], output_path: Path) -> bool:
+    def combine_transactions_files(self, files: List[Dict], output_path: Path,
+                              results: Optional[List[FileReadResult]] = None) -> bool:
         """
         Combine individual transactions files into unified file.
         
         Args:
             files: List of file info dictionaries
             output_path: Path for output file
+            results: Files already read by read_files (read here when None)
             
         Returns:
             True if successful, False otherwise
@@ -305,33 +326,29 @@ class BanchileCombiner:
         failed_files = 0
         total_records = 0
         
-        for file_info in files:
-            file_path = file_info['file']
-            client = file_info['client']
-            account = file_info['account']
-            bank = file_info['bank']
-            
-            try:
-                # Process single file to get transactions data
-                _, transactions_df = self.process_single_file(file_path, client, account)
-                
-                if transactions_df.empty:
-                    logger.warning(f"  ⚠️ Empty transactions data: {client}_{account}")
-                    continue
-                
-                # Add bank, client, account columns
-                transactions_df = self.add_bank_client_account_columns(transactions_df, bank, client, account)
-                
-                combined_data.append(transactions_df)
-                successful_files += 1
-                record_count = len(transactions_df)
-                total_records += record_count
-                logger.info(f"  ✅ Added {record_count} transactions records from {client}_{account}")
-                
-            except Exception as e:
-                logger.error(f"  ❌ Error processing transactions from {file_path.name}: {str(e)}")
+        if results is None:
+            results = self.read_files(files)
+        
+        for result in results:
+            file_path = result.file_info['file']
+            client = result.file_info['client']
+            account = result.file_info['account']
+            
+            if not result.ok:
+                logger.error(f"  ❌ Error processing transactions from {file_path.name}: {result.error}")
                 failed_files += 1
                 continue
+            
+            transactions_df = result.data[1]
+            if transactions_df.empty:
+                logger.warning(f"  ⚠️ Empty transactions data: {client}_{account}")
+                continue
+            
+            combined_data.append(transactions_df)
+            successful_files += 1
+            record_count = len(transactions_df)
+            total_records += record_count
+            logger.info(f"  ✅ Added {record_count} transactions records from {client}_{account}")
         
         if not combined_data:
             logger.error("❌ No valid transactions data to combine")
@@ -396,13 +413,16 @@ class BanchileCombiner:
         # Create output directory if it doesn't exist
         output_dir.mkdir(parents=True, exist_ok=True)
         
+        # Each file holds both sheets, so read them once for both combinations
+        results = self.read_files(files)
+        
         # Combine securities files
         logger.info("\n📄 Processing securities files...")
-        securities_success = self.combine_securities_files(files, securities_output)
+        securities_success = self.combine_securities_files(files, securities_output, results)
         
         # Combine transactions files
         logger.info("\n💰 Processing transactions files...")
-        transactions_success = self.combine_transactions_files(files, transactions_output)
+        transactions_success = self.combine_transactions_files(files, transactions_output, results)
         
         # Final summary
         logger.info("\n" + "=" * 50)
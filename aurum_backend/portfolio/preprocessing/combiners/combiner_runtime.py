@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Combiner Runtime
+
+Shared file loading for the multi-file combiners. Banks deliver one workbook per
+account and every read runs header detection plus a full read_excel, so the account
+files of a date are read and normalized concurrently in a bounded process pool
+(Excel parsing is CPU bound; threads would serialize on the GIL).
+
+- Results come back in input order, so the combined file matches a sequential run.
+- A file that fails only fails itself: its error is returned with its result.
+- Per-file read timings are reported to the ProgressTracker.
+
+The pool is bounded by the file count and by max_workers, which defaults to the smaller
+of the CPU count and COMBINER_MAX_WORKERS (4 when unset). With one worker files are
+read inline, and a pool that cannot start or breaks falls back to reading them inline.
+Workers are started by a forkserver (spawn where that is unavailable) rather than
+forked, so they never inherit the parent's database connections, locks or threads.
+"""
+
+import os
+import sys
+import time
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import repeat
+from pathlib import Path
+from typing import Any, Callable, Iterable, List, Optional
+
+import pandas as pd
+
+# Add the project root to Python path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from preprocessing.progress_tracker import ProgressTracker
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 4
+
+
+@dataclass
+class FileReadResult:
+    """Outcome of reading one file: the read function's return value or its error."""
+    file_info: Any
+    data: Any = None
+    error: Optional[str] = None
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _pool_context():
+    """Start method for pool workers: forkserver where the platform has it, else spawn."""
+    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    return multiprocessing.get_context(method)
+
+
+def _timed_read(read_func: Callable, file_info: Any) -> tuple:
+    """Worker entry point: read one file, returning (data, error, seconds)."""
+    start = time.perf_counter()
+    try:
+        data, error = read_func(file_info), None
+    except Exception as e:
+        data, error = None, str(e)
+    return data, error, time.perf_counter() - start
+
+
+def describe_file(file_info: Any) -> str:
+    """Display name of a file info dict ({'file': Path, ...}), path or key."""
+    if isinstance(file_info, dict) and 'file' in file_info:
+        file_info = file_info['file']
+    if isinstance(file_info, Path):
+        return file_info.name
+    return str(file_info)
+
+
+def record_count(data: Any) -> int:
+    """Rows read: a DataFrame's length, summed over tuples of DataFrames."""
+    if isinstance(data, pd.DataFrame):
+        return len(data)
+    if isinstance(data, (tuple, list)):
+        return sum(record_count(item) for item in data)
+    return 0
+
+
+class CombinerRuntime:
+    """Reads a bank's account files concurrently for a combiner."""
+
+    def __init__(self, bank_code: str, max_workers: Optional[int] = None,
+                 progress_tracker: Optional[ProgressTracker] = None):
+        """
+        Args:
+            bank_code: Bank the files belong to (used in logs and timings)
+            max_workers: Pool size limit (default: CPU count, at most COMBINER_MAX_WORKERS or 4)
+            progress_tracker: Tracker receiving per-file timings
+        """
+        self.bank_code = bank_code
+        self.max_workers = max_workers or min(
+            int(os.environ.get('COMBINER_MAX_WORKERS', DEFAULT_MAX_WORKERS)), os.cpu_count() or 1
+        )
+        self.progress_tracker = progress_tracker or ProgressTracker()
+
+    def workers_for(self, file_count: int) -> int:
+        return max(1, min(file_count, self.max_workers))
+
+    def read_all(self, files: Iterable[Any], read_func: Callable[[Any], Any],
+                 file_type: str = 'input') -> List[FileReadResult]:
+        """
+        Read every file with read_func, concurrently when there is more than one.
+
+        read_func must be picklable (a module-level function or a method of a
+        picklable combiner) and should return the file's normalized data.
+
+        Args:
+            files: File infos, passed one at a time to read_func
+            read_func: Reads and normalizes one file
+            file_type: Kind of file, for logs and timings (e.g. 'securities')
+
+        Returns:
+            One FileReadResult per file, in input order
+        """
+        files = list(files)
+        if not files:
+            return []
+
+        workers = self.workers_for(len(files))
+        start = time.perf_counter()
+        outcomes = None
+        if workers > 1:
+            try:
+                with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context()) as pool:
+                    outcomes = list(pool.map(_timed_read, repeat(read_func), files))
+            except Exception as e:
+                logger.warning(f"  ⚠️ Parallel read of {self.bank_code} {file_type} failed ({e}), reading sequentially")
+        if outcomes is None:
+            workers = 1
+            outcomes = [_timed_read(read_func, file_info) for file_info in files]
+
+        results = [FileReadResult(file_info, *outcome) for file_info, outcome in zip(files, outcomes)]
+        elapsed = time.perf_counter() - start
+        logger.info(f"  ⏱️ Read {len(files)} {self.bank_code} {file_type} files in {elapsed:.1f}s "
+                    f"({workers} worker{'s' if workers > 1 else ''})")
+
+        label = f"{self.bank_code} {file_type}"
+        for result in results:
+            self.progress_tracker.record_file_timing(
+                label, describe_file(result.file_info), result.seconds,
+                records=record_count(result.data), error=result.error
+            )
+        self.progress_tracker.show_file_timings(label)
+        return results
@@ -19,6 +19,7 @@ sys.path.insert(0, str(project_root))
 
 from preprocessing.bank_detector import BankDetector
 from preprocessing.combiners.header_detector import HeaderDetector
+from preprocessing.combiners.combiner_runtime import CombinerRuntime
 
 logger = logging.getLogger(__name__)
 
@@ -26,9 +27,10 @@ logger = logging.getLogger(__name__)
 class CSCombiner:
     """Combines individual CS client files into unified bank files."""
     
-    def __init__(self):
+    def __init__(self, progress_tracker=None):
         """Initialize the CS combiner."""
         self.bank_code = 'CS'
+        self.runtime = CombinerRuntime(self.bank_code, progress_tracker=progress_tracker)
         logger.info(f"🏦 Initialized {self.bank_code} file combiner")
     
     def discover_cs_files(self, cs_dir: Path, date: str) -> Dict[str, List[Dict]]:
@@ -226,6 +228,25 @@ class CSCombiner:
             logger.error(f"    ❌ Error processing transactions file {file_path.name}: {str(e)}")
             raise
     
+    def _read_securities_account(self, file_info: Dict) -> pd.DataFrame:
+        """Read one account's securities file with bank, client, account columns (runs in a worker)."""
+        df = self.process_securities_file_with_fallback(file_info['file'], file_info['client'], file_info['account'])
+        return self._add_identifier_columns(df, file_info)
+    
+    def _read_transactions_account(self, file_info: Dict) -> pd.DataFrame:
+        """Read one account's transactions file with bank, client, account columns (runs in a worker)."""
+        df = self.process_transactions_file(file_info['file'], file_info['client'], file_info['account'])
+        return self._add_identifier_columns(df, file_info)
+    
+    @staticmethod
+    def _add_identifier_columns(df: pd.DataFrame, file_info: Dict) -> pd.DataFrame:
+        """Add bank, client, account columns at the beginning."""
+        if not df.empty:
+            df.insert(0, 'bank', file_info['bank'])
+            df.insert(1, 'client', file_info['client'])
+            df.insert(2, 'account', file_info['account'])
+        return df
+    
     def combine_securities_files(self, files: List[Dict], output_path: Path) -> bool:
         """
         Combine individual securities files into unified file.
@@ -247,34 +268,26 @@ class CSCombiner:
         successful_files = 0
         failed_files = 0
         
-        for file_info in files:
-            file_path = file_info['file']
-            bank = file_info['bank']
-            client = file_info['client']
-            account = file_info['account']
+        # Files are read concurrently; results keep the input order
+        for result in self.runtime.read_all(files, self._read_securities_account, 'securities'):
+            file_path = result.file_info['file']
+            client = result.file_info['client']
+            account = result.file_info['account']
             
-            try:
-                # Process with fallback strategies
-                df = self.process_securities_file_with_fallback(file_path, client, account)
-                
-                if df.empty:
-                    logger.warning(f"  ⚠️ Empty file: {file_path.name}")
-                    continue
-                
-                # Add bank, client, account columns at the beginning
-                df.insert(0, 'bank', bank)
-                df.insert(1, 'client', client)
-                df.insert(2, 'account', account)
-                
-                combined_data.append(df)
-                successful_files += 1
-                logger.info(f"  ✅ Added {len(df)} records from {client}_{account}")
-                
-            except Exception as e:
-                logger.error(f"  ❌ Error processing {file_path.name}: {str(e)}")
+            if not result.ok:
+                logger.error(f"  ❌ Error processing {file_path.name}: {result.error}")
                 logger.error(f"  💡 Skipping corrupted file and continuing...")
                 failed_files += 1
                 continue
+            
+            df = result.data
+            if df.empty:
+                logger.warning(f"  ⚠️ Empty file: {file_path.name}")
+                continue
+            
+            combined_data.append(df)
+            successful_files += 1
+            logger.info(f"  ✅ Added {len(df)} records from {client}_{account}")
         
         if not combined_data:
             logger.error("❌ No valid securities data to combine")
@@ -321,34 +334,26 @@ class CSCombiner:
         successful_files = 0
         failed_files = 0
         
-        for file_info in files:
-            file_path = file_info['file']
-            bank = file_info['bank']
-            client = file_info['client']
-            account = file_info['account']
+        # Files are read concurrently; results keep the input order
+        for result in self.runtime.read_all(files, self._read_transactions_account, 'transactions'):
+            file_path = result.file_info['file']
+            client = result.file_info['client']
+            account = result.file_info['account']
             
-            try:
-                # Process transactions file
-                df = self.process_transactions_file(file_path, client, account)
-                
-                if df.empty:
-                    logger.warning(f"  ⚠️ Empty file: {file_path.name}")
-                    continue
-                
-                # Add bank, client, account columns at the beginning
-                df.insert(0, 'bank', bank)
-                df.insert(1, 'client', client)
-                df.insert(2, 'account', account)
-                
-                combined_data.append(df)
-                successful_files += 1
-                logger.info(f"  ✅ Added {len(df)} records from {client}_{account}")
-                
-            except Exception as e:
-                logger.error(f"  ❌ Error processing {file_path.name}: {str(e)}")
+            if not result.ok:
+                logger.error(f"  ❌ Error processing {file_path.name}: {result.error}")
                 logger.error(f"  💡 Skipping corrupted file and continuing...")
                 failed_files += 1
                 continue
+            
+            df = result.data
+            if df.empty:
+                logger.warning(f"  ⚠️ Empty file: {file_path.name}")
+                continue
+            
+            combined_data.append(df)
+            successful_files += 1
+            logger.info(f"  ✅ Added {len(df)} records from {client}_{account}")
         
         if not combined_data:
             logger.error("❌ No valid transactions data to combine")
@@ -22,6 +22,7 @@ project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
 from preprocessing.bank_detector import BankDetector
+from preprocessing.combiners.combiner_runtime import CombinerRuntime
 
 logger = logging.getLogger(__name__)
 
@@ -29,9 +30,10 @@ logger = logging.getLogger(__name__)
 class JBCombiner:
     """Combines individual JB client files into unified bank files."""
     
-    def __init__(self):
+    def __init__(self, progress_tracker=None):
         """Initialize the JB combiner."""
         self.bank_code = 'JB'
+        self.runtime = CombinerRuntime(self.bank_code, progress_tracker=progress_tracker)
         logger.info(f"🏦 Initialized {self.bank_code} file combiner")
     
     def _is_empty_row(self, row: pd.Series) -> bool:
@@ -393,6 +395,22 @@ class JBCombiner:
             logger.info(f"  💰 HS format - no transactions file expected for: {client}_{account}")
             return pd.DataFrame()
     
+    def _read_securities_account(self, file_info: Dict) -> pd.DataFrame:
+        """Read one account's securities file with identifier columns (runs in a worker)."""
+        client, account = file_info['client'], file_info['account']
+        df = self.process_securities_file(file_info['file'], client, account)
+        if df.empty:
+            return df
+        return self._reorder_columns_with_identifiers(df, self.bank_code, client, account)
+    
+    def _read_transactions_account(self, file_info: Dict) -> pd.DataFrame:
+        """Read one account's transactions file with identifier columns (runs in a worker)."""
+        client, account = file_info['client'], file_info['account']
+        df = self.process_transactions_file(file_info['file'], client, account)
+        if df.empty:
+            return df
+        return self._reorder_columns_with_identifiers(df, self.bank_code, client, account)
+    
     def combine_securities_files(self, files: List[Dict], output_path: Path) -> bool:
         """
         Combine multiple securities files into one.
@@ -412,28 +430,23 @@ class JBCombiner:
         
         combined_data = []
         
-        for file_info in files:
-            file_path = file_info['file']
-            client = file_info['client']
-            account = file_info['account']
+        # Files are read concurrently; results keep the input order
+        for result in self.runtime.read_all(files, self._read_securities_account, 'securities'):
+            file_path = result.file_info['file']
+            client = result.file_info['client']
+            account = result.file_info['account']
             
-            try:
-                # Process the securities file
-                df = self.process_securities_file(file_path, client, account)
-                
-                if df.empty:
-                    logger.warning(f"    ⚠️ Skipping empty file: {file_path.name}")
-                    continue
-                
-                # Add bank, client, account columns at the beginning
-                df = self._reorder_columns_with_identifiers(df, self.bank_code, client, account)
-                
-                combined_data.append(df)
-                logger.info(f"    ✅ Added {len(df)} securities from {client}_{account}")
-                
-            except Exception as e:
-                logger.error(f"    ❌ Failed to process {file_path.name}: {str(e)}")
+            if not result.ok:
+                logger.error(f"    ❌ Failed to process {file_path.name}: {result.error}")
+                continue
+            
+            df = result.data
+            if df.empty:
+                logger.warning(f"    ⚠️ Skipping empty file: {file_path.name}")
                 continue
+            
+            combined_data.append(df)
+            logger.info(f"    ✅ Added {len(df)} securities from {client}_{account}")
         
         if not combined_data:
             logger.error("❌ No valid securities data to combine")
@@ -472,28 +485,23 @@ class JBCombiner:
         
         combined_data = []
         
-        for file_info in files:
-            file_path = file_info['file']
-            client = file_info['client']
-            account = file_info['account']
+        # Files are read concurrently; results keep the input order
+        for result in self.runtime.read_all(files, self._read_transactions_account, 'transactions'):
+            file_path = result.file_info['file']
+            client = result.file_info['client']
+            account = result.file_info['account']
             
-            try:
-                # Process the transactions file
-                df = self.process_transactions_file(file_path, client, account)
-                
-                if df.empty:
-                    logger.warning(f"    ⚠️ Skipping empty file: {file_path.name}")
-                    continue
-                
-                # Add bank, client, account columns at the beginning
-                df = self._reorder_columns_with_identifiers(df, self.bank_code, client, account)
-                
-                combined_data.append(df)
-                logger.info(f"    ✅ Added {len(df)} transactions from {client}_{account}")
-                
-            except Exception as e:
-                logger.error(f"    ❌ Failed to process {file_path.name}: {str(e)}")
+            if not result.ok:
+                logger.error(f"    ❌ Failed to process {file_path.name}: {result.error}")
                 continue
+            
+            df = result.data
+            if df.empty:
+                logger.warning(f"    ⚠️ Skipping empty file: {file_path.name}")
+                continue
+            
+            combined_data.append(df)
+            logger.info(f"    ✅ Added {len(df)} transactions from {client}_{account}")
         
         if not combined_data:
             logger.warning("⚠️ No valid transactions data to combine")
@@ -9,6 +9,7 @@ Adds bank, client, and account columns extracted from account numbers in the dat
 import os
 import sys
 import logging
+from functools import partial
 from pathlib import Path
 from typing import Dict, List, Optional
 import pandas as pd
@@ -24,6 +25,7 @@ load_dotenv(aurum_backend_root / '.env')
 from portfolio.services.mappings_encryption_service import MappingsEncryptionService
 
 from preprocessing.bank_detector import BankDetector
+from preprocessing.combiners.combiner_runtime import CombinerRuntime
 
 logger = logging.getLogger(__name__)
 
@@ -31,9 +33,10 @@ logger = logging.getLogger(__name__)
 class LombardCombiner:
     """Combines individual Lombard securities files into unified bank files."""
     
-    def __init__(self):
+    def __init__(self, progress_tracker=None):
         """Initialize the Lombard combiner."""
         self.bank_code = 'LO'
+        self.runtime = CombinerRuntime(self.bank_code, progress_tracker=progress_tracker)
         logger.info(f"🏦 Initialized {self.bank_code} file combiner")
         
     def load_account_mapping(self, mappings_file: str) -> Dict[str, Dict[str, str]]:
@@ -198,6 +201,62 @@ class LombardCombiner:
             logger.warning(f"  ⚠️ Filename doesn't start with 'LO_': {filename}")
             return True  # Allow processing to continue
     
+    def _read_securities_file(self, file_path: Path, account_mapping: Dict[str, Dict[str, str]]) -> pd.DataFrame:
+        """
+        Read one securities file with bank, client, account columns (runs in a worker).
+        
+        Args:
+            file_path: Securities file path
+            account_mapping: Account number to client/account mapping
+            
+        Returns:
+            Positions with identifier columns (empty when there is nothing to add)
+            
+        Raises:
+            ValueError: If the file's account number cannot be resolved to a client
+        """
+        logger.info(f"  📄 Processing: {file_path.name}")
+        
+        # Read the Excel file - securities files have 2 sheets, we want "Positions" (second sheet)
+        # Header is at row 3 (0-indexed), so use header=3
+        df = pd.read_excel(file_path, sheet_name='Positions', header=3)
+        
+        if df.empty:
+            logger.warning(f"  ⚠️ Empty positions data in: {file_path.name}")
+            return df
+        
+        # Extract and validate account number from the data
+        account_number = self.extract_and_validate_account(df, file_path)
+        if not account_number:
+            raise ValueError(f"Failed to extract account number from {file_path.name}")
+        
+        # Validate account number with filename expectation
+        if not self.validate_account_with_filename(account_number, file_path):
+            logger.warning(f"  ⚠️ Account validation warning for {file_path.name}")
+        
+        # Look up client and account info from mapping
+        if account_number not in account_mapping:
+            raise ValueError(f"Account number {account_number} not found in mappings")
+        
+        client_info = account_mapping[account_number]
+        
+        # Filter out rows with missing account numbers
+        df_filtered = df.dropna(subset=['Account Number'])
+        if len(df_filtered) != len(df):
+            skipped_rows = len(df) - len(df_filtered)
+            logger.info(f"  🗑️  Skipped {skipped_rows} rows with missing account numbers")
+        
+        if df_filtered.empty:
+            logger.warning(f"  ⚠️ No valid data remaining after filtering: {file_path.name}")
+            return df_filtered
+        
+        # Add bank, client, account columns at the beginning
+        df_filtered = df_filtered.copy()
+        df_filtered.insert(0, 'Bank', self.bank_code)
+        df_filtered.insert(1, 'Client', client_info['client'])
+        df_filtered.insert(2, 'Account', client_info['account'])
+        return df_filtered
+    
     def combine_securities_files(self, files: List[Path], output_path: Path, 
                                account_mapping: Dict[str, Dict[str, str]]) -> bool:
         """
@@ -221,64 +280,25 @@ class LombardCombiner:
         successful_files = 0
         failed_files = 0
         
-        for file_path in files:
-            try:
-                logger.info(f"  📄 Processing: {file_path.name}")
-                
-                # Read the Excel file - securities files have 2 sheets, we want "Positions" (second sheet)
-                # Header is at row 3 (0-indexed), so use header=3
-                df = pd.read_excel(file_path, sheet_name='Positions', header=3)
-                
-                if df.empty:
-                    logger.warning(f"  ⚠️ Empty positions data in: {file_path.name}")
-                    continue
-                
-                # Extract and validate account number from the data
-                account_number = self.extract_and_validate_account(df, file_path)
-                if not account_number:
-                    logger.error(f"  ❌ Failed to extract account number from {file_path.name}")
-                    failed_files += 1
-                    continue
-                
-                # Validate account number with filename expectation
-                if not self.validate_account_with_filename(account_number, file_path):
-                    logger.warning(f"  ⚠️ Account validation warning for {file_path.name}")
-                
-                # Look up client and account info from mapping
-                if account_number not in account_mapping:
-                    logger.error(f"  ❌ Account number {account_number} not found in mappings")
-                    failed_files += 1
-                    continue
-                
-                client_info = account_mapping[account_number]
-                bank = self.bank_code
-                client = client_info['client']
-                account = client_info['account']
-                
-                # Filter out rows with missing account numbers
-                df_filtered = df.dropna(subset=['Account Number'])
-                if len(df_filtered) != len(df):
-                    skipped_rows = len(df) - len(df_filtered)
-                    logger.info(f"  🗑️  Skipped {skipped_rows} rows with missing account numbers")
-                
-                if df_filtered.empty:
-                    logger.warning(f"  ⚠️ No valid data remaining after filtering: {file_path.name}")
-                    continue
-                
-                # Add bank, client, account columns at the beginning
-                df_filtered.insert(0, 'Bank', bank)
-                df_filtered.insert(1, 'Client', client)
-                df_filtered.insert(2, 'Account', account)
-                
-                combined_data.append(df_filtered)
-                successful_files += 1
-                logger.info(f"  ✅ Added {len(df_filtered)} records from {client}_{account}")
-                
-            except Exception as e:
-                logger.error(f"  ❌ Error processing {file_path.name}: {str(e)}")
+        # Files are read concurrently; results keep the input order
+        read_file = partial(self._read_securities_file, account_mapping=account_mapping)
+        for result in self.runtime.read_all(files, read_file, 'securities'):
+            file_path = result.file_info
+            
+            if not result.ok:
+                logger.error(f"  ❌ Error processing {file_path.name}: {result.error}")
                 logger.error(f"  💡 Skipping corrupted file and continuing...")
                 failed_files += 1
                 continue
+            
+            df_filtered = result.data
+            if df_filtered.empty:
+                continue
+            
+            combined_data.append(df_filtered)
+            successful_files += 1
+            logger.info(f"  ✅ Added {len(df_filtered)} records from "
+                        f"{df_filtered['Client'].iloc[0]}_{df_filtered['Account'].iloc[0]}")
         
         if not combined_data:
             logger.error("❌ No valid securities data to combine")
@@ -11,6 +11,7 @@ import os
 import sys
 import logging
 import re
+from functools import partial
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 import pandas as pd
@@ -21,6 +22,7 @@ sys.path.insert(0, str(project_root))
 
 from preprocessing.bank_detector import BankDetector
 from preprocessing.combiners.header_detector import HeaderDetector
+from preprocessing.combiners.combiner_runtime import CombinerRuntime
 
 logger = logging.getLogger(__name__)
 
@@ -28,9 +30,10 @@ logger = logging.getLogger(__name__)
 class PershingEnricher:
     """Enriches Pershing securities files with unit cost data."""
     
-    def __init__(self):
+    def __init__(self, progress_tracker=None):
         """Initialize the Pershing enricher."""
         self.bank_code = 'Pershing'
+        self.runtime = CombinerRuntime(self.bank_code, progress_tracker=progress_tracker)
         logger.info(f"🏦 Initialized {self.bank_code} data enricher")
     
     def discover_pershing_files(self, input_dir: Path, date: str) -> Dict[str, Dict[str, Optional[Path]]]:
@@ -407,6 +410,11 @@ class PershingEnricher:
             logger.error(f"  ❌ Error processing {client_key}: {str(e)}")
             return False
     
+    def _process_client(self, client_key: str, client_files: Dict[str, Dict[str, Optional[Path]]],
+                        output_dir: Path, date: str) -> bool:
+        """Process one discovered client/account (runs in a worker)."""
+        return self.process_client_files(client_key, client_files[client_key], output_dir, date)
+    
     def enrich_all_clients(self, input_dir: Path, output_dir: Path, date: str, dry_run: bool = False) -> bool:
         """
         Main method to enrich all Pershing client files for a specific date.
@@ -449,16 +457,24 @@ class PershingEnricher:
         successful_clients = 0
         failed_clients = 0
         
+        ready_clients = []
         for client_key, files in client_files.items():
             if files['securities'] and files['unitcost']:
-                if self.process_client_files(client_key, files, output_dir, date):
-                    successful_clients += 1
-                else:
-                    failed_clients += 1
+                ready_clients.append(client_key)
             else:
                 logger.warning(f"⚠️ Skipping {client_key} - missing required files")
                 failed_clients += 1
         
+        # Clients are enriched concurrently, each writing its own output files
+        process_client = partial(self._process_client, client_files=client_files, output_dir=output_dir, date=date)
+        for result in self.runtime.read_all(ready_clients, process_client, 'client'):
+            if result.ok and result.data:
+                successful_clients += 1
+            else:
+                if not result.ok:
+                    logger.error(f"  ❌ Error processing {result.file_info}: {result.error}")
+                failed_clients += 1
+        
         # Final summary
         logger.info(f"🎉 Pershing data enrichment completed!")
         logger.info(f"  ✅ Successful clients: {successful_clients}")
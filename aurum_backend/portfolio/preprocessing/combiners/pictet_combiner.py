@@ -26,6 +26,7 @@ try:
 except ImportError:
     from services.mappings_encryption_service import MappingsEncryptionService
 from preprocessing.bank_detector import BankDetector
+from preprocessing.combiners.combiner_runtime import CombinerRuntime
 
 logger = logging.getLogger(__name__)
 
@@ -33,9 +34,10 @@ logger = logging.getLogger(__name__)
 class PictetCombiner:
     """Combines individual Pictet client files into unified bank files."""
     
-    def __init__(self):
+    def __init__(self, progress_tracker=None):
         """Initialize the Pictet combiner."""
         self.bank_code = 'Pictet'
+        self.runtime = CombinerRuntime(self.bank_code, progress_tracker=progress_tracker)
         logger.info(f"🏦 Initialized {self.bank_code} file combiner")
         
     def load_account_mappings(self, mappings_file: str) -> Dict[str, Dict[str, str]]:
@@ -284,6 +286,10 @@ class PictetCombiner:
             logger.error(f"  ❌ Error processing {file_path.name}: {str(e)}")
             return pd.DataFrame()
     
+    def _read_securities_account(self, file_info: Dict) -> pd.DataFrame:
+        """Process one account's securities file (runs in a worker)."""
+        return self._process_single_securities_file(file_info['file'], file_info['client'], file_info['account'])
+    
     def combine_securities_files(self, files: List[Dict], output_path: Path) -> bool:
         """
         Combine individual securities files into unified file.
@@ -306,14 +312,17 @@ class PictetCombiner:
         failed_files = 0
         total_securities = 0
         
-        for file_info in files:
-            file_path = file_info['file']
-            client = file_info['client']
-            account = file_info['account']
+        # Files are read concurrently; results keep the input order
+        for result in self.runtime.read_all(files, self._read_securities_account, 'securities'):
+            client = result.file_info['client']
+            account = result.file_info['account']
             
-            # Process single securities file
-            df_processed = self._process_single_securities_file(file_path, client, account)
+            if not result.ok:
+                logger.error(f"  ❌ Error processing {result.file_info['file'].name}: {result.error}")
+                failed_files += 1
+                continue
             
+            df_processed = result.data
             if df_processed.empty:
                 logger.warning(f"  ⚠️ No securities data from: {client}_{account}")
                 failed_files += 1
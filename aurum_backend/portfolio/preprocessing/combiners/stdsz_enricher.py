@@ -594,11 +594,161 @@ class STDSZCostBasisCalculator:
             raise
 
 
+# Security-name normalization for ISIN matching, compiled once
+NAME_SUFFIX_PATTERNS = [re.compile(pattern) for pattern in (
+    r'\s*-\s*ADR\s*$',           # " - ADR"
+    r'\s*-\s*NEW\s*$',           # " - NEW"
+    r'\s*-\s*USD\s*$',           # " - USD"
+    r'\s*-\s*GBP\s*$',           # " - GBP"
+    r'\s+\d+\.\d+\s+\d{2}[A-Z]{3}\d{2}\s*$',  # " 4.125 15MAR28"
+    r'\s+\d+\.\d+\s+\d{2}[A-Z]{3}\d{2}\s*$',  # " 6.1 19AUG32" (second pass strips a repeat)
+    r'\s+VAR\s+\d{2}[A-Z]{3}\d{2}\s*$',       # " VAR 01FEB30"
+)]
+NAME_REPLACEMENTS = [(re.compile(pattern), replacement) for pattern, replacement in (
+    (r'\bCORP?\b', 'COMPANY'),
+    (r'\bCO\b', 'COMPANY'),
+    (r'\bINC\b', 'INCORPORATED'),
+    (r'\bINTL\b', 'INTERNATIONAL'),
+    (r'\bMIDSTRM\b', 'MIDSTREAM'),
+    (r'\bOPERATING,?\s*LP\b', ''),
+    (r'\b&\b', 'AND'),
+)]
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+FUZZY_MATCH_THRESHOLD = 0.8  # 80% similarity threshold
+
+# Known name families that match even with little word overlap. Each rule is a list of
+# alternatives; an alternative fires when every keyword is a substring of BOTH names.
+RULE_KEYWORDS = ('FORD MOTOR', 'EDISON', 'WESTERN MIDSTREAM', 'BARCLAYS', 'VIX',
+                 'PROSHARES', 'ISHARES', 'SPDR', 'INVESCO', 'NIO')
+MATCHING_RULES = [
+    # Rule 1: Company name variations (FORD MOTOR CO vs FORD MOTOR COMPANY)
+    ([{'FORD MOTOR'}, {'EDISON'}, {'WESTERN MIDSTREAM'}], 0.9),
+    # Rule 2: ETF name variations (with/without suffixes)
+    ([{'BARCLAYS', 'VIX'}, {'PROSHARES'}, {'ISHARES'}, {'SPDR'}, {'INVESCO'}], 0.85),
+    # Rule 3: ADR variations (NIO INC vs NIO INC - ADR)
+    ([{'NIO'}], 0.9),
+]
+
+
+def rule_keywords(normalized_name: str) -> frozenset:
+    """Rule keywords contained in a normalized name (substring test, as the rules use)."""
+    return frozenset(keyword for keyword in RULE_KEYWORDS if keyword in normalized_name)
+
+
+def apply_rule_floor(keywords1: frozenset, keywords2: frozenset, base_score: float) -> float:
+    """Raise base_score to the floor of the first matching rule, if any."""
+    shared = keywords1 & keywords2
+    if shared:
+        for alternatives, floor in MATCHING_RULES:
+            if any(alternative <= shared for alternative in alternatives):
+                return max(base_score, floor)
+    return base_score
+
+
+class STDSZSecurityMatcher:
+    """
+    Security name -> ISIN lookup over one STDSZ transactions file.
+    
+    Built once per file: every name is normalized a single time, exact matches are a
+    dict lookup and the fuzzy step only scores entries that share a word (via a
+    token -> entries inverted index) or a matching-rule keyword with the query.
+    Results are identical to scanning every row with _calculate_fuzzy_score: the
+    highest score wins and ties go to the earliest row.
+    """
+    
+    def __init__(self, transactions_df: pd.DataFrame, normalize):
+        self.source = transactions_df
+        self._normalize = normalize
+        self._exact = {}
+        self._entries = []          # (row_order, trans_security, words, keywords, isin)
+        self._token_index = {}      # word -> [entry positions]
+        self._keyword_index = {}    # rule keyword -> [entry positions]
+        
+        if 'SECURITY' not in transactions_df.columns:
+            return
+        isin_values = (transactions_df['ISIN/IDENTIFIER'] if 'ISIN/IDENTIFIER' in transactions_df.columns
+                       else pd.Series([None] * len(transactions_df), index=transactions_df.index))
+        
+        seen_normalized = set()
+        for row_order, (security, isin) in enumerate(zip(transactions_df['SECURITY'], isin_values)):
+            if pd.isna(security) or pd.isna(isin) or str(isin) == '--':
+                continue
+            trans_security = str(security).strip().upper()
+            self._exact.setdefault(trans_security, str(isin))
+            
+            # Later rows with the same normalized name can never beat the first one
+            normalized = normalize(trans_security)
+            if normalized in seen_normalized:
+                continue
+            seen_normalized.add(normalized)
+            
+            words = frozenset(normalized.split())
+            if not words:
+                continue
+            keywords = rule_keywords(normalized)
+            position = len(self._entries)
+            self._entries.append((row_order, trans_security, words, keywords, str(isin)))
+            for word in words:
+                self._token_index.setdefault(word, []).append(position)
+            for keyword in keywords:
+                self._keyword_index.setdefault(keyword, []).append(position)
+        
+        logger.debug(f"🗂️ Indexed {len(self._entries)} distinct securities for ISIN matching")
+    
+    def find(self, security_name: str) -> Optional[str]:
+        """Find ISIN for a security name using exact and fuzzy matching."""
+        try:
+            security_upper = security_name.upper().strip()
+            
+            # Step 1: Exact match
+            isin = self._exact.get(security_upper)
+            if isin is not None:
+                logger.debug(f"🎯 Exact match: {security_name} -> {isin}")
+                return isin
+            
+            # Step 2: Fuzzy match over entries sharing a word or a rule keyword
+            normalized = self._normalize(security_upper)
+            words = frozenset(normalized.split())
+            if not words:
+                logger.warning(f"⚠️ No ISIN match found for security: {security_name}")
+                return None
+            keywords = rule_keywords(normalized)
+            
+            candidates = set()
+            for word in words:
+                candidates.update(self._token_index.get(word, ()))
+            for keyword in keywords:
+                candidates.update(self._keyword_index.get(keyword, ()))
+            
+            best_entry = None
+            best_score = 0
+            for position in sorted(candidates):  # entries are in row order
+                entry = self._entries[position]
+                entry_words = entry[2]
+                base_score = len(words & entry_words) / len(words | entry_words)
+                score = min(apply_rule_floor(keywords, entry[3], base_score), 1.0)
+                if score > best_score and score >= FUZZY_MATCH_THRESHOLD:
+                    best_score = score
+                    best_entry = entry
+            
+            if best_entry:
+                logger.info(f"🎯 Fuzzy match ({best_score:.2f}): {security_name} -> {best_entry[1]} -> {best_entry[4]}")
+                return best_entry[4]
+            
+            logger.warning(f"⚠️ No ISIN match found for security: {security_name}")
+            return None
+        except Exception as e:
+            logger.error(f"❌ Error finding ISIN for {security_name}: {e}")
+            return None
+
+
 class STDSZTransactionsEnricher:
     """Step 4: Enrich STDSZ transactions (cashmovements) with ISINs from transactions file"""
     
     def __init__(self):
         self.logger = logging.getLogger(__name__)
+        self._matcher = None
         self.logger.info("💰 STDSZ Transactions Enricher initialized")
     
     def find_header_row(self, df: pd.DataFrame) -> int:
@@ -659,8 +809,23 @@ class STDSZTransactionsEnricher:
             self.logger.error(f"❌ Error extracting security name from: {detail_text[:50]}... - {e}")
             return None
     
+    def build_isin_matcher(self, transactions_df: pd.DataFrame) -> 'STDSZSecurityMatcher':
+        """Index a transactions file once for repeated security-name lookups."""
+        return STDSZSecurityMatcher(transactions_df, self._normalize_security_name)
+    
     def find_matching_isin(self, security_name: str, transactions_df: pd.DataFrame) -> Optional[str]:
-        """Find ISIN for security in transactions file using exact and fuzzy matching"""
+        """
+        Find ISIN for security in transactions file using exact and fuzzy matching.
+        
+        The index for transactions_df is built on first use and reused while the same
+        DataFrame object is passed in (it must not be modified between calls).
+        """
+        if self._matcher is None or self._matcher.source is not transactions_df:
+            self._matcher = self.build_isin_matcher(transactions_df)
+        return self._matcher.find(security_name)
+    
+    def _find_matching_isin_linear(self, security_name: str, transactions_df: pd.DataFrame) -> Optional[str]:
+        """Reference full-scan implementation; kept to verify STDSZSecurityMatcher."""
         try:
             security_upper = security_name.upper().strip()
             
@@ -671,11 +836,9 @@ class STDSZTransactionsEnricher:
                     if security_upper == trans_security:
                         isin = row.get('ISIN/IDENTIFIER')
                         if pd.notna(isin) and str(isin) != '--':
-                            self.logger.debug(f"🎯 Exact match: {security_name} -> {isin}")
                             return str(isin)
             
             # Step 2: Try fuzzy matching for common patterns
-            best_match = None
             best_isin = None
             best_score = 0
             
@@ -685,20 +848,12 @@ class STDSZTransactionsEnricher:
                     isin = row.get('ISIN/IDENTIFIER')
                     
                     if pd.notna(isin) and str(isin) != '--':
-                        # Calculate fuzzy match score
                         score = self._calculate_fuzzy_score(security_upper, trans_security)
-                        
-                        if score > best_score and score >= 0.8:  # 80% similarity threshold
+                        if score > best_score and score >= FUZZY_MATCH_THRESHOLD:
                             best_score = score
-                            best_match = trans_security
                             best_isin = str(isin)
             
-            if best_match:
-                self.logger.info(f"🎯 Fuzzy match ({best_score:.2f}): {security_name} -> {best_match} -> {best_isin}")
-                return best_isin
-            
-            self.logger.warning(f"⚠️ No ISIN match found for security: {security_name}")
-            return None
+            return best_isin
         except Exception as e:
             self.logger.error(f"❌ Error finding ISIN for {security_name}: {e}")
             return None
@@ -730,66 +885,25 @@ class STDSZTransactionsEnricher:
     
     def _normalize_security_name(self, name: str) -> str:
         """Normalize security name for fuzzy matching"""
-        import re
-        
         # Convert to uppercase and remove extra spaces
         normalized = name.upper().strip()
         
         # Remove common suffixes and prefixes that vary
-        patterns_to_remove = [
-            r'\s*-\s*ADR\s*$',           # " - ADR"
-            r'\s*-\s*NEW\s*$',           # " - NEW"
-            r'\s*-\s*USD\s*$',           # " - USD"
-            r'\s*-\s*GBP\s*$',           # " - GBP"
-            r'\s+\d+\.\d+\s+\d{2}[A-Z]{3}\d{2}\s*$',  # " 4.125 15MAR28"
-            r'\s+\d+\.\d+\s+\d{2}[A-Z]{3}\d{2}\s*$',  # " 6.1 19AUG32"
-            r'\s+VAR\s+\d{2}[A-Z]{3}\d{2}\s*$',       # " VAR 01FEB30"
-        ]
-        
-        for pattern in patterns_to_remove:
-            normalized = re.sub(pattern, '', normalized)
+        for pattern in NAME_SUFFIX_PATTERNS:
+            normalized = pattern.sub('', normalized)
         
         # Standardize common abbreviations
-        replacements = {
-            r'\bCORP?\b': 'COMPANY',
-            r'\bCO\b': 'COMPANY', 
-            r'\bINC\b': 'INCORPORATED',
-            r'\bINTL\b': 'INTERNATIONAL',
-            r'\bMIDSTRM\b': 'MIDSTREAM',
-            r'\bOPERATING,?\s*LP\b': '',
-            r'\b&\b': 'AND',
-        }
-        
-        for pattern, replacement in replacements.items():
-            normalized = re.sub(pattern, replacement, normalized)
+        for pattern, replacement in NAME_REPLACEMENTS:
+            normalized = pattern.sub(replacement, normalized)
         
         # Remove extra spaces
-        normalized = re.sub(r'\s+', ' ', normalized).strip()
+        normalized = WHITESPACE_PATTERN.sub(' ', normalized).strip()
         
         return normalized
     
     def _apply_matching_rules(self, name1: str, name2: str, base_score: float) -> float:
         """Apply specific matching rules for known security name patterns"""
-        
-        # Rule 1: Company name variations (FORD MOTOR CO vs FORD MOTOR COMPANY)
-        if ('FORD MOTOR' in name1 and 'FORD MOTOR' in name2) or \
-           ('EDISON' in name1 and 'EDISON' in name2) or \
-           ('WESTERN MIDSTREAM' in name1 and 'WESTERN MIDSTREAM' in name2):
-            return max(base_score, 0.9)
-        
-        # Rule 2: ETF name variations (with/without suffixes)
-        if ('BARCLAYS' in name1 and 'BARCLAYS' in name2 and 'VIX' in name1 and 'VIX' in name2) or \
-           ('PROSHARES' in name1 and 'PROSHARES' in name2) or \
-           ('ISHARES' in name1 and 'ISHARES' in name2) or \
-           ('SPDR' in name1 and 'SPDR' in name2) or \
-           ('INVESCO' in name1 and 'INVESCO' in name2):
-            return max(base_score, 0.85)
-        
-        # Rule 3: ADR variations (NIO INC vs NIO INC - ADR)
-        if 'NIO' in name1 and 'NIO' in name2:
-            return max(base_score, 0.9)
-        
-        return base_score
+        return apply_rule_floor(rule_keywords(name1), rule_keywords(name2), base_score)
     
     def enrich_transactions(self, cashmovements_file: Path, transactions_file: Path, output_path: Path) -> Path:
         """Main enrichment logic for transactions"""
@@ -827,6 +941,7 @@ class STDSZTransactionsEnricher:
             # Process enrichment
             enriched_count = 0
             missing_count = 0
+            matcher = self.build_isin_matcher(trans_df)
             
             for idx, row in cash_df.iterrows():
                 isin_col = row.get('ISIN/IDENTIFIER')
@@ -840,7 +955,7 @@ class STDSZTransactionsEnricher:
                         
                         if security_name:
                             # Find matching ISIN
-                            isin = self.find_matching_isin(security_name, trans_df)
+                            isin = matcher.find(security_name)
                             
                             if isin:
                                 cash_df.loc[idx, 'ISIN/IDENTIFIER'] = isin
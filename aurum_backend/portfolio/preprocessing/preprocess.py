@@ -95,6 +95,9 @@ class UnifiedPreprocessor:
         }
         self.loaded_transformers = {}
         self.progress_tracker = ProgressTracker()
+        # Optional file catalog (FileCatalogService) answering file lookups instead of
+        # globbing; attached when running inside Django
+        self.file_catalog = None
         logger.info("🚀 Unified preprocessor initialized")
         logger.info(f"📋 Supported banks: {', '.join(self.supported_banks)}")
     
@@ -512,6 +515,14 @@ class UnifiedPreprocessor:
         
         return results
     
+    def _file_names(self, directory: Path) -> set:
+        """Names of the .xlsx files in a directory, from the file catalog when attached."""
+        if self.file_catalog is not None:
+            return self.file_catalog.file_names(directory)
+        if not directory.exists():
+            return set()
+        return {file_path.name for file_path in directory.glob("*.xlsx")}
+    
     def _bank_has_files(self, bank_code: str, date_str: str, input_dir: Path) -> bool:
         """Check if a bank has files for the specified date."""
         logger = logging.getLogger(__name__)
@@ -521,23 +532,17 @@ class UnifiedPreprocessor:
         # For IDB, check in subdirectory
         if bank_code == 'IDB':
             idb_dir = input_dir / 'idb'
-            if not idb_dir.exists():
-                logger.info(f"IDB directory {idb_dir} does not exist")
-                return False
             # Check if any IDB files exist for the date
-            files_found = list(idb_dir.glob(f"*{date_str}*.xlsx"))
-            logger.info(f"IDB files found for {date_str}: {[f.name for f in files_found]}")
+            files_found = sorted(name for name in self._file_names(idb_dir) if date_str in name)
+            logger.info(f"IDB files found for {date_str}: {files_found}")
             return len(files_found) > 0
         
         # For Banchile, check in subdirectory (files contain both securities and transactions in sheets)
         if bank_code == 'Banchile':
             banchile_dir = input_dir / 'banchile'
-            if not banchile_dir.exists():
-                logger.info(f"Banchile directory {banchile_dir} does not exist")
-                return False
             # Check if any Banchile files exist for the date (each file contains both securities and transactions)
-            files_found = list(banchile_dir.glob(f"*{date_str}*.xlsx"))
-            logger.info(f"Banchile files found for {date_str}: {[f.name for f in files_found]}")
+            files_found = sorted(name for name in self._file_names(banchile_dir) if date_str in name)
+            logger.info(f"Banchile files found for {date_str}: {files_found}")
             return len(files_found) > 0
         
         # For other banks, check in main directory with case-insensitive patterns
@@ -557,23 +562,22 @@ class UnifiedPreprocessor:
         logger.info(f"Looking for transactions patterns: {transactions_patterns}")
         
         # Check if files exist and log results
+        file_names = self._file_names(input_dir)
         for pattern in securities_patterns:
-            file_path = input_dir / pattern
-            exists = file_path.exists()
-            logger.info(f"Checking {file_path}: {'exists' if exists else 'not found'}")
+            exists = pattern in file_names
+            logger.info(f"Checking {input_dir / pattern}: {'exists' if exists else 'not found'}")
         
         # Check transactions files
         transactions_exists = False
         for pattern in transactions_patterns:
-            file_path = input_dir / pattern
-            exists = file_path.exists()
-            logger.info(f"Checking {file_path}: {'exists' if exists else 'not found'}")
+            exists = pattern in file_names
+            logger.info(f"Checking {input_dir / pattern}: {'exists' if exists else 'not found'}")
             if exists:
                 transactions_exists = True
                 break
         
         # Check if at least one securities file exists
-        securities_exists = any((input_dir / pattern).exists() for pattern in securities_patterns)
+        securities_exists = any(pattern in file_names for pattern in securities_patterns)
         
         logger.info(f"Final result for {bank_code}: securities_exists={securities_exists}, transactions_exists={transactions_exists}")
         
@@ -1169,6 +1173,9 @@ class UnifiedPreprocessor:
         
         # Step 2: Discover banks and dates after preprocessing
         logger.info("🔍 Discovering banks ready for main preprocessing...")
+        if self.file_catalog is not None:
+            # Enrichers and combiners wrote new input files
+            self.file_catalog.reconcile(stages=['input'])
         # Check which banks have files for the target date
         discovered_banks = {}
         for bank in self.supported_banks:
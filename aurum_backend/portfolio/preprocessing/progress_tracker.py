@@ -26,6 +26,7 @@ class ProgressTracker:
             'cells_converted': 0,
             'files_saved': 0
         }
+        self.file_timings = []
     
     def start_operation(self, operation_name: str, emoji: str = "🔄"):
         """Start a new operation with status indicator."""
@@ -53,6 +54,31 @@ class ProgressTracker:
             if key in self.stats:
                 self.stats[key] += value
     
+    def record_file_timing(self, label: str, file_name: str, seconds: float,
+                           records: int = 0, error: Optional[str] = None):
+        """Record how long reading one input file took."""
+        self.file_timings.append({
+            'label': label,
+            'file': file_name,
+            'seconds': seconds,
+            'records': records,
+            'error': error
+        })
+    
+    def show_file_timings(self, label: Optional[str] = None, slowest: int = 5):
+        """Show read timings (of one label when given) with the slowest files."""
+        timings = [t for t in self.file_timings if label is None or t['label'] == label]
+        if not timings:
+            return
+        
+        total_seconds = sum(t['seconds'] for t in timings)
+        failed = sum(1 for t in timings if t['error'])
+        print(f"⏱️ {label or 'Files'}: {len(timings)} files read, {total_seconds:.1f}s total read time"
+              + (f", {failed} failed" if failed else ""))
+        for t in sorted(timings, key=lambda t: t['seconds'], reverse=True)[:slowest]:
+            status = "❌" if t['error'] else "✅"
+            print(f"   {status} {t['file']}: {t['seconds']:.2f}s, {t['records']:,} records")
+    
     def show_success(self, message: str):
         """Show success message with green checkmark."""
         print(f"✅ {message}")
@@ -77,6 +103,9 @@ class ProgressTracker:
         print(f"   • Records processed: {self.stats['records_processed']:,}")
         print(f"   • Cells converted: {self.stats['cells_converted']:,}")
         print(f"   • Files saved: {self.stats['files_saved']}")
+        if self.file_timings:
+            print(f"   • Files read: {len(self.file_timings)} "
+                  f"({sum(t['seconds'] for t in self.file_timings):.1f}s read time)")
 
 
 class BankProgressBox:
@@ -8,6 +8,7 @@ from collections import defaultdict
 from typing import Dict, List, Optional
 from django.db import transaction
 from ..models import Client, Position, PortfolioSnapshot, Transaction
+from ..utils.dietz_cache import bump_client_data_version
 
 logger = logging.getLogger(__name__)
 
@@ -155,6 +156,7 @@ class AccountRolloverService:
                 if phantom_positions.exists():
                     position_count = phantom_positions.count()
                     phantom_positions.delete()
+                    bump_client_data_version(client)
                     
                     self.logger.info(f"🗑️  Cleaned {position_count} phantom positions for {client}-{bank}-{account}")
                     cleaned_accounts += 1
@@ -303,6 +305,9 @@ class AccountRolloverService:
                 positions_failed += 1
                 continue  # Continue with other positions
         
+        if positions_copied:
+            bump_client_data_version(client_code)
+        
         if positions_failed > 0:
             self.logger.warning(f"⚠️ {positions_failed} positions failed to copy for {bank}_{account}")
         
@@ -35,23 +35,18 @@ class BondIssuerReportService(EnhancedReportService):
         
         try:
             # Get client and latest snapshot
-            client = Client.objects.get(code=client_code)
-            snapshot = PortfolioSnapshot.objects.filter(
-                client=client
-            ).order_by('-snapshot_date').first()
+            portfolio = self.get_latest_portfolio(client_code)
             
-            if not snapshot:
+            if not portfolio:
                 raise ValueError(f"No portfolio data found for {client_code}")
+            client, snapshot = portfolio.client, portfolio.snapshot
             
             # CRITICAL: Filter ONLY actual bonds (Fixed Income with maturity dates) 
             # This excludes ETFs and mutual funds which don't have maturity dates
             # Also exclude ALT positions for presentation
-            bond_positions = snapshot.positions.select_related('asset').filter(
-                asset__asset_type='Fixed Income',
-                asset__maturity_date__isnull=False
-            ).exclude(asset__bank='ALT')
+            bond_positions = portfolio.bond_positions()
             
-            if not bond_positions.exists():
+            if not bond_positions:
                 logger.warning(f"No bond positions found for {client_code} (Fixed Income with maturity dates)")
                 return self._render_empty_report(client, snapshot)
             
@@ -117,21 +112,29 @@ class BondIssuerReportService(EnhancedReportService):
         
         extraction_stats = {'tier1_2': 0, 'tier3': 0, 'tier4': 0}
         
-        for position in bond_positions:
+        # TIER 1 & 2: OpenFIGI CUSIP lookup (includes retry logic)
+        bond_positions = list(bond_positions)
+        openfigi_issuers = [
+            self.openfigi_service.get_issuer_by_cusip(position.asset.cusip) if position.asset.cusip else None
+            for position in bond_positions
+        ]
+        
+        # TIER 3 input: parse each distinct unresolved bond name once
+        parsed_issuers = self.name_parser.extract_many(
+            position.asset.name for position, issuer in zip(bond_positions, openfigi_issuers) if not issuer
+        )
+        
+        for position, issuer_name in zip(bond_positions, openfigi_issuers):
             asset = position.asset
-            issuer_name = None
             extraction_method = 'unknown'
             
-            # TIER 1 & 2: OpenFIGI CUSIP lookup (includes retry logic)
-            if asset.cusip:
-                issuer_name = self.openfigi_service.get_issuer_by_cusip(asset.cusip)
-                if issuer_name:
-                    extraction_method = 'openfigi'
-                    extraction_stats['tier1_2'] += 1
+            if issuer_name:
+                extraction_method = 'openfigi'
+                extraction_stats['tier1_2'] += 1
             
             # TIER 3: Bond name pattern parsing (fallback)
             if not issuer_name:
-                issuer_name = self.name_parser.extract_issuer_from_name(asset.name)
+                issuer_name = parsed_issuers.get(asset.name)
                 if issuer_name:
                     extraction_method = 'name_pattern'
                     extraction_stats['tier3'] += 1
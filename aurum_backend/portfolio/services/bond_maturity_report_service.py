@@ -12,6 +12,7 @@ from typing import Dict, List, Optional, Tuple
 from django.db.models import Q, Sum
 from portfolio.models import Client, PortfolioSnapshot, Position, Report
 from .enhanced_report_service import EnhancedReportService
+from .consolidated_data_service import ConsolidatedDataLoader
 from ..utils.report_utils import save_report_html
 
 logger = logging.getLogger(__name__)
@@ -44,23 +45,18 @@ class BondMaturityReportService(EnhancedReportService):
         """Generate individual client bond maturity report."""
         
         # Get client and latest snapshot
-        client = Client.objects.get(code=client_code)
-        snapshot = PortfolioSnapshot.objects.filter(
-            client=client
-        ).order_by('-snapshot_date').first()
+        portfolio = self.get_latest_portfolio(client_code)
         
-        if not snapshot:
+        if not portfolio:
             raise ValueError(f"No portfolio data found for {client_code}")
+        client, snapshot = portfolio.client, portfolio.snapshot
         
         # CRITICAL: Filter ONLY actual bonds (Fixed Income with maturity dates) 
         # This excludes ETFs and mutual funds which don't have maturity dates
         # Also exclude ALT positions for presentation (same logic as bond_issuer_weight)
-        bond_positions = snapshot.positions.select_related('asset').filter(
-            asset__asset_type='Fixed Income',
-            asset__maturity_date__isnull=False
-        ).exclude(asset__bank='ALT')
+        bond_positions = portfolio.bond_positions()
         
-        if not bond_positions.exists():
+        if not bond_positions:
             logger.warning(f"No bond positions found for {client_code} (Fixed Income with maturity dates)")
             return self._render_empty_individual_report(client, snapshot)
         
@@ -97,27 +93,19 @@ class BondMaturityReportService(EnhancedReportService):
         clients_processed = 0
         latest_snapshot_date = None
         
-        all_clients = Client.objects.exclude(code='ALL').order_by('code')
+        data_loader = self.data_loader or ConsolidatedDataLoader()
         
-        for client in all_clients:
-            snapshot = PortfolioSnapshot.objects.filter(
-                client=client
-            ).order_by('-snapshot_date').first()
-            
-            if not snapshot:
-                continue
+        for portfolio in data_loader.portfolios():
+            client, snapshot = portfolio.client, portfolio.snapshot
             
             # Track the latest snapshot date across all clients
             if latest_snapshot_date is None or snapshot.snapshot_date > latest_snapshot_date:
                 latest_snapshot_date = snapshot.snapshot_date
             
             # Get bond positions for this client
-            bond_positions = snapshot.positions.select_related('asset').filter(
-                asset__asset_type='Fixed Income',
-                asset__maturity_date__isnull=False
-            ).exclude(asset__bank='ALT')
+            bond_positions = portfolio.bond_positions()
             
-            if not bond_positions.exists():
+            if not bond_positions:
                 continue
             
             # Get bonds data for this client (include client info)
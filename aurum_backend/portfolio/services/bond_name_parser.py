@@ -1,14 +1,21 @@
 """
 Bond Name Pattern Parser - Tier 3 Fallback Logic
 Extracts issuer names from bond names using regex patterns
+
+Patterns are compiled once at import and results are memoized per raw bond name
+(bounded LRU shared by all parser instances), since the same bond names repeat
+across clients and report dates.
 """
 
 import re
 import logging
-from typing import Optional
+from functools import lru_cache
+from typing import Dict, Iterable, Optional
 
 logger = logging.getLogger(__name__)
 
+ISSUER_CACHE_SIZE = 4096
+
 class BondNameParser:
     """Parser for extracting issuer names from bond names."""
     
@@ -71,6 +78,11 @@ class BondNameParser:
         (r'^WESTN MIDSTREAM OPERA.*', 'WESTERN MIDSTREAM OPERATING LP', re.IGNORECASE),
     ]
     
+    PREFIX_PATTERNS = [
+        r'^\s*CUSIP\s*:?\s*\w+\s*',  # Remove CUSIP prefixes
+        r'^\s*ISIN\s*:?\s*\w+\s*',   # Remove ISIN prefixes
+    ]
+    
     def extract_issuer_from_name(self, bond_name: str) -> Optional[str]:
         """
         Extract issuer name from bond name using pattern matching.
@@ -83,13 +95,35 @@ class BondNameParser:
         """
         if not bond_name:
             return None
+        return _extract_issuer_cached(bond_name)
+    
+    def extract_many(self, bond_names: Iterable[str]) -> Dict[str, Optional[str]]:
+        """
+        Extract issuers for many bond names, parsing each distinct name once.
         
+        Returns:
+            Dict mapping each distinct input name to its issuer (or None)
+        """
+        return {name: self.extract_issuer_from_name(name) for name in dict.fromkeys(bond_names)}
+    
+    @staticmethod
+    def cache_info():
+        """LRU statistics for the shared issuer cache."""
+        return _extract_issuer_cached.cache_info()
+    
+    @staticmethod
+    def clear_cache() -> None:
+        """Drop memoized issuers (e.g. after changing the rule tables at runtime)."""
+        _extract_issuer_cached.cache_clear()
+    
+    def _extract_uncached(self, bond_name: str) -> Optional[str]:
+        """Run the full pattern pipeline for one bond name."""
         # STEP 1: Pre-process bond name (remove obvious noise)
         cleaned_name = self._pre_process_bond_name(bond_name.strip().upper())
         
         # STEP 2: Try existing extraction patterns
-        for pattern, replacement in self.EXTRACTION_PATTERNS:
-            match = re.match(pattern, cleaned_name)
+        for pattern, replacement in _COMPILED_EXTRACTION_PATTERNS:
+            match = pattern.match(cleaned_name)
             if match:
                 if isinstance(replacement, str) and replacement.startswith('\\'):
                     # Dynamic replacement with captured group
@@ -110,14 +144,9 @@ class BondNameParser:
     def _pre_process_bond_name(self, bond_name: str) -> str:
         """Pre-process bond name to remove noise before pattern matching."""
         # Remove common prefixes that interfere with matching
-        prefixes_to_remove = [
-            r'^\s*CUSIP\s*:?\s*\w+\s*',  # Remove CUSIP prefixes
-            r'^\s*ISIN\s*:?\s*\w+\s*',   # Remove ISIN prefixes
-        ]
-        
         processed = bond_name
-        for prefix_pattern in prefixes_to_remove:
-            processed = re.sub(prefix_pattern, '', processed, flags=re.IGNORECASE)
+        for prefix_pattern in _COMPILED_PREFIX_PATTERNS:
+            processed = prefix_pattern.sub('', processed)
         
         return processed.strip()
     
@@ -127,15 +156,32 @@ class BondNameParser:
             return raw_name
         
         standardized = raw_name
-        for pattern, replacement, flags in self.STANDARDIZATION_RULES:
-            standardized = re.sub(pattern, replacement, standardized, flags=flags)
+        for pattern, replacement in _COMPILED_STANDARDIZATION_RULES:
+            standardized = pattern.sub(replacement, standardized)
         
         # Additional cleanup
-        standardized = re.sub(r'\s+', ' ', standardized)  # Normalize whitespace
+        standardized = _WHITESPACE_PATTERN.sub(' ', standardized)  # Normalize whitespace
         standardized = standardized.strip()
         
         return standardized
     
     def _standardize_name(self, raw_name: str) -> str:
         """Legacy method - kept for backward compatibility."""
-        return self._enhanced_standardize_name(raw_name)
\ No newline at end of file
+        return self._enhanced_standardize_name(raw_name)
+
+
+# Rule tables compiled once; the class attributes above stay the readable source
+_COMPILED_EXTRACTION_PATTERNS = [
+    (re.compile(pattern), replacement) for pattern, replacement in BondNameParser.EXTRACTION_PATTERNS
+]
+_COMPILED_STANDARDIZATION_RULES = [
+    (re.compile(pattern, flags), replacement)
+    for pattern, replacement, flags in BondNameParser.STANDARDIZATION_RULES
+]
+_COMPILED_PREFIX_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in BondNameParser.PREFIX_PATTERNS]
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=ISSUER_CACHE_SIZE)
+def _extract_issuer_cached(bond_name: str) -> Optional[str]:
+    return BondNameParser()._extract_uncached(bond_name)
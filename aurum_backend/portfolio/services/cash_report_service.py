@@ -12,6 +12,7 @@ from typing import Dict, List, Optional, Tuple
 from django.db.models import Q, Sum
 from portfolio.models import Client, PortfolioSnapshot, Position, Report
 from .enhanced_report_service import EnhancedReportService
+from .consolidated_data_service import ConsolidatedDataLoader
 from ..utils.report_utils import save_report_html
 
 logger = logging.getLogger(__name__)
@@ -44,19 +45,14 @@ class CashReportService(EnhancedReportService):
         """Generate individual client cash position report."""
         
         # Get client and latest snapshot
-        client = Client.objects.get(code=client_code)
-        snapshot = PortfolioSnapshot.objects.filter(
-            client=client
-        ).order_by('-snapshot_date').first()
+        portfolio = self.get_latest_portfolio(client_code)
         
-        if not snapshot:
+        if not portfolio:
             raise ValueError(f"No portfolio data found for {client_code}")
+        client, snapshot = portfolio.client, portfolio.snapshot
         
         # Get cash positions - asset_type in ['Cash', 'Money Market']
-        cash_positions = snapshot.positions.select_related('asset').filter(
-            asset__asset_type__in=['Cash', 'Money Market'],
-            market_value__gt=0
-        ).order_by('asset__name')
+        cash_positions = sorted(portfolio.cash_positions(), key=lambda p: p.asset.name)
         
         # Calculate custody format: f"{bank} {account}".strip()
         positions_data = []
@@ -71,7 +67,7 @@ class CashReportService(EnhancedReportService):
         
         # Calculate total cash and AUM for concentration check
         total_cash = sum(pos['market_value'] for pos in positions_data)
-        total_aum = float(self._calculate_total_aum(snapshot))
+        total_aum = float(portfolio.non_alt_aum)
         
         # Check concentration alert (5% threshold)
         concentration_alert = None
@@ -113,33 +109,26 @@ class CashReportService(EnhancedReportService):
     def _generate_consolidated_report(self) -> str:
         """Generate consolidated cash position report for all clients."""
         
-        # Get all clients with cash positions
+        # Get all clients with cash positions (latest snapshots loaded in one pass);
+        # like the per-client loop this replaced, the ALL client is not excluded
         clients_with_cash = []
-        all_clients = Client.objects.all().order_by('code')
+        data_loader = self.data_loader or ConsolidatedDataLoader(exclude_codes=())
         
-        for client in all_clients:
-            snapshot = PortfolioSnapshot.objects.filter(
-                client=client
-            ).order_by('-snapshot_date').first()
-            
-            if not snapshot:
-                continue
+        for portfolio in data_loader.portfolios():
+            client, snapshot = portfolio.client, portfolio.snapshot
             
             # Get cash positions for this client
-            cash_positions = snapshot.positions.select_related('asset').filter(
-                asset__asset_type__in=['Cash', 'Money Market'],
-                market_value__gt=0
-            )
+            cash_positions = portfolio.cash_positions()
             
-            if not cash_positions.exists():
+            if not cash_positions:
                 continue
             
             # Calculate client cash data (excluding ALT)
-            total_cash = float(cash_positions.exclude(asset__bank='ALT').aggregate(
-                total=Sum('market_value')
-            )['total'] or Decimal('0'))
+            total_cash = float(sum(
+                (p.market_value for p in cash_positions if p.asset.bank != 'ALT'), Decimal('0')
+            ))
             
-            total_aum = float(self._calculate_total_aum(snapshot))
+            total_aum = float(portfolio.non_alt_aum)
             
             # Check concentration alert
             concentration_alert = None
@@ -194,7 +183,7 @@ class CashReportService(EnhancedReportService):
     
     def _calculate_total_aum(self, snapshot: PortfolioSnapshot) -> Decimal:
         """Calculate total NON-ALT AUM for a snapshot."""
-        total = snapshot.positions.exclude(asset__bank='ALT').aggregate(
+        total = snapshot.positions.exclude_alt().aggregate(
             total=Sum('market_value')
         )['total']
         return total or Decimal('0')
@@ -0,0 +1,106 @@
+"""
+Client Dashboard Service
+Stores and serves the precomputed client dashboard documents.
+
+update_database builds one document per client for the latest snapshot - the body of
+the dashboard-with-charts endpoint (summary, allocation, history, cumulative return,
+metrics comparison) and of the summary endpoint - so client logins read one row
+instead of recalculating metrics and Modified Dietz chart series.
+
+A document is current while it was built from the client's latest snapshot, after
+that snapshot's last save, under the client's current data version (bumped by
+population, rollover and restores). Stale or missing documents make the endpoints
+fall back to the live calculation.
+"""
+
+import logging
+from typing import Callable, Dict, Optional
+
+from ..models import Client, ClientDashboardDocument, PortfolioSnapshot
+from ..utils.dietz_cache import client_data_versions
+from ..utils.http_cache import make_etag
+
+logger = logging.getLogger(__name__)
+
+
+class ClientDashboardService:
+    """Publishes and looks up precomputed client dashboard documents."""
+
+    def data_version(self, client_code: str) -> str:
+        global_version, client_version = client_data_versions(client_code)
+        return f"{global_version}.{client_version}"
+
+    def latest_snapshot(self, client_code: str) -> Optional[PortfolioSnapshot]:
+        return PortfolioSnapshot.objects.filter(client__code=client_code).order_by('-snapshot_date').first()
+
+    def publish(self, client_code: str, snapshot: PortfolioSnapshot, payload: Dict,
+                data_version: Optional[str] = None) -> ClientDashboardDocument:
+        """
+        Store a client's dashboard document.
+
+        Args:
+            client_code: Client the document belongs to
+            snapshot: Latest snapshot the payload was built from
+            payload: {'dashboard': ..., 'data': ...} response bodies
+            data_version: Client data version read before the payload was built
+        """
+        document, _ = ClientDashboardDocument.objects.update_or_create(
+            client_code=client_code,
+            defaults={'snapshot': snapshot, 'payload': payload,
+                      'data_version': data_version or self.data_version(client_code)}
+        )
+        return document
+
+    def publish_all(self, build: Callable[[Client, PortfolioSnapshot], Dict]) -> Dict[str, int]:
+        """
+        Build and store the document of every client with data.
+
+        Args:
+            build: Returns the payload for a client and its latest snapshot
+
+        Returns:
+            Counts of published and failed clients
+        """
+        results = {'published': 0, 'failed': 0}
+        for client in Client.objects.order_by('code'):
+            snapshot = self.latest_snapshot(client.code)
+            if snapshot is None:
+                continue
+            try:
+                # Read before building: a bump during the build leaves the document stale
+                version = self.data_version(client.code)
+                self.publish(client.code, snapshot, build(client, snapshot), version)
+                results['published'] += 1
+            except Exception as e:
+                logger.error(f"Could not publish dashboard document for {client.code}: {e}")
+                results['failed'] += 1
+        logger.info(f"Published {results['published']} client dashboard documents ({results['failed']} failed)")
+        return results
+
+    def current(self, client_code: str, with_payload: bool = False) -> Optional[ClientDashboardDocument]:
+        """
+        The client's document if it is still current, else None.
+
+        Args:
+            client_code: Client code
+            with_payload: Load the payload too (otherwise it is deferred until accessed)
+        """
+        documents = ClientDashboardDocument.objects.filter(client_code=client_code)
+        if not with_payload:
+            documents = documents.defer('payload')
+        document = documents.first()
+        if document is None:
+            return None
+
+        latest = (PortfolioSnapshot.objects.filter(client__code=client_code)
+                  .order_by('-snapshot_date').values('id', 'updated_at').first())
+        if (latest is None or document.snapshot_id != latest['id']
+                or document.generated_at < latest['updated_at']
+                or document.data_version != self.data_version(client_code)):
+            logger.debug(f"Dashboard document for {client_code} is stale")
+            return None
+        return document
+
+    def etag(self, document: ClientDashboardDocument) -> str:
+        return make_etag('client_dashboard', document.client_code, document.snapshot_id,
+                         document.data_version, document.generated_at.isoformat())
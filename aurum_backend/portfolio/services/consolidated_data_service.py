@@ -0,0 +1,115 @@
+"""
+Consolidated Data Service
+Loads every client's latest snapshot and all of its positions with two queries, for
+consolidated and all-clients report generation.
+"""
+
+import logging
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
+from core.db_router import replica_reads
+from ..models import Client, PortfolioSnapshot, Position
+
+logger = logging.getLogger(__name__)
+
+CASH_ASSET_TYPES = ('Cash', 'Money Market')
+
+
+@dataclass
+class ClientPortfolio:
+    """A client's latest snapshot with its positions (assets preloaded)."""
+    client: Client
+    snapshot: PortfolioSnapshot
+    positions: List[Position]
+
+    @classmethod
+    def for_client(cls, client_code: str) -> Optional['ClientPortfolio']:
+        """
+        Load one client's latest portfolio.
+
+        Raises Client.DoesNotExist for unknown codes; returns None if the client has
+        no snapshots.
+        """
+        client = Client.objects.get(code=client_code)
+        snapshot = PortfolioSnapshot.objects.filter(client=client).order_by('-snapshot_date').first()
+        if not snapshot:
+            return None
+        return cls(client, snapshot, list(snapshot.positions.select_related('asset').order_by('id')))
+
+    def cash_positions(self) -> List[Position]:
+        """Cash and money market positions with a positive value (ALT included)."""
+        return [
+            p for p in self.positions
+            if p.asset.asset_type in CASH_ASSET_TYPES and p.market_value > 0
+        ]
+
+    def bond_positions(self) -> List[Position]:
+        """Actual bonds: Fixed Income with a maturity date, excluding ALT."""
+        return [
+            p for p in self.positions
+            if p.asset.asset_type == 'Fixed Income' and p.asset.maturity_date is not None
+            and p.asset.bank != 'ALT'
+        ]
+
+    def equity_positions(self) -> List[Position]:
+        """Equity positions, excluding ALT."""
+        return [p for p in self.positions if p.asset.asset_type == 'Equities' and p.asset.bank != 'ALT']
+
+    @property
+    def non_alt_aum(self) -> Decimal:
+        """Total NON-ALT market value of the snapshot."""
+        return sum((p.market_value for p in self.positions if p.asset.bank != 'ALT'), Decimal('0'))
+
+
+class ConsolidatedDataLoader:
+    """
+    Latest snapshot and positions of every client, loaded once and grouped in memory.
+
+    Query 1 picks each client's latest snapshot with a ROW_NUMBER() window over
+    snapshot_date (portable across PostgreSQL and SQLite); query 2 fetches the positions
+    of all those snapshots joined with their assets.
+    """
+
+    def __init__(self, client_codes: Optional[Iterable[str]] = None, exclude_codes: Iterable[str] = ('ALL',)):
+        self.client_codes = list(client_codes) if client_codes is not None else None
+        self.exclude_codes = list(exclude_codes)
+        self._portfolios: Optional[Dict[str, ClientPortfolio]] = None
+
+    @replica_reads
+    def load(self) -> Dict[str, ClientPortfolio]:
+        """Client code -> ClientPortfolio, ordered by client code."""
+        if self._portfolios is not None:
+            return self._portfolios
+
+        snapshots = PortfolioSnapshot.objects.select_related('client').annotate(
+            recency=Window(RowNumber(), partition_by=[F('client_id')], order_by=F('snapshot_date').desc())
+        ).exclude(client__code__in=self.exclude_codes)
+        if self.client_codes is not None:
+            snapshots = snapshots.filter(client__code__in=self.client_codes)
+        latest = {snapshot.id: snapshot for snapshot in snapshots.filter(recency=1)}
+
+        grouped = {snapshot_id: [] for snapshot_id in latest}
+        positions = Position.objects.filter(snapshot_id__in=list(latest)).select_related('asset').order_by('id')
+        for position in positions:
+            snapshot = latest[position.snapshot_id]
+            position.snapshot = snapshot
+            grouped[snapshot.id].append(position)
+
+        self._portfolios = {
+            snapshot.client.code: ClientPortfolio(snapshot.client, snapshot, grouped[snapshot.id])
+            for snapshot in sorted(latest.values(), key=lambda s: s.client.code)
+        }
+        logger.info(f"Loaded latest portfolios for {len(self._portfolios)} clients "
+                    f"({sum(len(p.positions) for p in self._portfolios.values())} positions)")
+        return self._portfolios
+
+    def portfolios(self) -> List[ClientPortfolio]:
+        return list(self.load().values())
+
+    def get(self, client_code: str) -> Optional[ClientPortfolio]:
+        return self.load().get(client_code)
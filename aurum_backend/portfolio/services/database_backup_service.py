@@ -3,23 +3,43 @@ Database Backup and Restore Service for Aurum Finance
 Supports both SQLite (local development) and PostgreSQL (production)
 Provides on-demand backup creation and UI-driven restore functionality.
 Enterprise-grade restore with maintenance mode integration.
+
+PostgreSQL backups are taken in pg_dump directory format with parallel workers
+(--jobs) and zstd compression where the server tools support it, and restored in
+parallel. SQLite backups are copied page-by-page through the sqlite3 backup API.
+Every backup gets a sidecar manifest (<backup>.manifest.json) with per-file SHA-256
+checksums recorded when the backup is written, so listing backups does not re-read
+them and restores verify the checksums before touching the database. Backup files
+are hashed in one streaming read as soon as they are written (pg_dump directories
+parallel_jobs files at a time).
 """
 
+import hashlib
+import json
 import os
+import re
 import shutil
 import sqlite3
 import subprocess
 import logging
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional
 from django.conf import settings
 from django.db import connections
 from core.maintenance import maintenance_mode
+from ..utils.response_cache import bump_generation, ALL_DEPENDENCIES
+from ..utils.dietz_cache import bump_client_data_version
 
 logger = logging.getLogger(__name__)
 
+MANIFEST_SUFFIX = '.manifest.json'
+HASH_CHUNK_BYTES = 1024 * 1024
+PG_DIRECTORY_EXTENSION = '.dir'
+
+
 class DatabaseBackupService:
     """
     Database backup and restore operations with safety features.
@@ -55,7 +75,8 @@ class DatabaseBackupService:
             # Use persistent backup location that survives deployments
             self.backup_dir = Path('/var/lib/aurumfinance/backups')
             self.backup_dir.mkdir(parents=True, exist_ok=True)
-            self.backup_extension = '.sql'
+            # Directory-format dumps (parallel dump/restore); legacy .sql custom-format files are still listed
+            self.backup_extension = PG_DIRECTORY_EXTENSION
             
             # PostgreSQL connection details
             self.db_name = self.db_config['NAME']
@@ -63,13 +84,22 @@ class DatabaseBackupService:
             self.db_password = self.db_config['PASSWORD']
             self.db_host = self.db_config.get('HOST', 'localhost')
             self.db_port = self.db_config.get('PORT', '5432')
+        
+        # Backup engine tuning
+        backup_settings = getattr(settings, 'BACKUP_SETTINGS', {})
+        self.parallel_jobs = max(1, int(backup_settings.get('PARALLEL_JOBS', min(4, os.cpu_count() or 1))))
+        self.compression = backup_settings.get('COMPRESSION', 'zstd')
+        self.sqlite_pages_per_step = int(backup_settings.get('SQLITE_PAGES_PER_STEP', 1024))
+        self._pg_major_version = None
     
-    def create_backup(self, backup_name: Optional[str] = None) -> Dict[str, any]:
+    def create_backup(self, backup_name: Optional[str] = None,
+                      progress_callback: Optional[Callable[[int, int], None]] = None) -> Dict[str, any]:
         """
         Create a consistent database backup using appropriate method for database type.
         
         Args:
             backup_name: Optional custom name (defaults to timestamp)
+            progress_callback: Optional callable(copied_pages, total_pages), SQLite only
             
         Returns:
             Dict with backup results and metadata
@@ -92,58 +122,37 @@ class DatabaseBackupService:
                 }
             
             self.logger.info(f"Creating {self.db_engine} database backup: {backup_filename}")
+            start_time = time.time()
             
             if self.is_sqlite:
-                # SQLite backup using native backup API
-                source_conn = sqlite3.connect(str(self.db_path))
-                backup_conn = sqlite3.connect(str(backup_path))
-                source_conn.backup(backup_conn)
-                source_conn.close()
-                backup_conn.close()
+                backup_result = self._create_sqlite_backup(backup_path, progress_callback)
             else:
-                # PostgreSQL backup using pg_dump
-                env = os.environ.copy()
-                if self.db_password:
-                    env['PGPASSWORD'] = self.db_password
-                
-                cmd = [
-                    'pg_dump',
-                    '--host', self.db_host,
-                    '--port', str(self.db_port),
-                    '--username', self.db_user,
-                    '--format', 'custom',  # Use custom format for better compression and features
-                    '--file', str(backup_path),
-                    '--verbose',
-                    '--no-password',  # Use PGPASSWORD env var
-                    self.db_name
-                ]
-                
-                result = subprocess.run(cmd, env=env, capture_output=True, text=True)
-                if result.returncode != 0:
-                    return {
-                        'success': False,
-                        'error': f'pg_dump failed: {result.stderr}'
-                    }
+                backup_result = self._create_postgresql_backup(backup_path)
             
-            # Validate backup integrity
-            if not self._validate_backup(backup_path):
-                backup_path.unlink()  # Delete corrupted backup
-                return {
-                    'success': False,
-                    'error': 'Backup validation failed - corrupted backup deleted'
-                }
+            if not backup_result['success']:
+                self._remove_backup_files(backup_path)
+                return backup_result
+            
+            # Later validations only compare against this manifest
+            manifest = self._write_manifest(backup_path, {
+                'duration_seconds': round(time.time() - start_time, 2),
+                **backup_result.get('details', {})
+            })
             
             # Get backup metadata
             backup_stats = backup_path.stat()
+            size_bytes = manifest['total_size']
             backup_info = {
                 'success': True,
                 'filename': backup_filename,
                 'path': str(backup_path),
-                'size_bytes': backup_stats.st_size,
-                'size_mb': round(backup_stats.st_size / 1024 / 1024, 2),
+                'size_bytes': size_bytes,
+                'size_mb': round(size_bytes / 1024 / 1024, 2),
                 'created_at': datetime.fromtimestamp(backup_stats.st_ctime),
                 'display_name': self._format_backup_display_name(backup_filename),
-                'db_type': 'SQLite' if self.is_sqlite else 'PostgreSQL'
+                'db_type': 'SQLite' if self.is_sqlite else 'PostgreSQL',
+                'duration_seconds': manifest['duration_seconds'],
+                'checksum': manifest['checksum']
             }
             
             self.logger.info(f"{backup_info['db_type']} backup created successfully: {backup_info['size_mb']} MB")
@@ -168,7 +177,8 @@ class DatabaseBackupService:
             if self.is_sqlite:
                 backup_files = list(self.backup_dir.glob('db_backup_*.sqlite3'))
             else:
-                backup_files = list(self.backup_dir.glob('db_backup_*.sql'))
+                backup_files = (list(self.backup_dir.glob('db_backup_*.sql')) +
+                                list(self.backup_dir.glob(f'db_backup_*{PG_DIRECTORY_EXTENSION}')))
             
             backups = []
             
@@ -181,11 +191,12 @@ class DatabaseBackupService:
                         self.logger.warning(f"Skipping corrupted backup: {backup_file.name}")
                         continue
                     
+                    size_bytes = self._backup_size(backup_file)
                     backup_info = {
                         'filename': backup_file.name,
                         'path': str(backup_file),
-                        'size_bytes': stats.st_size,
-                        'size_mb': round(stats.st_size / 1024 / 1024, 2),
+                        'size_bytes': size_bytes,
+                        'size_mb': round(size_bytes / 1024 / 1024, 2),
                         'created_at': datetime.fromtimestamp(stats.st_ctime),
                         'modified_at': datetime.fromtimestamp(stats.st_mtime),
                         'display_name': self._format_backup_display_name(backup_file.name),
@@ -242,7 +253,7 @@ class DatabaseBackupService:
                     'error': f'Backup file not found: {backup_filename}'
                 }
             
-            if not self._validate_backup(backup_path):
+            if not self._validate_backup(backup_path, verify_checksums=True):
                 return {
                     'success': False,
                     'error': f'Backup file is corrupted: {backup_filename}'
@@ -339,6 +350,10 @@ class DatabaseBackupService:
                     maintenance_mode.disable()
                     return restore_result
             
+            # Every cached API response now describes the pre-restore database
+            bump_generation(*ALL_DEPENDENCIES)
+            bump_client_data_version()
+            
             # Step 7: Disable maintenance mode and return to normal operation
             self.logger.info("🔧 Disabling maintenance mode...")
             maintenance_result = maintenance_mode.disable()
@@ -408,18 +423,17 @@ class DatabaseBackupService:
             
             # Safety check - don't delete if it's not a backup file
             if not (backup_filename.startswith('db_backup_') and 
-                    (backup_filename.endswith('.sqlite3') or backup_filename.endswith('.sql'))):
+                    backup_filename.endswith(('.sqlite3', '.sql', PG_DIRECTORY_EXTENSION))):
                 return {
                     'success': False,
                     'error': f'Safety check failed - not a backup file: {backup_filename}'
                 }
             
             # Get file info before deletion
-            stats = backup_path.stat()
-            size_mb = round(stats.st_size / 1024 / 1024, 2)
+            size_mb = round(self._backup_size(backup_path) / 1024 / 1024, 2)
             
-            # Delete the backup
-            backup_path.unlink()
+            # Delete the backup and its manifest
+            self._remove_backup_files(backup_path)
             
             self.logger.info(f"Backup deleted: {backup_filename} ({size_mb} MB)")
             
@@ -436,22 +450,243 @@ class DatabaseBackupService:
                 'error': f'Deletion failed: {str(e)}'
             }
     
-    def _validate_backup(self, backup_path: Path) -> bool:
+    def _create_sqlite_backup(self, backup_path: Path,
+                              progress_callback: Optional[Callable[[int, int], None]] = None) -> Dict[str, any]:
+        """
+        Copy the SQLite database page-by-page through the online backup API.
+        
+        Copying in steps of SQLITE_PAGES_PER_STEP pages lets other connections keep
+        using the database between steps; progress is reported after every step.
+        """
+        def report_progress(status, remaining, total):
+            copied = total - remaining
+            self.logger.debug(f"SQLite backup progress: {copied}/{total} pages")
+            if progress_callback:
+                progress_callback(copied, total)
+        
+        source_conn = sqlite3.connect(str(self.db_path))
+        backup_conn = sqlite3.connect(str(backup_path))
+        try:
+            source_conn.backup(backup_conn, pages=self.sqlite_pages_per_step, progress=report_progress)
+            
+            # Validate through the still-open copy instead of reopening it afterwards
+            cursor = backup_conn.cursor()
+            integrity = cursor.execute("PRAGMA quick_check").fetchone()[0]
+            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='portfolio_client'")
+            has_schema = cursor.fetchone() is not None
+        finally:
+            backup_conn.close()
+            source_conn.close()
+        
+        if integrity != 'ok' or not has_schema:
+            return {
+                'success': False,
+                'error': 'Backup validation failed - corrupted backup deleted'
+            }
+        
+        return {
+            'success': True,
+            'details': {'method': 'sqlite_online_backup', 'pages_per_step': self.sqlite_pages_per_step}
+        }
+    
+    def _create_postgresql_backup(self, backup_path: Path) -> Dict[str, any]:
+        """Run a parallel directory-format pg_dump and check its table of contents."""
+        cmd = self._build_pg_dump_command(backup_path)
+        result = subprocess.run(cmd, env=self._pg_env(), capture_output=True, text=True)
+        if result.returncode != 0:
+            return {
+                'success': False,
+                'error': f'pg_dump failed: {result.stderr}'
+            }
+        
+        if not self._validate_postgresql_dump(backup_path):
+            return {
+                'success': False,
+                'error': 'Backup validation failed - corrupted backup deleted'
+            }
+        
+        return {
+            'success': True,
+            'details': {
+                'method': 'pg_dump_directory',
+                'jobs': self.parallel_jobs,
+                'compression': cmd[cmd.index('--compress') + 1]
+            }
+        }
+    
+    def _build_pg_dump_command(self, backup_path: Path) -> List[str]:
+        """
+        Build the pg_dump command for a parallel directory-format backup.
+        
+        zstd needs pg_dump 16+; older clients fall back to gzip level 6.
+        """
+        if self.compression == 'none':
+            compress = '0'
+        elif self.compression == 'zstd' and (self._pg_dump_major_version() or 0) >= 16:
+            compress = 'zstd:3'
+        else:
+            compress = '6'
+        
+        return [
+            'pg_dump',
+            '--host', self.db_host,
+            '--port', str(self.db_port),
+            '--username', self.db_user,
+            '--format', 'directory',  # Required for parallel dump and restore
+            '--jobs', str(self.parallel_jobs),
+            '--compress', compress,
+            '--file', str(backup_path),
+            '--no-password',  # Use PGPASSWORD env var
+            self.db_name
+        ]
+    
+    def _pg_dump_major_version(self) -> Optional[int]:
+        """Major version of the installed pg_dump client, cached per service instance."""
+        if self._pg_major_version is None:
+            try:
+                result = subprocess.run(['pg_dump', '--version'], capture_output=True, text=True)
+                match = re.search(r'(\d+)(?:\.\d+)*', result.stdout)
+                self._pg_major_version = int(match.group(1)) if match else 0
+            except OSError:
+                self._pg_major_version = 0
+        return self._pg_major_version
+    
+    def _pg_env(self) -> Dict[str, str]:
+        env = os.environ.copy()
+        if self.db_password:
+            env['PGPASSWORD'] = self.db_password
+        return env
+    
+    def _validate_postgresql_dump(self, backup_path: Path) -> bool:
+        """A custom or directory dump is valid if pg_restore can list its table of contents."""
+        cmd = ['pg_restore', '--list', str(backup_path)]
+        result = subprocess.run(cmd, env=self._pg_env(), capture_output=True, text=True)
+        return result.returncode == 0 and 'portfolio_client' in result.stdout
+    
+    def _manifest_path(self, backup_path: Path) -> Path:
+        return backup_path.with_name(backup_path.name + MANIFEST_SUFFIX)
+    
+    def _backup_files(self, backup_path: Path) -> List[Path]:
+        if backup_path.is_dir():
+            return sorted(path for path in backup_path.rglob('*') if path.is_file())
+        return [backup_path]
+    
+    def _manifest_name(self, backup_path: Path, file_path: Path) -> str:
+        if backup_path.is_dir():
+            return file_path.relative_to(backup_path).as_posix()
+        return file_path.name
+    
+    def _hash_file(self, file_path: Path) -> str:
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_BYTES), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+    
+    def _write_manifest(self, backup_path: Path, details: Dict) -> Dict:
+        """
+        Record size and SHA-256 of every backup file next to the backup.
+        
+        Each file is hashed in one streaming read, parallel_jobs files at a time.
+        """
+        file_paths = self._backup_files(backup_path)
+        with ThreadPoolExecutor(max_workers=max(1, min(self.parallel_jobs, len(file_paths)))) as pool:
+            hashes = list(pool.map(self._hash_file, file_paths))
+        files = {
+            self._manifest_name(backup_path, file_path): {
+                'size': file_path.stat().st_size,
+                'sha256': sha256
+            }
+            for file_path, sha256 in zip(file_paths, hashes)
+        }
+        combined = hashlib.sha256(
+            ''.join(f"{name}:{info['sha256']}\n" for name, info in sorted(files.items())).encode('utf-8')
+        ).hexdigest()
+        
+        manifest = {
+            'created_at': datetime.now().isoformat(),
+            'db_type': 'SQLite' if self.is_sqlite else 'PostgreSQL',
+            'files': files,
+            'total_size': sum(info['size'] for info in files.values()),
+            'checksum': combined,
+            **details
+        }
+        with open(self._manifest_path(backup_path), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
+        return manifest
+    
+    def _read_manifest(self, backup_path: Path) -> Optional[Dict]:
+        manifest_path = self._manifest_path(backup_path)
+        if not manifest_path.exists():
+            return None
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Unreadable backup manifest {manifest_path}: {e}")
+            return None
+    
+    def _verify_manifest(self, backup_path: Path, manifest: Dict, verify_checksums: bool) -> bool:
+        """
+        Compare a backup against its manifest.
+        
+        Sizes are always compared (cheap); checksums only when verify_checksums is
+        set, which restore does before touching the live database.
+        """
+        current = {
+            self._manifest_name(backup_path, file_path): file_path
+            for file_path in self._backup_files(backup_path)
+        }
+        if set(current) != set(manifest.get('files', {})):
+            self.logger.warning(f"Backup {backup_path.name} does not match its manifest file list")
+            return False
+        
+        for name, expected in manifest['files'].items():
+            file_path = current[name]
+            if file_path.stat().st_size != expected['size']:
+                self.logger.warning(f"Backup {backup_path.name}: size mismatch for {name}")
+                return False
+            if verify_checksums and self._hash_file(file_path) != expected['sha256']:
+                self.logger.warning(f"Backup {backup_path.name}: checksum mismatch for {name}")
+                return False
+        return True
+    
+    def _backup_size(self, backup_path: Path) -> int:
+        return sum(file_path.stat().st_size for file_path in self._backup_files(backup_path))
+    
+    def _remove_backup_files(self, backup_path: Path) -> None:
+        """Delete a backup file or directory together with its manifest."""
+        if backup_path.is_dir():
+            shutil.rmtree(backup_path)
+        elif backup_path.exists():
+            backup_path.unlink()
+        manifest_path = self._manifest_path(backup_path)
+        if manifest_path.exists():
+            manifest_path.unlink()
+    
+    def _validate_backup(self, backup_path: Path, verify_checksums: bool = False) -> bool:
         """
         Validate database backup integrity for both SQLite and PostgreSQL.
         
         Checks:
         1. File exists and has content
-        2. Database-specific format validation
-        3. Basic content validation
+        2. Manifest sizes (and checksums when verify_checksums) if a manifest exists
+        3. Otherwise database-specific format and basic content validation
         
         Returns:
             True if backup is valid, False otherwise
         """
         try:
-            if not backup_path.exists() or backup_path.stat().st_size == 0:
+            if not backup_path.exists() or self._backup_size(backup_path) == 0:
                 return False
             
+            manifest = self._read_manifest(backup_path)
+            if manifest is not None:
+                return self._verify_manifest(backup_path, manifest, verify_checksums)
+            
+            if backup_path.is_dir():
+                return self._validate_postgresql_dump(backup_path)
+            
             if self.is_sqlite:
                 # SQLite validation
                 with open(backup_path, 'rb') as f:
@@ -478,15 +713,7 @@ class DatabaseBackupService:
             else:
                 # PostgreSQL validation
                 # For PostgreSQL custom format backups, we can use pg_restore --list to validate
-                env = os.environ.copy()
-                if self.db_password:
-                    env['PGPASSWORD'] = self.db_password
-                
-                cmd = ['pg_restore', '--list', str(backup_path)]
-                result = subprocess.run(cmd, env=env, capture_output=True, text=True)
-                
-                # If pg_restore can list the backup contents, it's valid
-                if result.returncode == 0 and 'portfolio_client' in result.stdout:
+                if self._validate_postgresql_dump(backup_path):
                     return True
                 
                 # Fallback: basic file content check for SQL files
@@ -517,6 +744,9 @@ class DatabaseBackupService:
                 elif filename.endswith('.sql'):
                     timestamp_part = filename[10:-4]  # Remove prefix and suffix
                     db_type_suffix = ' (PostgreSQL)'
+                elif filename.endswith(PG_DIRECTORY_EXTENSION):
+                    timestamp_part = filename[10:-len(PG_DIRECTORY_EXTENSION)]
+                    db_type_suffix = ' (PostgreSQL)'
                 else:
                     return filename
                 
@@ -613,7 +843,7 @@ class DatabaseBackupService:
                 }
             
             # Step 3: Restore to temporary database
-            self.logger.info("📥 Restoring data to temporary database...")
+            self.logger.info(f"📥 Restoring data to temporary database ({self.parallel_jobs} jobs)...")
             restore_cmd = [
                 'pg_restore',
                 '--host', self.db_host,
@@ -624,6 +854,7 @@ class DatabaseBackupService:
                 '--no-password',
                 '--clean',  # Clean before restore
                 '--if-exists',  # Don't error on missing objects
+                '--jobs', str(self.parallel_jobs),  # Parallel data load and index builds
                 str(backup_path)
             ]
             
@@ -6,6 +6,7 @@ Replaces SQLite database operations with Django ORM operations.
 from django.db import transaction
 from django.core.exceptions import ObjectDoesNotExist
 from ..models import Client, Asset, PortfolioSnapshot, Position, Transaction
+from ..utils.dietz_cache import bump_client_data_version
 import logging
 from typing import Optional, Dict, List, Any
 from datetime import datetime
@@ -77,6 +78,9 @@ class DjangoPortfolioDatabase:
             self._save_transactions(client, transactions_data)
             logger.info(f"Saved {len(transactions_data)} transactions")
 
+        if positions_data or transactions_data:
+            bump_client_data_version(client_code)
+
         return snapshot
 
     def _save_assets(self, assets_data: List[Dict], client_code: str) -> None:
@@ -6,10 +6,14 @@ Builds on DjangoReportService with exact template structure matching.
 
 from decimal import Decimal
 from django.db.models import Q, Sum, Count
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from collections import defaultdict
 import logging
-from ..models import Client, PortfolioSnapshot, Position, Transaction, Asset
+import numpy as np
+from ..models import Client, PortfolioSnapshot, Position, Asset
+from .position_frame import PositionFrame
+from .report_data_context import ReportDataContext
+from .report_section_cache import ReportSectionCache
 from jinja2 import Environment, FileSystemLoader
 from django.conf import settings
 import os
@@ -32,6 +36,26 @@ class EnhancedReportService:
         # Initialize Benchmark service for benchmark comparison
         from .benchmark_service import BenchmarkService
         self.benchmark_service = BenchmarkService()
+
+        # Shared (memoized) snapshot comparisons for movers
+        from .snapshot_diff_service import SnapshotDiffService
+        self.snapshot_diff_service = SnapshotDiffService()
+
+        # Optional ConsolidatedDataLoader shared across reports during bulk generation
+        self.data_loader = None
+
+    def get_latest_portfolio(self, client_code: str):
+        """
+        Latest snapshot and positions of a client, taken from the attached data loader
+        when it has them. Returns None if the client has no snapshots.
+        """
+        from .consolidated_data_service import ClientPortfolio
+
+        if self.data_loader is not None:
+            portfolio = self.data_loader.get(client_code)
+            if portfolio is not None:
+                return portfolio
+        return ClientPortfolio.for_client(client_code)
     
     def _setup_jinja2(self):
         """Setup Jinja2 environment with custom filters."""
@@ -72,63 +96,40 @@ class EnhancedReportService:
         logger.info(f"Generating enhanced report for {client_code}: {comparison_date} -> {current_date}")
         
         try:
-            # Get client and snapshots
-            client = Client.objects.get(code=client_code)
-            current_snapshot = PortfolioSnapshot.objects.get(
-                client=client, snapshot_date=current_date
-            )
-            
-            # Get comparison snapshot (automatically find previous if none specified)
-            if comparison_date and comparison_date != current_date:
-                # Explicit comparison date provided
-                try:
-                    comparison_snapshot = PortfolioSnapshot.objects.get(
-                        client=client, snapshot_date=comparison_date
-                    )
-                except PortfolioSnapshot.DoesNotExist:
-                    logger.warning(f"Comparison snapshot not found for {comparison_date}, using current")
-                    comparison_snapshot = current_snapshot
-                    comparison_date = current_date
-            else:
-                # No comparison date provided - automatically find previous snapshot
-                previous_snapshot = PortfolioSnapshot.objects.filter(
-                    client=client,
-                    snapshot_date__lt=current_date
-                ).order_by('-snapshot_date').first()
-                
-                if previous_snapshot:
-                    comparison_snapshot = previous_snapshot
-                    comparison_date = str(previous_snapshot.snapshot_date)
-                    logger.info(f"Auto-detected comparison date: {comparison_date} -> {current_date}")
-                else:
-                    # This is the first snapshot - no comparison possible
-                    comparison_snapshot = current_snapshot
-                    comparison_date = current_date
-                    logger.info(f"First snapshot for {client.code} - no comparison available")
+            # Client, snapshots and everything the sections read, loaded once; sections
+            # that only depend on the current date are reused across comparison dates
+            data = ReportDataContext.load(client_code, current_date, comparison_date,
+                                          dietz_service=self.dietz_service,
+                                          section_cache=ReportSectionCache(client_code))
+            client = data.client
+            current_snapshot, comparison_snapshot = data.current_snapshot, data.comparison_snapshot
+            current_date, comparison_date = data.current_date, data.comparison_date
             
             # Get enhanced metrics
-            current_metrics = self._calculate_enhanced_metrics(current_snapshot)
-            comparison_metrics = self._calculate_enhanced_metrics(comparison_snapshot) if comparison_snapshot != current_snapshot else current_metrics
+            current_metrics = self._calculate_enhanced_metrics(current_snapshot, data)
+            comparison_metrics = self._calculate_enhanced_metrics(comparison_snapshot, data) if comparison_snapshot != current_snapshot else current_metrics
             
             # Calculate biggest movers (ProjectAurum algorithm)
-            biggest_movers = self._calculate_biggest_movers_fixed(current_snapshot, comparison_snapshot)
+            biggest_movers = self._calculate_biggest_movers_fixed(current_snapshot, comparison_snapshot, data=data)
             current_metrics['biggest_movers'] = biggest_movers
             print(f"DEBUG: Setting biggest_movers to {len(biggest_movers)} items: {biggest_movers[:2] if biggest_movers else 'EMPTY'}")
             
             # Generate position tables (exact ProjectAurum format)
-            position_tables = self._generate_position_tables(current_snapshot)
+            position_tables = data.sections.get_or_build(
+                current_date, 'position_tables', lambda: self._generate_position_tables(current_snapshot, data)
+            )
             
             # Generate transaction tables HTML (conditional rendering)
-            transaction_tables_html = self._generate_transaction_tables_html(client, current_date, comparison_date)
+            transaction_tables_html = self._generate_transaction_tables_html(client, current_date, comparison_date, data)
             
             # Generate ApexCharts data
-            charts_data = self._generate_charts_data(client, current_snapshot, comparison_snapshot, current_date)
+            charts_data = self._generate_charts_data(client, current_snapshot, comparison_snapshot, current_date, data)
             
             # Prepare enhanced template context
             context = self._prepare_enhanced_template_context(
                 client, current_date, comparison_date,
                 current_metrics, comparison_metrics,
-                position_tables, transaction_tables_html, charts_data
+                position_tables, transaction_tables_html, charts_data, data
             )
             
             # Render template using Jinja2
@@ -146,27 +147,37 @@ class EnhancedReportService:
             logger.error(f"Error generating enhanced report for {client_code}: {e}")
             raise
     
-    def _calculate_enhanced_metrics(self, snapshot: PortfolioSnapshot) -> dict:
+    def _calculate_enhanced_metrics(self, snapshot: PortfolioSnapshot, data: ReportDataContext = None) -> dict:
         """
         Calculate enhanced metrics including position tables and ApexCharts data.
+        Memoized per snapshot on the report data context (and in its section cache).
         """
-        positions = snapshot.positions.select_related('asset').exclude(asset__bank='ALT').all()
+        data = data or ReportDataContext.for_snapshot(snapshot, dietz_service=self.dietz_service)
+        if snapshot.id not in data.metrics:
+            data.metrics[snapshot.id] = data.sections.get_or_build(
+                snapshot.snapshot_date, 'metrics', lambda: self._build_enhanced_metrics(snapshot, data)
+            )
+        return data.metrics[snapshot.id]
+    
+    def _build_enhanced_metrics(self, snapshot: PortfolioSnapshot, data: ReportDataContext) -> dict:
+        positions = data.positions_for(snapshot)
+        frame = data.frame_for(snapshot)
         
         # Basic calculations
-        total_value = sum(pos.market_value for pos in positions)
-        total_cost_basis = sum(pos.cost_basis for pos in positions)
+        total_value = frame.total_value
+        total_cost_basis = frame.total_cost_basis
         unrealized_gain_loss = total_value - total_cost_basis
         unrealized_gain_loss_pct = (unrealized_gain_loss / total_cost_basis * 100) if total_cost_basis > 0 else 0
         
         # Annual income calculation
-        estimated_annual_income = sum(pos.estimated_annual_income or Decimal('0') for pos in positions)
+        estimated_annual_income = float(frame.estimated_annual_income.sum())
         annual_income_yield = (estimated_annual_income / total_value * 100) if total_value > 0 else 0
         
         # Asset allocation
-        asset_allocation = self._calculate_asset_allocation(positions)
+        asset_allocation = self._calculate_asset_allocation(frame)
         
         # Custody allocation
-        custody_allocation = self._calculate_custody_allocation(positions)
+        custody_allocation = self._calculate_custody_allocation(frame)
         
         # Position count by type
         positions_by_type = self._group_positions_by_type(positions)
@@ -178,10 +189,10 @@ class EnhancedReportService:
         top_movers = {'gainers': [], 'losers': []}
         
         # Calculate period performance using Modified Dietz
-        period_performance = self._calculate_period_performance(snapshot)
+        period_performance = self._calculate_period_performance(snapshot, data)
         
         # Calculate since inception performance using Modified Dietz
-        inception_performance = self._calculate_since_inception_performance(snapshot)
+        inception_performance = self._calculate_since_inception_performance(snapshot, data)
         
         return {
             'total_value': float(total_value),
@@ -203,13 +214,19 @@ class EnhancedReportService:
             'net_cash_flow': 0,  # Placeholder - needs transaction analysis
         }
     
-    def _generate_position_tables(self, snapshot: PortfolioSnapshot) -> dict:
+    def _positions(self, snapshot: PortfolioSnapshot, data: ReportDataContext = None) -> list:
+        """ALT-excluded positions of a snapshot, from the report data context when given."""
+        if data is not None:
+            return data.positions_for(snapshot)
+        return list(snapshot.positions.select_related('asset').exclude_alt())
+    
+    def _generate_position_tables(self, snapshot: PortfolioSnapshot, data: ReportDataContext = None) -> dict:
         """
         Generate exact ProjectAurum position tables with 10 columns:
         custody, name, ticker, quantity, market_value, cost_basis, 
         unrealized_gain, unrealized_gain_pct, coupon_rate, annual_income
         """
-        positions = snapshot.positions.select_related('asset').exclude(asset__bank='ALT').all()
+        positions = self._positions(snapshot, data)
         
         # Group positions by asset type
         grouped_positions = defaultdict(list)
@@ -256,11 +273,11 @@ class EnhancedReportService:
         
         return dict(grouped_positions)
     
-    def _generate_position_tables_html(self, snapshot: PortfolioSnapshot) -> str:
+    def _generate_position_tables_html(self, snapshot: PortfolioSnapshot, data: ReportDataContext = None) -> str:
         """Generate HTML tables for positions instead of dict."""
         from collections import defaultdict
         
-        positions = snapshot.positions.select_related('asset').exclude(asset__bank='ALT').all()
+        positions = self._positions(snapshot, data)
         
         # Group positions by asset type
         grouped_positions = defaultdict(list)
@@ -408,31 +425,27 @@ class EnhancedReportService:
         
         return ''.join(html_sections)
     
-    def _calculate_period_performance(self, snapshot: PortfolioSnapshot) -> dict:
+    def _calculate_period_performance(self, snapshot: PortfolioSnapshot, data: ReportDataContext = None) -> dict:
         """Calculate period performance using Modified Dietz."""
+        data = data or ReportDataContext.for_snapshot(snapshot, dietz_service=self.dietz_service)
+        client_code = data.client.code
+        
         # Get previous snapshot for this client
-        previous_snapshot = PortfolioSnapshot.objects.filter(
-            client=snapshot.client,
-            snapshot_date__lt=snapshot.snapshot_date
-        ).order_by('-snapshot_date').first()
+        previous_snapshot = data.previous_snapshot(snapshot.snapshot_date)
         
         if not previous_snapshot:
-            logger.debug(f"No previous snapshot found for {snapshot.client.code} before {snapshot.snapshot_date}")
+            logger.debug(f"No previous snapshot found for {client_code} before {snapshot.snapshot_date}")
             return {'period_dollar': 0, 'period_percent': 0}
         
         try:
             # Use Modified Dietz service for accurate period return and detailed calculation
-            detailed_result = self.dietz_service.calculate_portfolio_return_detailed(
-                snapshot.client.code, 
-                previous_snapshot.snapshot_date, 
-                snapshot.snapshot_date
-            )
+            detailed_result = data.dietz(previous_snapshot.snapshot_date, snapshot.snapshot_date)
             
             # Get the actual Modified Dietz gain/loss (accounts for external flows)
             period_dollar = detailed_result.get('gain_loss', 0)
             period_return = detailed_result.get('return_percentage', 0)
             
-            logger.debug(f"Period performance for {snapshot.client.code}: ${period_dollar:,.2f} ({period_return:.2f}%)")
+            logger.debug(f"Period performance for {client_code}: ${period_dollar:,.2f} ({period_return:.2f}%)")
             
             return {
                 'period_dollar': period_dollar,
@@ -442,31 +455,28 @@ class EnhancedReportService:
             logger.error(f"Error calculating period performance: {e}")
             return {'period_dollar': 0, 'period_percent': 0}
     
-    def _calculate_since_inception_performance(self, snapshot: PortfolioSnapshot) -> dict:
+    def _calculate_since_inception_performance(self, snapshot: PortfolioSnapshot, data: ReportDataContext = None) -> dict:
         """Calculate since inception performance using Modified Dietz."""
+        data = data or ReportDataContext.for_snapshot(snapshot, dietz_service=self.dietz_service)
+        client_code = data.client.code
+        
         # Get first snapshot for this client
-        first_snapshot = PortfolioSnapshot.objects.filter(
-            client=snapshot.client
-        ).order_by('snapshot_date').first()
+        first_snapshot = data.first_snapshot
         
         if not first_snapshot or first_snapshot.snapshot_date == snapshot.snapshot_date:
             # This IS the first snapshot - inception return is $0
-            logger.debug(f"First snapshot for {snapshot.client.code} - inception return is $0")
+            logger.debug(f"First snapshot for {client_code} - inception return is $0")
             return {'inception_dollar': 0, 'inception_percent': 0}
         
         try:
             # Use Modified Dietz service for accurate inception return and detailed calculation
-            detailed_result = self.dietz_service.calculate_portfolio_return_detailed(
-                snapshot.client.code,
-                first_snapshot.snapshot_date,
-                snapshot.snapshot_date
-            )
+            detailed_result = data.dietz(first_snapshot.snapshot_date, snapshot.snapshot_date)
             
             # Get the actual Modified Dietz gain/loss (accounts for external flows)
             inception_dollar = detailed_result.get('gain_loss', 0)
             inception_return = detailed_result.get('return_percentage', 0)
             
-            logger.debug(f"Since inception performance for {snapshot.client.code}: ${inception_dollar:,.2f} ({inception_return:.2f}%)")
+            logger.debug(f"Since inception performance for {client_code}: ${inception_dollar:,.2f} ({inception_return:.2f}%)")
             
             return {
                 'inception_dollar': inception_dollar,
@@ -476,7 +486,8 @@ class EnhancedReportService:
             logger.error(f"Error calculating inception performance: {e}")
             return {'inception_dollar': 0, 'inception_percent': 0}
     
-    def _calculate_period_investment_cash_flow(self, client: Client, start_date: str, end_date: str) -> float:
+    def _calculate_period_investment_cash_flow(self, client: Client, start_date: str, end_date: str,
+                                               data: ReportDataContext = None) -> float:
         """
         Calculate investment cash flow for a specific period using InvestmentCashFlowService.
         
@@ -487,30 +498,35 @@ class EnhancedReportService:
             client: Client object
             start_date: Period start date (YYYY-MM-DD)
             end_date: Period end date (YYYY-MM-DD)
+            data: Report data context to take the transactions from
         
         Returns:
             float: Net investment cash flow for the period
         """
         # Get transactions in the period
-        transactions = Transaction.objects.filter(
-            client=client,
-            date__gte=start_date,
-            date__lte=end_date
-        ).select_related('asset')
+        transactions = (data or ReportDataContext(client)).transactions_between(start_date, end_date)
         
-        if not transactions.exists():
+        if not transactions:
             logger.debug(f"No transactions found for {client.code} ({start_date} to {end_date})")
             return 0.0
         
         # Use InvestmentCashFlowService to calculate net cash flow
         net_cash_flow = self.investment_cash_flow_service.calculate_investment_cash_flows_from_models(
-            list(transactions)
+            transactions
         )
         
         logger.debug(f"Investment cash flow for {client.code} ({start_date} to {end_date}): ${net_cash_flow:,.2f}")
         return net_cash_flow
     
-    def _generate_transaction_tables(self, client: Client, current_date: str, comparison_date: str) -> dict:
+    def _period_transactions(self, client: Client, start_date: str, end_date: str,
+                             data: ReportDataContext = None) -> list:
+        """Transactions of the reporting period, newest first (by type within a day)."""
+        transactions = (data or ReportDataContext(client)).transactions_between(start_date, end_date)
+        transactions = sorted(transactions, key=lambda t: t.transaction_type)
+        return sorted(transactions, key=lambda t: t.date, reverse=True)
+    
+    def _generate_transaction_tables(self, client: Client, current_date: str, comparison_date: str,
+                                     data: ReportDataContext = None) -> dict:
         """
         Generate transaction tables for the reporting period.
         Only show if there are transactions in the period.
@@ -520,13 +536,9 @@ class EnhancedReportService:
             return {}
         
         # Get transactions in the reporting period
-        transactions = Transaction.objects.filter(
-            client=client,
-            date__gte=comparison_date,
-            date__lte=current_date
-        ).select_related('asset').order_by('-date', 'transaction_type')
+        transactions = self._period_transactions(client, comparison_date, current_date, data)
         
-        if not transactions.exists():
+        if not transactions:
             return {}
         
         # Group transactions by type
@@ -557,7 +569,8 @@ class EnhancedReportService:
         
         return dict(grouped_transactions)
     
-    def _generate_transaction_tables_html(self, client: Client, current_date: str, comparison_date: str) -> str:
+    def _generate_transaction_tables_html(self, client: Client, current_date: str, comparison_date: str,
+                                          data: ReportDataContext = None) -> str:
         """Generate HTML transaction tables for the reporting period."""
         logger.info(f"Generating transaction tables: {client.code} from {comparison_date} to {current_date}")
         
@@ -566,16 +579,11 @@ class EnhancedReportService:
             return ""  # No period to show transactions for
         
         # Get transactions in the reporting period
-        transactions = Transaction.objects.filter(
-            client=client,
-            date__gte=comparison_date,
-            date__lte=current_date
-        ).select_related('asset').order_by('-date', 'transaction_type')
+        transactions = self._period_transactions(client, comparison_date, current_date, data)
         
-        transaction_count = transactions.count()
-        logger.info(f"Found {transaction_count} transactions between {comparison_date} and {current_date}")
+        logger.info(f"Found {len(transactions)} transactions between {comparison_date} and {current_date}")
         
-        if not transactions.exists():
+        if not transactions:
             return ""
         
         # Generate HTML table
@@ -626,7 +634,8 @@ class EnhancedReportService:
         return ''.join(html_sections)
     
     def _generate_charts_data(self, client: Client, current_snapshot: PortfolioSnapshot, 
-                            comparison_snapshot: PortfolioSnapshot, current_date: str) -> dict:
+                            comparison_snapshot: PortfolioSnapshot, current_date: str,
+                            data: ReportDataContext = None) -> dict:
         """
         Generate ApexCharts data for all 5 required charts:
         1. Asset Allocation (pie chart)
@@ -635,56 +644,29 @@ class EnhancedReportService:
         4. Cumulative Return (line chart)
         5. Benchmark Comparison (line chart)
         """
-        positions = current_snapshot.positions.select_related('asset').exclude(asset__bank='ALT').all()
-        total_value = sum(pos.market_value for pos in positions)
-        
-        # 1. Asset Allocation Chart
-        asset_allocation_data = self._calculate_asset_allocation(positions)
-        asset_allocation_chart = {
-            'hasData': bool(asset_allocation_data),
-            'message': 'Asset allocation data' if asset_allocation_data else 'No asset allocation data',
-            'series': [data['percentage'] for data in asset_allocation_data.values()],
-            'labels': list(asset_allocation_data.keys()),
-            'monetaryValues': [data['market_value'] for data in asset_allocation_data.values()]
-        }
-        
-        # 2. Custody Allocation Chart  
-        custody_allocation_data = self._calculate_custody_allocation(positions)
-        custody_allocation_chart = {
-            'hasData': bool(custody_allocation_data),
-            'message': 'Custody allocation data' if custody_allocation_data else 'No custody allocation data',
-            'series': [data['percentage'] for data in custody_allocation_data.values()],
-            'labels': list(custody_allocation_data.keys()),
-            'monetaryValues': [data['market_value'] for data in custody_allocation_data.values()]
-        }
-        
-        # 3. Bank Allocation Chart
-        bank_allocation_data = self._calculate_bank_allocation(positions)
-        bank_allocation_chart = {
-            'hasData': bool(bank_allocation_data),
-            'message': 'Bank allocation data' if bank_allocation_data else 'No bank allocation data',
-            'series': [data['percentage'] for data in bank_allocation_data.values()],
-            'labels': list(bank_allocation_data.keys()),
-            'monetaryValues': [data['market_value'] for data in bank_allocation_data.values()]
-        }
+        data = data or ReportDataContext(client, current_snapshot, comparison_snapshot,
+                                         dietz_service=self.dietz_service)
+        # 1-3. Allocation charts and 6. bond maturity chart only depend on the current
+        # snapshot (bond buckets also on today's date)
+        snapshot_charts = data.sections.get_or_build(
+            current_snapshot.snapshot_date, f'snapshot_charts:{date.today()}',
+            lambda: self._generate_snapshot_charts(data.frame_for(current_snapshot))
+        )
         
         # 3. Portfolio History Chart - FIXED to use current_date and show actual values
-        portfolio_history_chart = self._generate_portfolio_history_chart(client, current_date)
+        portfolio_history_chart = self._generate_portfolio_history_chart(client, current_date, data)
         
         # 4. Cumulative Return Chart - FIXED to calculate Modified Dietz returns
-        cumulative_return_chart = self._generate_cumulative_return_chart(client, current_date)
+        cumulative_return_chart = self._generate_cumulative_return_chart(client, current_date, data)
         
         # 5. Benchmark Comparison Chart - NEW: Portfolio vs VOO vs AGG
-        benchmark_comparison_chart = self._generate_benchmark_comparison_chart(client, current_date)
-        
-        # 6. Bond Maturity Distribution Chart - NEW: Same chart as bond maturity report
-        bond_maturity_chart = self._generate_bond_maturity_distribution_chart(positions)
+        benchmark_comparison_chart = self._generate_benchmark_comparison_chart(client, current_date, data)
         
         # 7. Portfolio Comparison Chart - FIXED with actual 4-metric data
         if comparison_snapshot != current_snapshot:
             # Calculate the 4 required metrics
-            current_metrics = self._calculate_enhanced_metrics(current_snapshot)
-            comparison_metrics = self._calculate_enhanced_metrics(comparison_snapshot)
+            current_metrics = self._calculate_enhanced_metrics(current_snapshot, data)
+            comparison_metrics = self._calculate_enhanced_metrics(comparison_snapshot, data)
             
             # 1. Total Value Change (simple portfolio value difference)
             total_value_change = current_metrics.get('total_value', 0) - comparison_metrics.get('total_value', 0)
@@ -695,7 +677,7 @@ class EnhancedReportService:
             # 3. Net Investment Cash Flow (using InvestmentCashFlowService)
             comparison_date_str = str(comparison_snapshot.snapshot_date)
             net_investment_cash_flow = self._calculate_period_investment_cash_flow(
-                client, comparison_date_str, current_date
+                client, comparison_date_str, current_date, data
             )
             
             # 4. Estimated Annual Income Change
@@ -734,96 +716,109 @@ class EnhancedReportService:
             }
         
         return {
-            'asset_allocation': asset_allocation_chart,
-            'custody_allocation': custody_allocation_chart,
-            'bank_allocation': bank_allocation_chart,
+            **snapshot_charts,
             'portfolio_history': portfolio_history_chart,
             'cumulative_return': cumulative_return_chart,
             'benchmark_comparison': benchmark_comparison_chart,
-            'bond_maturity_distribution': bond_maturity_chart,
             'portfolio_comparison': portfolio_comparison_chart
         }
     
-    def _calculate_asset_allocation(self, positions) -> dict:
-        """Calculate asset allocation with market_value and percentage using ProjectAurum categories."""
-        allocation = defaultdict(float)
-        total_value = sum(pos.market_value for pos in positions)
+    def _generate_snapshot_charts(self, positions) -> dict:
+        """Allocation pie charts and the bond maturity distribution of one snapshot's positions."""
+        positions = PositionFrame.of(positions)
+        # 1. Asset Allocation Chart
+        asset_allocation_data = self._calculate_asset_allocation(positions)
+        asset_allocation_chart = {
+            'hasData': bool(asset_allocation_data),
+            'message': 'Asset allocation data' if asset_allocation_data else 'No asset allocation data',
+            'series': [data['percentage'] for data in asset_allocation_data.values()],
+            'labels': list(asset_allocation_data.keys()),
+            'monetaryValues': [data['market_value'] for data in asset_allocation_data.values()]
+        }
         
-        if total_value == 0:
-            return {}
+        # 2. Custody Allocation Chart  
+        custody_allocation_data = self._calculate_custody_allocation(positions)
+        custody_allocation_chart = {
+            'hasData': bool(custody_allocation_data),
+            'message': 'Custody allocation data' if custody_allocation_data else 'No custody allocation data',
+            'series': [data['percentage'] for data in custody_allocation_data.values()],
+            'labels': list(custody_allocation_data.keys()),
+            'monetaryValues': [data['market_value'] for data in custody_allocation_data.values()]
+        }
         
-        for position in positions:
-            asset_type = position.asset.asset_type
-            
-            # CORRECT MAPPING - EXACT PROJECTAURUM CATEGORIES
-            if asset_type == 'Fixed Income':
-                category = 'Fixed Income'
-            elif asset_type == 'Equities':
-                category = 'Equities'
-            elif asset_type in ['Cash', 'Money Market']:
-                category = 'Cash/Money Market'  # FIXED - combine both
-            else:
-                category = 'Alternatives'
-            
-            allocation[category] += float(position.market_value)
+        # 3. Bank Allocation Chart
+        bank_allocation_data = self._calculate_bank_allocation(positions)
+        bank_allocation_chart = {
+            'hasData': bool(bank_allocation_data),
+            'message': 'Bank allocation data' if bank_allocation_data else 'No bank allocation data',
+            'series': [data['percentage'] for data in bank_allocation_data.values()],
+            'labels': list(bank_allocation_data.keys()),
+            'monetaryValues': [data['market_value'] for data in bank_allocation_data.values()]
+        }
+        
+        # 6. Bond Maturity Distribution Chart - NEW: Same chart as bond maturity report
+        bond_maturity_chart = self._generate_bond_maturity_distribution_chart(positions)
         
-        # Return objects with market_value and percentage
+        return {
+            'asset_allocation': asset_allocation_chart,
+            'custody_allocation': custody_allocation_chart,
+            'bank_allocation': bank_allocation_chart,
+            'bond_maturity_distribution': bond_maturity_chart,
+        }
+    
+    def _allocation(self, values: dict, total_value: float) -> dict:
+        """Objects with market_value and percentage of total value."""
         return {
             k: {
                 'market_value': v, 
-                'percentage': round(v / float(total_value) * 100, 2)
+                'percentage': round(v / total_value * 100, 2)
             } 
-            for k, v in allocation.items()
+            for k, v in values.items()
         }
     
+    def _calculate_asset_allocation(self, positions) -> dict:
+        """Calculate asset allocation with market_value and percentage using ProjectAurum categories."""
+        frame = PositionFrame.of(positions)
+        total_value = frame.total_value
+        
+        if total_value == 0:
+            return {}
+        
+        # CORRECT MAPPING - EXACT PROJECTAURUM CATEGORIES, mapped once per asset type
+        categories = np.array([self._allocation_category(asset_type) for asset_type in frame.asset_types],
+                              dtype=object)
+        return self._allocation(frame.sum_by(categories[frame.asset_type_codes]), total_value)
+    
+    @staticmethod
+    def _allocation_category(asset_type: str) -> str:
+        if asset_type in ('Fixed Income', 'Equities'):
+            return asset_type
+        if asset_type in ['Cash', 'Money Market']:
+            return 'Cash/Money Market'  # FIXED - combine both
+        return 'Alternatives'
+    
     def _calculate_custody_allocation(self, positions) -> dict:
         """Calculate custody allocation with market_value and percentage using Account Bank format."""
-        allocation = defaultdict(float)
-        total_value = sum(pos.market_value for pos in positions)
+        frame = PositionFrame.of(positions)
+        total_value = frame.total_value
         
         if total_value == 0:
             return {}
         
-        for position in positions:
-            # CORRECT FORMAT: "Account Bank" (e.g., "LSAdmin JPM", "LS JPM")
-            if position.account and position.bank:
-                custody = f"{position.account} {position.bank}"
-            elif position.bank:
-                custody = position.bank
-            else:
-                custody = 'Unknown'
-                
-            allocation[custody] += float(position.market_value)
-        
-        # Return objects with market_value and percentage
-        return {
-            k: {
-                'market_value': v, 
-                'percentage': round(v / float(total_value) * 100, 2)
-            } 
-            for k, v in allocation.items()
-        }
+        # CORRECT FORMAT: "Account Bank" (e.g., "LSAdmin JPM", "LS JPM")
+        custody = frame.custody_labels(account_first=True, blank='Unknown')
+        return self._allocation(frame.sum_by(custody), total_value)
     
     def _calculate_bank_allocation(self, positions) -> dict:
         """Calculate bank allocation with market_value and percentage using bank field."""
-        allocation = defaultdict(float)
-        total_value = sum(pos.market_value for pos in positions)
+        frame = PositionFrame.of(positions)
+        total_value = frame.total_value
         
         if total_value == 0:
             return {}
         
-        for position in positions:
-            bank_name = position.bank if position.bank else 'Unknown'
-            allocation[bank_name] += float(position.market_value)
-        
-        # Return objects with market_value and percentage
-        result = {
-            k: {
-                'market_value': v, 
-                'percentage': round(v / float(total_value) * 100, 2)
-            } 
-            for k, v in allocation.items()
-        }
+        banks = np.where(frame.bank == '', 'Unknown', frame.bank).astype(object)
+        result = self._allocation(frame.sum_by(banks), total_value)
         
         # Consolidate to top 5 + Others for better readability
         if len(result) > 5:
@@ -956,17 +951,58 @@ class EnhancedReportService:
         except (ValueError, TypeError):
             return str(coupon_rate)
     
-    def _generate_portfolio_history_chart(self, client: Client, current_date: str = None) -> dict:
-        """Generate portfolio history chart - show actual portfolio values over time (includes cash flows)."""
+    def _series_points(self, data: ReportDataContext, current_date: str, section: str, point) -> list:
+        """
+        [date, value] points, one per snapshot up to current_date, of a chart series.
         
-        # Get snapshots up to current_date (inclusive)
-        query = PortfolioSnapshot.objects.filter(client=client)
-        if current_date:
-            query = query.filter(snapshot_date__lte=current_date)
+        Cached per date and versioned by the snapshot chain and the transactions in its
+        range, so when the previous snapshot's series is cached only the newest point
+        is computed.
+        point(snapshot, points_so_far) returns the value for one snapshot.
+        """
+        snapshots = data.snapshots_until(current_date)
+        if not snapshots:
+            return []
+        
+        def build():
+            previous = None
+            if len(snapshots) > 1:
+                previous = data.sections.get(snapshots[-2].snapshot_date, section,
+                                             version=data.series_version(snapshots[:-1]))
+            if previous is not None:
+                return previous + [[snapshots[-1].snapshot_date.strftime('%Y-%m-%d'), point(snapshots[-1], previous)]]
+            points = []
+            for snapshot in snapshots:
+                points.append([snapshot.snapshot_date.strftime('%Y-%m-%d'), point(snapshot, points)])
+            return points
+        
+        return data.sections.get_or_build(snapshots[-1].snapshot_date, section, build,
+                                          version=data.series_version(snapshots))
+    
+    def _chart_series_data(self, points: list) -> list:
+        """ApexCharts {x: timestamp ms, y: value} data for [date, value] points."""
+        chart_data = []
+        for date_str, value in points:
+            try:
+                date_obj = datetime.strptime(date_str, '%Y-%m-%d')
+                timestamp = int(date_obj.timestamp() * 1000)
+                chart_data.append({'x': timestamp, 'y': value})
+            except ValueError:
+                continue
+        return chart_data
+    
+    def _generate_portfolio_history_chart(self, client: Client, current_date: str = None,
+                                          data: ReportDataContext = None) -> dict:
+        """Generate portfolio history chart - show actual portfolio values over time (includes cash flows)."""
+        data = data or ReportDataContext(client)
         
-        snapshots = query.order_by('snapshot_date')
+        # Actual portfolio total_value of each snapshot up to current_date (includes cash flows)
+        points = self._series_points(
+            data, current_date, 'history_series',
+            lambda snapshot, points: float(snapshot.portfolio_metrics.get('total_value', 0))
+        )
         
-        if snapshots.count() < 2:
+        if len(points) < 2:
             return {
                 'hasData': False,
                 'message': 'Not enough historical data to display portfolio value evolution',
@@ -977,30 +1013,13 @@ class EnhancedReportService:
                 'gradient': {'to': '#0056b3'}
             }
         
-        dates = []
-        values = []
-        
-        # Get actual portfolio total_value for each snapshot (includes cash flows)
-        for snapshot in snapshots:
-            dates.append(snapshot.snapshot_date.strftime('%Y-%m-%d'))
-            total_value = snapshot.portfolio_metrics.get('total_value', 0)
-            values.append(float(total_value))
-        
-        # Format data for ApexCharts with timestamps
-        chart_data = []
-        for i, (date_str, value) in enumerate(zip(dates, values)):
-            try:
-                from datetime import datetime
-                date_obj = datetime.strptime(date_str, '%Y-%m-%d')
-                timestamp = int(date_obj.timestamp() * 1000)
-                chart_data.append({'x': timestamp, 'y': value})
-            except ValueError:
-                continue
+        dates = [date_str for date_str, _ in points]
+        values = [value for _, value in points]
         
         return {
             'hasData': True,
             'message': 'Portfolio history data',
-            'series': [{'name': 'Portfolio Value', 'data': chart_data}],
+            'series': [{'name': 'Portfolio Value', 'data': self._chart_series_data(points)}],
             'currentValue': f"${values[-1]:,.2f}" if values else "$0.00",
             'currentDate': dates[-1] if dates else '',
             'yAxisMin': min(values) * 0.95 if values else 0,
@@ -1009,16 +1028,30 @@ class EnhancedReportService:
             'gradient': {'to': '#dae1f3'}
         }
     
-    def _generate_cumulative_return_chart(self, client: Client, current_date: str) -> dict:
+    def _generate_cumulative_return_chart(self, client: Client, current_date: str,
+                                          data: ReportDataContext = None) -> dict:
         """Generate cumulative return chart using Modified Dietz (excludes cash flows, base 1000)."""
+        data = data or ReportDataContext(client, dietz_service=self.dietz_service)
         
-        # Get snapshots up to current_date (inclusive)  
-        snapshots = PortfolioSnapshot.objects.filter(
-            client=client,
-            snapshot_date__lte=current_date
-        ).order_by('snapshot_date')
+        def cumulative_value(snapshot, points):
+            if not points:
+                return 1000  # Base 1000 start
+            try:
+                # Calculate return from inception using Modified Dietz
+                inception_return = data.dietz(
+                    data.first_snapshot.snapshot_date, 
+                    snapshot.snapshot_date
+                )['return_percentage']
+                
+                # Apply to base 1000: 1000 * (1 + return_percentage/100)
+                return round(1000 * (1 + inception_return / 100), 2)
+            except Exception as e:
+                logger.warning(f"Error calculating cumulative return: {e}")
+                return points[-1][1]  # Use previous value
         
-        if snapshots.count() < 2:
+        points = self._series_points(data, current_date, 'cumulative_series', cumulative_value)
+        
+        if len(points) < 2:
             return {
                 'hasData': False,
                 'message': 'Not enough historical data to display cumulative returns',
@@ -1029,48 +1062,13 @@ class EnhancedReportService:
                 'gradient': {'to': '#1e7e34'}
             }
         
-        dates = []
-        cumulative_values = []
-        
-        first_snapshot = snapshots.first()
-        dates.append(first_snapshot.snapshot_date.strftime('%Y-%m-%d'))
-        cumulative_values.append(1000)  # Base 1000 start
-        
-        # Calculate cumulative returns using Modified Dietz from inception
-        for snapshot in snapshots[1:]:
-            try:
-                # Calculate return from inception using Modified Dietz
-                inception_return = self.dietz_service.calculate_return(
-                    client.code, 
-                    first_snapshot.snapshot_date, 
-                    snapshot.snapshot_date
-                )
-                
-                # Apply to base 1000: 1000 * (1 + return_percentage/100)
-                cumulative_value = 1000 * (1 + inception_return / 100)
-                cumulative_values.append(round(cumulative_value, 2))
-                dates.append(snapshot.snapshot_date.strftime('%Y-%m-%d'))
-                
-            except Exception as e:
-                logger.warning(f"Error calculating cumulative return: {e}")
-                cumulative_values.append(cumulative_values[-1])  # Use previous value
-                dates.append(snapshot.snapshot_date.strftime('%Y-%m-%d'))
-        
-        # Format data for ApexCharts with timestamps
-        chart_data = []
-        for i, (date_str, value) in enumerate(zip(dates, cumulative_values)):
-            try:
-                from datetime import datetime
-                date_obj = datetime.strptime(date_str, '%Y-%m-%d')
-                timestamp = int(date_obj.timestamp() * 1000)
-                chart_data.append({'x': timestamp, 'y': value})
-            except ValueError:
-                continue
+        dates = [date_str for date_str, _ in points]
+        cumulative_values = [value for _, value in points]
         
         return {
             'hasData': True,
             'message': 'Cumulative return data',
-            'series': [{'name': 'Cumulative Return (Base: 1000)', 'data': chart_data}],
+            'series': [{'name': 'Cumulative Return (Base: 1000)', 'data': self._chart_series_data(points)}],
             'currentValue': f"{cumulative_values[-1]:.2f}" if cumulative_values else "1000.00",
             'currentDate': dates[-1] if dates else '',
             'yAxisMin': min(cumulative_values) - 50 if cumulative_values else 950,
@@ -1079,16 +1077,15 @@ class EnhancedReportService:
             'gradient': {'to': '#dae1f3'}
         }
     
-    def _generate_benchmark_comparison_chart(self, client: Client, current_date: str) -> dict:
+    def _generate_benchmark_comparison_chart(self, client: Client, current_date: str,
+                                             data: ReportDataContext = None) -> dict:
         """Generate benchmark comparison chart with portfolio vs VOO vs AGG (all base 1000)."""
+        data = data or ReportDataContext(client, dietz_service=self.dietz_service)
         
         # Get snapshots up to current_date (inclusive)  
-        snapshots = PortfolioSnapshot.objects.filter(
-            client=client,
-            snapshot_date__lte=current_date
-        ).order_by('snapshot_date')
+        snapshots = data.snapshots_until(current_date)
         
-        if snapshots.count() < 2:
+        if len(snapshots) < 2:
             return {
                 'hasData': False,
                 'message': 'Not enough historical data to display benchmark comparison',
@@ -1099,12 +1096,12 @@ class EnhancedReportService:
             }
         
         # Get portfolio data
-        first_snapshot = snapshots.first()
+        first_snapshot = snapshots[0]
         start_date = first_snapshot.snapshot_date.strftime('%Y-%m-%d')
         end_date = current_date
         
         # Portfolio cumulative values (reuse existing logic)
-        portfolio_chart = self._generate_cumulative_return_chart(client, current_date)
+        portfolio_chart = self._generate_cumulative_return_chart(client, current_date, data)
         
         if not portfolio_chart.get('hasData'):
             return portfolio_chart
@@ -1180,56 +1177,14 @@ class EnhancedReportService:
     
     def _generate_bond_maturity_distribution_chart(self, positions) -> dict:
         """Generate exact same chart as bond maturity report."""
-        from datetime import date
-        
-        # Use exact same logic as bond maturity report
-        maturity_periods = {
-            '1_year': {'face_value': 0.0},
-            '2_year': {'face_value': 0.0},
-            '3_year': {'face_value': 0.0},
-            '4_year': {'face_value': 0.0},
-            '5_year': {'face_value': 0.0},
-            '6_plus_year': {'face_value': 0.0}
-        }
+        frame = PositionFrame.of(positions)
         
         # Filter bonds (same as bond maturity report)
-        bond_positions = [p for p in positions if 
-                         p.asset.asset_type == 'Fixed Income' and 
-                         p.asset.maturity_date is not None]
-        
-        if not bond_positions:
+        if not frame.bonds().any():
             return {'hasData': False, 'message': 'No bonds found'}
         
-        today = date.today()
-        
-        for position in bond_positions:
-            days_to_maturity = (position.asset.maturity_date - today).days
-            face_value = float(position.quantity)
-            
-            if days_to_maturity <= 365:
-                period = '1_year'
-            elif days_to_maturity <= 730:
-                period = '2_year'
-            elif days_to_maturity <= 1095:
-                period = '3_year'
-            elif days_to_maturity <= 1460:
-                period = '4_year'
-            elif days_to_maturity <= 1825:
-                period = '5_year'
-            else:
-                period = '6_plus_year'
-            
-            maturity_periods[period]['face_value'] += face_value
-        
-        # Return exact same data structure as bond maturity report chart
-        face_values = [
-            maturity_periods['1_year']['face_value'],
-            maturity_periods['2_year']['face_value'],
-            maturity_periods['3_year']['face_value'],
-            maturity_periods['4_year']['face_value'],
-            maturity_periods['5_year']['face_value'],
-            maturity_periods['6_plus_year']['face_value']
-        ]
+        # Face value (quantity) per 1..5 and 6+ year bucket, as in the bond maturity report
+        face_values = [float(value) for value in frame.maturity_buckets()]
         
         return {
             'hasData': True,
@@ -1240,7 +1195,8 @@ class EnhancedReportService:
     def _prepare_enhanced_template_context(self, client: Client, current_date: str, 
                                          comparison_date: str, current_metrics: dict, 
                                          comparison_metrics: dict, position_tables: dict,
-                                         transaction_tables_html: str, charts_data: dict) -> dict:
+                                         transaction_tables_html: str, charts_data: dict,
+                                         data: ReportDataContext = None) -> dict:
         """Prepare enhanced template context with position/transaction HTML tables."""
         
         # Calculate comparison values
@@ -1254,12 +1210,12 @@ class EnhancedReportService:
         if comparison_date != current_date:
             # Week 1: Cash flow for comparison period (single day or short period)
             week1_cash_flow = self._calculate_period_investment_cash_flow(
-                client, comparison_date, comparison_date
+                client, comparison_date, comparison_date, data
             )
             
             # Week 2: Cash flow for period between comparison and current
             week2_cash_flow = self._calculate_period_investment_cash_flow(
-                client, comparison_date, current_date
+                client, comparison_date, current_date, data
             )
             
             # Combined: Total cash flow for the entire period
@@ -1380,7 +1336,10 @@ class EnhancedReportService:
             },
             
             # Generate HTML position tables
-            'positions_table': self._generate_position_tables_html(
+            'positions_table': data.sections.get_or_build(
+                current_date, 'positions_table_html',
+                lambda: self._generate_position_tables_html(data.current_snapshot, data)
+            ) if data else self._generate_position_tables_html(
                 PortfolioSnapshot.objects.get(client=client, snapshot_date=current_date)
             ),
             'transactions_table': transaction_tables_html,
@@ -1404,7 +1363,7 @@ class EnhancedReportService:
         # Add rollover transparency
         rollover_info = None
         try:
-            snapshot = PortfolioSnapshot.objects.get(
+            snapshot = data.current_snapshot if data else PortfolioSnapshot.objects.get(
                 client=client,
                 snapshot_date=current_date
             )
@@ -1610,7 +1569,7 @@ class EnhancedReportService:
         
         return self.generate_weekly_report(client_code, snapshot_date, comparison_date)
     
-    def _calculate_biggest_movers_fixed(self, current_snapshot, comparison_snapshot, limit=5):
+    def _calculate_biggest_movers_fixed(self, current_snapshot, comparison_snapshot, limit=5, data=None):
         """
         Calculate biggest movers using ProjectAurum's enhanced algorithm.
         Filters out cash, small positions, and quantity changes.
@@ -1624,114 +1583,39 @@ class EnhancedReportService:
         max_quantity_change_pct = 5.0  # Maximum allowed quantity change percentage
         min_position_size = 5000  # Minimum position size to avoid noise
         
-        # Convert Django positions to ProjectAurum format (EXCLUDE ALT positions)
-        week1_positions = self._convert_positions_to_dict(comparison_snapshot.positions.select_related('asset').exclude(asset__bank='ALT').all())
-        week2_positions = self._convert_positions_to_dict(current_snapshot.positions.select_related('asset').exclude(asset__bank='ALT').all())
-        
-        # Create dictionary mapping from position identifier to position details for week 1
-        week1_positions_dict = {}
-        for position in week1_positions:
-            # Use compound key that uniquely identifies the position (ProjectAurum format)
-            cusip_str = str(position.get('cusip', '')).strip()
-            key = (
-                cusip_str,
-                position.get('name', '').strip(), 
-                position.get('ticker', '').strip(),
-                position.get('asset_type', '').strip()
-            )
-            week1_positions_dict[key] = position
+        # Positions held in both weeks (matched on asset, ALT excluded)
+        positions = (data.positions_for(comparison_snapshot), data.positions_for(current_snapshot)) if data else None
+        diff = self.snapshot_diff_service.diff(
+            current_snapshot.client.code, comparison_snapshot.snapshot_date, current_snapshot.snapshot_date,
+            positions=positions
+        )
+        
+        # Filters: no cash/money market, meaningful sizes, no significant quantity
+        # changes (those indicate transactions rather than price movement)
+        mask = diff.mask(
+            exclude_asset_types=excluded_asset_types,
+            min_value=min_position_size,
+            max_quantity_change_pct=max_quantity_change_pct
+        )
         
-        # Calculate percentage changes for positions that exist in both weeks
         movers = []
-        excluded_count = {'cash': 0, 'quantity_change': 0, 'small_size': 0, 'missing': 0}
-        
-        for position in week2_positions:
-            # Create matching key for week2 position
-            cusip_str = str(position.get('cusip', '')).strip()
-            key = (
-                cusip_str,
-                position.get('name', '').strip(), 
-                position.get('ticker', '').strip(),
-                position.get('asset_type', '').strip()
-            )
-            
-            # Skip if position didn't exist in week 1
-            if key not in week1_positions_dict:
-                excluded_count['missing'] += 1
-                continue
-            
-            week1_position = week1_positions_dict[key]
-            
-            # Filter 1: Exclude cash and money market positions
-            asset_type = position.get('asset_type', '').strip()
-            if asset_type in excluded_asset_types:
-                excluded_count['cash'] += 1
-                continue
-            
-            # Get market values and quantities
-            week1_value = float(week1_position.get('market_value', 0))
-            week2_value = float(position.get('market_value', 0))
-            week1_qty = float(week1_position.get('quantity', 0))
-            week2_qty = float(position.get('quantity', 0))
-            
-            # Filter 2: Require meaningful position sizes
-            if week1_value < min_position_size or week2_value < min_position_size:
-                excluded_count['small_size'] += 1
-                continue
-            
-            # Filter 3: Exclude positions with significant quantity changes (indicates transactions)
-            if week1_qty != 0:
-                qty_change_pct = abs(((week2_qty - week1_qty) / week1_qty) * 100)
-                if qty_change_pct > max_quantity_change_pct:
-                    excluded_count['quantity_change'] += 1
-                    continue
-            elif week2_qty != 0:
-                # New position (week1_qty = 0, week2_qty > 0) - this is a purchase
-                excluded_count['quantity_change'] += 1
-                continue
-            
-            # Skip if either value is zero to avoid division by zero
-            if week1_value == 0 or week2_value == 0:
-                continue
-            
-            # Calculate price-based percentage change
-            pct_change = ((week2_value - week1_value) / week1_value) * 100
-            dollar_change = week2_value - week1_value
-            
-            # Create mover entry (ProjectAurum format)
-            mover = {
-                'name': position.get('name', 'Unknown'),
-                'asset_type': asset_type,
+        pct_changes = diff.pct_change
+        for i in diff.ranked(mask):
+            pct_change = float(pct_changes[i])
+            movers.append({
+                'name': diff.names[i] or 'Unknown',
+                'asset_type': diff.asset_types[i],
                 'pct_change': pct_change,
-                'dollar_change': dollar_change,
+                'dollar_change': float(diff.value_delta[i]),
                 'abs_pct_change': abs(pct_change),
                 'movement_type': 'Price Movement',
-                'week1_value': week1_value,
-                'week2_value': week2_value
-            }
-            movers.append(mover)
-        
-        # Sort by absolute dollar change (descending) - prioritizes financial impact
-        movers.sort(key=lambda x: abs(x['dollar_change']), reverse=True)
+                'week1_value': float(diff.value1[i]),
+                'week2_value': float(diff.value2[i])
+            })
         
-        # Take top 'limit' movers
+        # Sorted by absolute dollar change (descending) - prioritizes financial impact
         top_movers = movers[:limit]
         
         logger.info(f"Biggest movers calculation complete: {len(top_movers)} of {len(movers)} total movers")
         
         return top_movers
-    
-    def _convert_positions_to_dict(self, positions):
-        """Convert Django Position objects to ProjectAurum format dictionaries."""
-        position_list = []
-        for position in positions:
-            position_dict = {
-                'cusip': position.asset.cusip if position.asset else '',
-                'name': position.asset.name if position.asset else 'Unknown',
-                'ticker': position.asset.ticker if position.asset else '',
-                'asset_type': position.asset.asset_type if position.asset else '',
-                'market_value': float(position.market_value or 0),
-                'quantity': float(position.quantity or 0)
-            }
-            position_list.append(position_dict)
-        return position_list
\ No newline at end of file
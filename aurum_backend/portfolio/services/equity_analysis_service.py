@@ -7,8 +7,10 @@ import logging
 from typing import Dict, List
 from collections import defaultdict
 from decimal import Decimal
+import numpy as np
 from .fmp_equity_service import FMPEquityService
 from .etf_detector import ETFDetector
+from .etf_lookthrough_service import BENCHMARK_TICKER, LookthroughMatrix
 
 logger = logging.getLogger(__name__)
 
@@ -16,17 +18,64 @@ logger = logging.getLogger(__name__)
 class EquityAnalysisService:
     """Analyze equity positions with sector breakdown."""
 
-    def __init__(self):
-        self.fmp_service = FMPEquityService()
+    def __init__(self, fmp_service=None):
+        self._fmp_service = fmp_service
+        self.lookthrough = None
         # Pass FMP service to ETF detector for API-based detection
-        self.etf_detector = ETFDetector(fmp_service=self.fmp_service)
+        self.etf_detector = ETFDetector(fmp_service=fmp_service)
+
+    @property
+    def fmp_service(self) -> FMPEquityService:
+        """FMP client, created only when the local look-through store cannot answer."""
+        return self._connect_fmp()
+
+    def _connect_fmp(self) -> FMPEquityService:
+        """Create the FMP client (once) and hand it to the ETF detector."""
+        if self._fmp_service is None:
+            self._fmp_service = FMPEquityService()
+            self.etf_detector.fmp_service = self._fmp_service
+        return self._fmp_service
+
+    def _load_lookthrough(self, positions) -> None:
+        """Load the local store; connect FMP only for tickers it does not cover yet."""
+        self.lookthrough = LookthroughMatrix.load()
+        self.etf_detector.reference = self.lookthrough.references
+        if any(pos.asset.ticker and self.lookthrough.reference(pos.asset.ticker) is None for pos in positions):
+            self._connect_fmp()
+
+    def _profile(self, ticker: str) -> Dict:
+        info = self.lookthrough.reference(ticker) if self.lookthrough else None
+        if info is None:
+            return self.fmp_service.get_company_profile(ticker)
+        profile = {'ticker': info.ticker, 'sector': info.sector}
+        if info.name:
+            profile['company_name'] = info.name
+        return profile
+
+    def _etf_holdings(self, etf_ticker: str) -> List[Dict]:
+        info = self.lookthrough.reference(etf_ticker) if self.lookthrough else None
+        if info is None or not info.is_etf:
+            return self.fmp_service.get_etf_holdings(etf_ticker)
+        return self.lookthrough.holdings(etf_ticker)
+
+    def _etf_sector_weightings(self, etf_ticker: str) -> Dict[str, float]:
+        info = self.lookthrough.reference(etf_ticker) if self.lookthrough else None
+        if info is None or not info.is_etf:
+            return self.fmp_service.get_etf_sector_weightings(etf_ticker)
+        return dict(info.sector_weightings)
+
+    def _spy_benchmark(self) -> Dict[str, float]:
+        info = self.lookthrough.reference(BENCHMARK_TICKER) if self.lookthrough else None
+        if info is None:
+            return self.fmp_service.get_spy_benchmark_allocation()
+        return dict(info.sector_weightings) or FMPEquityService.HARDCODED_SPY_WEIGHTS.copy()
 
     def analyze_equity_portfolio(self, positions) -> Dict:
         """
         Main analysis method with ETF look-through disaggregation.
 
         Args:
-            positions: QuerySet of Position objects (Equities only, ALTs excluded)
+            positions: QuerySet or list of Position objects (Equities only, ALTs excluded)
 
         Returns:
             {
@@ -41,7 +90,9 @@ class EquityAnalysisService:
                 'total_equity_value': float
             }
         """
-        logger.info(f"Analyzing equity portfolio with {positions.count()} positions")
+        logger.info(f"Analyzing equity portfolio with {len(positions)} positions")
+
+        self._load_lookthrough(positions)
 
         # Separate direct equities from ETFs
         direct_equities, etfs = self.etf_detector.separate_equities(positions)
@@ -71,7 +122,7 @@ class EquityAnalysisService:
         )
 
         # Get SPY benchmark
-        spy_benchmark = self.fmp_service.get_spy_benchmark_allocation()
+        spy_benchmark = self._spy_benchmark()
 
         # Compare with SPY
         sector_comparison = self._compare_with_spy(combined_sector_exposure, spy_benchmark)
@@ -92,8 +143,12 @@ class EquityAnalysisService:
         """Enrich direct equity holdings with FMP sector data."""
         enriched_holdings = []
 
-        # Batch enrich all tickers
-        ticker_data = self.fmp_service.batch_enrich_equities(direct_equities)
+        # Enrich each distinct ticker once
+        ticker_data = {}
+        for position in direct_equities:
+            ticker = position.asset.ticker
+            if ticker and ticker not in ticker_data:
+                ticker_data[ticker] = self._profile(ticker)
 
         for position in direct_equities:
             ticker = position.asset.ticker
@@ -134,7 +189,7 @@ class EquityAnalysisService:
             # Get ETF sector weightings
             sector_breakdown = {}
             if ticker:
-                sector_breakdown = self.fmp_service.get_etf_sector_weightings(ticker) or {}
+                sector_breakdown = self._etf_sector_weightings(ticker) or {}
 
             enriched_etfs.append({
                 'ticker': ticker or 'N/A',
@@ -267,8 +322,8 @@ class EquityAnalysisService:
 
             ticker = ticker.upper().strip()
 
-            # Get sector from FMP
-            profile = self.fmp_service.get_company_profile(ticker)
+            # Get sector from the local store or FMP
+            profile = self._profile(ticker)
             sector = profile.get('sector', 'Unknown') if profile else 'Unknown'
             company_name = profile.get('company_name', position.asset.name) if profile else position.asset.name
 
@@ -284,7 +339,27 @@ class EquityAnalysisService:
                 'percentage': 0.0
             }
 
-        # Step 2: For each ETF, get holdings and distribute to aggregated map
+        def stock_entry(stock_ticker: str, stock_name: str) -> Dict:
+            """Aggregated holding of a stock, created (with its sector) on first sight."""
+            if stock_ticker not in aggregated_map:
+                profile = self._profile(stock_ticker)
+                aggregated_map[stock_ticker] = {
+                    'ticker': stock_ticker,
+                    'name': stock_name,
+                    'sector': profile.get('sector', 'Unknown') if profile else 'Unknown',
+                    'direct_value': 0.0,
+                    'direct_shares': 0.0,
+                    'etf_value': 0.0,
+                    'etf_contributions': [],
+                    'total_value': 0.0,
+                    'percentage': 0.0
+                }
+            return aggregated_map[stock_ticker]
+
+        # Step 2: For each ETF, distribute its value across its holdings. ETFs held in the
+        # local store are collected and distributed in one sparse product (Step 2b).
+        store_etf_values = {}
+        etf_names = {}
         for etf_position in etfs:
             etf_ticker = etf_position.asset.ticker
             if not etf_ticker:
@@ -294,8 +369,14 @@ class EquityAnalysisService:
             etf_value = float(etf_position.market_value)
             etf_name = etf_position.asset.name
 
+            if self.lookthrough is not None and self.lookthrough.has_etf(etf_ticker):
+                store_ticker = etf_ticker.upper().strip()
+                store_etf_values[store_ticker] = store_etf_values.get(store_ticker, 0.0) + etf_value
+                etf_names.setdefault(store_ticker, etf_name)
+                continue
+
             # Get ETF holdings from FMP API
-            etf_holdings = self.fmp_service.get_etf_holdings(etf_ticker)
+            etf_holdings = self._etf_holdings(etf_ticker)
 
             if not etf_holdings:
                 logger.warning(f"No holdings data found for ETF {etf_ticker}")
@@ -318,34 +399,32 @@ class EquityAnalysisService:
                 weight = holding.get('weight', 0) / 100.0  # Convert percentage to decimal
                 indirect_value = etf_value * weight
 
-                # Initialize or update aggregated holding
-                if stock_ticker not in aggregated_map:
-                    # Get sector for this stock
-                    profile = self.fmp_service.get_company_profile(stock_ticker)
-                    sector = profile.get('sector', 'Unknown') if profile else 'Unknown'
-                    stock_name = holding.get('name', stock_ticker)
-
-                    aggregated_map[stock_ticker] = {
-                        'ticker': stock_ticker,
-                        'name': stock_name,
-                        'sector': sector,
-                        'direct_value': 0.0,
-                        'direct_shares': 0.0,
-                        'etf_value': 0.0,
-                        'etf_contributions': [],
-                        'total_value': 0.0,
-                        'percentage': 0.0
-                    }
-
-                # Add ETF contribution
-                aggregated_map[stock_ticker]['etf_value'] += indirect_value
-                aggregated_map[stock_ticker]['etf_contributions'].append({
+                entry = stock_entry(stock_ticker, holding.get('name', stock_ticker))
+                entry['etf_value'] += indirect_value
+                entry['etf_contributions'].append({
                     'etf_ticker': etf_ticker,
                     'etf_name': etf_name,
                     'value': indirect_value,
                     'weight': round(weight * 100, 2)
                 })
 
+        # Step 2b: Store-backed ETFs (stored holdings are already each ETF's top 10)
+        if store_etf_values:
+            matrix = self.lookthrough
+            entries, values = matrix.contributions(store_etf_values)
+            logger.info(f"Distributing {len(store_etf_values)} ETFs across {len(entries)} stored holdings")
+            for i, indirect_value in zip(entries, values):
+                etf_ticker = matrix.etfs[matrix.rows[i]]
+                column = matrix.cols[i]
+                entry = stock_entry(matrix.constituents[column], matrix.constituent_names[column])
+                entry['etf_value'] += float(indirect_value)
+                entry['etf_contributions'].append({
+                    'etf_ticker': etf_ticker,
+                    'etf_name': etf_names[etf_ticker],
+                    'value': float(indirect_value),
+                    'weight': round(float(matrix.weights[i]) * 100, 2)
+                })
+
         # Step 3: Calculate totals and percentages
         aggregated_holdings = []
         for ticker, data in aggregated_map.items():
@@ -359,3 +438,132 @@ class EquityAnalysisService:
         logger.info(f"Aggregated into {len(aggregated_holdings)} unique stock holdings")
 
         return aggregated_holdings
+
+    def analyze_firm_lookthrough(self, top_n: int = 25) -> Dict:
+        """
+        Equity look-through for every client's latest snapshot in one batched computation.
+
+        Reads only the local look-through store, so no FMP call is made: tickers it does
+        not cover are classified by name and reported with an Unknown sector, and ETFs
+        without stored holdings are reported as uncovered ETF value.
+
+        Returns:
+            {
+                'clients': {code: {'total_equity_value', 'direct_value', 'etf_value',
+                                   'uncovered_etf_value', 'top_holdings', 'sector_exposure'}},
+                'firm': {...same keys, summed across clients...}
+            }
+        """
+        from django.db.models import OuterRef, Subquery
+        from portfolio.models import PortfolioSnapshot, Position
+
+        lookthrough = LookthroughMatrix.load()
+        detector = ETFDetector(reference=lookthrough.references)
+
+        latest_snapshot = PortfolioSnapshot.objects.filter(
+            client=OuterRef('snapshot__client')
+        ).order_by('-snapshot_date').values('id')[:1]
+        positions = Position.objects.filter(
+            snapshot_id=Subquery(latest_snapshot),
+            asset__asset_type='Equities'
+        ).exclude_alt().select_related('asset', 'snapshot__client')
+
+        # Collect positions into a (clients x ETFs) value matrix and direct holdings
+        client_index, tickers, ticker_index, names = {}, [], {}, {}
+        etf_entries, direct_entries, uncovered = [], [], []
+        for position in positions:
+            row = client_index.setdefault(position.snapshot.client.code, len(client_index))
+            value = float(position.market_value)
+            ticker = (position.asset.ticker or position.asset.name or '').upper().strip()
+            if not ticker:
+                continue
+            if detector.is_etf(position.asset):
+                if lookthrough.has_etf(ticker):
+                    etf_entries.append((row, lookthrough.etf_index[ticker], value))
+                else:
+                    uncovered.append((row, value))
+                continue
+            if ticker not in ticker_index:
+                ticker_index[ticker] = len(tickers)
+                tickers.append(ticker)
+                names[ticker] = position.asset.name
+            direct_entries.append((row, ticker_index[ticker], value))
+
+        # Stock universe: direct tickers followed by constituents not held directly
+        for column, constituent in enumerate(lookthrough.constituents):
+            if constituent not in ticker_index:
+                ticker_index[constituent] = len(tickers)
+                tickers.append(constituent)
+                names[constituent] = lookthrough.constituent_names[column]
+
+        n_clients = len(client_index)
+        etf_values = np.zeros((n_clients, len(lookthrough.etf_index)))
+        direct_values = np.zeros((n_clients, len(tickers)))
+        uncovered_values = np.zeros(n_clients)
+        for row, column, value in etf_entries:
+            etf_values[row, column] += value
+        for row, column, value in direct_entries:
+            direct_values[row, column] += value
+        for row, value in uncovered:
+            uncovered_values[row] += value
+
+        # Sparse look-through for every client at once, scattered into the stock universe
+        indirect_values = np.zeros_like(direct_values)
+        constituent_columns = np.array([ticker_index[c] for c in lookthrough.constituents], dtype=np.int64)
+        indirect_values[:, constituent_columns] = lookthrough.lookthrough_many(etf_values)
+
+        # Sector exposure: direct holdings by stock sector, ETFs by their sector weightings
+        stock_sectors = [getattr(lookthrough.reference(ticker), 'sector', 'Unknown') for ticker in tickers]
+        etf_tickers = sorted(lookthrough.etf_index, key=lookthrough.etf_index.get)
+        sectors = sorted(set(stock_sectors) | {
+            sector for etf in etf_tickers for sector in lookthrough.reference(etf).sector_weightings
+        })
+        sector_index = {sector: i for i, sector in enumerate(sectors)}
+        stock_sector_map = np.zeros((len(tickers), len(sectors)))
+        stock_sector_map[np.arange(len(tickers)), [sector_index[s] for s in stock_sectors]] = 1.0
+        etf_sector_map = np.zeros((len(etf_tickers), len(sectors)))
+        for row, etf in enumerate(etf_tickers):
+            for sector, weight in lookthrough.reference(etf).sector_weightings.items():
+                etf_sector_map[row, sector_index[sector]] = weight / 100.0
+        sector_values = direct_values @ stock_sector_map + etf_values @ etf_sector_map
+
+        def summarize(direct, indirect, by_sector, etf_total, uncovered_total):
+            total_equity_value = float(direct.sum() + etf_total + uncovered_total)
+            combined = direct + indirect
+            top = [i for i in np.argsort(-combined, kind='stable')[:top_n] if combined[i] > 0]
+            return {
+                'total_equity_value': total_equity_value,
+                'direct_value': float(direct.sum()),
+                'etf_value': float(etf_total),
+                'uncovered_etf_value': float(uncovered_total),
+                'top_holdings': [
+                    {
+                        'ticker': tickers[i],
+                        'name': names[tickers[i]],
+                        'sector': stock_sectors[i],
+                        'direct_value': float(direct[i]),
+                        'etf_value': float(indirect[i]),
+                        'total_value': float(combined[i]),
+                        'percentage': round(float(combined[i]) / total_equity_value * 100, 2) if total_equity_value > 0 else 0.0
+                    }
+                    for i in top
+                ],
+                'sector_exposure': dict(sorted(
+                    ((sectors[i], round(float(by_sector[i]) / total_equity_value * 100, 2))
+                     for i in np.flatnonzero(by_sector)),
+                    key=lambda item: item[1], reverse=True
+                )) if total_equity_value > 0 else {}
+            }
+
+        etf_totals = etf_values.sum(axis=1)
+        clients = {
+            code: summarize(direct_values[row], indirect_values[row], sector_values[row],
+                            etf_totals[row], uncovered_values[row])
+            for code, row in sorted(client_index.items())
+        }
+        firm = summarize(direct_values.sum(axis=0), indirect_values.sum(axis=0), sector_values.sum(axis=0),
+                         etf_totals.sum(), uncovered_values.sum())
+
+        logger.info(f"Firm-wide equity look-through: {n_clients} clients, {len(tickers)} stocks, "
+                    f"{len(etf_tickers)} stored ETFs")
+        return {'clients': clients, 'firm': firm}
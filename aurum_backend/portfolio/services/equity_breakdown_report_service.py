@@ -7,7 +7,7 @@ import logging
 from datetime import datetime
 from typing import Tuple
 from django.db.models import Count
-from portfolio.models import Client, PortfolioSnapshot
+from portfolio.models import Client
 from portfolio.utils.report_utils import save_report_html
 from .enhanced_report_service import EnhancedReportService
 from .equity_analysis_service import EquityAnalysisService
@@ -36,26 +36,22 @@ class EquityBreakdownReportService(EnhancedReportService):
 
         try:
             # 1. Get client and latest snapshot
-            client = Client.objects.get(code=client_code)
-            snapshot = PortfolioSnapshot.objects.filter(
-                client=client
-            ).order_by('-snapshot_date').first()
+            portfolio = self.get_latest_portfolio(client_code)
 
-            if not snapshot:
+            if not portfolio:
                 logger.warning(f"No portfolio snapshots found for client {client_code}")
                 return self._generate_empty_report(client_code, "No portfolio data found"), None
+            client, snapshot = portfolio.client, portfolio.snapshot
 
             # 2. Filter equity positions (exclude ALTs)
-            equity_positions = snapshot.positions.select_related('asset').filter(
-                asset__asset_type='Equities'
-            ).exclude(asset__bank='ALT')
+            equity_positions = portfolio.equity_positions()
 
-            if not equity_positions.exists():
+            if not equity_positions:
                 logger.warning(f"No equity positions found for client {client_code}")
                 return self._generate_empty_report(client_code, f"No equity positions found for snapshot {snapshot.snapshot_date}"), snapshot.snapshot_date
 
             # 3. Analyze equities
-            logger.info(f"Analyzing {equity_positions.count()} equity positions")
+            logger.info(f"Analyzing {len(equity_positions)} equity positions")
             analysis_results = self.equity_analysis_service.analyze_equity_portfolio(
                 equity_positions
             )
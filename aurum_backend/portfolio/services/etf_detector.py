@@ -1,6 +1,7 @@
 """
 ETF Detection Utility
-Identifies ETFs from equity positions using FMP API + fallback name patterns
+Identifies ETFs from equity positions using the local reference table or FMP API,
+with name patterns as fallback
 """
 
 import logging
@@ -21,14 +22,17 @@ class ETFDetector:
         'SCHWAB', 'FIDELITY', 'BLACKROCK'
     ]
 
-    def __init__(self, fmp_service=None):
+    def __init__(self, fmp_service=None, reference=None):
         """
         Initialize ETF detector.
 
         Args:
             fmp_service: Optional FMPEquityService instance for API-based detection
+            reference: Optional ticker -> SecurityInfo map from the look-through store;
+                tickers found here are never looked up through the API
         """
         self.fmp_service = fmp_service
+        self.reference = reference or {}
 
     def is_etf(self, asset: Asset) -> bool:
         """
@@ -43,8 +47,12 @@ class ETFDetector:
         if not asset:
             return False
 
-        # Method 1: Use FMP API if available and ticker exists
-        if self.fmp_service and asset.ticker:
+        # Method 1: Use the local reference table, else FMP API if available
+        info = self.reference.get(asset.ticker.upper().strip()) if asset.ticker else None
+        if info is not None:
+            if info.is_etf:
+                return True
+        elif self.fmp_service and asset.ticker:
             try:
                 is_etf_api = self.fmp_service.is_etf(asset.ticker)
                 if is_etf_api:
@@ -0,0 +1,284 @@
+"""
+ETF Look-through Store
+Local ETF x constituent weight matrix and ticker reference table for equity analysis.
+
+The store is refreshed from FMP by `manage.py refresh_etf_holdings`; read paths only
+touch the database. The matrix is kept in coordinate form (numpy arrays of ETF row,
+constituent column and weight), so a portfolio's look-through is one sparse
+matrix-vector product and the firm-wide view is one sparse matrix-matrix product
+over every client at once.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Count, Max
+
+from ..models import Asset, ETFConstituent, SecurityReference
+from ..utils.response_cache import PORTFOLIO_DATA, bump_generation
+
+logger = logging.getLogger(__name__)
+
+TOP_HOLDINGS = 10  # Look-through uses each ETF's top 10 holdings
+BENCHMARK_TICKER = 'SPY'
+
+
+@dataclass(frozen=True)
+class SecurityInfo:
+    """Reference data for one ticker."""
+    ticker: str
+    name: str
+    sector: str
+    is_etf: bool
+    sector_weightings: Dict[str, float] = field(default_factory=dict)
+
+
+class LookthroughMatrix:
+    """
+    Sparse ETF x constituent weight matrix plus the ticker reference table.
+
+    Weights are stored as fractions. Rows are ETFs, columns are constituents; entries
+    of one ETF are contiguous and in holding-rank order.
+    """
+
+    _cache_lock = threading.Lock()
+    _cached: Optional[Tuple[tuple, 'LookthroughMatrix']] = None
+
+    def __init__(self, references: Dict[str, SecurityInfo],
+                 entries: Iterable[Tuple[str, str, str, float]]):
+        self.references = references
+        self.etf_index: Dict[str, int] = {}
+        self.etfs: List[str] = []
+        self.constituent_index: Dict[str, int] = {}
+        self.constituents: List[str] = []
+        self.constituent_names: List[str] = []
+        self._row_slices: Dict[str, Tuple[int, int]] = {}
+
+        rows, cols, weights = [], [], []
+        for position, (etf, constituent, name, weight) in enumerate(entries):
+            if etf not in self.etf_index:
+                self.etf_index[etf] = len(self.etfs)
+                self.etfs.append(etf)
+            row = self.etf_index[etf]
+            if constituent not in self.constituent_index:
+                self.constituent_index[constituent] = len(self.constituents)
+                self.constituents.append(constituent)
+                self.constituent_names.append(name or constituent)
+            start, _ = self._row_slices.get(etf, (position, position))
+            self._row_slices[etf] = (start, position + 1)
+            rows.append(row)
+            cols.append(self.constituent_index[constituent])
+            weights.append(weight / 100.0)
+
+        self.rows = np.array(rows, dtype=np.int64)
+        self.cols = np.array(cols, dtype=np.int64)
+        self.weights = np.array(weights, dtype=np.float64)
+
+    @classmethod
+    def load(cls) -> 'LookthroughMatrix':
+        """
+        Load the store from the database, reusing the in-process copy while the
+        tables are unchanged.
+        """
+        version = (
+            tuple(SecurityReference.objects.aggregate(count=Count('id'), latest=Max('refreshed_at')).values()) +
+            tuple(ETFConstituent.objects.aggregate(count=Count('id'), latest=Max('refreshed_at')).values())
+        )
+        with cls._cache_lock:
+            if cls._cached and cls._cached[0] == version:
+                return cls._cached[1]
+
+        references = {
+            ticker: SecurityInfo(ticker, name, sector, is_etf, weightings or {})
+            for ticker, name, sector, is_etf, weightings in SecurityReference.objects.values_list(
+                'ticker', 'name', 'sector', 'is_etf', 'sector_weightings'
+            )
+        }
+        entries = ETFConstituent.objects.order_by('etf_ticker', 'rank').values_list(
+            'etf_ticker', 'constituent_ticker', 'constituent_name', 'weight'
+        )
+        matrix = cls(references, entries)
+        logger.info(f"Loaded ETF look-through store: {len(references)} tickers, "
+                    f"{len(matrix.etf_index)} ETFs, {len(matrix.weights)} weights")
+
+        with cls._cache_lock:
+            cls._cached = (version, matrix)
+        return matrix
+
+    def reference(self, ticker: Optional[str]) -> Optional[SecurityInfo]:
+        return self.references.get((ticker or '').upper().strip())
+
+    def has_etf(self, ticker: Optional[str]) -> bool:
+        return (ticker or '').upper().strip() in self._row_slices
+
+    def holdings(self, etf_ticker: str) -> List[Dict]:
+        """Stored holdings of one ETF in rank order, shaped like FMP's get_etf_holdings."""
+        start, end = self._row_slices.get(etf_ticker.upper().strip(), (0, 0))
+        return [
+            {
+                'symbol': self.constituents[self.cols[i]],
+                'name': self.constituent_names[self.cols[i]],
+                'weight': float(self.weights[i] * 100.0),
+            }
+            for i in range(start, end)
+        ]
+
+    def lookthrough(self, etf_values: Dict[str, float]) -> Dict[str, float]:
+        """
+        Constituent exposure of a set of ETF positions (sparse matrix-vector product).
+
+        Args:
+            etf_values: ETF ticker -> market value held
+        """
+        exposure = np.bincount(self.cols, weights=self._etf_vector(etf_values)[self.rows] * self.weights,
+                               minlength=len(self.constituents))
+        return {self.constituents[i]: float(exposure[i]) for i in np.flatnonzero(exposure)}
+
+    def contributions(self, etf_values: Dict[str, float]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Per-holding exposure of a set of ETF positions.
+
+        Args:
+            etf_values: ETF ticker -> market value held
+
+        Returns:
+            (entries, values): indices into rows/cols/weights of every holding of a held
+            ETF, in etf_values order then holding rank, and the value each contributes
+        """
+        vector = self._etf_vector(etf_values)
+        order = np.full(len(self.etfs), len(etf_values))
+        for rank, etf in reversed(list(enumerate(etf_values))):
+            row = self.etf_index.get(etf.upper().strip())
+            if row is not None:
+                order[row] = rank
+        entries = np.flatnonzero(order[self.rows] < len(etf_values))
+        entries = entries[np.argsort(order[self.rows[entries]], kind='stable')]
+        return entries, vector[self.rows[entries]] * self.weights[entries]
+
+    def _etf_vector(self, etf_values: Dict[str, float]) -> np.ndarray:
+        """Market values by ETF row."""
+        vector = np.zeros(len(self.etfs))
+        for etf, value in etf_values.items():
+            row = self.etf_index.get(etf.upper().strip())
+            if row is not None:
+                vector[row] += value
+        return vector
+
+    def lookthrough_many(self, etf_matrix: np.ndarray) -> np.ndarray:
+        """
+        Constituent exposure for many portfolios at once (sparse matrix-matrix product).
+
+        Args:
+            etf_matrix: (portfolios x ETFs) market values, columns ordered by etf_index
+
+        Returns:
+            (portfolios x constituents) market values
+        """
+        exposure = np.zeros((etf_matrix.shape[0], len(self.constituents)))
+        np.add.at(exposure.T, self.cols, (etf_matrix[:, self.rows] * self.weights).T)
+        return exposure
+
+
+class ETFLookthroughService:
+    """Refresh the local look-through store from FMP."""
+
+    def __init__(self, fmp_service=None):
+        self._fmp_service = fmp_service
+
+    @property
+    def fmp_service(self):
+        if self._fmp_service is None:
+            from .fmp_equity_service import FMPEquityService
+            self._fmp_service = FMPEquityService()
+        return self._fmp_service
+
+    def get_equity_tickers(self) -> List[str]:
+        """Distinct equity tickers held in any custody, plus the benchmark ETF."""
+        tickers = Asset.objects.filter(asset_type='Equities').exclude(bank='ALT').exclude(
+            ticker=''
+        ).values_list('ticker', flat=True).distinct()
+        return sorted({ticker.upper().strip() for ticker in tickers if ticker} | {BENCHMARK_TICKER})
+
+    def refresh(self, tickers: Optional[Iterable[str]] = None) -> Dict:
+        """
+        Refresh reference data for held tickers, and holdings for every ETF among them.
+
+        Constituents of refreshed ETFs get reference rows too, so look-through never
+        needs a profile lookup at request time. Failed profile lookups are not stored:
+        the ticker keeps its previous row (or falls back to FMP at request time) and is
+        retried by the next refresh.
+        """
+        tickers = [t.upper().strip() for t in (tickers or self.get_equity_tickers()) if t]
+        stats = {'tickers': 0, 'etfs': 0, 'constituents': 0, 'unresolved': 0, 'errors': 0}
+        profiled = set()
+
+        for ticker in tickers:
+            try:
+                if self.fmp_service.is_etf(ticker):
+                    constituents = self._refresh_etf(ticker)
+                    stats['etfs'] += 1
+                    for symbol in constituents:
+                        if symbol not in profiled and symbol not in tickers:
+                            profiled.add(symbol)
+                            if self._refresh_profile(symbol):
+                                stats['constituents'] += 1
+                            else:
+                                stats['unresolved'] += 1
+                elif not self._refresh_profile(ticker):
+                    stats['unresolved'] += 1
+                    continue
+                stats['tickers'] += 1
+            except Exception as e:
+                stats['errors'] += 1
+                logger.error(f"Failed to refresh look-through data for {ticker}: {e}")
+
+        bump_generation(PORTFOLIO_DATA)
+        logger.info(f"ETF look-through store refreshed: {stats}")
+        return stats
+
+    def _refresh_profile(self, ticker: str) -> bool:
+        """Store the ticker's profile; False when FMP has none (nothing is written)."""
+        profile = self.fmp_service.get_company_profile(ticker)
+        if not profile or 'error' in profile:
+            logger.warning(f"No profile for {ticker}; it will be retried on the next refresh")
+            return False
+        SecurityReference.objects.update_or_create(
+            ticker=ticker,
+            defaults={
+                'name': profile.get('company_name', ''),
+                'sector': profile.get('sector', 'Unknown'),
+                'is_etf': False,
+                'sector_weightings': {},
+            }
+        )
+        return True
+
+    def _refresh_etf(self, ticker: str) -> List[str]:
+        holdings = (self.fmp_service.get_etf_holdings(ticker) or [])[:TOP_HOLDINGS]
+        sector_weightings = self.fmp_service.get_etf_sector_weightings(ticker) or {}
+
+        entries = {}
+        for rank, holding in enumerate(holdings):
+            symbol = (holding.get('symbol') or '').upper().strip()
+            if symbol and symbol not in entries:
+                entries[symbol] = ETFConstituent(
+                    etf_ticker=ticker,
+                    constituent_ticker=symbol,
+                    constituent_name=(holding.get('name') or symbol)[:200],
+                    weight=float(holding.get('weight') or 0),
+                    rank=rank,
+                )
+
+        with transaction.atomic():
+            SecurityReference.objects.update_or_create(
+                ticker=ticker,
+                defaults={'name': '', 'sector': 'ETF', 'is_etf': True, 'sector_weightings': sector_weightings}
+            )
+            ETFConstituent.objects.filter(etf_ticker=ticker).delete()
+            ETFConstituent.objects.bulk_create(entries.values())
+
+        return list(entries)
@@ -1,20 +1,89 @@
 """
 Excel Export Service for AurumFinance
 Generates Excel files for positions and transactions data export.
+
+Positions and transactions are exported by streaming rows straight from
+``values_list`` querysets into a constant-memory writer (XlsxWriter, CSV or
+Parquet), so an ALL-clients export never materializes model instances, a row
+list or a DataFrame.
+
+Transactions are read in keyset pages ordered by (date, id): every page is a short
+query starting after the last row of the previous one, so multi-year ranges hold no
+cursor open and deep pages cost the same as the first. Keyset paging needs a unique
+total order, so ALL-clients exports are no longer grouped by client: their rows come
+by date, like a single client's, rather than by (client, date, asset name).
+
+Exports too large to stream within a request run as background jobs (see
+ExportJobService) that write the file with write_transactions_export.
 """
 
-import pandas as pd
+import csv
+import os
+import tempfile
 import logging
-from io import BytesIO
-from decimal import Decimal
-from typing import Tuple, List, Dict, Any, Optional
-from datetime import datetime, date
+from io import StringIO
+from typing import Tuple, List, Dict, Any, Optional, Iterator, Iterable, Callable
+from datetime import datetime
 
+import xlsxwriter
 from django.db import models
+from django.db.models import Q
+from core.db_router import replica_reads
 from ..models import Position, Transaction, PortfolioSnapshot, Client
 
 logger = logging.getLogger(__name__)
 
+# (column name, value kind) - kind drives the Parquet schema
+POSITION_COLUMNS = [
+    ('bank', 'str'), ('client', 'str'), ('account', 'str'), ('asset_type', 'str'),
+    ('name', 'str'), ('cost_basis', 'float'), ('market_value', 'float'),
+    ('quantity', 'float'), ('price', 'float'), ('ticker', 'str'), ('cusip', 'str'),
+    ('coupon_rate', 'float'), ('maturity_date', 'str'),
+    ('unrealized_gain_dollar', 'float'), ('unrealized_gain_percent', 'float'),
+]
+
+TRANSACTION_COLUMNS = [
+    ('bank', 'str'), ('client', 'str'), ('account', 'str'), ('date', 'str'),
+    ('transaction_type', 'str'), ('cusip', 'str'), ('quantity', 'float'),
+    ('price', 'float'), ('amount', 'float'),
+]
+
+EXPORT_CONTENT_TYPES = {
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+STREAM_CHUNK_ROWS = 2000          # rows fetched per database round trip
+FILE_CHUNK_BYTES = 64 * 1024      # bytes per streamed response chunk
+MAX_COLUMN_WIDTH = 30
+
+
+class TemporaryFileStream:
+    """
+    Iterates a temporary file in fixed-size chunks and deletes it on close.
+    Django's StreamingHttpResponse calls close() even when the client disconnects early.
+    """
+    
+    def __init__(self, path: str, chunk_size: int = FILE_CHUNK_BYTES):
+        self.path = path
+        self.chunk_size = chunk_size
+    
+    def __iter__(self):
+        try:
+            with open(self.path, 'rb') as export_file:
+                while True:
+                    chunk = export_file.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    yield chunk
+        finally:
+            self.close()
+    
+    def close(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
 
 class ExcelExportService:
     """Service for exporting portfolio data to Excel files."""
@@ -33,221 +102,361 @@ class ExcelExportService:
         Returns:
             Tuple of (excel_bytes, filename)
         """
+        chunks, filename, _ = self.stream_positions_export(client_code, snapshot_date, 'xlsx')
+        excel_bytes = b''.join(chunks)
+        self.logger.info(f"Generated Excel file: {filename} ({len(excel_bytes)} bytes)")
+        return excel_bytes, filename
+    
+    def export_transactions_excel(self, client_code: str, start_date: str, end_date: str) -> Tuple[bytes, str]:
+        """
+        Export transactions data to Excel format.
+        
+        Args:
+            client_code: Client code ('ALL' for all clients, or specific code like 'BK')
+            start_date: Start date in 'YYYY-MM-DD' format
+            end_date: End date in 'YYYY-MM-DD' format
+            
+        Returns:
+            Tuple of (excel_bytes, filename)
+        """
+        chunks, filename, _ = self.stream_transactions_export(client_code, start_date, end_date, 'xlsx')
+        excel_bytes = b''.join(chunks)
+        self.logger.info(f"Generated Excel file: {filename} ({len(excel_bytes)} bytes)")
+        return excel_bytes, filename
+    
+    @replica_reads
+    def stream_positions_export(self, client_code: str, snapshot_date: str,
+                                export_format: str = 'xlsx') -> Tuple[Iterator[bytes], str, str]:
+        """
+        Export positions as a stream of bytes chunks.
+        
+        Args:
+            client_code: Client code ('ALL' for all clients, or specific code like 'BK')
+            snapshot_date: Snapshot date in 'YYYY-MM-DD' format
+            export_format: 'xlsx', 'csv' or 'parquet'
+            
+        Returns:
+            Tuple of (chunk_iterator, filename, content_type)
+        """
         try:
-            self.logger.info(f"Starting positions export for client={client_code}, date={snapshot_date}")
+            self.logger.info(f"Starting positions export for client={client_code}, date={snapshot_date}, format={export_format}")
+            content_type = self._content_type(export_format)
             
             # Parse snapshot date
             snapshot_date_obj = datetime.strptime(snapshot_date, '%Y-%m-%d').date()
             
             # Build query based on client selection
+            positions = Position.objects.filter(snapshot__snapshot_date=snapshot_date_obj)
             if client_code == "ALL":
-                positions = Position.objects.filter(
-                    snapshot__snapshot_date=snapshot_date_obj
-                ).select_related('asset', 'snapshot__client').order_by('snapshot__client__code', 'asset__name')
-                self.logger.info(f"Querying positions for ALL clients on {snapshot_date}")
+                positions = positions.order_by('snapshot__client__code', 'asset__name')
             else:
-                positions = Position.objects.filter(
-                    snapshot__snapshot_date=snapshot_date_obj,
-                    snapshot__client__code=client_code
-                ).select_related('asset', 'snapshot__client').order_by('asset__name')
-                self.logger.info(f"Querying positions for client {client_code} on {snapshot_date}")
+                positions = positions.filter(snapshot__client__code=client_code).order_by('asset__name')
             
+            # Bind the database now; rows are read lazily after this call returns
+            positions = positions.using(positions.db)
             if not positions.exists():
                 raise ValueError(f"No positions found for client={client_code} on date={snapshot_date}")
             
-            # Build export data
-            export_data = []
-            for position in positions:
-                # Calculate unrealized gain
-                unrealized_gain_dollar = float(position.market_value - position.cost_basis)
-                
-                if position.cost_basis > 0:
-                    unrealized_gain_percent = (unrealized_gain_dollar / float(position.cost_basis)) * 100
-                else:
-                    unrealized_gain_percent = 0.0
-                
-                # Format maturity date if exists
-                maturity_date_str = position.asset.maturity_date.strftime('%d/%m/%Y') if position.asset.maturity_date else None
-                
-                row_data = {
-                    'bank': position.bank or '',
-                    'client': position.snapshot.client.code,
-                    'account': position.account or '',
-                    'asset_type': position.asset.asset_type or '',
-                    'name': position.asset.name or '',
-                    'cost_basis': float(position.cost_basis),
-                    'market_value': float(position.market_value),
-                    'quantity': float(position.quantity),
-                    'price': float(position.price),
-                    'ticker': position.asset.ticker or '',
-                    'cusip': position.asset.cusip or '',
-                    'coupon_rate': float(position.asset.coupon_rate) if position.asset.coupon_rate else None,
-                    'maturity_date': maturity_date_str,
-                    'unrealized_gain_dollar': unrealized_gain_dollar,
-                    'unrealized_gain_percent': unrealized_gain_percent
-                }
-                export_data.append(row_data)
-            
-            self.logger.info(f"Processed {len(export_data)} positions for export")
-            
-            # Create DataFrame with specific column order
-            columns_order = [
-                'bank', 'client', 'account', 'asset_type', 'name', 'cost_basis', 
-                'market_value', 'quantity', 'price', 'ticker', 'cusip', 
-                'coupon_rate', 'maturity_date', 'unrealized_gain_dollar', 'unrealized_gain_percent'
-            ]
-            
-            df = pd.DataFrame(export_data, columns=columns_order)
-            
-            # Generate filename
             date_formatted = snapshot_date_obj.strftime('%d_%m_%Y')
-            filename = f"positions_{date_formatted}_{client_code}.xlsx"
-            
-            # Create Excel file in memory
-            excel_buffer = BytesIO()
-            with pd.ExcelWriter(excel_buffer, engine='openpyxl') as writer:
-                df.to_excel(writer, sheet_name='Positions', index=False)
-                
-                # Get the workbook and worksheet for basic formatting
-                workbook = writer.book
-                worksheet = writer.sheets['Positions']
-                
-                # Apply basic formatting (headers bold)
-                from openpyxl.styles import Font
-                header_font = Font(bold=True)
-                for cell in worksheet[1]:  # First row (headers)
-                    cell.font = header_font
-                
-                # Auto-adjust column widths
-                for column in worksheet.columns:
-                    max_length = 0
-                    column_letter = column[0].column_letter
-                    for cell in column:
-                        try:
-                            if len(str(cell.value)) > max_length:
-                                max_length = len(str(cell.value))
-                        except:
-                            pass
-                    adjusted_width = min(max_length + 2, 30)  # Cap at 30 characters
-                    worksheet.column_dimensions[column_letter].width = adjusted_width
-            
-            excel_bytes = excel_buffer.getvalue()
-            self.logger.info(f"Generated Excel file: {filename} ({len(excel_bytes)} bytes)")
+            filename = f"positions_{date_formatted}_{client_code}.{export_format}"
             
-            return excel_bytes, filename
+            rows = self._iter_position_rows(positions)
+            chunks = self._stream_rows(rows, POSITION_COLUMNS, 'Positions', export_format)
+            return chunks, filename, content_type
             
         except Exception as e:
             self.logger.error(f"Error exporting positions: {e}")
             raise
     
-    def export_transactions_excel(self, client_code: str, start_date: str, end_date: str) -> Tuple[bytes, str]:
+    @replica_reads
+    def stream_transactions_export(self, client_code: str, start_date: str, end_date: str,
+                                   export_format: str = 'xlsx') -> Tuple[Iterator[bytes], str, str]:
         """
-        Export transactions data to Excel format.
+        Export transactions as a stream of bytes chunks.
         
         Args:
             client_code: Client code ('ALL' for all clients, or specific code like 'BK')
             start_date: Start date in 'YYYY-MM-DD' format
             end_date: End date in 'YYYY-MM-DD' format
+            export_format: 'xlsx', 'csv' or 'parquet'
             
         Returns:
-            Tuple of (excel_bytes, filename)
+            Tuple of (chunk_iterator, filename, content_type)
         """
         try:
-            self.logger.info(f"Starting transactions export for client={client_code}, date_range={start_date} to {end_date}")
-            
-            # Parse dates
-            start_date_obj = datetime.strptime(start_date, '%Y-%m-%d').date()
-            end_date_obj = datetime.strptime(end_date, '%Y-%m-%d').date()
-            
-            # Build query based on client selection
-            if client_code == "ALL":
-                transactions = Transaction.objects.filter(
-                    date__gte=start_date_obj,
-                    date__lte=end_date_obj
-                ).select_related('asset', 'client').order_by('client__code', 'date', 'asset__name')
-                self.logger.info(f"Querying transactions for ALL clients from {start_date} to {end_date}")
-            else:
-                transactions = Transaction.objects.filter(
-                    date__gte=start_date_obj,
-                    date__lte=end_date_obj,
-                    client__code=client_code
-                ).select_related('asset', 'client').order_by('date', 'asset__name')
-                self.logger.info(f"Querying transactions for client {client_code} from {start_date} to {end_date}")
+            self.logger.info(f"Starting transactions export for client={client_code}, date_range={start_date} to {end_date}, format={export_format}")
+            content_type = self._content_type(export_format)
+            transactions, filename = self.transactions_export_query(client_code, start_date, end_date, export_format)
             
             if not transactions.exists():
                 raise ValueError(f"No transactions found for client={client_code} in date range {start_date} to {end_date}")
             
-            # Build export data
-            export_data = []
-            for transaction in transactions:
-                # Format date
-                date_formatted = transaction.date.strftime('%d/%m/%Y')
-                
-                row_data = {
-                    'bank': transaction.bank or '',
-                    'client': transaction.client.code,
-                    'account': transaction.account or '',
-                    'date': date_formatted,
-                    'transaction_type': transaction.transaction_type or '',
-                    'cusip': transaction.asset.cusip if transaction.asset else '',
-                    'quantity': float(transaction.quantity) if transaction.quantity else 0.0,
-                    'price': float(transaction.price) if transaction.price else 0.0,
-                    'amount': float(transaction.amount)
-                }
-                export_data.append(row_data)
+            rows = self._iter_transaction_rows(transactions)
+            chunks = self._stream_rows(rows, TRANSACTION_COLUMNS, 'Transactions', export_format)
+            return chunks, filename, content_type
             
-            self.logger.info(f"Processed {len(export_data)} transactions for export")
+        except Exception as e:
+            self.logger.error(f"Error exporting transactions: {e}")
+            raise
+    
+    @replica_reads
+    def write_transactions_export(self, client_code: str, start_date: str, end_date: str,
+                                  export_format: str = 'xlsx',
+                                  progress: Optional[Callable[[int], None]] = None,
+                                  directory: Optional[str] = None,
+                                  prefix: str = 'aurum_export_') -> Tuple[str, str, int]:
+        """
+        Write a transactions export to a temporary file (for background jobs).
+        
+        Args:
+            client_code: Client code ('ALL' for all clients, or specific code like 'BK')
+            start_date: Start date in 'YYYY-MM-DD' format
+            end_date: End date in 'YYYY-MM-DD' format
+            export_format: 'xlsx', 'csv' or 'parquet'
+            progress: Called with the number of rows read after every page
+            directory: Where the file is written (default: the system temp directory)
+            prefix: File name prefix, so the owner can find files of interrupted runs
             
-            # Create DataFrame with specific column order
-            columns_order = [
-                'bank', 'client', 'account', 'date', 'transaction_type', 
-                'cusip', 'quantity', 'price', 'amount'
+        Returns:
+            Tuple of (file_path, filename, row_count); the caller owns the file
+        """
+        self._content_type(export_format)
+        transactions, filename = self.transactions_export_query(client_code, start_date, end_date, export_format)
+        
+        row_count = 0
+        
+        def count_rows(rows_read: int):
+            nonlocal row_count
+            row_count = rows_read
+            if progress:
+                progress(rows_read)
+        
+        rows = self._iter_transaction_rows(transactions, progress=count_rows)
+        if export_format == 'csv':
+            path = self._write_csv_file(rows, TRANSACTION_COLUMNS, directory, prefix)
+        elif export_format == 'parquet':
+            path = self._write_parquet_file(rows, TRANSACTION_COLUMNS, directory, prefix)
+        else:
+            path = self._write_xlsx_file(rows, TRANSACTION_COLUMNS, 'Transactions', directory, prefix)
+        return path, filename, row_count
+    
+    def transactions_export_query(self, client_code: str, start_date: str, end_date: str,
+                                  export_format: str = 'xlsx') -> Tuple[models.QuerySet, str]:
+        """
+        Transactions selected by a client/date-range export and the export's filename.
+        
+        Raises:
+            ValueError: If a date is not in 'YYYY-MM-DD' format
+        """
+        start_date_obj = datetime.strptime(start_date, '%Y-%m-%d').date()
+        end_date_obj = datetime.strptime(end_date, '%Y-%m-%d').date()
+        
+        # Build query based on client selection
+        transactions = Transaction.objects.filter(date__gte=start_date_obj, date__lte=end_date_obj)
+        if client_code != "ALL":
+            transactions = transactions.filter(client__code=client_code)
+        
+        # Bind the database now; rows are read lazily after this call returns
+        transactions = transactions.using(transactions.db)
+        
+        start_formatted = start_date_obj.strftime('%d_%m_%Y')
+        end_formatted = end_date_obj.strftime('%d_%m_%Y')
+        filename = f"transactions_{start_formatted}-{end_formatted}_{client_code}.{export_format}"
+        return transactions, filename
+    
+    def _iter_position_rows(self, positions) -> Iterator[list]:
+        """Yield export rows (POSITION_COLUMNS order) without instantiating models."""
+        values = positions.values_list(
+            'bank', 'snapshot__client__code', 'account', 'asset__asset_type', 'asset__name',
+            'cost_basis', 'market_value', 'quantity', 'price', 'asset__ticker', 'asset__cusip',
+            'asset__coupon_rate', 'asset__maturity_date'
+        ).iterator(chunk_size=STREAM_CHUNK_ROWS)
+        
+        for (bank, client, account, asset_type, name, cost_basis, market_value,
+             quantity, price, ticker, cusip, coupon_rate, maturity_date) in values:
+            cost_basis = float(cost_basis)
+            market_value = float(market_value)
+            unrealized_gain_dollar = market_value - cost_basis
+            unrealized_gain_percent = (unrealized_gain_dollar / cost_basis) * 100 if cost_basis > 0 else 0.0
+            
+            yield [
+                bank or '', client, account or '', asset_type or '', name or '',
+                cost_basis, market_value, float(quantity), float(price),
+                ticker or '', cusip or '',
+                float(coupon_rate) if coupon_rate else None,
+                maturity_date.strftime('%d/%m/%Y') if maturity_date else None,
+                unrealized_gain_dollar, unrealized_gain_percent
             ]
+    
+    def _iter_transaction_rows(self, transactions, progress: Optional[Callable[[int], None]] = None,
+                               page_size: int = STREAM_CHUNK_ROWS) -> Iterator[list]:
+        """Yield export rows (TRANSACTION_COLUMNS order) in (date, id) order without instantiating models."""
+        values = self._iter_keyset_pages(transactions, (
+            'bank', 'client__code', 'account', 'date', 'transaction_type',
+            'asset__cusip', 'quantity', 'price', 'amount'
+        ), progress, page_size)
+        
+        for bank, client, account, txn_date, transaction_type, cusip, quantity, price, amount in values:
+            yield [
+                bank or '', client, account or '', txn_date.strftime('%d/%m/%Y'),
+                transaction_type or '', cusip or '',
+                float(quantity) if quantity else 0.0,
+                float(price) if price else 0.0,
+                float(amount)
+            ]
+    
+    def _iter_keyset_pages(self, transactions, fields: Tuple[str, ...],
+                           progress: Optional[Callable[[int], None]] = None,
+                           page_size: int = STREAM_CHUNK_ROWS) -> Iterator[tuple]:
+        """
+        Yield values_list rows of a transactions queryset in (date, id) order, one
+        query per page of page_size rows, each starting after the previous page's last key.
+        """
+        last_key = None
+        rows_read = 0
+        while True:
+            page = transactions
+            if last_key is not None:
+                last_date, last_id = last_key
+                page = page.filter(Q(date__gt=last_date) | Q(date=last_date, id__gt=last_id))
+            rows = list(page.order_by('date', 'id').values_list('date', 'id', *fields)[:page_size])
+            
+            for row in rows:
+                yield row[2:]
+            rows_read += len(rows)
+            if progress:
+                progress(rows_read)
+            
+            if len(rows) < page_size:
+                return
+            last_key = rows[-1][:2]
+    
+    def _content_type(self, export_format: str) -> str:
+        if export_format not in EXPORT_CONTENT_TYPES:
+            raise ValueError(f"Unsupported export format: {export_format}")
+        return EXPORT_CONTENT_TYPES[export_format]
+    
+    def _stream_rows(self, rows: Iterable[list], columns: List[Tuple[str, str]],
+                     sheet_name: str, export_format: str) -> Iterator[bytes]:
+        """
+        Route rows to the writer for the requested format.
+        
+        CSV is generated lazily while the response is sent. XLSX and Parquet are
+        written to a temporary file first (both need a footer/directory at the end)
+        and then streamed from disk, so memory stays flat in every case.
+        """
+        if export_format == 'csv':
+            return self._iter_csv(rows, columns)
+        
+        if export_format == 'parquet':
+            path = self._write_parquet_file(rows, columns)
+        else:
+            path = self._write_xlsx_file(rows, columns, sheet_name)
+        return self._iter_file(path)
+    
+    def _iter_csv(self, rows: Iterable[list], columns: List[Tuple[str, str]]) -> Iterator[bytes]:
+        buffer = StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow([name for name, _ in columns])
+        
+        for index, row in enumerate(rows, start=1):
+            writer.writerow(row)
+            if index % STREAM_CHUNK_ROWS == 0:
+                yield buffer.getvalue().encode('utf-8')
+                buffer.seek(0)
+                buffer.truncate(0)
+        
+        if buffer.tell():
+            yield buffer.getvalue().encode('utf-8')
+    
+    def _write_csv_file(self, rows: Iterable[list], columns: List[Tuple[str, str]],
+                        directory: Optional[str] = None, prefix: str = 'aurum_export_') -> str:
+        """Write rows as CSV to a temporary file."""
+        handle, path = tempfile.mkstemp(suffix='.csv', prefix=prefix, dir=directory)
+        os.close(handle)
+        
+        try:
+            with open(path, 'wb') as export_file:
+                for chunk in self._iter_csv(rows, columns):
+                    export_file.write(chunk)
+            return path
             
-            df = pd.DataFrame(export_data, columns=columns_order)
-            
-            # Generate filename
-            start_formatted = start_date_obj.strftime('%d_%m_%Y')
-            end_formatted = end_date_obj.strftime('%d_%m_%Y')
-            filename = f"transactions_{start_formatted}-{end_formatted}_{client_code}.xlsx"
-            
-            # Create Excel file in memory
-            excel_buffer = BytesIO()
-            with pd.ExcelWriter(excel_buffer, engine='openpyxl') as writer:
-                df.to_excel(writer, sheet_name='Transactions', index=False)
-                
-                # Get the workbook and worksheet for basic formatting
-                workbook = writer.book
-                worksheet = writer.sheets['Transactions']
-                
-                # Apply basic formatting (headers bold)
-                from openpyxl.styles import Font
-                header_font = Font(bold=True)
-                for cell in worksheet[1]:  # First row (headers)
-                    cell.font = header_font
-                
-                # Auto-adjust column widths
-                for column in worksheet.columns:
-                    max_length = 0
-                    column_letter = column[0].column_letter
-                    for cell in column:
-                        try:
-                            if len(str(cell.value)) > max_length:
-                                max_length = len(str(cell.value))
-                        except:
-                            pass
-                    adjusted_width = min(max_length + 2, 30)  # Cap at 30 characters
-                    worksheet.column_dimensions[column_letter].width = adjusted_width
-            
-            excel_bytes = excel_buffer.getvalue()
-            self.logger.info(f"Generated Excel file: {filename} ({len(excel_bytes)} bytes)")
-            
-            return excel_bytes, filename
-            
-        except Exception as e:
-            self.logger.error(f"Error exporting transactions: {e}")
+        except Exception:
+            os.unlink(path)
             raise
     
+    def _write_xlsx_file(self, rows: Iterable[list], columns: List[Tuple[str, str]], sheet_name: str,
+                         directory: Optional[str] = None, prefix: str = 'aurum_export_') -> str:
+        """Write rows with XlsxWriter in constant-memory mode; widths come from running maxima."""
+        handle, path = tempfile.mkstemp(suffix='.xlsx', prefix=prefix, dir=directory)
+        os.close(handle)
+        
+        try:
+            workbook = xlsxwriter.Workbook(path, {'constant_memory': True})
+            worksheet = workbook.add_worksheet(sheet_name)
+            header_format = workbook.add_format({'bold': True})
+            
+            headers = [name for name, _ in columns]
+            widths = [len(header) for header in headers]
+            worksheet.write_row(0, 0, headers, header_format)
+            
+            row_count = 0
+            for row_index, row in enumerate(rows, start=1):
+                worksheet.write_row(row_index, 0, row)
+                for col_index, value in enumerate(row):
+                    if value is not None:
+                        length = len(str(value))
+                        if length > widths[col_index]:
+                            widths[col_index] = length
+                row_count = row_index
+            
+            # Column widths may be set after the rows in constant_memory mode
+            for col_index, width in enumerate(widths):
+                worksheet.set_column(col_index, col_index, min(width + 2, MAX_COLUMN_WIDTH))
+            
+            workbook.close()
+            self.logger.info(f"Wrote {row_count} rows to {sheet_name} export ({os.path.getsize(path)} bytes)")
+            return path
+            
+        except Exception:
+            os.unlink(path)
+            raise
+    
+    def _write_parquet_file(self, rows: Iterable[list], columns: List[Tuple[str, str]],
+                            directory: Optional[str] = None, prefix: str = 'aurum_export_') -> str:
+        """Write rows as Parquet row groups of STREAM_CHUNK_ROWS (requires pyarrow)."""
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("Parquet export requires the pyarrow package")
+        
+        schema = pa.schema([
+            (name, pa.float64() if kind == 'float' else pa.string()) for name, kind in columns
+        ])
+        handle, path = tempfile.mkstemp(suffix='.parquet', prefix=prefix, dir=directory)
+        os.close(handle)
+        
+        try:
+            with pq.ParquetWriter(path, schema) as writer:
+                batch = []
+                for row in rows:
+                    batch.append(row)
+                    if len(batch) == STREAM_CHUNK_ROWS:
+                        writer.write_table(pa.Table.from_arrays(list(map(list, zip(*batch))), schema=schema))
+                        batch = []
+                if batch:
+                    writer.write_table(pa.Table.from_arrays(list(map(list, zip(*batch))), schema=schema))
+            return path
+            
+        except Exception:
+            os.unlink(path)
+            raise
+    
+    def _iter_file(self, path: str) -> Iterator[bytes]:
+        """Stream a temporary export file; it is removed once sent or when the response is closed."""
+        return TemporaryFileStream(path)
+    
     def get_available_export_dates(self) -> Dict[str, Any]:
         """
         Get available dates for export functionality.
@@ -286,7 +495,7 @@ class ExcelExportService:
             ]
             
             return {
-                'snapshot_dates': [date.strftime('%Y-%m-%d') for date in snapshot_dates],
+                'snapshot_dates': [snapshot_date.strftime('%Y-%m-%d') for snapshot_date in snapshot_dates],
                 'transaction_date_range': {
                     'min_date': transaction_dates['min_date'].strftime('%Y-%m-%d') if transaction_dates['min_date'] else None,
                     'max_date': transaction_dates['max_date'].strftime('%Y-%m-%d') if transaction_dates['max_date'] else None
@@ -314,6 +523,8 @@ class ExcelExportService:
             self.logger.info(f"Starting monthly returns export for client={client_code}, year={year}, month={month}")
             
             # Get monthly returns data using the same logic as the report generation
+            import pandas as pd
+            from io import BytesIO
             from .custody_returns_service import CustodyReturnsService
             
             custody_service = CustodyReturnsService()
@@ -0,0 +1,214 @@
+"""
+Export Job Service
+Runs large transaction exports in the background and keeps their files for download.
+
+A multi-year ALL-clients export can take longer than a request should stay open, so
+exports above BACKGROUND_ROWS rows (or any export asked for with background=true)
+become an ExportJob:
+
+1. the request creates the job and returns its status URL (202)
+2. a worker thread writes the file with ExcelExportService.write_transactions_export,
+   reading keyset pages and recording rows_written after each page
+3. the completed file is renamed in EXPORT_DIR and served by the download endpoint
+
+Worker threads die with their process (e.g. a gunicorn worker restart), so PENDING or
+RUNNING jobs older than STALE_JOB_MINUTES are marked ERROR and their partial files
+removed; this runs when jobs are created and when their status is read. Files and
+finished jobs older than RETENTION_HOURS are removed when new jobs are created.
+Configured by EXPORT_SETTINGS.
+"""
+
+import logging
+import shutil
+import threading
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from ..models import ExportJob
+from .excel_export_service import ExcelExportService
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    'EXPORT_DIR': None,           # Default: MEDIA_ROOT/exports
+    'BACKGROUND_ROWS': 100000,    # Larger exports run as background jobs
+    'RETENTION_HOURS': 24,
+    'STALE_JOB_MINUTES': 120,     # Unfinished jobs older than this lost their worker
+    'RUN_IN_THREAD': True,        # False runs jobs inline (tests, management commands)
+}
+
+
+def get_settings() -> Dict:
+    config = {**DEFAULT_SETTINGS, **getattr(settings, 'EXPORT_SETTINGS', {})}
+    config['EXPORT_DIR'] = Path(config['EXPORT_DIR'] or Path(settings.MEDIA_ROOT) / 'exports')
+    return config
+
+
+class ExportJobService:
+    """Creates, runs and reports background transaction exports."""
+
+    def __init__(self, export_service: Optional[ExcelExportService] = None):
+        self.export_service = export_service or ExcelExportService()
+        self.config = get_settings()
+
+    def count_transactions(self, client_code: str, start_date: str, end_date: str) -> int:
+        """Rows a transactions export would write."""
+        transactions, _ = self.export_service.transactions_export_query(client_code, start_date, end_date)
+        return transactions.order_by().count()
+
+    def should_run_in_background(self, total_rows: int) -> bool:
+        """Whether an export of total_rows rows is larger than BACKGROUND_ROWS."""
+        return total_rows > self.config['BACKGROUND_ROWS']
+
+    def create_transactions_job(self, client_code: str, start_date: str, end_date: str,
+                                export_format: str = 'xlsx', user=None,
+                                total_rows: Optional[int] = None) -> ExportJob:
+        """
+        Create and start a transactions export job.
+
+        Args:
+            total_rows: The selection's row count when the caller already counted it
+
+        Raises:
+            ValueError: For an unsupported format, a malformed date or an empty selection
+        """
+        self.export_service._content_type(export_format)
+        transactions, filename = self.export_service.transactions_export_query(
+            client_code, start_date, end_date, export_format
+        )
+        if total_rows is None:
+            total_rows = transactions.order_by().count()
+        if not total_rows:
+            raise ValueError(f"No transactions found for client={client_code} in date range {start_date} to {end_date}")
+
+        self.purge_expired()
+        job = ExportJob.objects.create(
+            export_type='transactions', client_code=client_code, start_date=date.fromisoformat(start_date),
+            end_date=date.fromisoformat(end_date), export_format=export_format, filename=filename,
+            total_rows=total_rows, requested_by=user if user and user.is_authenticated else None
+        )
+        logger.info(f"Created export job {job.job_id}: {total_rows} transactions for {client_code}")
+        self.start(job)
+        job.refresh_from_db()
+        return job
+
+    def start(self, job: ExportJob):
+        """Run the job in a worker thread once the job row is committed (inline if RUN_IN_THREAD is off)."""
+        if not self.config['RUN_IN_THREAD']:
+            self.run(job.job_id)
+            return
+
+        def launch():
+            threading.Thread(target=self._run_in_thread, args=(job.job_id,), daemon=True,
+                             name=f'export-{job.job_id}').start()
+        transaction.on_commit(launch)
+
+    def _run_in_thread(self, job_id):
+        try:
+            self.run(job_id)
+        finally:
+            # The worker thread's own database connection
+            connection.close()
+
+    def run(self, job_id) -> ExportJob:
+        """Write the job's export file, recording progress, the result or the error."""
+        job = ExportJob.objects.get(job_id=job_id)
+        jobs = ExportJob.objects.filter(pk=job.pk)
+        jobs.update(status='RUNNING', started_at=timezone.now())
+
+        try:
+            # Written under the job's prefix so the files of a lost worker can be found
+            export_dir = self.config['EXPORT_DIR']
+            export_dir.mkdir(parents=True, exist_ok=True)
+            path, filename, row_count = self.export_service.write_transactions_export(
+                job.client_code, job.start_date.isoformat(), job.end_date.isoformat(), job.export_format,
+                progress=lambda rows: jobs.update(rows_written=rows),
+                directory=str(export_dir), prefix=f"{job.job_id}_tmp_"
+            )
+
+            destination = export_dir / f"{job.job_id}_{filename}"
+            shutil.move(path, destination)
+
+            # A job marked stale in the meantime stays failed
+            completed = jobs.filter(status='RUNNING').update(
+                status='COMPLETED', rows_written=row_count, filename=filename,
+                file_path=str(destination), file_size=destination.stat().st_size,
+                completed_at=timezone.now()
+            )
+            if completed:
+                logger.info(f"Export job {job.job_id} completed: {row_count} rows in {destination.name}")
+            else:
+                destination.unlink()
+                logger.warning(f"Export job {job.job_id} finished after it was marked stale; file discarded")
+        except Exception as e:
+            logger.error(f"Export job {job.job_id} failed: {e}")
+            jobs.update(status='ERROR', error_message=str(e), completed_at=timezone.now())
+
+        job.refresh_from_db()
+        return job
+
+    def describe(self, job: ExportJob) -> Dict:
+        """Job status for the API."""
+        return {
+            'job_id': str(job.job_id),
+            'export_type': job.export_type,
+            'client_code': job.client_code,
+            'start_date': job.start_date.isoformat(),
+            'end_date': job.end_date.isoformat(),
+            'format': job.export_format,
+            'status': job.status,
+            'total_rows': job.total_rows,
+            'rows_written': job.rows_written,
+            'progress': round(job.rows_written / job.total_rows * 100, 1) if job.total_rows else 0.0,
+            'filename': job.filename,
+            'file_size': job.file_size,
+            'error': job.error_message or None,
+            'created_at': job.created_at.isoformat(),
+            'completed_at': job.completed_at.isoformat() if job.completed_at else None,
+        }
+
+    def _remove_job_files(self, job_ids) -> None:
+        """Delete the export and partial files of jobs (all are prefixed with the job id)."""
+        export_dir = self.config['EXPORT_DIR']
+        for job_id in job_ids:
+            for file_path in export_dir.glob(f"{job_id}_*"):
+                file_path.unlink(missing_ok=True)
+
+    def _stale_cutoff(self):
+        return timezone.now() - timedelta(minutes=self.config['STALE_JOB_MINUTES'])
+
+    def is_stale(self, job: ExportJob) -> bool:
+        """Whether an unfinished job is older than STALE_JOB_MINUTES (its worker is gone)."""
+        return job.status in ('PENDING', 'RUNNING') and job.created_at < self._stale_cutoff()
+
+    def fail_stale(self, jobs=None) -> int:
+        """Mark PENDING/RUNNING jobs (of the jobs queryset, default all) older than STALE_JOB_MINUTES as ERROR."""
+        jobs = ExportJob.objects.all() if jobs is None else jobs
+        stale = jobs.filter(status__in=['PENDING', 'RUNNING'], created_at__lt=self._stale_cutoff())
+        job_ids = list(stale.values_list('job_id', flat=True))
+        if not job_ids:
+            return 0
+        failed = ExportJob.objects.filter(job_id__in=job_ids, status__in=['PENDING', 'RUNNING']).update(
+            status='ERROR', completed_at=timezone.now(),
+            error_message=f"Export did not finish within {self.config['STALE_JOB_MINUTES']} minutes "
+                          f"(its worker was stopped)"
+        )
+        self._remove_job_files(job_ids)
+        logger.warning(f"Marked {failed} stale export jobs as failed")
+        return failed
+
+    def purge_expired(self) -> int:
+        """Fail stale jobs, then delete finished jobs older than RETENTION_HOURS together with their files."""
+        self.fail_stale()
+        cutoff = timezone.now() - timedelta(hours=self.config['RETENTION_HOURS'])
+        expired = ExportJob.objects.filter(created_at__lt=cutoff).exclude(status__in=['PENDING', 'RUNNING'])
+        self._remove_job_files(expired.values_list('job_id', flat=True))
+        deleted, _ = expired.delete()
+        if deleted:
+            logger.info(f"Purged {deleted} expired export jobs")
+        return deleted
@@ -0,0 +1,202 @@
+"""
+File Catalog Service
+Keeps the BankFile catalog of bank files on disk - uploads, organized input files and
+preprocessing outputs - so the polled status and date endpoints query one table
+instead of globbing every bank directory.
+
+The catalog is updated where files are written (upload organization, promotion,
+preprocessing). reconcile() - also run by manage.py reconcile_file_catalog - re-scans
+the trees and repairs drift, hashing only new or changed files.
+"""
+
+import hashlib
+import logging
+from datetime import datetime, timezone as dt_timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Union
+
+from django.conf import settings
+from django.db import transaction
+
+from ..models import BankFile
+from ..preprocessing.bank_detector import BankDetector
+
+logger = logging.getLogger(__name__)
+
+INPUT_DIR = Path('data/excel/input_files')
+OUTPUT_DIR = Path('data/excel')
+
+STAGES = ('upload', 'input', 'output')
+FILE_TYPES = ('securities', 'transactions', 'unitcost', 'cashmovements')
+HASH_CHUNK_SIZE = 1024 * 1024
+
+PathLike = Union[str, Path]
+
+
+def upload_dir() -> Path:
+    return Path(settings.BASE_DIR) / 'aurum_backend' / 'uploads'
+
+
+def file_type_for(filename: str) -> str:
+    """securities/transactions/unitcost/cashmovements from the filename, '' otherwise."""
+    filename = filename.lower()
+    for file_type in FILE_TYPES:
+        if file_type in filename:
+            return file_type
+    return ''
+
+
+def content_hash(path: PathLike) -> str:
+    """SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _mtime(stat) -> datetime:
+    return datetime.fromtimestamp(stat.st_mtime, tz=dt_timezone.utc)
+
+
+class FileCatalogService:
+    """Records, reconciles and queries the bank file catalog."""
+
+    # Directories of each stage
+
+    def stage_directories(self, stage: str) -> List[Path]:
+        """Directories scanned for a stage (the trees the endpoints used to glob)."""
+        if stage == 'output':
+            return [OUTPUT_DIR]
+        root = INPUT_DIR if stage == 'input' else upload_dir()
+        if not root.exists():
+            return []
+        directories = [root]
+        for bank_dir in sorted(d for d in root.iterdir() if d.is_dir()):
+            directories.append(bank_dir)
+            for subdir in sorted(d for d in bank_dir.iterdir() if d.is_dir()):
+                # Input keeps nested files only in nonenriched_* upload folders;
+                # uploads nest by DD_MM_YYYY/<bank>
+                if stage == 'upload' or subdir.name.startswith('nonenriched_'):
+                    directories.append(subdir)
+        return directories
+
+    def stage_files(self, stage: str) -> Dict[str, Path]:
+        """Files of a stage currently on disk, by path."""
+        patterns = ('*.xlsx', '*.xls') if stage == 'upload' else ('*.xlsx',)
+        files = {}
+        for directory in self.stage_directories(stage):
+            if not directory.exists():
+                continue
+            for pattern in patterns:
+                for path in directory.glob(pattern):
+                    if path.is_file():
+                        files[str(path)] = path
+        return files
+
+    # Updates
+
+    def record(self, path: PathLike, stage: str, digest: Optional[str] = None) -> BankFile:
+        """
+        Add or refresh one file's catalog entry.
+
+        Args:
+            path: File on disk
+            stage: 'upload', 'input' or 'output'
+            digest: Content hash when already known (computed otherwise)
+        """
+        path = Path(path)
+        stat = path.stat()
+        entry, _ = BankFile.objects.update_or_create(
+            path=str(path),
+            defaults={
+                'directory': str(path.parent),
+                'filename': path.name,
+                'bank': BankDetector.detect_bank(path.name) or '',
+                'file_date': BankDetector.extract_date_from_filename(path.name) or '',
+                'file_type': file_type_for(path.name),
+                'size': stat.st_size,
+                'mtime': _mtime(stat),
+                'content_hash': digest or content_hash(path),
+                'stage': stage,
+            }
+        )
+        return entry
+
+    def record_many(self, paths: Iterable[PathLike], stage: str) -> int:
+        """Record several files in one transaction."""
+        count = 0
+        with transaction.atomic():
+            for path in paths:
+                self.record(path, stage)
+                count += 1
+        return count
+
+    def remove(self, path: PathLike) -> None:
+        BankFile.objects.filter(path=str(Path(path))).delete()
+
+    def reconcile(self, stages: Optional[Iterable[str]] = None, dry_run: bool = False) -> Dict[str, int]:
+        """
+        Bring the catalog in line with the disk: add new files, refresh changed ones
+        (size or mtime) and drop missing ones. Each stage is updated in one transaction.
+
+        Returns:
+            Counts of added, updated, removed and unchanged files
+        """
+        stats = {'added': 0, 'updated': 0, 'removed': 0, 'unchanged': 0}
+        for stage in stages or STAGES:
+            on_disk = self.stage_files(stage)
+            catalog = {entry.path: entry for entry in BankFile.objects.filter(stage=stage)}
+
+            added = [path for path in on_disk if path not in catalog]
+            removed = [path for path in catalog if path not in on_disk]
+            updated = []
+            for path, entry in catalog.items():
+                if path in on_disk:
+                    stat = on_disk[path].stat()
+                    if entry.size != stat.st_size or entry.mtime != _mtime(stat):
+                        updated.append(path)
+
+            stats['added'] += len(added)
+            stats['updated'] += len(updated)
+            stats['removed'] += len(removed)
+            stats['unchanged'] += len(on_disk) - len(added) - len(updated)
+
+            if dry_run or not (added or updated or removed):
+                continue
+            with transaction.atomic():
+                BankFile.objects.filter(stage=stage, path__in=removed).delete()
+                for path in added + updated:
+                    self.record(on_disk[path], stage)
+            logger.info(f"File catalog {stage}: {len(added)} added, {len(updated)} updated, {len(removed)} removed")
+        return stats
+
+    def ensure_populated(self) -> None:
+        """Build the catalog from disk the first time it is queried."""
+        if not BankFile.objects.exists():
+            self.reconcile()
+
+    # Queries
+
+    def files(self, stage: str, directories: Optional[Iterable[PathLike]] = None):
+        """Catalog entries of a stage, optionally limited to some directories."""
+        self.ensure_populated()
+        entries = BankFile.objects.filter(stage=stage)
+        if directories is not None:
+            entries = entries.filter(directory__in=[str(Path(d)) for d in directories])
+        return entries
+
+    def file_names(self, directory: PathLike) -> Set[str]:
+        """Names of the .xlsx files cataloged in a directory."""
+        self.ensure_populated()
+        return set(BankFile.objects.filter(directory=str(Path(directory)), filename__endswith='.xlsx')
+                   .values_list('filename', flat=True))
+
+    def processed_dates(self) -> Set[str]:
+        """Dates with both a combined securities and transactions output file."""
+        dates = {'securities': set(), 'transactions': set()}
+        for filename, file_date in self.files('output').values_list('filename', 'file_date'):
+            for file_type in dates:
+                if file_date and filename.startswith(f"{file_type}_"):
+                    dates[file_type].add(file_date)
+        return dates['securities'] & dates['transactions']
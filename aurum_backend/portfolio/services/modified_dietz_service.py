@@ -11,6 +11,7 @@ from datetime import datetime, date, timedelta
 from typing import Dict, List, Optional, Any, Union, Tuple
 from django.db.models import Sum, Q
 from ..models import Position, Transaction
+from ..utils.dietz_cache import dietz_result_cache
 
 logger = logging.getLogger(__name__)
 
@@ -21,8 +22,14 @@ class ModifiedDietzService:
     Ported from ProjectAurum with identical calculation logic.
     """
     
-    def __init__(self):
-        """Initialize Modified Dietz calculator."""
+    def __init__(self, use_cache: bool = True):
+        """
+        Initialize Modified Dietz calculator.
+        
+        Args:
+            use_cache: Serve repeated (client, start, end) results from the Dietz result cache
+        """
+        self.use_cache = use_cache
         logger.debug("ModifiedDietzService initialized")
     
     def _calculate_alt_position_adjustments(self, transactions: List[Transaction], 
@@ -92,103 +99,7 @@ class ModifiedDietzService:
         Returns:
             Float: Return percentage (Modified Dietz return)
         """
-        try:
-            # Convert string dates to date objects
-            if isinstance(start_date, str):
-                start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
-            elif isinstance(start_date, datetime):
-                start_date = start_date.date()
-                
-            if isinstance(end_date, str):
-                end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
-            elif isinstance(end_date, datetime):
-                end_date = end_date.date()
-            
-            # Get period length in days
-            period_days = (end_date - start_date).days
-            if period_days <= 0:
-                logger.warning(f"Invalid period: {start_date} to {end_date}")
-                return 0.0
-            
-            # Get portfolio values at start and end
-            start_value = self._get_portfolio_value_on_date(client, start_date)
-            end_value = self._get_portfolio_value_on_date(client, end_date)
-            
-            # Get transactions during the period
-            transactions = self._get_transactions_for_period(client, start_date, end_date)
-            
-            # Calculate cash flows using our cash flow service
-            from .cash_flow_service import CashFlowService
-            cash_flow_service = CashFlowService()
-            
-            net_external_flows = 0.0
-            weighted_external_flows = 0.0
-            external_flow_count = 0
-            
-            logger.debug(f"Calculating Modified Dietz return for client {client}: {start_date} to {end_date} ({period_days} days)")
-            logger.debug(f"Start value: ${start_value:,.2f}, End value: ${end_value:,.2f}")
-            
-            # No ALT adjustments needed since ALT transactions are excluded
-            alt_purchase_adjustment, alt_sale_adjustment = 0.0, 0.0
-            adjusted_end_value = end_value
-            
-            if alt_purchase_adjustment > 0 or alt_sale_adjustment > 0:
-                logger.info(f"ALT adjustments applied: Purchase adj: -${alt_purchase_adjustment:,.2f}, "
-                           f"Sale adj: +${alt_sale_adjustment:,.2f}")
-                logger.info(f"End value adjusted: ${end_value:,.2f} → ${adjusted_end_value:,.2f}")
-            
-            # Process each transaction
-            for tx in transactions:
-                # Check if it's an external cash flow
-                if cash_flow_service.is_external_cash_flow(tx):
-                    cf_amount = cash_flow_service.get_cash_flow_amount(tx)
-                    
-                    # Calculate time weight: (Days remaining after cash flow) / (Total period days)
-                    tx_date = tx.date
-                    if isinstance(tx_date, datetime):
-                        tx_date = tx_date.date()
-                    
-                    days_from_start = (tx_date - start_date).days
-                    weight = (period_days - days_from_start) / period_days
-                    
-                    # Accumulate cash flows
-                    net_external_flows += cf_amount
-                    weighted_external_flows += cf_amount * weight
-                    external_flow_count += 1
-                    
-                    logger.debug(f"External flow: {tx.transaction_type} "
-                               f"${cf_amount:,.2f} on {tx_date} (weight: {weight:.4f})")
-            
-            # Calculate Modified Dietz return using correct formula with ALT adjustments
-            gain_or_loss = adjusted_end_value - start_value - net_external_flows
-            average_capital = start_value + weighted_external_flows
-            
-            logger.debug(f"External flows summary: {external_flow_count} flows, "
-                        f"Net: ${net_external_flows:,.2f}, Weighted: ${weighted_external_flows:,.2f}")
-            logger.debug(f"Gain/Loss: ${gain_or_loss:,.2f}, Average Capital: ${average_capital:,.2f}")
-            
-            if alt_purchase_adjustment > 0 or alt_sale_adjustment > 0:
-                logger.debug(f"ALT adjustments summary: Purchase: -${alt_purchase_adjustment:,.2f}, "
-                           f"Sale: +${alt_sale_adjustment:,.2f}, Net effect: ${alt_sale_adjustment - alt_purchase_adjustment:,.2f}")
-            
-            # Handle edge cases
-            if average_capital == 0:
-                logger.warning("Average capital is zero - cannot calculate return")
-                return 0.0
-                
-            if abs(average_capital) < 0.01:  # Very small average capital
-                logger.warning(f"Very small average capital: ${average_capital:.2f} - return may be unreliable")
-            
-            # Calculate return as percentage
-            return_percentage = (gain_or_loss / average_capital) * 100
-            
-            logger.debug(f"Modified Dietz return: {return_percentage:.4f}%")
-            
-            return return_percentage
-            
-        except Exception as e:
-            logger.error(f"Error calculating Modified Dietz return for {client}: {str(e)}")
-            return 0.0
+        return self.calculate_portfolio_return_detailed(client, start_date, end_date)['return_percentage']
     
     def calculate_portfolio_return_detailed(self, client: str, start_date: Union[str, date], 
                                           end_date: Union[str, date]) -> Dict[str, Any]:
@@ -204,77 +115,20 @@ class ModifiedDietzService:
             Dict with detailed return calculation breakdown
         """
         try:
-            # Convert dates
-            if isinstance(start_date, str):
-                start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
-            elif isinstance(start_date, datetime):
-                start_date = start_date.date()
+            start_date = self._to_date(start_date)
+            end_date = self._to_date(end_date)
+            
+            def compute():
+                # Get values and transactions during the period
+                start_value = self._get_portfolio_value_on_date(client, start_date)
+                end_value = self._get_portfolio_value_on_date(client, end_date)
+                transactions = self._get_transactions_for_period(client, start_date, end_date)
                 
-            if isinstance(end_date, str):
-                end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
-            elif isinstance(end_date, datetime):
-                end_date = end_date.date()
-            
-            period_days = (end_date - start_date).days
-            
-            # Get values
-            start_value = self._get_portfolio_value_on_date(client, start_date)
-            end_value = self._get_portfolio_value_on_date(client, end_date)
-            
-            # Calculate return
-            return_percentage = self.calculate_return(client, start_date, end_date)
-            
-            # Get detailed cash flow breakdown
-            transactions = self._get_transactions_for_period(client, start_date, end_date)
-            
-            from .cash_flow_service import CashFlowService
-            cash_flow_service = CashFlowService()
-            
-            net_external_flows = 0.0
-            weighted_external_flows = 0.0
-            external_flow_count = 0
-            
-            # No ALT adjustments needed since ALT transactions are excluded
-            alt_purchase_adjustment, alt_sale_adjustment = 0.0, 0.0
-            
-            for tx in transactions:
-                if cash_flow_service.is_external_cash_flow(tx):
-                    cf_amount = cash_flow_service.get_cash_flow_amount(tx)
-                    
-                    tx_date = tx.date
-                    if isinstance(tx_date, datetime):
-                        tx_date = tx_date.date()
-                    
-                    days_from_start = (tx_date - start_date).days
-                    weight = (period_days - days_from_start) / period_days if period_days > 0 else 0
-                    
-                    net_external_flows += cf_amount
-                    weighted_external_flows += cf_amount * weight
-                    external_flow_count += 1
+                return self.calculate_return_from_data(
+                    client, start_date, end_date, start_value, end_value, transactions
+                )
             
-            # Apply ALT adjustments to end value
-            adjusted_end_value = end_value - alt_purchase_adjustment + alt_sale_adjustment
-            
-            gain_loss = adjusted_end_value - start_value - net_external_flows
-            average_capital = start_value + weighted_external_flows
-            
-            return {
-                'client': client,
-                'start_date': start_date.strftime('%Y-%m-%d'),
-                'end_date': end_date.strftime('%Y-%m-%d'),
-                'period_days': period_days,
-                'start_value': start_value,
-                'end_value': end_value,
-                'adjusted_end_value': adjusted_end_value,
-                'return_percentage': return_percentage,
-                'gain_loss': gain_loss,
-                'net_external_flows': net_external_flows,
-                'weighted_external_flows': weighted_external_flows,
-                'average_capital': average_capital,
-                'external_flow_count': external_flow_count,
-                'alt_purchase_adjustment': alt_purchase_adjustment,
-                'alt_sale_adjustment': alt_sale_adjustment
-            }
+            return self.cached(client, start_date, end_date, compute)
             
         except Exception as e:
             logger.error(f"Error calculating detailed portfolio return for {client}: {str(e)}")
@@ -284,6 +138,120 @@ class ModifiedDietzService:
                 'error': str(e)
             }
     
+    def cached(self, client: str, start_date: date, end_date: date, compute) -> Dict[str, Any]:
+        """Result of compute() for the period, through the Dietz result cache when enabled."""
+        if not self.use_cache:
+            return compute()
+        return dietz_result_cache.get_or_compute(client, start_date, end_date, compute)
+    
+    def calculate_return_from_data(self, client: str, start_date: date, end_date: date,
+                                   start_value: float, end_value: float,
+                                   transactions: List[Transaction]) -> Dict[str, Any]:
+        """
+        Modified Dietz breakdown from already loaded inputs (no queries).
+        
+        Used directly by callers that load values and transactions for many periods
+        at once, such as the weekly report.
+        
+        Args:
+            client: Client code
+            start_date: Start date of the period
+            end_date: End date of the period
+            start_value: NON-ALT portfolio value on start_date
+            end_value: NON-ALT portfolio value on end_date
+            transactions: NON-ALT transactions dated start_date..end_date (inclusive)
+        
+        Returns:
+            Dict with detailed return calculation breakdown
+        """
+        period_days = (end_date - start_date).days
+        
+        # Calculate cash flows using our cash flow service
+        from .cash_flow_service import CashFlowService
+        cash_flow_service = CashFlowService()
+        
+        net_external_flows = 0.0
+        weighted_external_flows = 0.0
+        external_flow_count = 0
+        
+        logger.debug(f"Calculating Modified Dietz return for client {client}: {start_date} to {end_date} ({period_days} days)")
+        logger.debug(f"Start value: ${start_value:,.2f}, End value: ${end_value:,.2f}")
+        
+        # No ALT adjustments needed since ALT transactions are excluded
+        alt_purchase_adjustment, alt_sale_adjustment = 0.0, 0.0
+        
+        # Process each transaction
+        for tx in transactions:
+            # Check if it's an external cash flow
+            if cash_flow_service.is_external_cash_flow(tx):
+                cf_amount = cash_flow_service.get_cash_flow_amount(tx)
+                
+                # Calculate time weight: (Days remaining after cash flow) / (Total period days)
+                tx_date = tx.date
+                if isinstance(tx_date, datetime):
+                    tx_date = tx_date.date()
+                
+                days_from_start = (tx_date - start_date).days
+                weight = (period_days - days_from_start) / period_days if period_days > 0 else 0
+                
+                # Accumulate cash flows
+                net_external_flows += cf_amount
+                weighted_external_flows += cf_amount * weight
+                external_flow_count += 1
+                
+                logger.debug(f"External flow: {tx.transaction_type} "
+                           f"${cf_amount:,.2f} on {tx_date} (weight: {weight:.4f})")
+        
+        # Apply ALT adjustments to end value
+        adjusted_end_value = end_value - alt_purchase_adjustment + alt_sale_adjustment
+        
+        gain_loss = adjusted_end_value - start_value - net_external_flows
+        average_capital = start_value + weighted_external_flows
+        
+        logger.debug(f"External flows summary: {external_flow_count} flows, "
+                    f"Net: ${net_external_flows:,.2f}, Weighted: ${weighted_external_flows:,.2f}")
+        logger.debug(f"Gain/Loss: ${gain_loss:,.2f}, Average Capital: ${average_capital:,.2f}")
+        
+        # Handle edge cases
+        if period_days <= 0:
+            logger.warning(f"Invalid period: {start_date} to {end_date}")
+            return_percentage = 0.0
+        elif average_capital == 0:
+            logger.warning("Average capital is zero - cannot calculate return")
+            return_percentage = 0.0
+        else:
+            if abs(average_capital) < 0.01:  # Very small average capital
+                logger.warning(f"Very small average capital: ${average_capital:.2f} - return may be unreliable")
+            return_percentage = (gain_loss / average_capital) * 100
+            logger.debug(f"Modified Dietz return: {return_percentage:.4f}%")
+        
+        return {
+            'client': client,
+            'start_date': start_date.strftime('%Y-%m-%d'),
+            'end_date': end_date.strftime('%Y-%m-%d'),
+            'period_days': period_days,
+            'start_value': start_value,
+            'end_value': end_value,
+            'adjusted_end_value': adjusted_end_value,
+            'return_percentage': return_percentage,
+            'gain_loss': gain_loss,
+            'net_external_flows': net_external_flows,
+            'weighted_external_flows': weighted_external_flows,
+            'average_capital': average_capital,
+            'external_flow_count': external_flow_count,
+            'alt_purchase_adjustment': alt_purchase_adjustment,
+            'alt_sale_adjustment': alt_sale_adjustment
+        }
+    
+    @staticmethod
+    def _to_date(value: Union[str, date, datetime]) -> date:
+        """Convert string (YYYY-MM-DD) and datetime inputs to a date."""
+        if isinstance(value, str):
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        if isinstance(value, datetime):
+            return value.date()
+        return value
+    
     def _get_portfolio_value_on_date(self, client: str, target_date: date) -> float:
         """
         Get total NON-ALT portfolio value for a client on a specific date.
@@ -299,7 +267,7 @@ class ModifiedDietzService:
             total_value = Position.objects.filter(
                 snapshot__client__code=client,
                 snapshot__snapshot_date=target_date
-            ).exclude(asset__bank='ALT').aggregate(total=Sum('market_value'))['total']
+            ).exclude_alt().aggregate(total=Sum('market_value'))['total']
             
             return float(total_value) if total_value else 0.0
             
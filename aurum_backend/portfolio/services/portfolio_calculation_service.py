@@ -3,16 +3,24 @@ Pure Django Portfolio Calculation Service
 Implements ProjectAurum calculations using only Django models.
 """
 
-from django.db.models import Sum, F, Q
+from django.db import transaction
+from django.db.models import F, Q
 from ..models import Client, PortfolioSnapshot, Position, Transaction
-from decimal import Decimal, ROUND_HALF_UP
+from decimal import ROUND_HALF_UP
 import logging
+import numpy as np
 from datetime import datetime, timedelta, date
 from typing import Dict, List, Optional
 from .modified_dietz_service import ModifiedDietzService
+from .portfolio_evolution_service import PortfolioEvolutionService
+from .position_frame import PositionFrame
+from .snapshot_diff_service import SnapshotDiffService
+from ..utils.response_cache import bump_generation, PORTFOLIO_DATA
 
 logger = logging.getLogger(__name__)
 
+MATURITY_PERIODS = ('1 Year', '2 Years', '3 Years', '4 Years', '5 Years', '6+ Years')
+
 class PortfolioCalculationService:
     """Pure Django service for portfolio calculations."""
     
@@ -33,7 +41,7 @@ class PortfolioCalculationService:
         snapshot = PortfolioSnapshot.objects.get(client=client, snapshot_date=snapshot_date)
         
         # Get positions and transactions (EXCLUDE ALT for presentation)
-        positions = Position.objects.filter(snapshot=snapshot).exclude(asset__bank='ALT').select_related('asset')
+        positions = Position.objects.filter(snapshot=snapshot).exclude_alt().select_related('asset')
         transactions = Transaction.objects.filter(client=client, date__lte=snapshot_date).exclude(bank='ALT')
         
         # Calculate core metrics
@@ -43,35 +51,38 @@ class PortfolioCalculationService:
             'calculation_timestamp': datetime.now().isoformat()
         }
         
+        # One columnar pass over the positions feeds every allocation below
+        frame = PositionFrame.from_queryset(positions)
+
         # Basic portfolio values
-        metrics.update(self._calculate_basic_metrics(positions))
+        metrics.update(self._calculate_basic_metrics(frame))
         
         # Asset allocation
-        metrics['asset_allocation'] = self._calculate_asset_allocation(positions, metrics['total_value'])
+        metrics['asset_allocation'] = self._calculate_asset_allocation(frame, metrics['total_value'])
         
         # Custody allocation
-        metrics['custody_allocation'] = self._calculate_custody_allocation(positions, metrics['total_value'])
+        metrics['custody_allocation'] = self._calculate_custody_allocation(frame, metrics['total_value'])
         
         # Bank allocation
-        metrics['bank_allocation'] = self._calculate_bank_allocation(positions, metrics['total_value'])
+        metrics['bank_allocation'] = self._calculate_bank_allocation(frame, metrics['total_value'])
         
         # Bond maturity distribution
-        metrics['bond_maturity_distribution'] = self._calculate_bond_maturity_distribution(positions, metrics['total_value'])
+        metrics['bond_maturity_distribution'] = self._calculate_bond_maturity_distribution(frame, metrics['total_value'])
         
         # Annual income calculations
-        metrics['estimated_annual_income'] = self._calculate_annual_income(positions)
+        metrics['estimated_annual_income'] = self._calculate_annual_income(frame)
         
         # Modified Dietz calculations
-        metrics.update(self._calculate_modified_dietz_returns(client, snapshot_date, positions, transactions))
+        metrics.update(self._calculate_modified_dietz_returns(client, snapshot_date, frame, transactions))
         
         # Top movers (requires comparison with previous period)
         metrics['top_movers'] = self._calculate_top_movers(client, snapshot_date, positions)
         
         # Bond maturity timeline
-        metrics['bond_maturity'] = self._calculate_bond_maturity(positions)
+        metrics['bond_maturity'] = self._calculate_bond_maturity(frame)
         
         # Position details for reports
-        metrics['positions_by_type'] = self._group_positions_by_type(positions)
+        metrics['positions_by_type'] = self._group_positions_by_type(frame)
         
         # Recent transactions
         metrics['recent_transactions'] = self._get_recent_transactions(transactions)
@@ -82,157 +93,80 @@ class PortfolioCalculationService:
         # Update snapshot with calculated metrics
         snapshot.portfolio_metrics = metrics
         snapshot.save()
-        
+
+        # Keep the pre-computed evolution series in step with the snapshot
+        try:
+            PortfolioEvolutionService().record_client_value(
+                client_code, snapshot.snapshot_date, metrics['total_value']
+            )
+        except Exception as e:
+            logger.warning(f"Could not update evolution series for {client_code}: {e}")
+
+        # After the caller's transaction (e.g. integrate_single_date) commits the new metrics
+        transaction.on_commit(lambda: bump_generation(PORTFOLIO_DATA))
+
         logger.info(f"Calculated metrics for {client_code}: ${metrics['total_value']:,.2f} total value")
         return metrics
     
-    def _calculate_basic_metrics(self, positions) -> dict:
+    def _calculate_basic_metrics(self, frame: PositionFrame) -> dict:
         """Calculate basic portfolio metrics."""
-        total_value = positions.aggregate(total=Sum('market_value'))['total'] or Decimal('0')
-        total_cost_basis = positions.aggregate(total=Sum('cost_basis'))['total'] or Decimal('0')
+        total_value = frame.total_value
+        total_cost_basis = frame.total_cost_basis
         
         unrealized_gain_loss = total_value - total_cost_basis
         unrealized_gain_loss_pct = 0
         if total_cost_basis > 0:
-            unrealized_gain_loss_pct = float((unrealized_gain_loss / total_cost_basis) * 100)
+            unrealized_gain_loss_pct = (unrealized_gain_loss / total_cost_basis) * 100
         
         return {
-            'total_value': float(total_value),
-            'total_cost_basis': float(total_cost_basis),
-            'unrealized_gain_loss': float(unrealized_gain_loss),
+            'total_value': total_value,
+            'total_cost_basis': total_cost_basis,
+            'unrealized_gain_loss': unrealized_gain_loss,
             'unrealized_gain_loss_pct': unrealized_gain_loss_pct,
-            'position_count': positions.count()
+            'position_count': len(frame)
+        }
+    
+    def _allocation(self, sums: Dict[str, float], total_value: float) -> dict:
+        """Value and percentage of total value per group."""
+        return {
+            key: {'value': value, 'percentage': (value / total_value) * 100 if total_value > 0 else 0}
+            for key, value in sums.items()
         }
     
-    def _calculate_asset_allocation(self, positions, total_value: float) -> dict:
+    def _calculate_asset_allocation(self, frame: PositionFrame, total_value: float) -> dict:
         """Calculate asset allocation by asset type."""
-        allocation = {}
-        
-        for position in positions:
-            asset_type = position.asset.asset_type
-            if asset_type not in allocation:
-                allocation[asset_type] = {'value': Decimal('0'), 'percentage': 0}
-            allocation[asset_type]['value'] += position.market_value
-        
-        # Calculate percentages
-        for asset_type in allocation:
-            if total_value > 0:
-                allocation[asset_type]['percentage'] = float(
-                    (allocation[asset_type]['value'] / Decimal(str(total_value))) * 100
-                )
-            allocation[asset_type]['value'] = float(allocation[asset_type]['value'])
-        
-        return allocation
+        return self._allocation(frame.sum_by_asset_type(), total_value)
     
-    def _calculate_custody_allocation(self, positions, total_value: float) -> dict:
+    def _calculate_custody_allocation(self, frame: PositionFrame, total_value: float) -> dict:
         """Calculate custody allocation by bank + account."""
-        allocation = {}
-        
-        for position in positions:
-            custody = f"{position.bank} {position.account}".strip()
-            if custody not in allocation:
-                allocation[custody] = {'value': Decimal('0'), 'percentage': 0}
-            allocation[custody]['value'] += position.market_value
-        
-        # Calculate percentages
-        for custody in allocation:
-            if total_value > 0:
-                allocation[custody]['percentage'] = float(
-                    (allocation[custody]['value'] / Decimal(str(total_value))) * 100
-                )
-            allocation[custody]['value'] = float(allocation[custody]['value'])
-        
-        return allocation
+        return self._allocation(frame.sum_by(frame.custody_labels()), total_value)
     
-    def _calculate_bank_allocation(self, positions, total_value: float) -> dict:
+    def _calculate_bank_allocation(self, frame: PositionFrame, total_value: float) -> dict:
         """Calculate bank allocation by bank field."""
-        allocation = {}
-        
-        for position in positions:
-            bank_name = position.bank
-            if bank_name not in allocation:
-                allocation[bank_name] = {'value': Decimal('0'), 'percentage': 0}
-            allocation[bank_name]['value'] += position.market_value
-        
-        # Calculate percentages
-        for bank_name in allocation:
-            if total_value > 0:
-                allocation[bank_name]['percentage'] = float(
-                    (allocation[bank_name]['value'] / Decimal(str(total_value))) * 100
-                )
-            allocation[bank_name]['value'] = float(allocation[bank_name]['value'])
-        
-        return allocation
+        return self._allocation(frame.sum_by_bank(), total_value)
     
-    def _calculate_bond_maturity_distribution(self, positions, total_value: float) -> dict:
+    def _calculate_bond_maturity_distribution(self, frame: PositionFrame, total_value: float) -> dict:
         """Calculate bond maturity distribution by maturity periods (1Y, 2Y, etc.)."""
-        from datetime import date
-        
-        allocation = {
-            '1 Year': {'value': Decimal('0'), 'percentage': 0},
-            '2 Years': {'value': Decimal('0'), 'percentage': 0}, 
-            '3 Years': {'value': Decimal('0'), 'percentage': 0},
-            '4 Years': {'value': Decimal('0'), 'percentage': 0},
-            '5 Years': {'value': Decimal('0'), 'percentage': 0},
-            '6+ Years': {'value': Decimal('0'), 'percentage': 0}
-        }
-        
-        today = date.today()
-        bond_positions = positions.filter(
-            asset__asset_type='Fixed Income',
-            asset__maturity_date__isnull=False
-        )
-        
-        for position in bond_positions:
-            days_to_maturity = (position.asset.maturity_date - today).days
-            face_value = position.quantity  # Use face value like bond maturity report
-            
-            if days_to_maturity <= 365:
-                period = '1 Year'
-            elif days_to_maturity <= 730:
-                period = '2 Years'
-            elif days_to_maturity <= 1095:
-                period = '3 Years'
-            elif days_to_maturity <= 1460:
-                period = '4 Years'
-            elif days_to_maturity <= 1825:
-                period = '5 Years'
-            else:
-                period = '6+ Years'
-                
-            allocation[period]['value'] += face_value
-        
-        # Calculate percentages
-        total_bonds_value = sum(d['value'] for d in allocation.values())
-        if total_bonds_value > 0:
-            for period in allocation:
-                allocation[period]['percentage'] = float(
-                    (allocation[period]['value'] / total_bonds_value) * 100
-                )
-                allocation[period]['value'] = float(allocation[period]['value'])
-        else:
-            # If no bonds, convert Decimal to float for JSON serialization
-            for period in allocation:
-                allocation[period]['value'] = float(allocation[period]['value'])
+        # Face value (quantity) like the bond maturity report, bucketed by days to maturity
+        buckets = frame.maturity_buckets()
+        total_bonds_value = float(buckets.sum())
         
+        allocation = {}
+        for period, value in zip(MATURITY_PERIODS, buckets):
+            allocation[period] = {
+                'value': float(value),
+                'percentage': float(value / total_bonds_value * 100) if total_bonds_value > 0 else 0
+            }
         return allocation
     
-    def _calculate_annual_income(self, positions) -> float:
+    def _calculate_annual_income(self, frame: PositionFrame) -> float:
         """Calculate estimated annual income (coupon_rate * quantity)."""
-        annual_income = Decimal('0')
-        
-        for position in positions:
-            if position.coupon_rate and position.quantity:
-                # All coupon rates are stored as percentages, always divide by 100
-                # This matches the Position model calculation logic
-                coupon_rate = Decimal(str(position.coupon_rate)) / 100
-                position_income = coupon_rate * position.quantity
-                annual_income += position_income
-        
-        return float(annual_income)
+        # All coupon rates are stored as percentages, always divide by 100
+        # This matches the Position model calculation logic
+        return frame.coupon_income()
     
     def _calculate_modified_dietz_returns(self, client: Client, snapshot_date: str, 
-                                        positions, transactions) -> dict:
+                                        frame: PositionFrame, transactions) -> dict:
         """
         Calculate Modified Dietz returns (excludes external cash flows).
         
@@ -255,7 +189,7 @@ class PortfolioCalculationService:
             }
         
         # Current values
-        current_value = sum(float(p.market_value) for p in positions)
+        current_value = frame.total_value
         previous_value = previous_snapshot.portfolio_metrics.get('total_value', 0)
         
         # Calculate period cash flows (simplified - excludes external flows)
@@ -316,55 +250,34 @@ class PortfolioCalculationService:
         if not previous_snapshot:
             return {'gainers': [], 'losers': []}
         
-        # Get previous positions
-        previous_positions = Position.objects.filter(
-            snapshot__client=client,
-            snapshot__snapshot_date=previous_snapshot.snapshot_date
-        ).exclude(asset__bank='ALT').select_related('asset')
+        # Compare with the previous snapshot, matched on asset (custody-aware)
+        diff = SnapshotDiffService().diff(client.code, previous_snapshot.snapshot_date, snapshot_date)
         
-        # Create lookup for previous values
-        previous_values = {pos.asset.ticker: float(pos.market_value) for pos in previous_positions}
-        
-        # Calculate changes
         movers = []
-        for position in positions:
-            ticker = position.asset.ticker
-            current_value = float(position.market_value)
-            previous_value = previous_values.get(ticker, 0)
-            
-            if previous_value > 0:
-                dollar_change = current_value - previous_value
-                percent_change = (dollar_change / previous_value) * 100
-                
-                movers.append({
-                    'ticker': ticker,
-                    'name': position.asset.name,
-                    'asset_type': position.asset.asset_type,
-                    'dollar_change': dollar_change,
-                    'percent_change': percent_change,
-                    'current_value': current_value,
-                    'previous_value': previous_value
-                })
-        
-        # Sort by absolute dollar change
-        movers.sort(key=lambda x: abs(x['dollar_change']), reverse=True)
-        
-        # Get top 5 gainers and losers
+        percent_changes = diff.pct_change
+        for i in diff.ranked(diff.in2 & (diff.value1 > 0)):
+            movers.append({
+                'ticker': diff.tickers[i],
+                'name': diff.names[i],
+                'asset_type': diff.asset_types[i],
+                'dollar_change': float(diff.value_delta[i]),
+                'percent_change': float(percent_changes[i]),
+                'current_value': float(diff.value2[i]),
+                'previous_value': float(diff.value1[i])
+            })
+        
+        # Movers are ranked by absolute dollar change; take top 5 gainers and losers
         gainers = [m for m in movers if m['dollar_change'] > 0][:5]
         losers = [m for m in movers if m['dollar_change'] < 0][:5]
         
         return {'gainers': gainers, 'losers': losers}
     
-    def _calculate_bond_maturity(self, positions) -> dict:
+    def _calculate_bond_maturity(self, frame: PositionFrame) -> dict:
         """Calculate bond maturity timeline."""
-        bonds = positions.filter(
-            asset__asset_type='Fixed Income',
-            asset__maturity_date__isnull=False
-        )
-        
         maturity_data = {}
-        for bond in bonds:
-            year = bond.asset.maturity_date.year
+        years = frame.maturity_years()
+        for i in np.flatnonzero(frame.bonds()):
+            year = int(years[i])
             if year not in maturity_data:
                 maturity_data[year] = {
                     'count': 0,
@@ -373,13 +286,13 @@ class PortfolioCalculationService:
                 }
             
             maturity_data[year]['count'] += 1
-            maturity_data[year]['market_value'] += float(bond.market_value)
+            maturity_data[year]['market_value'] += float(frame.market_value[i])
             maturity_data[year]['bonds'].append({
-                'name': bond.asset.name,
-                'ticker': bond.asset.ticker,
-                'market_value': float(bond.market_value),
-                'maturity_date': bond.asset.maturity_date.isoformat(),
-                'coupon_rate': bond.coupon_rate
+                'name': frame.names[i],
+                'ticker': frame.tickers[i],
+                'market_value': float(frame.market_value[i]),
+                'maturity_date': frame.maturity_date(i).isoformat(),
+                'coupon_rate': None if np.isnan(frame.coupon_rate[i]) else float(frame.coupon_rate[i])
             })
         
         # Sort bonds within each year by market value
@@ -390,38 +303,32 @@ class PortfolioCalculationService:
         
         return maturity_data
     
-    def _group_positions_by_type(self, positions) -> dict:
+    def _group_positions_by_type(self, frame: PositionFrame) -> dict:
         """Group positions by asset type for report display."""
         grouped = {}
         
-        for position in positions:
-            asset_type = position.asset.asset_type
-            if asset_type not in grouped:
-                grouped[asset_type] = []
-            
-            # Calculate annual income for this position
-            annual_income = 0
-            if position.coupon_rate and position.quantity:
-                coupon_rate = float(position.coupon_rate)
-                if coupon_rate > 1:  # Assume it's a percentage
-                    coupon_rate = coupon_rate / 100
-                annual_income = coupon_rate * float(position.quantity)
-            
-            grouped[asset_type].append({
-                'custody': f"{position.bank} {position.account}".strip(),
-                'name': position.asset.name,
-                'ticker': position.asset.ticker,
-                'quantity': float(position.quantity),
-                'market_value': float(position.market_value),
-                'cost_basis': float(position.cost_basis),
-                'unrealized_gain_loss': float(position.market_value - position.cost_basis),
-                'unrealized_gain_loss_pct': float(
-                    ((position.market_value - position.cost_basis) / position.cost_basis * 100)
-                    if position.cost_basis > 0 else 0
-                ),
-                'coupon_rate': position.coupon_rate or 0,
-                'annual_income': annual_income,
-                'maturity_date': position.asset.maturity_date.isoformat() if position.asset.maturity_date else None
+        # Annual income per position; coupons above 1 are percentages
+        coupon_rate = np.nan_to_num(frame.coupon_rate)
+        annual_income = np.where(coupon_rate > 1, coupon_rate / 100, coupon_rate) * frame.quantity
+        gain_loss = frame.market_value - frame.cost_basis
+        custody = frame.custody_labels()
+        asset_types = frame.asset_type
+        
+        for i in range(len(frame)):
+            cost_basis = frame.cost_basis[i]
+            maturity_date = frame.maturity_date(i)
+            grouped.setdefault(asset_types[i], []).append({
+                'custody': custody[i],
+                'name': frame.names[i],
+                'ticker': frame.tickers[i],
+                'quantity': float(frame.quantity[i]),
+                'market_value': float(frame.market_value[i]),
+                'cost_basis': float(cost_basis),
+                'unrealized_gain_loss': float(gain_loss[i]),
+                'unrealized_gain_loss_pct': float(gain_loss[i] / cost_basis * 100) if cost_basis > 0 else 0.0,
+                'coupon_rate': float(coupon_rate[i]),
+                'annual_income': float(annual_income[i]),
+                'maturity_date': maturity_date.isoformat() if maturity_date else None
             })
         
         return grouped
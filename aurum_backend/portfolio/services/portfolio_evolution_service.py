@@ -0,0 +1,195 @@
+"""
+Portfolio Evolution Service for Aurum Finance
+Maintains the pre-computed portfolio value series used by evolution charts.
+
+Each time a client's metrics are calculated for a date, that client's point and
+the firm-wide 'ALL' point for the same date are refreshed; deleting a snapshot
+removes its point the same way (see portfolio.signals). Charts then read the
+whole series with a single indexed query instead of loading every snapshot.
+
+As in the live aggregated chart, the firm-wide total only counts clients with at
+least MIN_CLIENT_POINTS snapshots.
+"""
+
+import logging
+from datetime import datetime, time, date
+from decimal import Decimal
+from typing import Dict, Optional, Union
+
+from django.db import transaction
+from django.db.models import Sum, Max, Count, Subquery
+
+from ..models import PortfolioEvolutionPoint
+
+logger = logging.getLogger(__name__)
+
+ALL_CLIENTS = 'ALL'
+MIN_CLIENT_POINTS = 2  # A client's history chart needs two points to have data
+
+
+class PortfolioEvolutionService:
+    """
+    Incrementally maintained portfolio value series per client and firm-wide.
+    """
+
+    def record_client_value(self, client_code: str, snapshot_date: Union[str, date],
+                            total_value: Union[float, Decimal]) -> None:
+        """
+        Store a client's total value for a date and refresh the firm-wide point.
+
+        Args:
+            client_code: Client identifier
+            snapshot_date: Snapshot date (date or YYYY-MM-DD)
+            total_value: Client portfolio total value for that date
+        """
+        snapshot_date = self._to_date(snapshot_date)
+
+        with transaction.atomic():
+            PortfolioEvolutionPoint.objects.update_or_create(
+                client_filter=client_code,
+                snapshot_date=snapshot_date,
+                defaults={'total_value': Decimal(str(total_value))}
+            )
+            self._refresh_after_change(client_code, snapshot_date)
+
+    def remove_client_value(self, client_code: str, snapshot_date: Union[str, date]) -> None:
+        """
+        Drop a client's point for a date (its snapshot was deleted) and refresh the
+        firm-wide points it fed.
+        """
+        snapshot_date = self._to_date(snapshot_date)
+
+        with transaction.atomic():
+            deleted, _ = PortfolioEvolutionPoint.objects.filter(
+                client_filter=client_code, snapshot_date=snapshot_date
+            ).delete()
+            if deleted:
+                self._refresh_after_change(client_code, snapshot_date)
+
+    def _refresh_after_change(self, client_code: str, snapshot_date: date) -> None:
+        """
+        Refresh the firm-wide points affected by a change to one client point: the
+        point's date, and every date of the client when the change moved it across
+        MIN_CLIENT_POINTS (it joins or leaves the firm-wide total).
+        """
+        dates = {snapshot_date}
+        client_dates = list(PortfolioEvolutionPoint.objects.filter(
+            client_filter=client_code
+        ).values_list('snapshot_date', flat=True))
+        if len(client_dates) in (MIN_CLIENT_POINTS - 1, MIN_CLIENT_POINTS):
+            dates.update(client_dates)
+        for changed_date in sorted(dates):
+            self.refresh_firm_total(changed_date)
+
+    def refresh_firm_total(self, snapshot_date: Union[str, date]) -> Optional[Decimal]:
+        """
+        Recompute the 'ALL' point for a date from the per-client points of clients
+        with at least MIN_CLIENT_POINTS points.
+
+        Returns:
+            The firm-wide total, or None when no such client has data for the date
+        """
+        snapshot_date = self._to_date(snapshot_date)
+
+        charted_clients = PortfolioEvolutionPoint.objects.exclude(client_filter=ALL_CLIENTS).values(
+            'client_filter'
+        ).annotate(points=Count('id')).filter(points__gte=MIN_CLIENT_POINTS).values('client_filter')
+        firm_total = PortfolioEvolutionPoint.objects.filter(
+            snapshot_date=snapshot_date, client_filter__in=Subquery(charted_clients)
+        ).aggregate(total=Sum('total_value'))['total']
+
+        if firm_total is None:
+            PortfolioEvolutionPoint.objects.filter(
+                client_filter=ALL_CLIENTS, snapshot_date=snapshot_date
+            ).delete()
+            return None
+
+        PortfolioEvolutionPoint.objects.update_or_create(
+            client_filter=ALL_CLIENTS,
+            snapshot_date=snapshot_date,
+            defaults={'total_value': firm_total}
+        )
+        return firm_total
+
+    def get_series_version(self, client_filter: str = ALL_CLIENTS) -> Dict:
+        """
+        Cheap version probe for conditional GET (no series rows are loaded).
+
+        Returns:
+            Dict with point count and last modification timestamp
+        """
+        version = PortfolioEvolutionPoint.objects.filter(
+            client_filter=client_filter
+        ).aggregate(count=Count('id'), last_updated=Max('last_updated'))
+        return {
+            'count': version['count'] or 0,
+            'last_updated': version['last_updated']
+        }
+
+    def get_series(self, client_filter: str = ALL_CLIENTS, end_date: Optional[Union[str, date]] = None) -> Dict:
+        """
+        Load the series as compact parallel arrays.
+
+        Args:
+            client_filter: Client code or 'ALL'
+            end_date: Optional inclusive upper bound
+
+        Returns:
+            Dict with 'dates' (YYYY-MM-DD), 'timestamps' (ms) and 'values' lists
+        """
+        query = PortfolioEvolutionPoint.objects.filter(client_filter=client_filter)
+        if end_date:
+            query = query.filter(snapshot_date__lte=self._to_date(end_date))
+
+        dates = []
+        timestamps = []
+        values = []
+        for snapshot_date, total_value in query.order_by('snapshot_date').values_list(
+            'snapshot_date', 'total_value'
+        ):
+            dates.append(snapshot_date.isoformat())
+            timestamps.append(int(datetime.combine(snapshot_date, time.min).timestamp() * 1000))
+            values.append(float(total_value))
+
+        return {
+            'client_filter': client_filter,
+            'dates': dates,
+            'timestamps': timestamps,
+            'values': values
+        }
+
+    def build_evolution_chart(self, client_filter: str = ALL_CLIENTS) -> Optional[Dict]:
+        """
+        Build the ApexCharts evolution payload from the pre-computed series.
+
+        Returns:
+            Chart dict in the same shape as the dashboard evolution chart,
+            or None when no points exist yet (callers fall back to live calculation)
+        """
+        series = self.get_series(client_filter)
+        values = series['values']
+        if not values:
+            return None
+
+        chart_data = [
+            {'x': timestamp, 'y': round(value, 2)}
+            for timestamp, value in zip(series['timestamps'], values)
+        ]
+
+        return {
+            'hasData': True,
+            'message': 'Total portfolio evolution across all clients' if client_filter == ALL_CLIENTS else 'Portfolio history data',
+            'series': [{'name': 'Total Portfolio Value', 'data': chart_data}],
+            'currentValue': f"${chart_data[-1]['y']:,.2f}",
+            'currentDate': series['dates'][-1],
+            'yAxisMin': min(values) * 0.95,
+            'yAxisMax': max(values) * 1.05,
+            'colors': ['#5f76a1'],
+            'gradient': {'to': '#dae1f3'}
+        }
+
+    def _to_date(self, value: Union[str, date]) -> date:
+        """Normalize YYYY-MM-DD strings to date objects."""
+        if isinstance(value, str):
+            return datetime.strptime(value, '%Y-%m-%d').date()
+        return value
@@ -6,6 +6,8 @@ No ProjectAurum imports, no SQLite, just clean Django ORM operations.
 from django.db import transaction
 from ..models import Client, Asset, Position, Transaction, PortfolioSnapshot
 from ..parsers.excel_parser import StatementParser, TransactionParser
+from ..utils.response_cache import bump_generation, PORTFOLIO_DATA
+from ..utils.dietz_cache import bump_client_data_version
 import logging
 from datetime import datetime, date
 from decimal import Decimal
@@ -15,6 +17,23 @@ logger = logging.getLogger(__name__)
 
 class PortfolioPopulationService:
     """Pure Django service for populating portfolio data from Excel files."""
+
+    # Transaction types linked to the custody's CASH asset when no security matches
+    CASH_TRANSACTION_TYPES = [
+        'Withdrawal', 'Deposit', 'Transfer', 'Wire Transfer', 'ACH',
+        'OUTGOING', 'Cash withdrawal', 'ATM Withdrawal', 'Wire Transfer Credit',
+        'ELECTRONIFIED CHECK', 'Cash Liquidation', 'BILL PMT', 'Zelle Payment',
+        'Online Transfer', 'TRANSFER ACCOUNT', 'Cross Border Credit Transfer',
+
+        # Pictet-specific (fallback when CUSIP matching fails)
+        'Purchase',                      # Security purchases
+        'Sale',                          # Security sales
+        'Redemption',                    # Fund/bond redemptions
+        'Redemption prior to maturity',  # Early bond redemptions
+        'Management fees PNAA',          # Management fees
+        'Portfolio fees',                # Administration + flat fees
+        'Interest'                       # Interest (fallback if CUSIP fails)
+    ]
     
     @transaction.atomic
     def populate_from_excel(self, securities_file: str, transactions_file: str, 
@@ -219,24 +238,7 @@ class PortfolioPopulationService:
                     transaction_type = tx.get('transaction_type', '')
                     amount = tx.get('amount', 0)
                     
-                    # Define cash transaction types
-                    cash_transaction_types = [
-                        'Withdrawal', 'Deposit', 'Transfer', 'Wire Transfer', 'ACH',
-                        'OUTGOING', 'Cash withdrawal', 'ATM Withdrawal', 'Wire Transfer Credit',
-                        'ELECTRONIFIED CHECK', 'Cash Liquidation', 'BILL PMT', 'Zelle Payment',
-                        'Online Transfer', 'TRANSFER ACCOUNT', 'Cross Border Credit Transfer',
-
-                        # Pictet-specific (fallback when CUSIP matching fails)
-                        'Purchase',                      # Security purchases
-                        'Sale',                          # Security sales
-                        'Redemption',                    # Fund/bond redemptions
-                        'Redemption prior to maturity',  # Early bond redemptions
-                        'Management fees PNAA',          # Management fees
-                        'Portfolio fees',                # Administration + flat fees
-                        'Interest'                       # Interest (fallback if CUSIP fails)
-                    ]
-                    
-                    if transaction_type in cash_transaction_types:
+                    if transaction_type in self.CASH_TRANSACTION_TYPES:
                         # Use CASH asset for cash transactions
                         asset = self._get_or_create_cash_asset(client_code, bank, account)
                         logger.info(f"Using CASH asset for transaction: {transaction_type}, Client={client_code}, Amount={amount}")
@@ -275,6 +277,12 @@ class PortfolioPopulationService:
                        f"{client_results['securities_processed']} securities, "
                        f"{client_results['transactions_processed']} transactions")
         
+        # Positions were replaced - drop cached data (responses, snapshot diffs) built from them
+        # once they are committed, so nothing rebuilt from the old rows is stored as current
+        transaction.on_commit(lambda: bump_generation(PORTFOLIO_DATA))
+        if all_clients:
+            bump_client_data_version(*sorted(all_clients))
+        
         logger.info(f"Population complete: {results}")
         return results
     
@@ -0,0 +1,248 @@
+"""
+Position Frame
+Columnar representation of a snapshot's positions for metrics, charts and reports.
+
+A frame is built from one values_list query (or from positions already loaded with
+their assets) into float64 value columns and integer-coded bank / asset type
+categories, so allocations, maturity buckets and income are numpy reductions instead
+of loops over model instances summing Decimals.
+
+Grouped sums keep the order in which each group first appears in the positions
+(id order), which is the order the dict-building loops they replace produced.
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+from django.db.models import QuerySet
+
+from ..models import Position
+
+logger = logging.getLogger(__name__)
+
+_FIELDS = ('id', 'asset_id', 'market_value', 'cost_basis', 'quantity', 'coupon_rate',
+           'estimated_annual_income', 'face_value', 'bank', 'account',
+           'asset__asset_type', 'asset__name', 'asset__ticker', 'asset__cusip',
+           'asset__maturity_date', 'asset__coupon_rate')
+
+# Upper bounds (days to maturity, inclusive) of the 1..5 year buckets; beyond is 6+
+MATURITY_BUCKET_DAYS = (365, 730, 1095, 1460, 1825)
+
+
+def _floats(rows: Sequence[tuple], column: int, missing: float = 0.0) -> np.ndarray:
+    return np.fromiter((missing if row[column] is None else float(row[column]) for row in rows),
+                       dtype=float, count=len(rows))
+
+
+def _codes(values: Sequence[str]):
+    """Integer codes and categories of a string column."""
+    categories, codes = np.unique(np.array(values, dtype=object), return_inverse=True)
+    return codes.astype(np.int64), categories
+
+
+@dataclass
+class PositionFrame:
+    """
+    One snapshot's positions as parallel arrays, in position id order.
+
+    face_value and coupon_rate are nan where the position has none; market values,
+    cost basis, quantities and estimated income are 0 where null. Maturity dates are
+    the asset's (datetime64[D], NaT when unknown).
+    """
+    position_ids: np.ndarray
+    asset_ids: np.ndarray
+    market_value: np.ndarray
+    cost_basis: np.ndarray
+    quantity: np.ndarray
+    coupon_rate: np.ndarray
+    asset_coupon_rate: np.ndarray
+    estimated_annual_income: np.ndarray
+    face_value: np.ndarray
+    bank_codes: np.ndarray
+    banks: np.ndarray
+    asset_type_codes: np.ndarray
+    asset_types: np.ndarray
+    accounts: np.ndarray
+    names: List[str]
+    tickers: List[str]
+    cusips: List[str]
+    maturity_dates: np.ndarray
+
+    # Construction
+
+    @classmethod
+    def of(cls, positions: Union['PositionFrame', QuerySet, Iterable[Position]]) -> 'PositionFrame':
+        """A frame for a frame, a Position queryset or loaded positions (with their assets)."""
+        if isinstance(positions, cls):
+            return positions
+        if isinstance(positions, QuerySet):
+            return cls.from_queryset(positions)
+        return cls.from_positions(positions)
+
+    @classmethod
+    def from_queryset(cls, positions: QuerySet) -> 'PositionFrame':
+        """Build from a Position queryset with one values_list query."""
+        return cls.from_rows(list(positions.order_by('id').values_list(*_FIELDS)))
+
+    @classmethod
+    def from_positions(cls, positions: Iterable[Position]) -> 'PositionFrame':
+        """Build from positions already loaded with select_related('asset')."""
+        return cls.from_rows([
+            (p.id, p.asset_id, p.market_value, p.cost_basis, p.quantity, p.coupon_rate,
+             p.estimated_annual_income, p.face_value, p.bank, p.account,
+             p.asset.asset_type, p.asset.name, p.asset.ticker, p.asset.cusip,
+             p.asset.maturity_date, p.asset.coupon_rate)
+            for p in positions
+        ])
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[tuple]) -> 'PositionFrame':
+        """Build from _FIELDS rows."""
+        bank_codes, banks = _codes([row[8] or '' for row in rows])
+        asset_type_codes, asset_types = _codes([row[10] or '' for row in rows])
+        return cls(
+            position_ids=np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows)),
+            asset_ids=np.fromiter((row[1] for row in rows), dtype=np.int64, count=len(rows)),
+            market_value=_floats(rows, 2),
+            cost_basis=_floats(rows, 3),
+            quantity=_floats(rows, 4),
+            coupon_rate=_floats(rows, 5, np.nan),
+            asset_coupon_rate=_floats(rows, 15, np.nan),
+            estimated_annual_income=_floats(rows, 6),
+            face_value=_floats(rows, 7, np.nan),
+            bank_codes=bank_codes,
+            banks=banks,
+            asset_type_codes=asset_type_codes,
+            asset_types=asset_types,
+            accounts=np.array([row[9] or '' for row in rows], dtype=object),
+            names=[row[11] or '' for row in rows],
+            tickers=[row[12] or '' for row in rows],
+            cusips=[row[13] or '' for row in rows],
+            maturity_dates=np.array([row[14] for row in rows], dtype='datetime64[D]'),
+        )
+
+    # Columns
+
+    def __len__(self) -> int:
+        return len(self.position_ids)
+
+    @property
+    def total_value(self) -> float:
+        return float(self.market_value.sum())
+
+    @property
+    def total_cost_basis(self) -> float:
+        return float(self.cost_basis.sum())
+
+    @property
+    def bank(self) -> np.ndarray:
+        """Bank of every position."""
+        return self.banks[self.bank_codes] if len(self) else np.array([], dtype=object)
+
+    @property
+    def asset_type(self) -> np.ndarray:
+        """Asset type of every position."""
+        return self.asset_types[self.asset_type_codes] if len(self) else np.array([], dtype=object)
+
+    def is_asset_type(self, *asset_types: str) -> np.ndarray:
+        """Mask of positions whose asset type is one of asset_types."""
+        wanted = np.flatnonzero(np.isin(self.asset_types, list(asset_types)))
+        return np.isin(self.asset_type_codes, wanted)
+
+    def bonds(self) -> np.ndarray:
+        """Mask of Fixed Income positions with a maturity date."""
+        return self.is_asset_type('Fixed Income') & ~np.isnat(self.maturity_dates)
+
+    def days_to_maturity(self, today: Optional[date] = None) -> np.ndarray:
+        """Days from today to each maturity date (NaT maturities give a meaningless value)."""
+        today = np.datetime64(today or date.today(), 'D')
+        return (self.maturity_dates - today).astype(np.int64)
+
+    def maturity_years(self) -> np.ndarray:
+        """Calendar year of each maturity date (NaT maturities give a meaningless value)."""
+        return self.maturity_dates.astype('datetime64[Y]').astype(np.int64) + 1970
+
+    def maturity_date(self, i: int) -> Optional[date]:
+        value = self.maturity_dates[i]
+        return None if np.isnat(value) else value.astype(date)
+
+    def custody_labels(self, account_first: bool = False, blank: str = '') -> np.ndarray:
+        """
+        Custody label of every position.
+
+        Args:
+            account_first: "<account> <bank>" (reports) instead of "<bank> <account>" (metrics)
+            blank: Label when both bank and account are empty
+        """
+        labels = []
+        for bank, account in zip(self.bank, self.accounts):
+            if account_first:
+                label = f"{account} {bank}" if account and bank else bank
+            else:
+                label = f"{bank} {account}".strip()
+            labels.append(label or blank)
+        return np.array(labels, dtype=object)
+
+    # Reductions
+
+    def sum_by(self, labels: np.ndarray, weights: Optional[np.ndarray] = None,
+               mask: Optional[np.ndarray] = None) -> Dict[str, float]:
+        """
+        Sum weights (default: market value) per label, in first-appearance order.
+
+        Args:
+            labels: Group label of every position (e.g. self.asset_type, custody_labels())
+            weights: Values to sum per position
+            mask: Positions to include
+        """
+        if not len(self):
+            return {}
+        codes, categories = _codes(list(labels))
+        return self._grouped_sum(codes, categories, weights, mask)
+
+    def sum_by_asset_type(self, weights: Optional[np.ndarray] = None,
+                          mask: Optional[np.ndarray] = None) -> Dict[str, float]:
+        return self._grouped_sum(self.asset_type_codes, self.asset_types, weights, mask)
+
+    def sum_by_bank(self, weights: Optional[np.ndarray] = None,
+                    mask: Optional[np.ndarray] = None) -> Dict[str, float]:
+        return self._grouped_sum(self.bank_codes, self.banks, weights, mask)
+
+    def _grouped_sum(self, codes: np.ndarray, categories: np.ndarray,
+                     weights: Optional[np.ndarray], mask: Optional[np.ndarray]) -> Dict[str, float]:
+        weights = self.market_value if weights is None else weights
+        if mask is not None:
+            positions = np.flatnonzero(mask)
+            codes, weights = codes[positions], weights[positions]
+        if not len(codes):
+            return {}
+        sums = np.bincount(codes, weights=weights, minlength=len(categories))
+        first_seen = np.full(len(categories), len(codes))
+        np.minimum.at(first_seen, codes, np.arange(len(codes)))
+        order = np.argsort(first_seen, kind='stable')[:len(np.unique(codes))]
+        return {categories[code]: float(sums[code]) for code in order}
+
+    def count_by_asset_type(self, mask: Optional[np.ndarray] = None) -> Dict[str, int]:
+        counts = self.sum_by_asset_type(np.ones(len(self)), mask)
+        return {asset_type: int(count) for asset_type, count in counts.items()}
+
+    def maturity_buckets(self, weights: Optional[np.ndarray] = None, today: Optional[date] = None,
+                         mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Sum of weights (default: quantity, i.e. face) of bonds in the 1..5 and 6+ year buckets.
+
+        Returns:
+            Six bucket totals
+        """
+        bonds = self.bonds() if mask is None else self.bonds() & mask
+        weights = self.quantity if weights is None else weights
+        buckets = np.searchsorted(MATURITY_BUCKET_DAYS, self.days_to_maturity(today)[bonds], side='left')
+        return np.bincount(buckets, weights=weights[bonds], minlength=len(MATURITY_BUCKET_DAYS) + 1)
+
+    def coupon_income(self) -> float:
+        """Estimated annual income from coupons: coupon rate (percent) / 100 * quantity."""
+        paying = ~np.isnan(self.coupon_rate) & (self.coupon_rate != 0) & (self.quantity != 0)
+        return float((self.coupon_rate[paying] / 100 * self.quantity[paying]).sum())
@@ -9,6 +9,7 @@ from typing import Dict, List, Optional, Any
 from ..preprocessing.bank_detector import BankDetector
 from ..preprocessing.preprocess import UnifiedPreprocessor
 from .alt_combination_service import AltCombinationService
+from .file_catalog_service import FileCatalogService
 
 logger = logging.getLogger(__name__)
 
@@ -171,6 +172,7 @@ class ProcessingService:
             # Use existing preprocessor logic with proper directories
             input_dir = Path("data/excel/input_files")
             output_dir = Path("data/excel")
+            self.preprocessor.file_catalog = FileCatalogService()
             result = self.preprocessor.process_all_banks(input_dir, output_dir, target_date=date)
             
             return {
@@ -211,6 +213,7 @@ class ProcessingService:
             # Step: Combine ALT files with output files if available (run regardless of process_all_banks success)
             logger.info("🔄 Checking for ALT files to combine...")
             alt_result = self._combine_alt_files(date)
+            self._refresh_file_catalog()
             
             if result['success']:
                 # Additional pipeline steps could be added here
@@ -255,6 +258,13 @@ class ProcessingService:
                 'pipeline_stage': 'preprocessing_failed'
             }
     
+    def _refresh_file_catalog(self) -> None:
+        """Catalog the input and output files written by preprocessing."""
+        try:
+            FileCatalogService().reconcile(stages=['input', 'output'])
+        except Exception as e:
+            logger.warning(f"Could not refresh file catalog (reconcile_file_catalog will repair it): {e}")
+    
     def _combine_alt_files(self, date: str) -> Dict[str, Any]:
         """
         Combine ALT files with output files after bank processing.
@@ -0,0 +1,232 @@
+"""
+Report Data Context
+Everything a weekly report reads from the database, loaded once and shared by all of
+EnhancedReportService's section builders.
+
+Each part is loaded lazily with a single query:
+- the client's snapshot series (also resolves the current and comparison snapshots)
+- ALT-excluded positions of the current and comparison snapshots, with their assets
+  (and a columnar PositionFrame of them for allocations and totals)
+- NON-ALT portfolio value of every snapshot (Modified Dietz start/end values)
+- transactions from the first snapshot up to the report date; period tables,
+  investment cash flows and Modified Dietz flows are all slices of it
+
+Modified Dietz results and snapshot metrics are memoized on the context, so a report
+costs the same handful of queries however long the client's history is.
+"""
+
+import bisect
+import logging
+from datetime import date, datetime
+from functools import cached_property
+from typing import Dict, List, Optional, Union
+
+from django.db.models import Sum
+
+from ..models import Client, PortfolioSnapshot, Position, Transaction
+from .modified_dietz_service import ModifiedDietzService
+from .position_frame import PositionFrame
+from .report_section_cache import ReportSectionCache
+
+logger = logging.getLogger(__name__)
+
+DateLike = Union[str, date, datetime]
+
+
+def _to_date(value: DateLike) -> date:
+    return ModifiedDietzService._to_date(value)
+
+
+class ReportDataContext:
+    """
+    Loaded report inputs for one client, current snapshot and comparison snapshot.
+
+    Built with no current snapshot it still serves the snapshot series, values and
+    Modified Dietz returns; transaction slices are then queried directly. Sections are
+    only cached across reports when a section_cache is given.
+    """
+
+    def __init__(self, client: Client, current_snapshot: Optional[PortfolioSnapshot] = None,
+                 comparison_snapshot: Optional[PortfolioSnapshot] = None,
+                 dietz_service: Optional[ModifiedDietzService] = None,
+                 section_cache: Optional[ReportSectionCache] = None):
+        self.client = client
+        self.current_snapshot = current_snapshot
+        self.comparison_snapshot = comparison_snapshot or current_snapshot
+        self.dietz_service = dietz_service or ModifiedDietzService()
+        self.sections = section_cache or ReportSectionCache(client.code, enabled=False)
+        # Section results keyed by snapshot id, filled by the report service
+        self.metrics: Dict[int, dict] = {}
+        self._positions: Dict[int, List[Position]] = {}
+        self._frames: Dict[int, PositionFrame] = {}
+        self._dietz: Dict[tuple, dict] = {}
+
+    @classmethod
+    def for_snapshot(cls, snapshot: PortfolioSnapshot, **kwargs) -> 'ReportDataContext':
+        return cls(snapshot.client, snapshot, **kwargs)
+
+    @classmethod
+    def load(cls, client_code: str, current_date: DateLike, comparison_date: Optional[DateLike] = None,
+             **kwargs) -> 'ReportDataContext':
+        """
+        Resolve a report's snapshots from the client's series.
+
+        Without a distinct comparison date the previous snapshot is used (the current
+        one for a client's first snapshot); a comparison date with no snapshot falls
+        back to the current one. Raises Client/PortfolioSnapshot.DoesNotExist like get().
+        """
+        client = Client.objects.get(code=client_code)
+        context = cls(client, **kwargs)
+
+        current_date = _to_date(current_date)
+        current_snapshot = context.snapshot_on(current_date)
+        if current_snapshot is None:
+            raise PortfolioSnapshot.DoesNotExist(f"No snapshot for {client_code} on {current_date}")
+
+        if comparison_date and _to_date(comparison_date) != current_date:
+            comparison_snapshot = context.snapshot_on(_to_date(comparison_date))
+            if comparison_snapshot is None:
+                logger.warning(f"Comparison snapshot not found for {comparison_date}, using current")
+                comparison_snapshot = current_snapshot
+        else:
+            comparison_snapshot = context.previous_snapshot(current_date)
+            if comparison_snapshot:
+                logger.info(f"Auto-detected comparison date: {comparison_snapshot.snapshot_date} -> {current_date}")
+            else:
+                logger.info(f"First snapshot for {client.code} - no comparison available")
+                comparison_snapshot = current_snapshot
+
+        context.current_snapshot = current_snapshot
+        context.comparison_snapshot = comparison_snapshot
+        return context
+
+    @property
+    def current_date(self) -> Optional[str]:
+        return str(self.current_snapshot.snapshot_date) if self.current_snapshot else None
+
+    @property
+    def comparison_date(self) -> Optional[str]:
+        return str(self.comparison_snapshot.snapshot_date) if self.comparison_snapshot else None
+
+    # Snapshot series
+
+    @cached_property
+    def snapshots(self) -> List[PortfolioSnapshot]:
+        """All snapshots of the client, oldest first."""
+        return list(self.client.snapshots.order_by('snapshot_date'))
+
+    @cached_property
+    def _snapshot_dates(self) -> List[date]:
+        return [snapshot.snapshot_date for snapshot in self.snapshots]
+
+    def snapshot_on(self, snapshot_date: DateLike) -> Optional[PortfolioSnapshot]:
+        snapshot_date = _to_date(snapshot_date)
+        index = bisect.bisect_left(self._snapshot_dates, snapshot_date)
+        if index < len(self.snapshots) and self._snapshot_dates[index] == snapshot_date:
+            return self.snapshots[index]
+        return None
+
+    def snapshots_until(self, end_date: Optional[DateLike] = None) -> List[PortfolioSnapshot]:
+        """Snapshots up to end_date inclusive (all when None)."""
+        if end_date is None:
+            return self.snapshots
+        return self.snapshots[:bisect.bisect_right(self._snapshot_dates, _to_date(end_date))]
+
+    def previous_snapshot(self, snapshot_date: DateLike) -> Optional[PortfolioSnapshot]:
+        index = bisect.bisect_left(self._snapshot_dates, _to_date(snapshot_date))
+        return self.snapshots[index - 1] if index else None
+
+    @property
+    def first_snapshot(self) -> Optional[PortfolioSnapshot]:
+        return self.snapshots[0] if self.snapshots else None
+
+    # Positions
+
+    def positions_for(self, snapshot: PortfolioSnapshot) -> List[Position]:
+        """ALT-excluded positions of a snapshot with their assets, in id order."""
+        if snapshot.id not in self._positions:
+            snapshot_ids = {snapshot.id}
+            if not self._positions:
+                # First use loads both report snapshots together
+                snapshot_ids.update(s.id for s in (self.current_snapshot, self.comparison_snapshot) if s)
+            loaded = {snapshot_id: [] for snapshot_id in snapshot_ids}
+            positions = (Position.objects.filter(snapshot_id__in=snapshot_ids)
+                         .select_related('asset').exclude_alt().order_by('id'))
+            for position in positions:
+                loaded[position.snapshot_id].append(position)
+            self._positions.update(loaded)
+        return self._positions[snapshot.id]
+
+    def frame_for(self, snapshot: PortfolioSnapshot) -> PositionFrame:
+        """Columnar view of positions_for(snapshot), for allocations, charts and totals."""
+        if snapshot.id not in self._frames:
+            self._frames[snapshot.id] = PositionFrame.from_positions(self.positions_for(snapshot))
+        return self._frames[snapshot.id]
+
+    @cached_property
+    def values(self) -> Dict[date, float]:
+        """NON-ALT market value of every snapshot of the client, by date."""
+        rows = (Position.objects.filter(snapshot__client=self.client).exclude_alt()
+                .values('snapshot__snapshot_date').annotate(total=Sum('market_value')).order_by())
+        return {row['snapshot__snapshot_date']: float(row['total'] or 0) for row in rows}
+
+    # Transactions
+
+    @cached_property
+    def transactions(self) -> List[Transaction]:
+        """Transactions (ALT included) from the first snapshot to the current one, by date."""
+        start, end = self._transaction_window
+        return list(self.client.transactions.filter(date__gte=start, date__lte=end)
+                    .select_related('asset').order_by('date', 'id'))
+
+    @cached_property
+    def _transaction_dates(self) -> List[date]:
+        return [transaction.date for transaction in self.transactions]
+
+    @property
+    def _transaction_window(self) -> Optional[tuple]:
+        if self.current_snapshot is None or not self.snapshots:
+            return None
+        return self.first_snapshot.snapshot_date, self.current_snapshot.snapshot_date
+
+    def transactions_between(self, start_date: DateLike, end_date: DateLike,
+                             include_alt: bool = True) -> List[Transaction]:
+        """Transactions dated start_date..end_date inclusive, oldest first."""
+        start_date, end_date = _to_date(start_date), _to_date(end_date)
+        window = self._transaction_window
+        if window and window[0] <= start_date and end_date <= window[1]:
+            transactions = self.transactions[bisect.bisect_left(self._transaction_dates, start_date):
+                                             bisect.bisect_right(self._transaction_dates, end_date)]
+        else:
+            transactions = list(self.client.transactions.filter(date__gte=start_date, date__lte=end_date)
+                                .select_related('asset').order_by('date', 'id'))
+        if not include_alt:
+            transactions = [transaction for transaction in transactions if transaction.bank != 'ALT']
+        return transactions
+
+    def series_version(self, snapshots: List[PortfolioSnapshot]) -> Optional[str]:
+        """Section cache version of a chart series over these snapshots (see ReportSectionCache)."""
+        if not self.sections.enabled:
+            return None  # Nothing is cached, so skip reading the range's transactions
+        # A single snapshot's point (the series start) does not depend on any transaction
+        transactions = []
+        if len(snapshots) > 1:
+            transactions = self.transactions_between(snapshots[0].snapshot_date, snapshots[-1].snapshot_date)
+        return self.sections.series_version(snapshots, transactions)
+
+    # Modified Dietz
+
+    def dietz(self, start_date: DateLike, end_date: DateLike) -> dict:
+        """Memoized Modified Dietz breakdown (see calculate_portfolio_return_detailed)."""
+        start_date, end_date = _to_date(start_date), _to_date(end_date)
+        key = (start_date, end_date)
+        if key not in self._dietz:
+            self._dietz[key] = self.dietz_service.cached(
+                self.client.code, start_date, end_date,
+                lambda: self.dietz_service.calculate_return_from_data(
+                    self.client.code, start_date, end_date,
+                    self.values.get(start_date, 0.0), self.values.get(end_date, 0.0),
+                    self.transactions_between(start_date, end_date, include_alt=False)
+                )
+            )
+        return self._dietz[key]
@@ -0,0 +1,91 @@
+"""
+Report Section Cache
+Weekly report sections that depend only on (client, snapshot date) - position tables,
+allocation and bond maturity charts, snapshot metrics - are cached per date, so
+re-rendering a date against another comparison date reuses them.
+
+Sections are versioned two ways:
+- by the PORTFOLIO_DATA generation (the default), so any upload invalidates them
+- by the chain of snapshots up to the date (ids and update times) and a watermark of
+  the transactions dated within that chain's range, for per-snapshot chart series.
+  Every point is keyed by its own range: a new upload only adds a snapshot and
+  transactions after the previous date, so the previous date's series stays valid and
+  a new date's series extends it by one point, while a transaction posted late into an
+  earlier range changes that range's watermark and rebuilds the series.
+"""
+
+import hashlib
+import logging
+from datetime import date
+from typing import Any, Callable, Iterable, Optional, Union
+
+from django.core.cache import cache
+
+from ..models import PortfolioSnapshot, Transaction
+from ..utils.response_cache import get_generations, PORTFOLIO_DATA
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'aurum:report_section'
+SECTION_TIMEOUT = 60 * 60 * 24 * 7
+
+
+class ReportSectionCache:
+    """Cached report sections of one client."""
+
+    def __init__(self, client_code: str, enabled: bool = True):
+        self.client_code = client_code
+        self.enabled = enabled
+        self._generation = None
+
+    @property
+    def generation(self) -> Optional[int]:
+        """PORTFOLIO_DATA generation, read once so a report sees one data version."""
+        if self._generation is None:
+            self._generation = get_generations([PORTFOLIO_DATA])[PORTFOLIO_DATA]
+        return self._generation
+
+    def series_version(self, snapshots: Iterable[PortfolioSnapshot], transactions: Iterable[Transaction]) -> str:
+        """
+        Version of a series built from these snapshots and the transactions dated in
+        their range (changes when a snapshot is re-saved or a transaction of the range
+        is added, removed or re-amounted).
+        """
+        chain = ';'.join(f"{snapshot.id}:{snapshot.updated_at.isoformat()}" for snapshot in snapshots)
+        watermark = ';'.join(f"{transaction.id}:{transaction.amount}" for transaction in transactions)
+        return (f"{hashlib.md5(chain.encode('utf-8')).hexdigest()}:"
+                f"{hashlib.md5(watermark.encode('utf-8')).hexdigest()}")
+
+    def _key(self, snapshot_date: Union[str, date], section: str, version) -> str:
+        if version is None:
+            version = f"g{self.generation}"
+        return f"{KEY_PREFIX}:{self.client_code}:{snapshot_date}:{section}:{version}"
+
+    def get(self, snapshot_date: Union[str, date], section: str, version=None) -> Any:
+        """Cached section, or None."""
+        if not self.enabled:
+            return None
+        try:
+            return cache.get(self._key(snapshot_date, section, version))
+        except Exception as e:
+            logger.warning(f"Report section cache unavailable: {e}")
+            return None
+
+    def set(self, snapshot_date: Union[str, date], section: str, value: Any, version=None) -> None:
+        if not self.enabled:
+            return
+        try:
+            cache.set(self._key(snapshot_date, section, version), value, SECTION_TIMEOUT)
+        except Exception as e:
+            logger.warning(f"Could not cache report section {section} for {self.client_code}: {e}")
+
+    def get_or_build(self, snapshot_date: Union[str, date], section: str, build: Callable[[], Any],
+                     version=None) -> Any:
+        """Cached section, built (and cached) on a miss."""
+        value = self.get(snapshot_date, section, version)
+        if value is not None:
+            logger.debug(f"Report section hit: {self.client_code} {snapshot_date} {section}")
+            return value
+        value = build()
+        self.set(snapshot_date, section, value, version)
+        return value
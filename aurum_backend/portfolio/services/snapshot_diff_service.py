@@ -0,0 +1,203 @@
+"""
+Snapshot Diff Service
+Position-level comparison of two snapshots of a client, shared by the metrics top
+movers, the weekly report's biggest movers and anything else comparing periods.
+
+Each snapshot is read with one values_list query (ALT excluded) and the two sides are
+outer-joined on asset identity. Assets are unique per custody (ticker, cusip, name,
+bank, account, client), so repeated tickers across custodies and blank tickers never
+collide. Results are memoized in the cache per (client, date1, date2) under the
+current PORTFOLIO_DATA generation.
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from django.core.cache import cache
+
+from ..models import Position
+from ..utils.response_cache import get_generations, PORTFOLIO_DATA
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'aurum:snapshot_diff'
+DIFF_TIMEOUT = 60 * 60 * 24
+CASH_ASSET_TYPES = ('Cash', 'Money Market')
+
+_FIELDS = ('asset_id', 'market_value', 'quantity', 'price',
+           'asset__name', 'asset__ticker', 'asset__asset_type', 'asset__cusip')
+
+
+@dataclass
+class SnapshotDiff:
+    """
+    Outer join of two snapshots' positions on asset, as parallel arrays.
+
+    date1 is the earlier (comparison) snapshot and date2 the later one. Values,
+    quantities and prices are 0 where the asset is absent on that side; in1/in2 say
+    which side holds it. Positions of the same asset within a snapshot are summed.
+    """
+    client_code: str
+    date1: str
+    date2: str
+    asset_ids: np.ndarray
+    names: List[str]
+    tickers: List[str]
+    asset_types: np.ndarray
+    cusips: List[str]
+    value1: np.ndarray
+    value2: np.ndarray
+    quantity1: np.ndarray
+    quantity2: np.ndarray
+    price1: np.ndarray
+    price2: np.ndarray
+    in1: np.ndarray
+    in2: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.asset_ids)
+
+    @property
+    def matched(self) -> np.ndarray:
+        """Held in both snapshots."""
+        return self.in1 & self.in2
+
+    @property
+    def value_delta(self) -> np.ndarray:
+        return self.value2 - self.value1
+
+    @property
+    def quantity_delta(self) -> np.ndarray:
+        return self.quantity2 - self.quantity1
+
+    @property
+    def price_delta(self) -> np.ndarray:
+        return self.price2 - self.price1
+
+    @property
+    def pct_change(self) -> np.ndarray:
+        """Value change in percent of value1 (nan where value1 is 0)."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(self.value1 != 0, self.value_delta / self.value1 * 100, np.nan)
+
+    @property
+    def quantity_change_pct(self) -> np.ndarray:
+        """Absolute quantity change in percent of quantity1 (inf for new quantity, 0 if both 0)."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            change = np.abs(self.quantity_delta / self.quantity1) * 100
+        return np.where(self.quantity1 != 0, change, np.where(self.quantity2 != 0, np.inf, 0.0))
+
+    def mask(self, matched: bool = True, exclude_asset_types: Iterable[str] = (),
+             min_value: Optional[float] = None, max_quantity_change_pct: Optional[float] = None) -> np.ndarray:
+        """
+        Combine the common filters into one boolean mask.
+
+        Args:
+            matched: Only assets held in both snapshots
+            exclude_asset_types: Asset types to drop (e.g. CASH_ASSET_TYPES)
+            min_value: Both values must be at least this large
+            max_quantity_change_pct: Drop positions whose quantity moved more (trades)
+        """
+        mask = self.matched.copy() if matched else np.ones(len(self), dtype=bool)
+        exclude_asset_types = list(exclude_asset_types)
+        if exclude_asset_types:
+            mask &= ~np.isin(self.asset_types, exclude_asset_types)
+        if min_value is not None:
+            mask &= (self.value1 >= min_value) & (self.value2 >= min_value)
+        if max_quantity_change_pct is not None:
+            mask &= self.quantity_change_pct <= max_quantity_change_pct
+        return mask
+
+    def ranked(self, mask: np.ndarray, limit: Optional[int] = None) -> np.ndarray:
+        """Indices selected by mask, ordered by absolute dollar change (largest first)."""
+        indices = np.flatnonzero(mask)
+        order = np.argsort(-np.abs(self.value_delta[indices]), kind='stable')
+        return indices[order][:limit]
+
+
+class SnapshotDiffService:
+    """Build and memoize SnapshotDiff objects."""
+
+    def diff(self, client_code: str, date1: Union[str, date], date2: Union[str, date],
+             positions: Optional[Tuple[Sequence[Position], Sequence[Position]]] = None) -> SnapshotDiff:
+        """
+        Compare a client's snapshots on date1 (earlier) and date2 (later).
+
+        A missing snapshot behaves like an empty one. Callers that already hold both
+        snapshots' ALT-excluded positions (with assets, in id order) can pass them as
+        positions to build the diff without querying.
+        """
+        date1, date2 = str(date1), str(date2)
+        try:
+            generation = get_generations([PORTFOLIO_DATA])[PORTFOLIO_DATA]
+            key = f"{KEY_PREFIX}:{client_code}:{date1}:{date2}:{generation}"
+            cached = cache.get(key)
+        except Exception as e:
+            logger.warning(f"Snapshot diff cache unavailable: {e}")
+            key, cached = None, None
+        if cached is not None:
+            return cached
+
+        rows = tuple([self._row(position) for position in side] for side in positions) if positions else (None, None)
+        result = self._build(client_code, date1, date2, *rows)
+        if key:
+            try:
+                cache.set(key, result, DIFF_TIMEOUT)
+            except Exception as e:
+                logger.warning(f"Could not cache snapshot diff for {client_code}: {e}")
+        return result
+
+    def _load(self, client_code: str, snapshot_date: str) -> List[tuple]:
+        return list(
+            Position.objects.filter(snapshot__client__code=client_code, snapshot__snapshot_date=snapshot_date)
+            .exclude_alt().order_by('id').values_list(*_FIELDS)
+        )
+
+    @staticmethod
+    def _row(position: Position) -> tuple:
+        """A loaded position as a _FIELDS row."""
+        asset = position.asset
+        return (position.asset_id, position.market_value, position.quantity, position.price,
+                asset.name, asset.ticker, asset.asset_type, asset.cusip)
+
+    def _build(self, client_code: str, date1: str, date2: str,
+               rows1: Optional[List[tuple]] = None, rows2: Optional[List[tuple]] = None) -> SnapshotDiff:
+        if rows1 is None:
+            rows1 = self._load(client_code, date1)
+        if rows2 is None:
+            rows2 = self._load(client_code, date2)
+
+        # Asset attributes from the later side win, the earlier fills assets sold since
+        attributes: Dict[int, tuple] = {row[0]: row[4:] for row in rows1}
+        attributes.update((row[0], row[4:]) for row in rows2)
+        asset_ids = np.array(sorted(attributes), dtype=np.int64)
+
+        def side(rows):
+            values, quantities, prices = (np.zeros(len(asset_ids)) for _ in range(3))
+            present = np.zeros(len(asset_ids), dtype=bool)
+            if rows:
+                ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+                index = np.searchsorted(asset_ids, ids)
+                np.add.at(values, index, np.fromiter((float(row[1]) for row in rows), dtype=float, count=len(rows)))
+                np.add.at(quantities, index, np.fromiter((float(row[2]) for row in rows), dtype=float, count=len(rows)))
+                prices[index] = np.fromiter((float(row[3]) for row in rows), dtype=float, count=len(rows))
+                present[index] = True
+            return values, quantities, prices, present
+
+        value1, quantity1, price1, in1 = side(rows1)
+        value2, quantity2, price2, in2 = side(rows2)
+        names, tickers, asset_types, cusips = zip(*(attributes[i] for i in asset_ids)) if len(asset_ids) else ((),) * 4
+
+        logger.debug(f"Snapshot diff {client_code} {date1} -> {date2}: {len(asset_ids)} assets "
+                     f"({int((in1 & in2).sum())} in both)")
+        return SnapshotDiff(
+            client_code=client_code, date1=date1, date2=date2, asset_ids=asset_ids,
+            names=[name or '' for name in names], tickers=[ticker or '' for ticker in tickers],
+            asset_types=np.array([(t or '').strip() for t in asset_types], dtype=object),
+            cusips=[cusip or '' for cusip in cusips],
+            value1=value1, value2=value2, quantity1=quantity1, quantity2=quantity2,
+            price1=price1, price2=price2, in1=in1, in2=in2,
+        )
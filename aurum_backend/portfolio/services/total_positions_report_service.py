@@ -9,8 +9,7 @@ from collections import defaultdict
 from decimal import Decimal
 from datetime import datetime
 from typing import Dict, List, Any
-from django.db.models import Sum
-from ..models import Client, PortfolioSnapshot, Position
+from ..models import Client
 from ..utils.report_utils import save_report_html
 from .enhanced_report_service import EnhancedReportService
 
@@ -39,30 +38,26 @@ class TotalPositionsReportService(EnhancedReportService):
         
         try:
             # Get client and latest snapshot
-            client = Client.objects.get(code=client_code)
-            snapshot = PortfolioSnapshot.objects.filter(
-                client=client
-            ).order_by('-snapshot_date').first()
+            portfolio = self.get_latest_portfolio(client_code)
             
-            if not snapshot:
+            if not portfolio:
                 logger.warning(f"No portfolio snapshots found for client {client_code}")
                 return self._generate_empty_report(client_code, "No portfolio data found")
+            client, snapshot = portfolio.client, portfolio.snapshot
             
             # Get ALL positions (including ALTs) - this is the key difference
-            positions = snapshot.positions.select_related('asset').all()
+            positions = portfolio.positions
             
-            if not positions.exists():
+            if not positions:
                 logger.warning(f"No positions found for client {client_code} in snapshot {snapshot.snapshot_date}")
                 return self._generate_empty_report(client_code, f"No positions found for snapshot {snapshot.snapshot_date}")
             
             # Calculate metrics WITH ALTs included
-            total_positions = positions.count()
-            total_market_value = float(positions.aggregate(
-                total=Sum('market_value')
-            )['total'] or Decimal('0'))
+            total_positions = len(positions)
+            total_market_value = float(sum((p.market_value for p in positions), Decimal('0')))
             
             # Count ALT positions for information
-            alt_positions_count = positions.filter(asset__bank='ALT').count()
+            alt_positions_count = sum(1 for p in positions if p.asset.bank == 'ALT')
             
             # Generate positions table organized by asset class (like weekly report)
             positions_table = self._generate_total_positions_table(positions)
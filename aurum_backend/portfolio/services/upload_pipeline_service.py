@@ -0,0 +1,252 @@
+"""
+Upload Pipeline Service
+Stages, validates and deduplicates uploaded bank files concurrently, so a multi-bank
+upload does not handle one file at a time, and re-uploads of identical files are
+neither rewritten nor reprocessed.
+
+Per file:
+1. stage (worker): copy the upload's chunks to uploads/staging while computing its SHA-256
+2. validate (worker): workbook header sniffing (files with no detectable bank or date
+   are still accepted, into the fallback folders, as before)
+3. deduplicate (request thread): look the hash up in the file catalog
+   - same content already at the file's destination: linked to it, not rewritten
+   - same content under another name (e.g. an unchanged statement for a new date):
+     organized as usual, with a warning naming the earlier file
+4. organize (request thread): move the staged file into place and catalog it
+
+Results are yielded as files finish. Configured by UPLOAD_SETTINGS.
+"""
+
+import hashlib
+import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, Optional
+
+from django.conf import settings
+
+from ..models import BankFile
+from .file_catalog_service import INPUT_DIR, upload_dir
+from .processing_service import ProcessingService
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    'WORKERS': 4,
+}
+
+EXCEL_EXTENSIONS = ('.xlsx', '.xls')
+XLSX_SIGNATURE = b'PK\x03\x04'
+XLS_SIGNATURE = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+
+# Where each bank's uploads are organized for processing
+UPLOAD_DESTINATIONS = {
+    # Special processing banks (enrichment + combination)
+    'Pershing': INPUT_DIR / 'pershing' / 'nonenriched_pershing',
+    'LO': INPUT_DIR / 'lombard' / 'nonenriched_lombard',
+    'STDSZ': INPUT_DIR / 'santander_switzerland' / 'nonenriched_santander_switzerland',
+
+    # Combination processing banks
+    'Banchile': INPUT_DIR / 'banchile',
+    'CS': INPUT_DIR / 'cs',
+    'CSC': INPUT_DIR / 'csc',
+    'JB': INPUT_DIR / 'jb',
+    'Valley': INPUT_DIR / 'valley',
+    'IDB': INPUT_DIR / 'idb',  # Fixed: IDB needs combination processing
+    'Pictet': INPUT_DIR / 'pictet',
+    'Gonet': INPUT_DIR / 'gonet',
+
+    # Enrichment processing banks
+    'HSBC': INPUT_DIR / 'hsbc',
+
+    # Alternative assets - ready for combination
+    'ALT': INPUT_DIR / 'alternatives',
+
+    # Simple processing banks (ready for transform)
+    'JPM': INPUT_DIR,  # Root directory
+    'MS': INPUT_DIR,   # Root directory
+    'Safra': INPUT_DIR, # Root directory
+    'Citi': INPUT_DIR  # Root directory
+}
+
+
+def get_settings() -> Dict:
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'UPLOAD_SETTINGS', {})}
+
+
+def sniff_workbook(path: Path, filename: str) -> Optional[str]:
+    """Why a staged file is not a readable workbook of its extension, or None if it is."""
+    with open(path, 'rb') as f:
+        header = f.read(8)
+
+    if filename.lower().endswith('.xls'):
+        return None if header.startswith(XLS_SIGNATURE) else 'Not an .xls workbook (unrecognized file header)'
+
+    if not header.startswith(XLSX_SIGNATURE):
+        return 'Not an .xlsx workbook (unrecognized file header)'
+    try:
+        from openpyxl import load_workbook
+        # Opened through a handle: openpyxl rejects the staging .part extension
+        with open(path, 'rb') as f:
+            workbook = load_workbook(f, read_only=True)
+            try:
+                if not workbook.sheetnames:
+                    return 'Workbook has no sheets'
+            finally:
+                workbook.close()
+    except Exception as e:
+        return f'Unreadable workbook: {e}'
+    return None
+
+
+@dataclass
+class StagedUpload:
+    """An uploaded file copied to the staging area, with its hash and header check result."""
+    uploaded_file: object
+    bank_code: Optional[str] = None
+    date: Optional[str] = None
+    path: Optional[Path] = None
+    content_hash: str = ''
+    error: Optional[str] = None
+
+    @property
+    def filename(self) -> str:
+        return self.uploaded_file.name
+
+    def discard(self) -> None:
+        """Remove the staged copy (after a rejection)."""
+        if self.path is not None:
+            self.path.unlink(missing_ok=True)
+            self.path = None
+
+
+class UploadPipeline:
+    """Runs uploaded files through staging, validation, deduplication and organization."""
+
+    def __init__(self, processing_service: Optional[ProcessingService] = None,
+                 max_workers: Optional[int] = None):
+        self.processing_service = processing_service or ProcessingService()
+        self.max_workers = max_workers or get_settings()['WORKERS']
+        self.staging_dir = upload_dir() / 'staging'
+
+    # Worker steps
+
+    def stage(self, uploaded_file) -> StagedUpload:
+        """Copy an upload to the staging area while hashing it, then validate it."""
+        staged = StagedUpload(uploaded_file)
+        if not uploaded_file.name.lower().endswith(EXCEL_EXTENSIONS):
+            staged.error = 'Invalid file type. Only .xlsx and .xls files are allowed.'
+            return staged
+
+        # Detect bank and date
+        staged.bank_code = self.processing_service.detect_bank(uploaded_file.name)
+        staged.date = self.processing_service.extract_date_from_filename(uploaded_file.name)
+
+        self.staging_dir.mkdir(parents=True, exist_ok=True)
+        # .part files are never picked up by file discovery or the catalog
+        staged.path = self.staging_dir / f"{uuid.uuid4().hex}.part"
+        digest = hashlib.sha256()
+        with open(staged.path, 'wb') as destination:
+            for chunk in uploaded_file.chunks():
+                destination.write(chunk)
+                digest.update(chunk)
+        staged.content_hash = digest.hexdigest()
+
+        staged.error = sniff_workbook(staged.path, uploaded_file.name)
+        if staged.error:
+            staged.discard()
+        return staged
+
+    # Request thread steps
+
+    def find_duplicate(self, staged: StagedUpload) -> Optional[BankFile]:
+        """Cataloged upload or input file with the same content, preferring the file's destination."""
+        duplicates = BankFile.objects.filter(content_hash=staged.content_hash, stage__in=['upload', 'input'])
+        destination = UPLOAD_DESTINATIONS.get(staged.bank_code)
+        if destination is not None:
+            same_place = duplicates.filter(path=str(destination / staged.filename)).first()
+            if same_place is not None:
+                return same_place
+        return duplicates.order_by('id').first()
+
+    def finish(self, staged: StagedUpload, organize: Callable) -> Dict:
+        """Deduplicate and organize a staged file, returning its upload result."""
+        uploaded_file = staged.uploaded_file
+        result = {
+            'filename': uploaded_file.name,
+            'bank_detected': staged.bank_code,
+            'date_detected': staged.date,
+            'size': uploaded_file.size,
+            'content_hash': staged.content_hash or None,
+        }
+
+        if staged.error:
+            return {**result, 'success': False, 'status': 'error', 'error': staged.error, 'organized_path': None}
+
+        duplicate = self.find_duplicate(staged)
+        if duplicate is not None and duplicate.filename == uploaded_file.name:
+            staged.discard()
+            logger.info(f"Skipped re-upload of {uploaded_file.name}: identical to {duplicate.path}")
+            return {
+                **result,
+                'success': True,
+                'status': 'duplicate',
+                'final_location': duplicate.path,
+                'organized_path': str(Path(duplicate.directory).relative_to(INPUT_DIR))
+                if duplicate.stage == 'input' else duplicate.directory,
+                'duplicate_of': duplicate.path,
+                'message': 'Identical file already uploaded - kept existing copy, nothing to reprocess'
+            }
+
+        organization_result = organize(uploaded_file, staged.bank_code, staged.date, staged=staged)
+        logger.info(f"Successfully uploaded {uploaded_file.name} (Bank: {staged.bank_code}, Date: {staged.date})")
+        result = {
+            **result,
+            'success': organization_result['status'] == 'success',
+            'status': organization_result['status'],
+            'final_location': organization_result['final_location'],
+            'organized_path': organization_result['organized_path'],
+            'message': organization_result['message']
+        }
+        if duplicate is not None:
+            # Same content under another name, e.g. an unchanged statement for a new date:
+            # the date still needs its own file, so it is kept
+            logger.warning(f"{uploaded_file.name} is identical to already uploaded file {duplicate.path}")
+            result['duplicate_of'] = duplicate.path
+            result['warning'] = f'Identical to already uploaded file {duplicate.filename}'
+        return result
+
+    def run(self, uploaded_files: Iterable, organize: Callable) -> Iterator[Dict]:
+        """
+        Process uploads concurrently, yielding each file's result as it finishes.
+
+        Args:
+            uploaded_files: Django UploadedFile objects
+            organize: organize_uploaded_file(uploaded_file, bank_code, date, staged=...)
+        """
+        uploaded_files = list(uploaded_files)
+        if not uploaded_files:
+            return
+
+        workers = max(1, min(self.max_workers, len(uploaded_files)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='upload') as pool:
+            futures = {pool.submit(self.stage, uploaded_file): uploaded_file for uploaded_file in uploaded_files}
+            for future in as_completed(futures):
+                uploaded_file = futures[future]
+                try:
+                    staged = future.result()
+                    yield self.finish(staged, organize)
+                except Exception as e:
+                    logger.error(f"Error processing file {uploaded_file.name}: {e}")
+                    yield {
+                        'filename': uploaded_file.name,
+                        'success': False,
+                        'status': 'error',
+                        'error': str(e),
+                        'bank_detected': None,
+                        'date_detected': None,
+                        'size': getattr(uploaded_file, 'size', 0),
+                        'organized_path': None
+                    }
@@ -0,0 +1,23 @@
+"""
+Model signal handlers for the portfolio app.
+"""
+
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import PortfolioSnapshot, Report
+from .services.portfolio_evolution_service import PortfolioEvolutionService
+from .utils.response_cache import bump_generation, REPORTS
+
+
+@receiver(post_save, sender=Report)
+@receiver(post_delete, sender=Report)
+def invalidate_report_listings(sender, **kwargs):
+    """Report lists and available-date endpoints change whenever a report is created or removed."""
+    bump_generation(REPORTS)
+
+
+@receiver(post_delete, sender=PortfolioSnapshot)
+def drop_evolution_point(sender, instance, **kwargs):
+    """A deleted snapshot takes its pre-computed evolution point (and its share of the firm total) with it."""
+    PortfolioEvolutionService().remove_client_value(instance.client.code, instance.snapshot_date)
@@ -0,0 +1,36 @@
+"""
+Test suite for memoized bond issuer extraction.
+"""
+
+from django.test import SimpleTestCase
+
+from ..services.bond_name_parser import BondNameParser
+
+
+class TestBondNameParser(SimpleTestCase):
+    """Test issuer extraction, bulk extraction and the shared LRU."""
+
+    def setUp(self):
+        """Start every test with an empty cache."""
+        BondNameParser.clear_cache()
+        self.parser = BondNameParser()
+
+    def test_extraction_rules(self):
+        """Test representative names across the rule phases."""
+        self.assertEqual(self.parser.extract_issuer_from_name('US TREASURY 4% 2030'), 'US Treasury')
+        self.assertEqual(self.parser.extract_issuer_from_name('FORD MTR CO 4.125% 03/15/28'), 'FORD MOTOR Company')
+        self.assertEqual(self.parser.extract_issuer_from_name('CUSIP: 123ABC BK OF AMERICA 3.5% 01/02/30'),
+                         'Bank of AMERICA')
+        self.assertIsNone(self.parser.extract_issuer_from_name(''))
+
+    def test_extract_many_dedupes(self):
+        """Test that repeated names are parsed once and shared across instances."""
+        names = ['APPLE INC 3 1/4 05/06/31', 'APPLE INC 3 1/4 05/06/31', 'CITIGROUP INC 5% 01/01/30']
+        result = self.parser.extract_many(names)
+
+        self.assertEqual(result, {'APPLE INC 3 1/4 05/06/31': 'APPLE Inc',
+                                  'CITIGROUP INC 5% 01/01/30': 'CITIGROUP Inc'})
+        self.assertEqual(BondNameParser.cache_info().misses, 2)
+
+        BondNameParser().extract_issuer_from_name('APPLE INC 3 1/4 05/06/31')
+        self.assertEqual(BondNameParser.cache_info().hits, 1)
@@ -0,0 +1,77 @@
+"""
+Test suite for the precomputed client dashboard documents.
+"""
+
+from datetime import date
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from .. import views
+from ..models import User, Client, Asset, PortfolioSnapshot, Position, ClientDashboardDocument
+from ..utils.dietz_cache import bump_client_data_version, dietz_result_cache
+
+DASHBOARD_URL = '/api/portfolio/client/dashboard-with-charts/'
+SUMMARY_URL = '/api/portfolio/client/dashboard/'
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class TestClientDashboardDocument(TestCase):
+    """Test that client dashboards are served from the precomputed document while it is current."""
+
+    def setUp(self):
+        """Set up a client with two snapshots and publish its document."""
+        cache.clear()
+        dietz_result_cache.clear_local()
+        client = Client.objects.create(code='AAA', name='Client AAA')
+        asset = Asset.objects.create(name='APPLE INC', ticker='AAPL', asset_type='Equities',
+                                     bank='JPM', account='001', client='AAA')
+        for day, value in [(date(2025, 7, 3), 100000), (date(2025, 7, 10), 110000)]:
+            self.snapshot = PortfolioSnapshot.objects.create(client=client, snapshot_date=day,
+                                                             portfolio_metrics={'total_value': value})
+            Position.objects.create(snapshot=self.snapshot, asset=asset, market_value=Decimal(value),
+                                    bank='JPM', account='001')
+
+        self.api = APIClient()
+        self.api.force_authenticate(User.objects.create_user(
+            username='client', password='pw', role='client', client_code='AAA'))
+        self.assertEqual(views._publish_client_dashboards(), {'published': 1, 'failed': 0})
+
+    def test_served_from_document(self):
+        """Test that both endpoints answer from the document and honour conditional GET."""
+        with patch.object(views, '_build_client_dashboard', side_effect=AssertionError), \
+                patch.object(views, '_build_client_dashboard_data', side_effect=AssertionError):
+            response = self.api.get(DASHBOARD_URL)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data['summary']['total_aum'], 110000.0)
+            self.assertIn('cumulative_return', response.data['charts'])
+
+            again = self.api.get(DASHBOARD_URL, HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(again.status_code, 304)
+
+            summary = self.api.get(SUMMARY_URL)
+            self.assertEqual((summary.data['snapshot_date'], summary.data['total_value']), ('2025-07-10', 110000))
+
+    def test_stale_document_falls_back_to_live(self):
+        """Test that a re-saved snapshot or a data version bump makes the endpoints calculate live."""
+        etag = self.api.get(DASHBOARD_URL)['ETag']
+
+        self.snapshot.portfolio_metrics = {'total_value': 120000}
+        self.snapshot.save()
+        response = self.api.get(DASHBOARD_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['summary']['total_aum'], 120000.0)
+
+        # The live result was stored: served from the document again
+        with patch.object(views, '_build_client_dashboard', side_effect=AssertionError):
+            self.assertEqual(self.api.get(DASHBOARD_URL).data['summary']['total_aum'], 120000.0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_client_data_version('AAA')
+        with patch.object(views, '_build_client_dashboard_data', wraps=views._build_client_dashboard_data) as build:
+            self.api.get(SUMMARY_URL)
+        self.assertEqual(build.call_count, 1)
+        self.assertEqual(ClientDashboardDocument.objects.count(), 1)
@@ -0,0 +1,155 @@
+"""
+Test suite for the batch date-range mode of the UniversalClientIntegrator.
+"""
+
+import logging
+import os
+import shutil
+import tempfile
+from contextlib import redirect_stdout
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+
+import pandas as pd
+from django.db import transaction
+from django.test import TestCase
+
+from universal_client_integrator import UniversalClientIntegrator
+from ..models import Client, Asset, Position, Transaction, PortfolioSnapshot
+from ..parsers.excel_parser import StatementParser, TransactionParser
+
+DATES = ['10_07_2025', '17_07_2025', '24_07_2025']
+
+# (client, ticker, name, asset type, bank, account, cusip, market value, coupon rate)
+HOLDINGS = [
+    ('AA', 'AAPL', 'APPLE INC', 'Equity', 'JPM', '001', '037833100', 10000, None),
+    ('AA', 'T 4.5 2030', 'US TREASURY 4.5% 2030', 'Fixed Income', 'JPM', '001', '91282CJL6', 15000, 4.5),
+    ('AA', 'MSFT', 'MICROSOFT CORP', 'Equity', 'CS', '002', '594918104', 20000, None),
+    ('AA', 'CASH', 'CASH', 'Cash', 'CS', '002', 'CASH', 5000, None),
+    ('BB', 'AAPL', 'APPLE INC', 'Equity', 'JPM', '009', '037833100', 30000, None),
+]
+
+
+def _write_date(date_str: str, clients=('AA', 'BB'), cs_scale: float = 1.0):
+    """Processed securities and transactions files of one date (values grow week by week)."""
+    week = DATES.index(date_str)
+    securities = pd.DataFrame([{
+        'Ticker': ticker, 'Name': name, 'Asset Type': asset_type, 'Quantity': 100, 'Price': value / 100,
+        'Market Value': (value + 500 * week) * (cs_scale if bank == 'CS' else 1), 'Cost Basis': value,
+        'Coupon Rate': coupon, 'Maturity Date': '2030-05-15' if coupon else None,
+        'Bank': bank, 'Account': account, 'Client': client, 'CUSIP': cusip,
+    } for client, ticker, name, asset_type, bank, account, cusip, value, coupon in HOLDINGS if client in clients])
+    transactions = pd.DataFrame([{
+        'Date': f'2025-07-{8 + 7 * week:02d}', 'Type': transaction_type, 'Quantity': 0, 'Price': 0,
+        'Amount': amount, 'Bank': bank, 'Account': account, 'Client': client, 'CUSIP': cusip,
+    } for client, transaction_type, amount, bank, account, cusip in [
+        ('AA', 'Dividend', 120, 'JPM', '001', '037833100'),
+        ('AA', 'Misc. Receipt', 1000, 'CS', '002', 'CASH'),
+        ('BB', 'Dividend', 300, 'JPM', '009', '037833100'),
+    ] if client in clients])
+    securities.to_excel(f'data/excel/securities_{date_str}.xlsx', index=False)
+    transactions.to_excel(f'data/excel/transactions_{date_str}.xlsx', index=False)
+
+
+class TestBatchIntegration(TestCase):
+    """Test that batch integration writes what the per-date path writes."""
+
+    def setUp(self):
+        """Set up processed files of three dates; the last one holds only client BB."""
+        logging.disable(logging.WARNING)
+        self.cwd = os.getcwd()
+        self.tmp = Path(tempfile.mkdtemp())
+        os.chdir(self.tmp)
+        Path('data/excel').mkdir(parents=True)
+        _write_date(DATES[0])
+        _write_date(DATES[1])
+        _write_date(DATES[2], clients=('BB',))
+
+    def tearDown(self):
+        """Remove the files and restore the working directory and logging."""
+        os.chdir(self.cwd)
+        shutil.rmtree(self.tmp)
+        logging.disable(logging.NOTSET)
+
+    def integrator(self, bank: str, dates: list) -> UniversalClientIntegrator:
+        integrator = UniversalClientIntegrator('AA', bank)
+        integrator._generate_date_range = lambda start, end: dates
+        return integrator
+
+    def integrate(self, bank: str, dates: list, batch: bool) -> list:
+        integrator = self.integrator(bank, dates)
+        with redirect_stdout(StringIO()):
+            if batch:
+                return integrator.integrate_date_range_batch(dates[0], dates[-1], workers=1)
+            return integrator.integrate_date_range(dates[0], dates[-1], interactive=False)
+
+    def state(self) -> dict:
+        """Client AA's assets, positions and transactions, independent of row ids."""
+        key = ('ticker', 'cusip', 'name', 'bank', 'account', 'asset_type')
+        return {
+            'assets': set(Asset.objects.filter(client='AA').values_list(*key)),
+            'positions': set(Position.objects.filter(snapshot__client__code='AA').values_list(
+                'snapshot__snapshot_date', 'asset__ticker', 'asset__bank', 'market_value', 'quantity',
+                'estimated_annual_income')),
+            'transactions': set(Transaction.objects.filter(client__code='AA').values_list(
+                'transaction_id', 'asset__ticker', 'date', 'amount')),
+        }
+
+    def test_batch_matches_per_date(self):
+        """Test equal assets, positions and transaction ids, and that a date without the client is skipped."""
+        with transaction.atomic():
+            self.integrate('JPM', DATES[:2], batch=False)
+            per_date = self.state()
+            transaction.set_rollback(True)
+        self.assertFalse(Client.objects.exists())
+
+        results = self.integrate('JPM', DATES, batch=True)
+        self.assertEqual(self.state(), per_date)
+        self.assertEqual(len(per_date['positions']), 8)
+        self.assertEqual({position[-1] for position in per_date['positions']}, {None, Decimal('4.5')})
+        self.assertEqual(len(per_date['transactions']), 4)
+        self.assertEqual([result['date'] for result in results], DATES[:2])
+        self.assertEqual([result['positions_created'] for result in results], [4, 4])
+        self.assertEqual([result['portfolio_metrics']['total_value'] for result in results], [50000.0, 52000.0])
+        self.assertFalse(PortfolioSnapshot.objects.filter(client__code='AA', snapshot_date='2025-07-24').exists())
+
+    def test_additive_preserves_other_banks(self):
+        """Test that an additive batch replaces only the target bank's positions."""
+        self.integrate('JPM', DATES[:1], batch=True)
+        jpm = dict(Position.objects.filter(asset__bank='JPM').values_list('id', 'market_value'))
+
+        _write_date(DATES[0], cs_scale=2.0)
+        results = self.integrate('CS', DATES[:2], batch=True)
+        self.assertEqual(results[0]['mode'], 'additive')
+        self.assertEqual(results[0]['positions_removed'], 2)
+        self.assertEqual(dict(Position.objects.filter(asset__bank='JPM').values_list('id', 'market_value')), jpm)
+        cs = Position.objects.filter(asset__bank='CS', snapshot__snapshot_date='2025-07-10')
+        self.assertEqual(sorted(cs.values_list('market_value', flat=True)), [Decimal('10000'), Decimal('40000')])
+        self.assertEqual(set(Position.objects.filter(snapshot__snapshot_date='2025-07-17')
+                             .values_list('asset__bank', flat=True)), {'CS'})
+
+    def test_parser_client_filter(self):
+        """Test that parsers only return the requested client's rows, case-insensitively."""
+        securities = StatementParser(f'data/excel/securities_{DATES[0]}.xlsx')
+        self.assertEqual(set(securities.parse()), {'AA', 'BB'})
+        filtered = securities.parse('aa')
+        self.assertEqual(list(filtered), ['AA'])
+        self.assertEqual([security['ticker'] for security in filtered['AA']], ['AAPL', 'T 4.5 2030', 'MSFT', 'CASH'])
+
+        transactions = TransactionParser(f'data/excel/transactions_{DATES[0]}.xlsx')
+        self.assertEqual([tx['amount'] for tx in transactions.parse('BB')['BB']], [300.0])
+        self.assertEqual(transactions.parse('ZZ'), {})
+
+    def test_remove_duplicate_transactions(self):
+        """Test that only the first of transactions sharing their business fields is kept."""
+        client = Client.objects.create(code='AA', name='Client AA')
+        asset = Asset.objects.create(name='APPLE INC', ticker='AAPL', cusip='037833100', asset_type='Equity',
+                                     bank='JPM', account='001', client='AA')
+        for transaction_id, amount in [('tx_1', '120'), ('tx_2', '120.00'), ('tx_3', '90'), ('tx_4', '120')]:
+            Transaction.objects.create(client=client, asset=asset, date='2025-07-08', transaction_type='Dividend',
+                                       amount=Decimal(amount), bank='JPM', account='001',
+                                       transaction_id=transaction_id)
+
+        self.integrator('JPM', [])._remove_duplicate_transactions('AA')
+        self.assertEqual(sorted(Transaction.objects.values_list('transaction_id', flat=True)), ['tx_1', 'tx_3'])
@@ -0,0 +1,79 @@
+"""
+Test suite for concurrent account file loading in the combiners.
+"""
+
+import logging
+import shutil
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+from django.test import SimpleTestCase
+
+from ..preprocessing.combiners.banchile_combiner import BanchileCombiner
+from ..preprocessing.combiners.combiner_runtime import CombinerRuntime
+from ..preprocessing.progress_tracker import ProgressTracker
+
+
+def _read_rows(path: Path) -> pd.DataFrame:
+    return pd.read_excel(path)
+
+
+class TestCombinerRuntime(SimpleTestCase):
+    """Test that concurrent reads keep file order, isolate errors and report timings."""
+
+    def setUp(self):
+        """Set up Banchile account workbooks and one corrupt file."""
+        logging.disable(logging.ERROR)
+        self.tmp = Path(tempfile.mkdtemp())
+        self.files = []
+        for i, (client, account) in enumerate([('AA', '001'), ('BB', '002'), ('CC', '003')]):
+            path = self.tmp / f"Banchile_{client}_{account}_10_07_2025.xlsx"
+            with pd.ExcelWriter(path) as writer:
+                for sheet, column in [('Posiciones', 'Instrumento'), ('Movimientos', 'Movimiento')]:
+                    rows = pd.DataFrame({column: [f"{sheet} {client} {n}" for n in range(i + 2)],
+                                         'Monto': [100.0 * n for n in range(i + 2)]})
+                    rows.to_excel(writer, sheet_name=sheet, startrow=4, index=False)
+            self.files.append({'file': path, 'bank': 'Banchile', 'client': client, 'account': account})
+
+        corrupt = self.tmp / "Banchile_DD_004_10_07_2025.xlsx"
+        corrupt.write_text("not a workbook")
+        self.files.insert(1, {'file': corrupt, 'bank': 'Banchile', 'client': 'DD', 'account': '004'})
+
+    def tearDown(self):
+        """Remove the files and restore logging."""
+        shutil.rmtree(self.tmp)
+        logging.disable(logging.NOTSET)
+
+    def combine(self, workers: int, tracker: ProgressTracker) -> pd.DataFrame:
+        combiner = BanchileCombiner(progress_tracker=tracker)
+        combiner.runtime.max_workers = workers
+        output = self.tmp / f"securities_{workers}.xlsx"
+        self.assertTrue(combiner.combine_securities_files(self.files, output))
+        return pd.read_excel(output)
+
+    def test_concurrent_matches_sequential(self):
+        """Test that a pooled combination writes the same file as a sequential one."""
+        tracker = ProgressTracker()
+        sequential = self.combine(1, tracker)
+        concurrent = self.combine(3, tracker)
+
+        pd.testing.assert_frame_equal(sequential, concurrent)
+        self.assertEqual(list(concurrent['client'].unique()), ['AA', 'BB', 'CC'])
+        self.assertEqual(len(concurrent), 2 + 3 + 4)
+
+        timings = [t for t in tracker.file_timings if t['label'] == 'Banchile account']
+        self.assertEqual(len(timings), 8)
+        self.assertEqual([t['records'] for t in timings[4:]], [4, 0, 6, 8])
+
+    def test_error_isolation(self):
+        """Test that a failing file reports its error without failing the others."""
+        runtime = CombinerRuntime('TEST', max_workers=2)
+        paths = [info['file'] for info in self.files]
+        results = runtime.read_all(paths, _read_rows, 'rows')
+
+        self.assertEqual([result.file_info for result in results], paths)
+        self.assertEqual([result.ok for result in results], [True, False, True, True])
+        self.assertIsNotNone(results[1].error)
+        self.assertEqual(len(runtime.progress_tracker.file_timings), 4)
+        self.assertTrue(all(t['seconds'] >= 0 for t in runtime.progress_tracker.file_timings))
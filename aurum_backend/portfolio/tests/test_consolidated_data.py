@@ -0,0 +1,79 @@
+"""
+Test suite for the set-based consolidated report data loader.
+"""
+
+from datetime import date
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from ..models import Client, Asset, PortfolioSnapshot, Position
+from ..services.bond_maturity_report_service import BondMaturityReportService
+from ..services.cash_report_service import CashReportService
+from ..services.consolidated_data_service import ConsolidatedDataLoader
+
+
+class TestConsolidatedDataLoader(TestCase):
+    """Test that consolidated reports read every client's latest snapshot in two queries."""
+
+    def setUp(self):
+        """Set up three clients, each with an older and a latest snapshot."""
+        for index, code in enumerate(['AAA', 'BBB', 'CCC']):
+            client = Client.objects.create(code=code, name=f'Client {code}')
+            for snapshot_date, label in [(date(2025, 7, 3), 'OLD'), (date(2025, 7, 10), 'NEW')]:
+                snapshot = PortfolioSnapshot.objects.create(client=client, snapshot_date=snapshot_date)
+                bond = Asset.objects.create(
+                    name=f'{code} {label} BOND 5% 2031', asset_type='Fixed Income', bank='JPM', account='001',
+                    client=code, maturity_date=date(2031, 1, 1 + index)
+                )
+                cash = Asset.objects.create(name=f'{code} {label} CASH', asset_type='Cash', bank='ALT',
+                                            account='001', client=code)
+                Position.objects.create(snapshot=snapshot, asset=bond, market_value=Decimal('900'))
+                Position.objects.create(snapshot=snapshot, asset=cash, market_value=Decimal('100'))
+        Client.objects.create(code='ALL', name='All Clients')
+
+    def test_loads_latest_snapshots_in_two_queries(self):
+        """Test that the window query picks each client's latest snapshot."""
+        loader = ConsolidatedDataLoader()
+        with self.assertNumQueries(2):
+            portfolios = loader.portfolios()
+
+        self.assertEqual([p.client.code for p in portfolios], ['AAA', 'BBB', 'CCC'])
+        for portfolio in portfolios:
+            self.assertEqual(portfolio.snapshot.snapshot_date, date(2025, 7, 10))
+            self.assertEqual([p.asset.name for p in portfolio.bond_positions()],
+                             [f'{portfolio.client.code} NEW BOND 5% 2031'])
+            self.assertEqual(len(portfolio.cash_positions()), 1)
+            self.assertEqual(portfolio.non_alt_aum, Decimal('900'))
+
+    def test_consolidated_report_query_count(self):
+        """Test that the consolidated report no longer queries per client."""
+        service = BondMaturityReportService()
+        with self.assertNumQueries(2):
+            html = service._generate_consolidated_report()
+
+        self.assertIn('CCC NEW BOND', html)
+        self.assertNotIn('OLD BOND', html)
+
+    def test_individual_reports_share_loader(self):
+        """Test that per-client reports reuse the attached dataset."""
+        service = BondMaturityReportService()
+        service.data_loader = ConsolidatedDataLoader()
+        service.data_loader.load()
+        with self.assertNumQueries(0):
+            html = service.generate_bond_maturity_report('BBB', 'individual')
+        self.assertIn('BBB NEW BOND', html)
+
+    def test_cash_consolidated_report_includes_all_client(self):
+        """Test that the consolidated cash report still lists the ALL client's cash, as before."""
+        snapshot = PortfolioSnapshot.objects.create(client=Client.objects.get(code='ALL'),
+                                                    snapshot_date=date(2025, 7, 10))
+        cash = Asset.objects.create(name='ALL CLIENTS CASH', asset_type='Cash', bank='JPM',
+                                    account='001', client='ALL')
+        Position.objects.create(snapshot=snapshot, asset=cash, market_value=Decimal('100'))
+
+        with patch('portfolio.services.cash_report_service.save_report_html', return_value=('', 0)):
+            html = CashReportService()._generate_consolidated_report()
+        self.assertIn('ALL CLIENTS CASH', html)
+        self.assertIn('AAA NEW CASH', html)
@@ -0,0 +1,108 @@
+"""
+Test suite for the Modified Dietz result cache and its data-version invalidation.
+"""
+
+from datetime import date
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from ..models import Client, Asset, PortfolioSnapshot, Position, Transaction
+from ..services.account_rollover_service import AccountRolloverService
+from ..services.modified_dietz_service import ModifiedDietzService
+from ..utils.dietz_cache import bump_client_data_version, dietz_result_cache, _version_key
+
+START, END = date(2025, 7, 3), date(2025, 7, 10)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class TestDietzResultCache(TestCase):
+    """Test that repeated returns are served from cache until the client's data changes."""
+
+    def setUp(self):
+        """Set up two clients with two snapshots and a deposit each."""
+        cache.clear()
+        dietz_result_cache.clear_local()
+        for code, value in [('AAA', 100000), ('BBB', 50000)]:
+            client = Client.objects.create(code=code, name=f'Client {code}')
+            asset = Asset.objects.create(name='APPLE INC', ticker='AAPL', asset_type='Equities',
+                                         bank='JPM', account='001', client=code)
+            for day, amount in [(START, value), (END, value * 1.1)]:
+                snapshot = PortfolioSnapshot.objects.create(client=client, snapshot_date=day)
+                Position.objects.create(snapshot=snapshot, asset=asset, market_value=Decimal(amount),
+                                        quantity=Decimal(100), bank='JPM', account='001')
+            Transaction.objects.create(client=client, asset=asset, date=date(2025, 7, 7), bank='JPM',
+                                       transaction_type='ACH Deposit', amount=Decimal('5000'),
+                                       account='001', transaction_id=f'{code}-deposit')
+        self.dietz = ModifiedDietzService()
+
+    def test_repeated_calculation_hits_cache(self):
+        """Test that the second request costs no queries, within and across processes."""
+        first = self.dietz.calculate_portfolio_return_detailed('AAA', START, END)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.dietz.calculate_return('AAA', '2025-07-03', '2025-07-10'),
+                             first['return_percentage'])
+
+        # Another process: only the shared cache is warm
+        dietz_result_cache.clear_local()
+        with self.assertNumQueries(0):
+            self.assertEqual(ModifiedDietzService().calculate_portfolio_return_detailed('AAA', START, END), first)
+
+        self.assertEqual(ModifiedDietzService(use_cache=False).calculate_portfolio_return_detailed(
+            'AAA', START, END), first)
+
+    def test_local_hit_skips_shared_cache(self):
+        """Test that a local hit reuses recent data versions and sees other processes' bumps later."""
+        first = self.dietz.calculate_portfolio_return_detailed('AAA', START, END)
+        with patch('portfolio.utils.dietz_cache.cache') as shared:
+            self.assertEqual(self.dietz.calculate_portfolio_return_detailed('AAA', START, END), first)
+        self.assertEqual(shared.method_calls, [])
+
+        # Another process changes AAA's data and bumps the shared counter only
+        Position.objects.filter(snapshot__client__code='AAA', snapshot__snapshot_date=END).update(
+            market_value=Decimal('200000'))
+        cache.incr(_version_key('AAA'))
+        self.assertEqual(self.dietz.calculate_portfolio_return_detailed('AAA', START, END), first)
+        with override_settings(DIETZ_CACHE_SETTINGS={'VERSION_TTL': 0}):
+            after = self.dietz.calculate_portfolio_return_detailed('AAA', START, END)
+        self.assertEqual(after['end_value'], 200000.0)
+
+    def test_version_bump_on_commit(self):
+        """Test that a client's bump applies on commit and leaves other clients cached."""
+        before = self.dietz.calculate_portfolio_return_detailed('AAA', START, END)
+        self.dietz.calculate_portfolio_return_detailed('BBB', START, END)
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            Position.objects.filter(snapshot__client__code='AAA', snapshot__snapshot_date=END).update(
+                market_value=Decimal('200000'))
+            bump_client_data_version('AAA')
+            # Not committed yet: readers still see the old version
+            self.assertEqual(self.dietz.calculate_portfolio_return_detailed('AAA', START, END), before)
+        self.assertEqual(len(callbacks), 1)
+
+        after = self.dietz.calculate_portfolio_return_detailed('AAA', START, END)
+        self.assertEqual(after['end_value'], 200000.0)
+        with self.assertNumQueries(0):
+            self.dietz.calculate_portfolio_return_detailed('BBB', START, END)
+
+    def test_rollover_and_classification_invalidate(self):
+        """Test that rolled-over positions and new classification rules are picked up."""
+        before = self.dietz.calculate_portfolio_return_detailed('BBB', START, END)
+        Asset.objects.create(name='MSFT', ticker='MSFT', asset_type='Equities', bank='MS', account='002',
+                             client='BBB')
+        snapshot = PortfolioSnapshot.objects.get(client__code='BBB', snapshot_date=START)
+        Position.objects.create(snapshot=snapshot, asset=Asset.objects.get(ticker='MSFT'),
+                                market_value=Decimal('7000'), bank='MS', account='002')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            AccountRolloverService().copy_account_positions('BBB', 'MS', '002', '2025-07-03', '2025-07-10')
+        after = self.dietz.calculate_portfolio_return_detailed('BBB', START, END)
+        self.assertEqual(after['end_value'], before['end_value'] + 7000)
+
+        with patch('portfolio.utils.dietz_cache.classification_version', return_value='new-rules'), \
+                patch.object(ModifiedDietzService, 'calculate_return_from_data', autospec=True,
+                             return_value={'return_percentage': 1.0}) as compute:
+            self.dietz.calculate_portfolio_return_detailed('BBB', START, END)
+        self.assertEqual(compute.call_count, 1)
@@ -0,0 +1,112 @@
+"""
+Test suite for the local ETF look-through store.
+"""
+
+from datetime import date
+from decimal import Decimal
+from unittest.mock import Mock, patch
+
+import numpy as np
+from django.test import TestCase
+
+from ..models import Client, Asset, PortfolioSnapshot, Position, SecurityReference, ETFConstituent
+from ..services.equity_analysis_service import EquityAnalysisService
+from ..services.etf_lookthrough_service import ETFLookthroughService, LookthroughMatrix
+
+
+class TestETFLookthrough(TestCase):
+    """Test look-through from the local store without any FMP access."""
+
+    def setUp(self):
+        """Set up a two-ETF store and two clients."""
+        LookthroughMatrix._cached = None
+        SecurityReference.objects.create(ticker='SPY', sector='ETF', is_etf=True,
+                                         sector_weightings={'Technology': 30.0, 'Financials': 70.0})
+        SecurityReference.objects.create(ticker='QQQ', sector='ETF', is_etf=True,
+                                         sector_weightings={'Technology': 100.0})
+        for ticker, name, sector in [('AAPL', 'Apple Inc', 'Technology'), ('MSFT', 'Microsoft Corp', 'Technology'),
+                                     ('JPM', 'JPMorgan Chase', 'Financials')]:
+            SecurityReference.objects.create(ticker=ticker, name=name, sector=sector)
+        for etf, rank, ticker, weight in [('SPY', 0, 'AAPL', 7.0), ('SPY', 1, 'JPM', 2.0),
+                                          ('QQQ', 0, 'AAPL', 9.0), ('QQQ', 1, 'MSFT', 8.0)]:
+            ETFConstituent.objects.create(etf_ticker=etf, rank=rank, constituent_ticker=ticker,
+                                          constituent_name=ticker, weight=weight)
+
+        self.snapshot_a = self._snapshot('AAA', [('AAPL', 'APPLE INC', 1000), ('SPY', 'SPDR S&P 500', 10000),
+                                                 ('QQQ', 'INVESCO QQQ', 5000)])
+        self._snapshot('BBB', [('SPY', 'SPDR S&P 500', 20000)])
+
+    def _snapshot(self, code, holdings):
+        client = Client.objects.create(code=code, name=f'Client {code}')
+        PortfolioSnapshot.objects.create(client=client, snapshot_date=date(2025, 7, 3))
+        snapshot = PortfolioSnapshot.objects.create(client=client, snapshot_date=date(2025, 7, 10))
+        for ticker, name, value in holdings:
+            asset = Asset.objects.create(ticker=ticker, name=name, asset_type='Equities', bank='JPM',
+                                         account='001', client=code)
+            Position.objects.create(snapshot=snapshot, asset=asset, bank='JPM', account='001',
+                                    quantity=Decimal('10'), market_value=Decimal(value))
+        return snapshot
+
+    def test_client_lookthrough_uses_store(self):
+        """Test the per-client analysis is served from the store with unchanged structure."""
+        positions = self.snapshot_a.positions.select_related('asset')
+        # Any FMP call would fail on this object; stored ETFs are distributed by the product alone
+        with patch.object(LookthroughMatrix, 'holdings', side_effect=AssertionError):
+            result = EquityAnalysisService(fmp_service=object()).analyze_equity_portfolio(positions)
+
+        apple = next(h for h in result['aggregated_holdings'] if h['ticker'] == 'AAPL')
+        self.assertEqual(apple['name'], 'Apple Inc')
+        self.assertAlmostEqual(apple['etf_value'], 10000 * 0.07 + 5000 * 0.09)
+        self.assertAlmostEqual(apple['total_value'], 2150)
+        self.assertEqual([(c['etf_ticker'], c['weight']) for c in apple['etf_contributions']],
+                         [('SPY', 7.0), ('QQQ', 9.0)])
+        self.assertAlmostEqual(sum(c['value'] for c in apple['etf_contributions']), apple['etf_value'])
+        self.assertEqual(result['spy_benchmark'], {'Technology': 30.0, 'Financials': 70.0})
+        self.assertEqual(len(result['etf_holdings']), 2)
+
+    def test_batched_product_matches_dense(self):
+        """Test the sparse products against a dense weight matrix."""
+        matrix = LookthroughMatrix.load()
+        dense = np.zeros((len(matrix.etf_index), len(matrix.constituents)))
+        dense[matrix.rows, matrix.cols] = matrix.weights
+        values = np.array([[10000.0, 5000.0], [20000.0, 0.0], [0.0, 0.0]])
+
+        np.testing.assert_allclose(matrix.lookthrough_many(values), values @ dense)
+        self.assertAlmostEqual(matrix.lookthrough({'spy': 100.0})['JPM'], 2.0)
+
+        entries, contributions = matrix.contributions({'QQQ': 100.0, 'spy': 10.0, 'VTI': 5.0})
+        self.assertEqual([(matrix.etfs[matrix.rows[i]], matrix.constituents[matrix.cols[i]]) for i in entries],
+                         [('QQQ', 'AAPL'), ('QQQ', 'MSFT'), ('SPY', 'AAPL'), ('SPY', 'JPM')])
+        np.testing.assert_allclose(contributions, [9.0, 8.0, 0.7, 0.2])
+        self.assertIs(LookthroughMatrix.load(), matrix)
+
+    def test_firm_wide_lookthrough(self):
+        """Test the firm-wide breakdown uses only each client's latest snapshot."""
+        result = EquityAnalysisService(fmp_service=object()).analyze_firm_lookthrough()
+
+        self.assertEqual(sorted(result['clients']), ['AAA', 'BBB'])
+        bbb = result['clients']['BBB']
+        self.assertEqual(bbb['total_equity_value'], 20000)
+        self.assertEqual({h['ticker']: round(h['etf_value'], 2) for h in bbb['top_holdings']}, {'AAPL': 1400, 'JPM': 400})
+        self.assertEqual(bbb['sector_exposure'], {'Financials': 70.0, 'Technology': 30.0})
+
+        firm_apple = result['firm']['top_holdings'][0]
+        self.assertEqual(firm_apple['ticker'], 'AAPL')
+        self.assertAlmostEqual(firm_apple['total_value'], 1000 + 1150 + 1400)
+
+    def test_failed_profiles_are_retried(self):
+        """Test that a failed profile lookup is not stored, so the next refresh retries it."""
+        fmp = Mock()
+        fmp.is_etf.return_value = False
+        fmp.get_company_profile.side_effect = lambda ticker: {'ticker': ticker, 'sector': 'Unknown',
+                                                               'error': 'No data available'}
+        stats = ETFLookthroughService(fmp_service=fmp).refresh(['JPM', 'NVDA'])
+        self.assertEqual((stats['tickers'], stats['unresolved']), (0, 2))
+        self.assertEqual(SecurityReference.objects.get(ticker='JPM').sector, 'Financials')
+        self.assertFalse(SecurityReference.objects.filter(ticker='NVDA').exists())
+
+        fmp.get_company_profile.side_effect = lambda ticker: {'ticker': ticker, 'company_name': 'NVIDIA Corp',
+                                                               'sector': 'Technology'}
+        stats = ETFLookthroughService(fmp_service=fmp).refresh(['NVDA'])
+        self.assertEqual((stats['tickers'], stats['unresolved']), (1, 0))
+        self.assertEqual(SecurityReference.objects.get(ticker='NVDA').sector, 'Technology')
@@ -0,0 +1,167 @@
+"""
+Test suite for streaming position and transaction exports.
+"""
+
+import os
+import shutil
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+from io import BytesIO
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from openpyxl import load_workbook
+from rest_framework.test import APIClient
+
+from ..models import User, Client, Asset, PortfolioSnapshot, Position, Transaction, ExportJob
+from ..services.excel_export_service import ExcelExportService, POSITION_COLUMNS
+from ..services.export_job_service import ExportJobService
+
+EXPORT_URL = '/api/portfolio/export/transactions/'
+
+
+class TestStreamingExports(TestCase):
+    """Test that streamed exports carry the same rows as the legacy exports."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.service = ExcelExportService()
+        client = Client.objects.create(code='AAA', name='Client A')
+        snapshot = PortfolioSnapshot.objects.create(client=client, snapshot_date=date(2025, 7, 10))
+        bond = Asset.objects.create(
+            ticker='', name='US TREASURY 4% 2030', asset_type='Fixed Income', bank='JPM',
+            account='001', client='AAA', cusip='912828ZZ1', coupon_rate=Decimal('4.0'),
+            maturity_date=date(2030, 5, 15)
+        )
+        Position.objects.create(
+            snapshot=snapshot, asset=bond, bank='JPM', account='001', quantity=Decimal('1000'),
+            market_value=Decimal('1050.00'), cost_basis=Decimal('1000.00'), price=Decimal('105')
+        )
+        Transaction.objects.create(
+            client=client, asset=bond, date=date(2025, 7, 8), transaction_type='BUY',
+            quantity=Decimal('1000'), price=Decimal('100'), amount=Decimal('-1000.00'),
+            bank='JPM', account='001', transaction_id='T1'
+        )
+
+    def test_positions_xlsx(self):
+        """Test that the constant-memory workbook has headers, rows and sized columns."""
+        excel_bytes, filename = self.service.export_positions_excel('ALL', '2025-07-10')
+        self.assertEqual(filename, 'positions_10_07_2025_ALL.xlsx')
+
+        worksheet = load_workbook(BytesIO(excel_bytes))['Positions']
+        rows = list(worksheet.iter_rows(values_only=True))
+        self.assertEqual(list(rows[0]), [name for name, _ in POSITION_COLUMNS])
+        self.assertEqual(rows[1][4], 'US TREASURY 4% 2030')
+        self.assertEqual(rows[1][12], '15/05/2030')
+        self.assertAlmostEqual(rows[1][14], 5.0)
+        self.assertAlmostEqual(worksheet.column_dimensions['E'].width, 21, delta=1)
+
+    def test_transactions_csv(self):
+        """Test the CSV fast path."""
+        chunks, filename, content_type = self.service.stream_transactions_export(
+            'AAA', '2025-07-01', '2025-07-31', 'csv'
+        )
+        lines = b''.join(chunks).decode('utf-8').splitlines()
+        self.assertEqual(content_type, 'text/csv')
+        self.assertEqual(lines[0], 'bank,client,account,date,transaction_type,cusip,quantity,price,amount')
+        self.assertEqual(lines[1], 'JPM,AAA,001,08/07/2025,BUY,912828ZZ1,1000.0,100.0,-1000.0')
+
+    def test_empty_range_raises(self):
+        """Test that an empty selection is reported before streaming starts."""
+        with self.assertRaises(ValueError):
+            self.service.stream_transactions_export('AAA', '2024-01-01', '2024-01-31', 'csv')
+
+
+class TestChunkedTransactionExport(TestCase):
+    """Test keyset-paged transaction exports and background export jobs."""
+
+    def setUp(self):
+        """Set up 25 transactions over two clients and a temporary export directory."""
+        self.export_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.export_dir, ignore_errors=True)
+        for code in ('AAA', 'BBB'):
+            client = Client.objects.create(code=code, name=f'Client {code}')
+            asset = Asset.objects.create(ticker='CASH', name='Cash', asset_type='Cash', bank='JPM',
+                                         account='001', client=code, cusip=f'CASH_{code}')
+            for i in range(13 if code == 'AAA' else 12):
+                Transaction.objects.create(
+                    client=client, asset=asset, date=date(2025, 7, 1) + timedelta(days=i % 5),
+                    transaction_type='Deposit', amount=Decimal(i), bank='JPM', account='001',
+                    transaction_id=f'{code}-{i}'
+                )
+
+        self.api = APIClient()
+        self.api.force_authenticate(User.objects.create_user(
+            username='admin', password='pw', role='admin', is_staff=True))
+
+    def test_keyset_pages(self):
+        """Test that pages cover every row once, in (date, id) order, with progress per page."""
+        service = ExcelExportService()
+        transactions, _ = service.transactions_export_query('ALL', '2025-07-01', '2025-07-31')
+        progress = []
+        with self.assertNumQueries(3):
+            rows = list(service._iter_transaction_rows(transactions, progress=progress.append, page_size=10))
+
+        self.assertEqual(progress, [10, 20, 25])
+        expected = list(Transaction.objects.order_by('date', 'id').values_list('client__code', 'amount'))
+        self.assertEqual([(row[1], Decimal(row[8])) for row in rows], expected)
+
+    def test_missing_cusip_is_blank(self):
+        """Test that transactions of assets without a CUSIP export an empty string, not null."""
+        Asset.objects.filter(client='AAA').update(cusip=None)
+        service = ExcelExportService()
+        transactions, _ = service.transactions_export_query('AAA', '2025-07-01', '2025-07-31')
+        self.assertEqual({row[5] for row in service._iter_transaction_rows(transactions)}, {''})
+
+    def test_background_job(self):
+        """Test that a large export becomes a job whose file can be downloaded."""
+        with self.settings(EXPORT_SETTINGS={'EXPORT_DIR': self.export_dir, 'BACKGROUND_ROWS': 20,
+                                            'RUN_IN_THREAD': False}):
+            small = self.api.post(EXPORT_URL, {'client_code': 'AAA', 'start_date': '2025-07-01',
+                                               'end_date': '2025-07-31', 'format': 'csv'}, format='json')
+            self.assertEqual(small.status_code, 200)
+
+            with CaptureQueriesContext(connection) as queries:
+                response = self.api.post(EXPORT_URL, {'client_code': 'ALL', 'start_date': '2025-07-01',
+                                                      'end_date': '2025-07-31', 'format': 'csv'}, format='json')
+        self.assertEqual(response.status_code, 202)
+        counts = [q['sql'] for q in queries.captured_queries if 'COUNT(' in q['sql'] and 'portfolio_transaction' in q['sql']]
+        self.assertEqual(len(counts), 1)
+        job = response.data['job']
+        self.assertEqual((job['status'], job['rows_written'], job['progress']), ('COMPLETED', 25, 100.0))
+
+        status_response = self.api.get(response.data['status_url'])
+        self.assertEqual(status_response.data['job']['filename'], 'transactions_01_07_2025-31_07_2025_ALL.csv')
+
+        download = self.api.get(response.data['download_url'])
+        lines = b''.join(download.streaming_content).decode('utf-8').splitlines()
+        self.assertEqual(len(lines), 26)
+        download.close()
+
+        # Expired jobs are purged with their files when the next job is created
+        stored = ExportJob.objects.get()
+        ExportJob.objects.update(created_at=stored.created_at - timedelta(days=2))
+        with self.settings(EXPORT_SETTINGS={'EXPORT_DIR': self.export_dir, 'RUN_IN_THREAD': False}):
+            self.api.post(EXPORT_URL, {'client_code': 'BBB', 'start_date': '2025-07-01', 'end_date': '2025-07-31',
+                                       'background': True}, format='json')
+        self.assertFalse(os.path.exists(stored.file_path))
+        self.assertEqual(ExportJob.objects.get().client_code, 'BBB')
+
+    def test_stale_jobs_fail_and_are_purged(self):
+        """Test that a job whose worker died is marked failed and purged with its partial file."""
+        job = ExportJob.objects.create(client_code='ALL', start_date=date(2025, 7, 1), end_date=date(2025, 7, 31),
+                                       export_format='csv', status='RUNNING', total_rows=25)
+        ExportJob.objects.update(created_at=job.created_at - timedelta(hours=3))
+        partial = os.path.join(self.export_dir, f'{job.job_id}_tmp_abc.csv')
+        open(partial, 'w').close()
+
+        with self.settings(EXPORT_SETTINGS={'EXPORT_DIR': self.export_dir}):
+            response = self.api.get(f'/api/portfolio/export/jobs/{job.job_id}/')
+            self.assertEqual(response.data['job']['status'], 'ERROR')
+            self.assertFalse(os.path.exists(partial))
+
+            ExportJob.objects.update(created_at=job.created_at - timedelta(days=2))
+            self.assertEqual(ExportJobService().purge_expired(), 1)
+        self.assertFalse(ExportJob.objects.exists())
@@ -0,0 +1,123 @@
+"""
+Test suite for the bank file catalog behind the file status and date endpoints.
+"""
+
+import os
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from pathlib import Path
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from openpyxl import Workbook
+from rest_framework.test import APIClient
+
+from ..models import User, BankFile
+from ..services.file_catalog_service import FileCatalogService, content_hash
+
+
+class TestFileCatalog(TestCase):
+    """Test catalog reconciliation and that endpoints read the catalog, not the disk."""
+
+    def setUp(self):
+        """Set up input, output and upload trees in a scratch working directory."""
+        self.cwd = os.getcwd()
+        self.tmp = Path(tempfile.mkdtemp())
+        os.chdir(self.tmp)
+        self.settings_override = override_settings(BASE_DIR=self.tmp)
+        self.settings_override.enable()
+
+        for name in ['data/excel/input_files/JPM_securities_10_07_2025.xlsx',
+                     'data/excel/input_files/JPM_transactions_10_07_2025.xlsx',
+                     'data/excel/input_files/cs/CS_AA_001_securities_17_07_2025.xlsx',
+                     'data/excel/input_files/pershing/nonenriched_pershing/Pershing_BB_002_unitcost_17_07_2025.xlsx',
+                     'data/excel/securities_10_07_2025.xlsx',
+                     'data/excel/transactions_10_07_2025.xlsx',
+                     'aurum_backend/uploads/MS_securities_24_07_2025.xlsx']:
+            self.write(name, b'data')
+
+        self.catalog = FileCatalogService()
+        admin = User.objects.create_user(username='admin', password='pw', role='admin')
+        self.api = APIClient()
+        self.api.force_authenticate(admin)
+
+    def tearDown(self):
+        """Restore the working directory and remove the trees."""
+        self.settings_override.disable()
+        os.chdir(self.cwd)
+        shutil.rmtree(self.tmp)
+
+    def write(self, name, content):
+        path = Path(name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+        return path
+
+    def test_reconcile(self):
+        """Test that reconcile adds, refreshes and removes entries to match the disk."""
+        stats = self.catalog.reconcile()
+        self.assertEqual(stats['added'], 7)
+        entry = BankFile.objects.get(filename='CS_AA_001_securities_17_07_2025.xlsx')
+        self.assertEqual((entry.stage, entry.bank, entry.file_date, entry.file_type),
+                         ('input', 'CS', '17_07_2025', 'securities'))
+        self.assertEqual(entry.directory, 'data/excel/input_files/cs')
+        self.assertEqual(entry.content_hash, content_hash(entry.path))
+
+        self.write(entry.path, b'new contents')
+        Path('data/excel/transactions_10_07_2025.xlsx').unlink()
+        self.write('data/excel/input_files/idb/IDB_securities_17_07_2025.xlsx', b'data')
+
+        out = StringIO()
+        call_command('reconcile_file_catalog', '--dry-run', stdout=out)
+        self.assertIn('1 added, 1 updated, 1 removed, 5 unchanged', out.getvalue())
+        self.assertEqual(BankFile.objects.count(), 7)
+
+        call_command('reconcile_file_catalog', stdout=StringIO())
+        self.assertEqual(BankFile.objects.count(), 7)
+        entry.refresh_from_db()
+        self.assertEqual(entry.content_hash, content_hash(entry.path))
+        self.assertEqual(self.catalog.processed_dates(), set())
+
+    def test_endpoints_read_catalog(self):
+        """Test that status and date endpoints answer from the catalog, built on first use."""
+        response = self.api.get('/api/portfolio/bank-status/')
+        banks = {bank['bank_code']: bank for bank in response.data['banks']}
+        self.assertEqual(response.data['current_date'], '17_07_2025')
+        self.assertEqual((banks['CS']['file_count'], banks['CS']['file_types']['securities']), (1, 1))
+        self.assertEqual((banks['Pershing']['file_count'], banks['Pershing']['file_types']['unitcost']), (1, 1))
+        self.assertEqual(banks['JPM']['available_dates'], ['10_07_2025'])
+
+        # Files removed behind the catalog's back stay listed until reconciled
+        shutil.rmtree('data/excel/input_files/cs')
+        response = self.api.get('/api/portfolio/available-dates/')
+        self.assertEqual(response.data['dates'], ['17_07_2025'])
+        self.assertEqual(response.data['summary']['total_processed_dates'], 1)
+
+        self.catalog.reconcile(stages=['input'])
+        response = self.api.get('/api/portfolio/bank-status/')
+        self.assertEqual(response.data['current_date'], '17_07_2025')
+        banks = {bank['bank_code']: bank for bank in response.data['banks']}
+        self.assertEqual(banks['CS']['file_count'], 0)
+
+        files = self.api.get('/api/portfolio/files/list/').data
+        self.assertEqual([f['filename'] for f in files['files']], ['MS_securities_24_07_2025.xlsx'])
+        self.assertEqual(files['banks']['MS'][0]['date_detected'], '24_07_2025')
+
+    def test_upload_and_delete_update_catalog(self):
+        """Test that organizing an upload and deleting a file keep the catalog current."""
+        self.catalog.reconcile()
+        workbook = BytesIO()
+        Workbook().save(workbook)
+        upload = SimpleUploadedFile('HSBC_securities_24_07_2025.xlsx', workbook.getvalue())
+        response = self.api.post('/api/portfolio/files/upload/', {'files': [upload]}, format='multipart')
+        self.assertEqual(response.data['successful_uploads'], 1)
+
+        entry = BankFile.objects.get(filename='HSBC_securities_24_07_2025.xlsx')
+        self.assertEqual((entry.stage, entry.directory), ('input', 'data/excel/input_files/hsbc'))
+        self.assertEqual(entry.content_hash, content_hash(entry.path))
+        self.assertIn('24_07_2025', self.api.get('/api/portfolio/available-dates/').data['dates'])
+
+        self.api.delete('/api/portfolio/files/MS_securities_24_07_2025.xlsx/')
+        self.assertFalse(BankFile.objects.filter(filename='MS_securities_24_07_2025.xlsx').exists())
@@ -0,0 +1,83 @@
+"""
+Test suite for the cached maintenance-mode state and middleware responses.
+"""
+
+import json
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest import mock
+
+from django.test import SimpleTestCase, RequestFactory, override_settings
+
+from core.maintenance import MaintenanceMode
+from core.middleware import MaintenanceModeMiddleware
+
+
+@override_settings(MAINTENANCE_POLL_INTERVAL_MS=60000)
+class TestMaintenanceModeState(SimpleTestCase):
+    """Test that maintenance state is polled, not read per request."""
+
+    def setUp(self):
+        """Set up a maintenance flag in a temporary directory."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.maintenance = MaintenanceMode()
+        self.maintenance.flag_file = Path(self.tmp.name) / 'maintenance_mode'
+        self.middleware = MaintenanceModeMiddleware(lambda request: None)
+        self.middleware.maintenance = self.maintenance
+        self.factory = RequestFactory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_no_filesystem_access_between_polls(self):
+        """Test that repeated checks reuse the snapshot."""
+        self.assertFalse(self.maintenance.is_active())
+        with mock.patch('core.maintenance.os.stat') as stat:
+            for _ in range(5):
+                self.assertIsNone(self.middleware.process_request(self.factory.get('/api/portfolio/health/')))
+        stat.assert_not_called()
+
+    def test_enable_and_disable_take_effect_in_process(self):
+        """Test that enable()/disable() invalidate the snapshot immediately."""
+        self.maintenance.is_active()
+        self.maintenance.enable(message='Restoring backup')
+        response = self.middleware.process_request(self.factory.get('/api/portfolio/snapshots/'))
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(json.loads(response.content)['message'], 'Restoring backup')
+
+        self.maintenance.disable()
+        self.assertIsNone(self.middleware.process_request(self.factory.get('/api/portfolio/snapshots/')))
+
+    def test_external_change_seen_after_poll_interval(self):
+        """Test that a flag written by another process is picked up on the next poll."""
+        self.maintenance.is_active()
+        self.maintenance.flag_file.write_text(json.dumps({'message': 'External', 'start_time': datetime.now().isoformat()}))
+        self.assertFalse(self.maintenance.is_active())
+
+        with self.settings(MAINTENANCE_POLL_INTERVAL_MS=0):
+            self.assertTrue(self.maintenance.is_active())
+            self.assertEqual(self.maintenance.current_state().info['message'], 'External')
+
+    def test_rendered_once_per_version(self):
+        """Test that the maintenance page is rendered once and served as fresh responses."""
+        self.maintenance.enable(message='Back soon')
+        with mock.patch.object(self.middleware, '_create_html_maintenance_response',
+                               wraps=self.middleware._create_html_maintenance_response) as render:
+            first = self.middleware.process_request(self.factory.get('/'))
+            second = self.middleware.process_request(self.factory.get('/'))
+        render.assert_called_once()
+        self.assertIsNot(first, second)
+        self.assertEqual(first.status_code, 503)
+        self.assertEqual(second['Retry-After'], '30')
+        self.assertIn(b'Back soon', second.content)
+
+    def test_timeout_disables(self):
+        """Test the automatic timeout on the cached state."""
+        self.maintenance.enable(timeout_minutes=1)
+        self.assertTrue(self.maintenance.is_active())
+        with mock.patch('core.maintenance.datetime') as clock:
+            clock.now.return_value = datetime.now() + timedelta(minutes=2)
+            clock.fromisoformat = datetime.fromisoformat
+            self.assertFalse(self.maintenance.is_active())
+        self.assertFalse(self.maintenance.flag_file.exists())
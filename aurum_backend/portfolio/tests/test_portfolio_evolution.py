@@ -0,0 +1,88 @@
+"""
+Test suite for the pre-computed portfolio evolution series.
+"""
+
+from datetime import date
+from decimal import Decimal
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from ..models import User, Client, PortfolioSnapshot, PortfolioEvolutionPoint
+from ..services.portfolio_evolution_service import PortfolioEvolutionService
+
+
+class TestPortfolioEvolutionService(TestCase):
+    """Test incremental maintenance of the evolution series."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.service = PortfolioEvolutionService()
+
+    def test_firm_total_tracks_client_points(self):
+        """Test that the ALL point sums the points of clients with at least two snapshots."""
+        self.service.record_client_value('AAA', '2025-07-10', 1000.0)
+        self.service.record_client_value('BBB', '2025-07-10', 250.5)
+        self.assertEqual(self.service.get_series('ALL')['values'], [])
+
+        self.service.record_client_value('AAA', '2025-07-17', 1100.0)
+        series = self.service.get_series('ALL')
+        self.assertEqual(series['dates'], ['2025-07-10', '2025-07-17'])
+        self.assertEqual(series['values'], [1000.0, 1100.0])
+
+        self.service.record_client_value('BBB', '2025-07-17', 300.0)
+        self.assertEqual(self.service.get_series('ALL')['values'], [1250.5, 1400.0])
+
+    def test_recalculation_replaces_point(self):
+        """Test that re-recording a date updates rather than duplicates."""
+        self.service.record_client_value('AAA', date(2025, 7, 3), 800.0)
+        self.service.record_client_value('AAA', date(2025, 7, 10), 1000.0)
+        self.service.record_client_value('AAA', date(2025, 7, 10), 900.0)
+
+        self.assertEqual(PortfolioEvolutionPoint.objects.filter(client_filter='AAA').count(), 2)
+        firm_point = PortfolioEvolutionPoint.objects.get(client_filter='ALL', snapshot_date=date(2025, 7, 10))
+        self.assertEqual(firm_point.total_value, Decimal('900.00'))
+
+    def test_deleted_snapshots_leave_the_series(self):
+        """Test that deleting snapshots removes their points and drops clients below two snapshots."""
+        client = Client.objects.create(code='AAA', name='Client AAA')
+        for day, value in [(3, 800.0), (10, 1000.0)]:
+            PortfolioSnapshot.objects.create(client=client, snapshot_date=date(2025, 7, day))
+            self.service.record_client_value('AAA', date(2025, 7, day), value)
+        self.assertEqual(self.service.get_series('ALL')['values'], [800.0, 1000.0])
+
+        PortfolioSnapshot.objects.filter(snapshot_date=date(2025, 7, 10)).delete()
+        self.assertEqual(self.service.get_series('AAA')['dates'], ['2025-07-03'])
+        self.assertIsNone(self.service.build_evolution_chart('ALL'))
+
+        client.delete()
+        self.assertFalse(PortfolioEvolutionPoint.objects.exists())
+
+    def test_chart_empty_without_points(self):
+        """Test that callers get None so they can fall back to live calculation."""
+        self.assertIsNone(self.service.build_evolution_chart('ALL'))
+
+
+class TestPortfolioEvolutionEndpoint(TestCase):
+    """Test the compact evolution endpoint and its conditional GET support."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.admin = User.objects.create_user(username='admin', password='pw', role='admin')
+        self.api = APIClient()
+        self.api.force_authenticate(self.admin)
+        PortfolioEvolutionService().record_client_value('AAA', '2025-07-03', 900.0)
+        PortfolioEvolutionService().record_client_value('AAA', '2025-07-10', 1000.0)
+
+    def test_etag_revalidation(self):
+        """Test that a matching If-None-Match returns 304 until the series changes."""
+        url = '/api/portfolio/dashboard/portfolio-evolution/'
+        response = self.api.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['values'], [900.0, 1000.0])
+
+        etag = response['ETag']
+        self.assertEqual(self.api.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        PortfolioEvolutionService().record_client_value('AAA', '2025-07-17', 1200.0)
+        self.assertEqual(self.api.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
@@ -0,0 +1,75 @@
+"""
+Test suite for the columnar PositionFrame and the services reading it.
+"""
+
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.test import TestCase
+
+from ..models import Client, Asset, PortfolioSnapshot, Position
+from ..services.enhanced_report_service import EnhancedReportService
+from ..services.portfolio_calculation_service import PortfolioCalculationService
+from ..services.position_frame import PositionFrame
+
+
+class TestPositionFrame(TestCase):
+    """Test that frame reductions match the per-position loops they replaced."""
+
+    def setUp(self):
+        """Set up a snapshot with equities, cash, two bonds and an ALT position."""
+        client = Client.objects.create(code='AAA', name='Client AAA')
+        self.snapshot = PortfolioSnapshot.objects.create(client=client, snapshot_date=date(2025, 7, 10))
+        today = date.today()
+        rows = [
+            ('AAPL', 'Equities', 'JPM', '001', 1000, 800, 10, None, None),
+            ('BOND1', 'Fixed Income', 'CS', '', 2000, 2100, 2000, 5.0, today + timedelta(days=400)),
+            ('CASH', 'Cash', 'JPM', '001', 500, 500, 500, None, None),
+            ('BOND2', 'Fixed Income', 'JPM', '002', 3000, 2900, 3000, 4.0, today + timedelta(days=3000)),
+            ('HEDGE', 'Alternatives', 'ALT', '', 9000, 9000, 1, None, None),
+        ]
+        for ticker, asset_type, bank, account, value, cost, quantity, coupon, maturity in rows:
+            asset = Asset.objects.create(name=f'{ticker} NAME', ticker=ticker, asset_type=asset_type, bank=bank,
+                                         account=account, client='AAA', maturity_date=maturity)
+            Position.objects.create(snapshot=self.snapshot, asset=asset, market_value=Decimal(value),
+                                    cost_basis=Decimal(cost), quantity=Decimal(quantity), bank=bank,
+                                    account=account, coupon_rate=coupon,
+                                    estimated_annual_income=Decimal(coupon * quantity / 100) if coupon else None)
+
+    def test_frame_columns_and_reductions(self):
+        """Test one-query construction, grouped sums in appearance order and maturity buckets."""
+        positions = Position.objects.filter(snapshot=self.snapshot).exclude_alt()
+        with self.assertNumQueries(1):
+            frame = PositionFrame.from_queryset(positions)
+        loaded = PositionFrame.from_positions(positions.select_related('asset').order_by('id'))
+
+        self.assertEqual(len(frame), 4)
+        self.assertEqual(frame.total_value, 6500.0)
+        self.assertEqual(list(frame.sum_by_asset_type()), ['Equities', 'Fixed Income', 'Cash'])
+        self.assertEqual(frame.sum_by_bank(), {'JPM': 4500.0, 'CS': 2000.0})
+        self.assertEqual(list(frame.custody_labels()), ['JPM 001', 'CS', 'JPM 001', 'JPM 002'])
+        self.assertEqual(list(frame.maturity_buckets()), [0.0, 2000.0, 0.0, 0.0, 0.0, 3000.0])
+        self.assertEqual(frame.coupon_income(), 220.0)
+        self.assertEqual(loaded.sum_by_asset_type(), frame.sum_by_asset_type())
+        self.assertIs(PositionFrame.of(frame), frame)
+        self.assertEqual(len(PositionFrame.from_rows([])), 0)
+
+    def test_services_on_frames(self):
+        """Test the calculation and report services' allocations from a frame."""
+        metrics = PortfolioCalculationService().calculate_portfolio_metrics('AAA', '2025-07-10')
+        self.assertEqual(metrics['position_count'], 4)
+        self.assertEqual(metrics['custody_allocation']['JPM 001'], {'value': 1500.0, 'percentage': 1500 / 65})
+        self.assertEqual(metrics['bond_maturity_distribution']['6+ Years'], {'value': 3000.0, 'percentage': 60.0})
+        self.assertEqual(metrics['estimated_annual_income'], 220.0)
+        self.assertEqual([bond['ticker'] for bonds in metrics['bond_maturity'].values() for bond in bonds['bonds']],
+                         ['BOND1', 'BOND2'])
+        self.assertEqual(metrics['positions_by_type']['Fixed Income'][0]['annual_income'], 100.0)
+
+        report = EnhancedReportService()
+        positions = list(Position.objects.filter(snapshot=self.snapshot).exclude_alt().select_related('asset'))
+        self.assertEqual(report._calculate_asset_allocation(positions)['Cash/Money Market'],
+                         {'market_value': 500.0, 'percentage': 7.69})
+        self.assertEqual(list(report._calculate_custody_allocation(positions)), ['001 JPM', 'CS', '002 JPM'])
+        charts = report._generate_snapshot_charts(positions)
+        self.assertEqual(charts['bond_maturity_distribution']['data'], [0.0, 2000.0, 0.0, 0.0, 0.0, 3000.0])
+        self.assertEqual(charts['bank_allocation']['labels'], ['JPM', 'CS'])
@@ -0,0 +1,119 @@
+"""
+Test suite for hot-path query plans and query counts.
+
+Each hot service method is run with its queries captured; every captured query is
+then EXPLAINed to check the purpose-built indexes are used and the position and
+transaction tables are never fully scanned. Plan checks run on SQLite (the test
+database here); query counts are checked on every backend.
+"""
+
+import re
+from datetime import date
+from decimal import Decimal
+from unittest import skipUnless
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from ..models import Client, Asset, PortfolioSnapshot, Position, Transaction
+from ..services.consolidated_data_service import ConsolidatedDataLoader
+from ..services.modified_dietz_service import ModifiedDietzService
+from ..services.portfolio_calculation_service import PortfolioCalculationService
+from ..services.snapshot_diff_service import SnapshotDiffService
+
+HOT_TABLES = ('portfolio_position', 'portfolio_transaction')
+
+
+def query_plan(sql):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return '\n'.join(row[-1] for row in cursor.fetchall())
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class TestHotPathQueryPlans(TestCase):
+    """Test index usage and query counts of the hot service methods."""
+
+    def setUp(self):
+        """Set up two clients with two snapshots, ALT and non-ALT positions and transactions."""
+        cache.clear()
+        for code in ['AAA', 'BBB']:
+            client = Client.objects.create(code=code, name=f'Client {code}')
+            for bank in ['JPM', 'ALT']:
+                asset = Asset.objects.create(name=f'{code} {bank} HOLDING', ticker=f'{code}{bank}',
+                                             asset_type='Equities', bank=bank, account='001', client=code)
+                for day, value in [(3, 1000), (10, 1100)]:
+                    snapshot, _ = PortfolioSnapshot.objects.get_or_create(client=client,
+                                                                          snapshot_date=date(2025, 7, day))
+                    Position.objects.create(snapshot=snapshot, asset=asset, bank=bank, account='001',
+                                            market_value=Decimal(value), quantity=Decimal('10'))
+                Transaction.objects.create(client=client, asset=asset, date=date(2025, 7, 7),
+                                           transaction_type='DEPOSIT', amount=Decimal('50'), bank=bank,
+                                           account='001', transaction_id=f'{code}-{bank}')
+
+    def capture(self, func, *args):
+        with CaptureQueriesContext(connection) as captured:
+            func(*args)
+        return [query['sql'] for query in captured.captured_queries]
+
+    def assert_plans(self, queries, expected_indexes):
+        """Every read of a hot table goes through an index; the expected ones are used."""
+        plans = [query_plan(sql) for sql in queries if sql.lstrip().upper().startswith('SELECT')]
+        for plan in plans:
+            for table in HOT_TABLES:
+                self.assertIsNone(re.search(rf'\bSCAN {table}\b(?! USING)', plan), plan)
+        combined = '\n'.join(plans)
+        for index in expected_indexes:
+            self.assertIn(index, combined)
+
+    def test_snapshot_diff(self):
+        """Test that a snapshot diff is two index searches on non-ALT positions."""
+        queries = self.capture(SnapshotDiffService()._build, 'AAA', '2025-07-03', '2025-07-10')
+        self.assertEqual(len(queries), 2)
+        if connection.vendor == 'sqlite':
+            self.assert_plans(queries, ['position_snapshot_cover_idx'])
+
+    def test_modified_dietz_inputs(self):
+        """Test portfolio value and period transactions lookups."""
+        service = ModifiedDietzService()
+        queries = self.capture(service._get_portfolio_value_on_date, 'AAA', date(2025, 7, 10))
+        queries += self.capture(service._get_transactions_for_period, 'AAA', date(2025, 7, 3), date(2025, 7, 10))
+        self.assertEqual(len(queries), 2)
+        if connection.vendor == 'sqlite':
+            self.assert_plans(queries, ['position_snapshot_cover_idx', 'transaction_nonalt_date_idx'])
+
+    def test_latest_snapshot_per_client(self):
+        """Test latest/previous snapshot lookups and the consolidated loader."""
+        loader = ConsolidatedDataLoader()
+        queries = self.capture(loader.load)
+        self.assertEqual(len(queries), 2)
+        self.assertEqual(loader.get('BBB').snapshot.snapshot_date, date(2025, 7, 10))
+
+        client = Client.objects.get(code='AAA')
+        previous = self.capture(PortfolioCalculationService()._get_previous_snapshot, client, '2025-07-10')
+        self.assertEqual(len(previous), 1)
+        if connection.vendor == 'sqlite':
+            self.assert_plans(queries, [])
+            self.assertRegex(query_plan(previous[0]), r'SEARCH portfolio_snapshot USING (COVERING )?INDEX')
+
+    @skipUnless(connection.vendor == 'sqlite', 'plan assertions use SQLite EXPLAIN QUERY PLAN')
+    def test_portfolio_metrics_never_scans_hot_tables(self):
+        """Test the full metrics calculation for full scans of positions and transactions."""
+        queries = self.capture(PortfolioCalculationService().calculate_portfolio_metrics, 'AAA', '2025-07-10')
+        self.assert_plans(queries, ['position_snapshot_cover_idx'])
+
+    def test_exclude_alt_matches_asset_bank(self):
+        """Test that exclude_alt decides ALT by the asset's bank, whatever the position's parsed bank."""
+        alt = Asset.objects.get(ticker='AAAALT')
+        position = Position.objects.filter(asset=alt).first()
+        position.bank = 'JPM'
+        position.save()
+        self.assertEqual(Position.objects.get(pk=position.pk).bank, 'JPM')
+        Position.objects.filter(snapshot__client__code='AAA', asset__bank='JPM').update(bank='ALT')
+
+        positions = Position.objects.filter(snapshot__client__code='AAA').exclude_alt()
+        self.assertEqual({p.asset.bank for p in positions}, {'JPM'})
+        self.assertEqual(positions.count(), Position.objects.filter(snapshot__client__code='AAA')
+                         .exclude(asset__bank='ALT').count())
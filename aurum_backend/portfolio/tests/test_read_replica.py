@@ -0,0 +1,132 @@
+"""
+Test suite for read-replica routing.
+"""
+
+from unittest import mock
+
+from django.db import router
+from django.http import HttpResponse
+from django.test import SimpleTestCase, RequestFactory, override_settings
+from rest_framework.test import force_authenticate
+
+from core import db_router
+from core.middleware import ReadReplicaMiddleware
+from .. import views
+from ..models import Position, ExportJob, User
+from ..services.consolidated_data_service import ConsolidatedDataLoader
+
+REPLICA = {'ALIAS': 'replica', 'MAX_LAG_SECONDS': 30, 'LAG_CHECK_SECONDS': 5, 'PIN_SECONDS': 10}
+
+
+@override_settings(REPLICA_SETTINGS=REPLICA)
+class TestReadReplicaRouting(SimpleTestCase):
+    """Test replica scopes, read-your-writes pinning and lag fallback."""
+
+    def setUp(self):
+        """Set up a replica with no lag and a middleware recording where reads go."""
+        db_router._lag_checks.clear()
+        patcher = mock.patch('core.db_router.measure_replica_lag', return_value=0.0)
+        self.lag = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.factory = RequestFactory()
+        self.reads = []
+
+        def view(request):
+            self.reads.append(Position.objects.all().db)
+            if request.GET.get('write'):
+                router.db_for_write(Position)
+                self.reads.append(Position.objects.all().db)
+            return HttpResponse('ok')
+        self.middleware = ReadReplicaMiddleware(view)
+
+    def test_reads_outside_scope_use_primary(self):
+        """Test that plain code paths are unaffected."""
+        self.assertEqual(Position.objects.all().db, 'default')
+        with db_router.replica_scope():
+            self.assertEqual(Position.objects.all().db, 'replica')
+            self.assertEqual(router.db_for_write(Position), 'default')
+            self.assertEqual(Position.objects.all().db, 'default')
+
+    def test_get_requests_read_from_replica(self):
+        """Test GET routing and the read-your-writes pin after a mutation."""
+        response = self.middleware(self.factory.get('/api/portfolio/admin/dashboard/'))
+        self.assertNotIn(db_router.PIN_COOKIE, response.cookies)
+
+        response = self.middleware(self.factory.post('/api/portfolio/admin/update-database/'))
+        self.assertEqual(response.cookies[db_router.PIN_COOKIE]['max-age'], 10)
+
+        request = self.factory.get('/api/portfolio/admin/dashboard/')
+        request.COOKIES[db_router.PIN_COOKIE] = '1'
+        self.middleware(request)
+        self.assertEqual(self.reads, ['replica', 'default', 'default'])
+
+    def test_write_during_get_pins_rest_of_request(self):
+        """Test that a GET which writes reads its own writes and pins the client."""
+        response = self.middleware(self.factory.get('/api/portfolio/client/dashboard/', {'write': '1'}))
+        self.assertEqual(self.reads, ['replica', 'default'])
+        self.assertIn(db_router.PIN_COOKIE, response.cookies)
+
+    def test_lagging_replica_falls_back(self):
+        """Test the lag threshold and that lag is re-measured only periodically."""
+        self.lag.return_value = 120.0
+        with db_router.replica_scope():
+            self.assertEqual(Position.objects.all().db, 'default')
+            self.lag.return_value = 0.0
+            self.assertEqual(Position.objects.all().db, 'default')
+        self.assertEqual(self.lag.call_count, 1)
+
+        db_router._lag_checks.clear()
+        self.lag.side_effect = Exception('connection refused')
+        with db_router.replica_scope():
+            self.assertEqual(Position.objects.all().db, 'default')
+
+    def test_read_only_services(self):
+        """Test that decorated service reads open a replica scope unless pinned."""
+        with mock.patch.object(ConsolidatedDataLoader, 'load', db_router.replica_reads(
+                lambda loader: Position.objects.all().db)):
+            self.assertEqual(ConsolidatedDataLoader().load(), 'replica')
+            with db_router.replica_scope():
+                db_router.pin_to_primary()
+                self.assertEqual(ConsolidatedDataLoader().load(), 'default')
+
+    @override_settings(REPLICA_SETTINGS={**REPLICA, 'ALIAS': None})
+    def test_disabled_without_replica(self):
+        """Test that no replica alias means every read uses the primary."""
+        response = self.middleware(self.factory.post('/api/portfolio/admin/update-database/'))
+        self.assertNotIn(db_router.PIN_COOKIE, response.cookies)
+        with db_router.replica_scope():
+            self.assertEqual(Position.objects.all().db, 'default')
+        self.assertTrue(router.allow_migrate('replica', 'portfolio'))
+
+    def test_service_after_write_reads_primary(self):
+        """Test that read-only services called by mutations and pinned requests read the primary."""
+        read = db_router.replica_reads(lambda: Position.objects.all().db)
+        with db_router.replica_scope(allowed=False):
+            self.assertEqual(read(), 'default')
+            router.db_for_write(Position)
+            self.assertEqual(read(), 'default')
+
+        response = self.middleware(self.factory.post('/api/portfolio/admin/update-database/'))
+        request = self.factory.get('/api/portfolio/admin/dashboard/')
+        request.COOKIES[db_router.PIN_COOKIE] = response.cookies[db_router.PIN_COOKIE].value
+        pinned = ReadReplicaMiddleware(lambda request: HttpResponse(read()))(request)
+        self.assertEqual(pinned.content, b'default')
+        with db_router.replica_scope():
+            self.assertEqual(read(), 'replica')
+            router.db_for_write(Position)
+            self.assertEqual(read(), 'default')
+
+    def test_export_job_status_reads_primary(self):
+        """Test that export job status is read from the primary even in a replica scope."""
+        reads = []
+
+        def get(**kwargs):
+            reads.append(router.db_for_read(ExportJob))
+            raise ExportJob.DoesNotExist
+
+        request = self.factory.get('/api/portfolio/export/jobs/1/')
+        force_authenticate(request, User(username='admin', role='admin'))
+        with mock.patch.object(ExportJob.objects, 'get', side_effect=get):
+            response = ReadReplicaMiddleware(lambda request: views.get_export_job(request, job_id='1'))(request)
+        self.assertEqual((response.status_code, reads), (404, ['default']))
+        self.assertNotIn(db_router.PIN_COOKIE, response.cookies)
@@ -0,0 +1,179 @@
+"""
+Test suite for the load-once weekly report data context and the section cache.
+"""
+
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from ..models import Client, Asset, PortfolioSnapshot, Position, Transaction
+from ..services.enhanced_report_service import EnhancedReportService
+from ..services.modified_dietz_service import ModifiedDietzService
+from ..services.report_data_context import ReportDataContext
+from ..services.report_section_cache import ReportSectionCache
+from ..utils.dietz_cache import bump_client_data_version, dietz_result_cache
+from ..utils.response_cache import bump_generation, PORTFOLIO_DATA
+
+# Client, snapshot series, both snapshots' positions, snapshot values, transactions
+REPORT_QUERIES = 5
+
+
+class ReportFixture:
+    """Weekly snapshots of one client and a report generator with benchmarks stubbed."""
+
+    def setUp(self):
+        """Set up weekly snapshots with equity, bond, cash and ALT holdings and some flows."""
+        cache.clear()
+        dietz_result_cache.clear_local()
+        self.client_obj = Client.objects.create(code='AAA', name='Client AAA')
+
+        def asset(name, ticker, bank, asset_type):
+            return Asset.objects.create(name=name, ticker=ticker, asset_type=asset_type, bank=bank,
+                                        account='001', client='AAA', maturity_date=date(2027, 1, 15)
+                                        if asset_type == 'Fixed Income' else None)
+
+        self.assets = [
+            asset('APPLE INC', 'AAPL', 'JPM', 'Equities'),
+            asset('US TREASURY', '', 'JPM', 'Fixed Income'),
+            asset('CASH', '', 'JPM', 'Cash'),
+            asset('ALT FUND', 'ALTF', 'ALT', 'Alternatives'),
+        ]
+        self.dates = [date(2025, 7, 3) + timedelta(weeks=week) for week in range(4)]
+        for week in range(4):
+            self.add_snapshot(week)
+
+        for day, transaction_type, amount, bank in [
+            (date(2025, 7, 8), 'ACH Deposit', '25000', 'JPM'),
+            (date(2025, 7, 15), 'Dividend', '1200', 'JPM'),
+            (date(2025, 7, 21), 'Misc. Disbursement', '-10000', 'JPM'),
+            (date(2025, 7, 22), 'ACH Deposit', '500000', 'ALT'),
+        ]:
+            Transaction.objects.create(client=self.client_obj, asset=self.assets[0], date=day, bank=bank,
+                                       transaction_type=transaction_type, amount=Decimal(amount),
+                                       account='001', transaction_id=f'{day}-{transaction_type}-{bank}')
+
+    def add_snapshot(self, week):
+        snapshot_date = date(2025, 7, 3) + timedelta(weeks=week)
+        snapshot = PortfolioSnapshot.objects.create(client=self.client_obj, snapshot_date=snapshot_date,
+                                                    portfolio_metrics={'total_value': 1000000 + week})
+        for i, held in enumerate(self.assets):
+            value = Decimal(100000 * (i + 1) + 3000 * week * (1 if i % 2 else -1))
+            Position.objects.create(snapshot=snapshot, asset=held, market_value=value, cost_basis=Decimal(90000),
+                                    quantity=Decimal(1000), price=value / 1000, bank=held.bank, account='001')
+        return snapshot
+
+    def generate(self, current_date, comparison_date=None):
+        service = EnhancedReportService()
+        with patch.object(service.benchmark_service, 'get_benchmark_data', return_value={}):
+            return service.generate_weekly_report('AAA', current_date, comparison_date)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class TestReportDataContext(ReportFixture, TestCase):
+    """Test that a weekly report reads its data once and computes the same returns."""
+
+    def test_constant_query_count(self):
+        """Test that a report costs the same queries however long the history is."""
+        with self.assertNumQueries(REPORT_QUERIES):
+            html = self.generate('2025-07-24')
+        self.assertIn('Client AAA', html)
+
+        for week in range(4, 10):
+            self.add_snapshot(week)
+        cache.clear()
+        dietz_result_cache.clear_local()
+        with self.assertNumQueries(REPORT_QUERIES):
+            self.generate('2025-09-04', '2025-07-24')
+
+    def test_first_report(self):
+        """Test that a client's first report skips the values and transactions it does not need."""
+        with self.assertNumQueries(REPORT_QUERIES - 2):
+            self.generate('2025-07-03')
+
+    def test_returns_match_dietz_service(self):
+        """Test that context returns equal the queried Modified Dietz breakdown (ALT flows excluded)."""
+        data = ReportDataContext.load('AAA', '2025-07-24')
+        self.assertEqual(data.comparison_date, '2025-07-17')
+        dietz = ModifiedDietzService()
+        for start in self.dates[:-1]:
+            expected = dietz.calculate_portfolio_return_detailed('AAA', start, self.dates[-1])
+            self.assertEqual(data.dietz(start, self.dates[-1]), expected)
+        self.assertEqual(data.dietz(self.dates[0], self.dates[1])['external_flow_count'], 1)
+
+        with self.assertNumQueries(0):
+            data.dietz(self.dates[0], self.dates[-1])
+            self.assertEqual(len(data.transactions_between(self.dates[2], self.dates[3])), 2)
+
+    def test_missing_snapshot(self):
+        """Test that unknown report dates still raise DoesNotExist."""
+        with self.assertRaises(PortfolioSnapshot.DoesNotExist):
+            ReportDataContext.load('AAA', '2025-07-04')
+        data = ReportDataContext.load('AAA', '2025-07-24', '2025-07-05')
+        self.assertEqual(data.comparison_date, '2025-07-24')
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class TestReportSectionCache(ReportFixture, TestCase):
+    """Test that date-only sections are reused and chart series grow incrementally."""
+
+    def test_rerender_reuses_sections(self):
+        """Test that another comparison date does not rebuild the current date's sections."""
+        self.generate('2025-07-24')
+        with patch.object(EnhancedReportService, '_generate_position_tables_html', side_effect=AssertionError), \
+                patch.object(EnhancedReportService, '_generate_position_tables', side_effect=AssertionError), \
+                patch.object(EnhancedReportService, '_generate_snapshot_charts', side_effect=AssertionError):
+            html = self.generate('2025-07-24', '2025-07-10')
+        self.assertIn('APPLE INC', html)
+
+        bump_generation(PORTFOLIO_DATA)
+        Position.objects.filter(asset=self.assets[0]).update(market_value=Decimal('123456.78'))
+        self.assertIn('123,456.78', self.generate('2025-07-24', '2025-07-10'))
+
+    def test_series_extend_incrementally(self):
+        """Test that a new date adds one cumulative point to the previous date's series."""
+        self.generate('2025-07-17')
+        with self.captureOnCommitCallbacks(execute=True):  # a new upload, as population bumps
+            bump_generation(PORTFOLIO_DATA)
+            bump_client_data_version('AAA')
+
+        periods = []
+        original = ModifiedDietzService.calculate_return_from_data
+
+        def record(service, client, start_date, end_date, *args):
+            periods.append((start_date, end_date))
+            return original(service, client, start_date, end_date, *args)
+
+        with patch.object(ModifiedDietzService, 'calculate_return_from_data', autospec=True, side_effect=record):
+            self.generate('2025-07-24')
+        self.assertIn((self.dates[0], self.dates[3]), periods)
+        self.assertNotIn((self.dates[0], self.dates[1]), periods)
+
+        service = EnhancedReportService()
+        client = Client.objects.get(code='AAA')
+        data = ReportDataContext.load('AAA', '2025-07-24', section_cache=ReportSectionCache('AAA'))
+        incremental = service._generate_cumulative_return_chart(client, '2025-07-24', data)
+        self.assertEqual(len(incremental['series'][0]['data']), 4)
+        self.assertEqual(incremental, service._generate_cumulative_return_chart(client, '2025-07-24'))
+
+    def test_late_transaction_rebuilds_series(self):
+        """Test that a transaction posted into an earlier period rebuilds the cached series."""
+        service = EnhancedReportService()
+        client = Client.objects.get(code='AAA')
+
+        def chart():
+            data = ReportDataContext.load('AAA', '2025-07-24', section_cache=ReportSectionCache('AAA'))
+            return service._generate_cumulative_return_chart(client, '2025-07-24', data)
+        before = chart()
+
+        Transaction.objects.create(client=self.client_obj, asset=self.assets[0], date=date(2025, 7, 9), bank='JPM',
+                                   transaction_type='Misc. Receipt', amount=Decimal('300000'), account='001',
+                                   transaction_id='late-deposit')
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_client_data_version('AAA')
+
+        after = chart()
+        self.assertNotEqual(after['series'][0]['data'][1], before['series'][0]['data'][1])
+        self.assertEqual(after, service._generate_cumulative_return_chart(client, '2025-07-24'))
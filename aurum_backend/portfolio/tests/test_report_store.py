@@ -0,0 +1,163 @@
+"""
+Test suite for the compressed, content-addressed report store.
+"""
+
+import base64
+import gzip
+import shutil
+import tempfile
+from datetime import date
+from io import StringIO
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from ..models import User, Client, Report
+from ..utils import report_store
+from ..utils.report_utils import save_report_html, load_report_html, report_exists
+
+HTML = '<html><body><h1>Weekly report</h1>' + '<p>Position row</p>' * 200 + '</body></html>'
+
+
+class ReportStoreTestMixin:
+    """Point REPORTS_DIR at a temporary directory."""
+
+    def setUp(self):
+        """Set up a temporary report directory."""
+        self.reports_dir = Path(tempfile.mkdtemp())
+        aurum_settings = dict(settings.AURUM_SETTINGS, REPORTS_DIR=self.reports_dir)
+        self.settings_override = override_settings(AURUM_SETTINGS=aurum_settings)
+        self.settings_override.enable()
+
+    def tearDown(self):
+        """Remove the temporary report directory."""
+        self.settings_override.disable()
+        shutil.rmtree(self.reports_dir, ignore_errors=True)
+
+
+class TestReportStore(ReportStoreTestMixin, TestCase):
+    """Test saving, loading and deduplication."""
+
+    def test_round_trip(self):
+        """Test that a saved report loads back unchanged and is stored compressed."""
+        relative_path, size = save_report_html('AAA', 'weekly', '2025-07-10', HTML)
+
+        self.assertEqual(relative_path, 'AAA/weekly_reports/weekly_report_2025-07-10.html')
+        self.assertEqual(size, len(HTML.encode('utf-8')))
+        self.assertEqual(load_report_html(relative_path), HTML)
+        self.assertTrue(report_exists('AAA', 'weekly', '2025-07-10'))
+
+        stored = report_store.read_reference(self.reports_dir / relative_path)
+        object_path = report_store.get_object_path(stored.sha256, 'gzip')
+        self.assertLess(object_path.stat().st_size, size)
+
+    def test_identical_content_is_stored_once(self):
+        """Test that two reports with the same body share one object."""
+        save_report_html('AAA', 'weekly', '2025-07-10', HTML)
+        save_report_html('BBB', 'weekly', '2025-07-10', HTML)
+
+        objects = list((self.reports_dir / '_store' / 'objects').rglob('*.html.gz'))
+        self.assertEqual(len(objects), 1)
+
+    def test_legacy_plain_file_still_loads(self):
+        """Test that reports written before the store are read as before."""
+        legacy = self.reports_dir / 'AAA' / 'weekly_reports' / 'weekly_report_2025-07-03.html'
+        legacy.parent.mkdir(parents=True)
+        legacy.write_text(HTML, encoding='utf-8')
+
+        self.assertEqual(load_report_html('AAA/weekly_reports/weekly_report_2025-07-03.html'), HTML)
+
+    def test_shared_static_asset_referenced(self):
+        """Test that an inlined copy of a static file becomes a URL reference."""
+        logo_path = Path(settings.STATICFILES_DIRS[0]) / 'images' / 'logo.png'
+        if not logo_path.exists():
+            self.skipTest('logo.png not available')
+
+        logo_b64 = base64.b64encode(logo_path.read_bytes()).decode('ascii')
+        html = f'<img src="data:image/png;base64,{logo_b64}">'
+
+        aurum_settings = dict(settings.AURUM_SETTINGS, REPORT_STATIC_URL='https://example.com/static/')
+        with override_settings(AURUM_SETTINGS=aurum_settings):
+            relative_path, _ = save_report_html('AAA', 'weekly', '2025-07-10', html)
+            self.assertEqual(load_report_html(relative_path),
+                             '<img src="https://example.com/static/images/logo.png">')
+
+    def test_prune_unreferenced_objects(self):
+        """Test that the prune command removes only old objects no reference points at."""
+        relative_path, _ = save_report_html('AAA', 'weekly', '2025-07-10', HTML)
+        save_report_html('AAA', 'weekly', '2025-07-10', HTML + '<!-- regenerated -->')
+        objects = self.reports_dir / '_store' / 'objects'
+        count = len(list(objects.rglob('*.html.*')))
+
+        self.assertEqual(report_store.prune_unreferenced_objects(), 0)  # too recent
+        out = StringIO()
+        call_command('prune_report_store', '--min-age-hours', '0', '--dry-run', stdout=out)
+        self.assertIn('Would prune', out.getvalue())
+        self.assertEqual(len(list(objects.rglob('*.html.*'))), count)
+
+        removed = report_store.prune_unreferenced_objects(min_age_seconds=0)
+        self.assertEqual(removed, len(report_store.available_encodings()))
+        self.assertEqual(len(list(objects.rglob('*.html.*'))), count - removed)
+        self.assertEqual(load_report_html(relative_path), HTML + '<!-- regenerated -->')
+
+    def test_negotiate_encoding(self):
+        """Test Accept-Encoding negotiation."""
+        self.assertEqual(report_store.negotiate_encoding('gzip, br', ['br', 'gzip']), 'br')
+        self.assertEqual(report_store.negotiate_encoding('gzip, br;q=0', ['br', 'gzip']), 'gzip')
+        self.assertIsNone(report_store.negotiate_encoding('identity', ['gzip']))
+
+
+class TestReportServing(ReportStoreTestMixin, TestCase):
+    """Test pre-compressed serving and conditional GET."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        super().setUp()
+        client = Client.objects.create(code='AAA', name='Client A')
+        relative_path, size = save_report_html('AAA', 'weekly', '2025-07-10', HTML)
+        self.report = Report.objects.create(
+            client=client, report_type='WEEKLY', report_date=date(2025, 7, 10),
+            file_path=relative_path, file_size=size
+        )
+        admin = User.objects.create_user(username='admin', password='pw', role='admin')
+        self.api = APIClient()
+        self.api.force_authenticate(admin)
+        self.url = f'/api/portfolio/reports/{self.report.id}/html/'
+
+    def test_serves_precompressed_bytes(self):
+        """Test that gzip clients get the stored object with Content-Encoding."""
+        response = self.api.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)).decode('utf-8'), HTML)
+
+    def test_identity_fallback(self):
+        """Test that clients without compression support get plain HTML."""
+        response = self.api.get(self.url, HTTP_ACCEPT_ENCODING='identity')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.content.decode('utf-8'), HTML)
+
+    def test_missing_object_is_not_found(self):
+        """Test that a reference whose object was pruned serves 404 instead of an error."""
+        shutil.rmtree(self.reports_dir / '_store' / 'objects')
+        for accept_encoding in ('gzip', 'identity'):
+            response = self.api.get(self.url, HTTP_ACCEPT_ENCODING=accept_encoding)
+            self.assertEqual(response.status_code, 404)
+
+    def test_conditional_get(self):
+        """Test that a matching If-None-Match returns 304 and that each encoding has its own ETag."""
+        etag = self.api.get(self.url)['ETag']
+        self.assertEqual(self.api.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        gzip_etag = self.api.get(self.url, HTTP_ACCEPT_ENCODING='gzip')['ETag']
+        self.assertNotEqual(gzip_etag, etag)
+        self.assertEqual(self.api.get(self.url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        self.assertEqual(self.api.get(self.url, HTTP_ACCEPT_ENCODING='gzip',
+                                      HTTP_IF_NONE_MATCH=gzip_etag).status_code, 304)
+
+        json_url = f'/api/portfolio/reports/{self.report.id}/view/'
+        json_etag = self.api.get(json_url)['ETag']
+        self.assertEqual(self.api.get(json_url, HTTP_IF_NONE_MATCH=json_etag).status_code, 304)
@@ -0,0 +1,68 @@
+"""
+Test suite for per-request SQL and timing instrumentation.
+"""
+
+from datetime import date
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from core.instrumentation import fingerprint
+from ..models import User, Client, PortfolioSnapshot
+
+INSTRUMENTED = dict(settings.INSTRUMENTATION_SETTINGS, ENABLED=True)
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+                   INSTRUMENTATION_SETTINGS=INSTRUMENTED)
+class TestRequestInstrumentation(TestCase):
+    """Test request recording, duplicate detection and the admin stats endpoint."""
+
+    def setUp(self):
+        """Set up an admin API client and some snapshots."""
+        cache.clear()
+        for code in ['AAA', 'BBB']:
+            client = Client.objects.create(code=code, name=f'Client {code}')
+            PortfolioSnapshot.objects.create(client=client, snapshot_date=date(2025, 7, 10))
+        self.api = APIClient()
+        self.api.force_authenticate(User.objects.create_user(username='admin', password='pw', role='admin'))
+
+    def test_fingerprint_normalises_parameters(self):
+        """Test that repeats with different literals and IN-list sizes share a fingerprint."""
+        self.assertEqual(fingerprint('SELECT * FROM t WHERE id IN (%s, %s) AND code = \'A\''),
+                         fingerprint('SELECT *  FROM t WHERE id IN (%s) AND code = \'BB\''))
+
+    def test_records_view_stats(self):
+        """Test that requests are aggregated per view and exposed to admins."""
+        for _ in range(3):
+            response = self.api.get('/api/portfolio/health/')
+            self.assertIn('db;dur=', response['Server-Timing'])
+
+        data = self.api.get('/api/portfolio/health/performance/').json()
+        self.assertTrue(data['enabled'])
+        health = next(view for view in data['views'] if view['view'] == 'portfolio:health_check')
+        self.assertEqual(health['requests'], 3)
+        self.assertGreaterEqual(health['sql_count']['p50'], 2)
+        self.assertLessEqual(health['wall_ms']['p50'], health['wall_ms']['max'])
+
+        self.api.delete('/api/portfolio/health/performance/')
+        self.assertEqual(self.api.get('/api/portfolio/health/performance/').json()['views'][0]['requests'], 1)
+
+    def test_sampled_profiling(self):
+        """Test that selected views are profiled when sampling is on."""
+        config = dict(INSTRUMENTED, PROFILE_SAMPLE_RATE=1.0, PROFILE_VIEWS=['portfolio:health_check'])
+        with self.settings(INSTRUMENTATION_SETTINGS=config):
+            self.api.get('/api/portfolio/health/')
+            self.api.get('/api/portfolio/snapshots/')
+
+        profiles = self.api.get('/api/portfolio/health/performance/?profiles=1').json()['profiles']
+        self.assertEqual([p['view'] for p in profiles], ['portfolio:health_check'])
+        self.assertIn('cumulative', profiles[0]['report'])
+
+    def test_requires_admin(self):
+        """Test that clients cannot read the stats."""
+        self.api.force_authenticate(User.objects.create_user(
+            username='client', password='pw', role='client', client_code='AAA'))
+        self.assertEqual(self.api.get('/api/portfolio/health/performance/').status_code, 403)
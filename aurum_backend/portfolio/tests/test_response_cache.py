@@ -0,0 +1,88 @@
+"""
+Test suite for the generation-invalidated API response cache.
+"""
+
+from datetime import date
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from ..models import User, Client, PortfolioSnapshot, Report
+from ..services.portfolio_calculation_service import PortfolioCalculationService
+from ..utils.response_cache import bump_generation, get_cache_stats, get_generations, PORTFOLIO_DATA
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class TestResponseCache(TestCase):
+    """Test cache hits, scoping and dependency invalidation."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        cache.clear()
+        self.client_obj = Client.objects.create(code='AAA', name='Client A')
+        PortfolioSnapshot.objects.create(
+            client=self.client_obj, snapshot_date=date(2025, 7, 10),
+            portfolio_metrics={'total_value': 100}
+        )
+        self.admin = User.objects.create_user(username='admin', password='pw', role='admin')
+        self.api = APIClient()
+        self.api.force_authenticate(self.admin)
+
+    def test_hit_after_miss(self):
+        """Test that a repeated GET is served from cache."""
+        url = '/api/portfolio/snapshots/'
+        self.assertEqual(self.api.get(url)['X-Cache'], 'MISS')
+        self.assertEqual(self.api.get(url)['X-Cache'], 'HIT')
+
+        stats = get_cache_stats()['endpoints']['available_snapshots']
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+    def test_generation_bump_invalidates(self):
+        """Test that bumping a dependency serves fresh data."""
+        url = '/api/portfolio/snapshots/'
+        self.assertEqual(len(self.api.get(url).data), 1)
+
+        PortfolioSnapshot.objects.create(
+            client=self.client_obj, snapshot_date=date(2025, 7, 17),
+            portfolio_metrics={'total_value': 120}
+        )
+        self.assertEqual(len(self.api.get(url).data), 1)  # still cached
+
+        bump_generation(PORTFOLIO_DATA)
+        response = self.api.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(len(response.data), 2)
+
+    def test_metrics_bump_waits_for_commit(self):
+        """Test that recalculating metrics bumps the generation only once its transaction commits."""
+        generation = get_generations([PORTFOLIO_DATA])[PORTFOLIO_DATA]
+        with self.captureOnCommitCallbacks() as callbacks:
+            PortfolioCalculationService().calculate_portfolio_metrics('AAA', '2025-07-10')
+            self.assertEqual(get_generations([PORTFOLIO_DATA])[PORTFOLIO_DATA], generation)
+        for callback in callbacks:
+            callback()
+        self.assertGreater(get_generations([PORTFOLIO_DATA])[PORTFOLIO_DATA], generation)
+
+    def test_report_creation_invalidates_listing(self):
+        """Test that saving a Report bumps the reports generation via signal."""
+        url = '/api/portfolio/reports/weekly_investment/generated/'
+        self.assertEqual(self.api.get(url).data['count'], 0)
+
+        Report.objects.create(
+            client=self.client_obj, report_type='WEEKLY',
+            report_date=date(2025, 7, 10), file_path='x.html'
+        )
+        self.assertEqual(self.api.get(url).data['count'], 1)
+
+    def test_client_scope_isolated(self):
+        """Test that client users never receive an admin-scoped entry."""
+        url = '/api/portfolio/snapshots/'
+        self.api.get(url)
+
+        client_user = User.objects.create_user(
+            username='client', password='pw', role='client', client_code='AAA'
+        )
+        client_api = APIClient()
+        client_api.force_authenticate(client_user)
+        self.assertEqual(client_api.get(url)['X-Cache'], 'MISS')
@@ -0,0 +1,93 @@
+"""
+Test suite for the snapshot diff engine and the movers built on it.
+"""
+
+from datetime import date
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from ..models import Client, Asset, PortfolioSnapshot, Position
+from ..services.enhanced_report_service import EnhancedReportService
+from ..services.portfolio_calculation_service import PortfolioCalculationService
+from ..services.snapshot_diff_service import SnapshotDiffService, CASH_ASSET_TYPES
+from ..utils.response_cache import bump_generation, PORTFOLIO_DATA
+
+
+@override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+class TestSnapshotDiff(TestCase):
+    """Test the asset-keyed join, filter masks and memoization."""
+
+    def setUp(self):
+        """Set up two weeks with the same ticker at two custodies, blank tickers, cash and a trade."""
+        cache.clear()
+        self.client_obj = Client.objects.create(code='AAA', name='Client AAA')
+        week1 = PortfolioSnapshot.objects.create(client=self.client_obj, snapshot_date=date(2025, 7, 3))
+        week2 = PortfolioSnapshot.objects.create(client=self.client_obj, snapshot_date=date(2025, 7, 10))
+
+        def asset(name, ticker, bank, asset_type='Equities'):
+            return Asset.objects.create(name=name, ticker=ticker, asset_type=asset_type, bank=bank,
+                                        account='001', client='AAA')
+
+        holdings = [
+            # asset, (value1, qty1), (value2, qty2)
+            (asset('APPLE INC', 'AAPL', 'JPM'), (100000, 500), (110000, 500)),
+            (asset('APPLE INC', 'AAPL', 'MS'), (50000, 250), (45000, 250)),
+            (asset('PRIVATE NOTE A', '', 'JPM', 'Fixed Income'), (20000, 20000), (26000, 20000)),
+            (asset('PRIVATE NOTE B', '', 'JPM', 'Fixed Income'), (30000, 30000), (29000, 30000)),
+            (asset('CASH', '', 'JPM', 'Cash'), (80000, 80000), (10000, 10000)),
+            (asset('MSFT', 'MSFT', 'JPM'), (40000, 100), (80000, 200)),          # bought more
+            (asset('ALT FUND', 'ALTF', 'ALT', 'Alternatives'), (1000000, 1), (2000000, 1)),
+        ]
+        for held, week1_data, week2_data in holdings:
+            for snapshot, (value, quantity) in [(week1, week1_data), (week2, week2_data)]:
+                Position.objects.create(snapshot=snapshot, asset=held, market_value=Decimal(value),
+                                        quantity=Decimal(quantity), price=Decimal(value) / Decimal(quantity))
+        sold = asset('SOLD CORP', 'SLD', 'JPM')
+        Position.objects.create(snapshot=week1, asset=sold, market_value=Decimal('15000'), quantity=Decimal('10'))
+        self.week1, self.week2 = week1, week2
+
+    def test_join_on_asset_identity(self):
+        """Test that repeated and blank tickers stay separate and ALT is excluded."""
+        diff = SnapshotDiffService().diff('AAA', '2025-07-03', '2025-07-10')
+
+        self.assertEqual(len(diff), 7)
+        self.assertEqual(int(diff.matched.sum()), 6)
+        by_name = {}
+        for i in range(len(diff)):
+            by_name.setdefault(diff.names[i], []).append(float(diff.value_delta[i]))
+        self.assertEqual(sorted(by_name['APPLE INC']), [-5000.0, 10000.0])
+        self.assertEqual(by_name['PRIVATE NOTE A'], [6000.0])
+        self.assertEqual(by_name['SOLD CORP'], [-15000.0])
+        self.assertNotIn('ALT FUND', by_name)
+
+    def test_masks(self):
+        """Test the price-movement filters."""
+        diff = SnapshotDiffService().diff('AAA', '2025-07-03', '2025-07-10')
+        mask = diff.mask(exclude_asset_types=CASH_ASSET_TYPES, min_value=5000, max_quantity_change_pct=5.0)
+        self.assertEqual([diff.names[i] for i in diff.ranked(mask)],
+                         ['APPLE INC', 'PRIVATE NOTE A', 'APPLE INC', 'PRIVATE NOTE B'])
+
+    def test_memoized_per_generation(self):
+        """Test that a diff is built once and rebuilt after data changes."""
+        service = SnapshotDiffService()
+        service.diff('AAA', '2025-07-03', '2025-07-10')
+        with self.assertNumQueries(0):
+            service.diff('AAA', '2025-07-03', '2025-07-10')
+
+        bump_generation(PORTFOLIO_DATA)
+        with self.assertNumQueries(2):
+            service.diff('AAA', '2025-07-03', '2025-07-10')
+
+    def test_movers_use_diff(self):
+        """Test that metrics top movers and report biggest movers agree on the join."""
+        top_movers = PortfolioCalculationService()._calculate_top_movers(self.client_obj, '2025-07-10', None)
+        self.assertEqual([(m['ticker'], m['dollar_change']) for m in top_movers['gainers']],
+                         [('MSFT', 40000.0), ('AAPL', 10000.0), ('', 6000.0)])
+        self.assertEqual(top_movers['losers'][0]['name'], 'CASH')
+
+        biggest = EnhancedReportService()._calculate_biggest_movers_fixed(self.week2, self.week1, limit=2)
+        self.assertEqual([(m['name'], m['dollar_change']) for m in biggest],
+                         [('APPLE INC', 10000.0), ('PRIVATE NOTE A', 6000.0)])
+        self.assertAlmostEqual(biggest[0]['pct_change'], 10.0)
@@ -0,0 +1,108 @@
+"""
+Test suite for the concurrent, deduplicating upload pipeline.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from io import BytesIO
+from pathlib import Path
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from openpyxl import Workbook
+from rest_framework.test import APIClient
+
+from ..models import User, BankFile
+from ..services.file_catalog_service import content_hash, upload_dir
+
+
+def workbook_bytes(value):
+    workbook = Workbook()
+    workbook.active['A1'] = value
+    buffer = BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+class TestUploadPipeline(TestCase):
+    """Test staging, header validation, duplicate handling and streamed results."""
+
+    def setUp(self):
+        """Set up a scratch working directory and an admin client."""
+        self.cwd = os.getcwd()
+        self.tmp = Path(tempfile.mkdtemp())
+        os.chdir(self.tmp)
+        self.settings_override = override_settings(BASE_DIR=self.tmp, UPLOAD_SETTINGS={'WORKERS': 3})
+        self.settings_override.enable()
+
+        admin = User.objects.create_user(username='admin', password='pw', role='admin')
+        self.api = APIClient()
+        self.api.force_authenticate(admin)
+
+    def tearDown(self):
+        """Restore the working directory and remove the trees."""
+        self.settings_override.disable()
+        os.chdir(self.cwd)
+        shutil.rmtree(self.tmp)
+
+    def upload(self, files, stream=False):
+        uploads = [SimpleUploadedFile(name, content) for name, content in files]
+        url = '/api/portfolio/files/upload/' + ('?stream=1' if stream else '')
+        return self.api.post(url, {'files': uploads}, format='multipart')
+
+    def test_validation_and_order(self):
+        """Test that bad files are rejected and results keep upload order."""
+        response = self.upload([
+            ('CS_AA_001_securities_24_07_2025.xlsx', workbook_bytes('cs')),
+            ('JPM_securities_24_07_2025.xlsx', b'not a workbook'),
+            ('MS_securities_24_07_2025.xls', workbook_bytes('xlsx named xls')),
+            ('notes.txt', b'text'),
+        ])
+        results = response.data['results']
+        self.assertEqual([r['filename'] for r in results],
+                         ['CS_AA_001_securities_24_07_2025.xlsx', 'JPM_securities_24_07_2025.xlsx',
+                          'MS_securities_24_07_2025.xls', 'notes.txt'])
+        self.assertEqual([r['success'] for r in results], [True, False, False, False])
+        self.assertIn('unrecognized file header', results[1]['error'])
+        self.assertEqual(response.data['successful_uploads'], 1)
+
+        path = Path('data/excel/input_files/cs/CS_AA_001_securities_24_07_2025.xlsx')
+        self.assertEqual(results[0]['content_hash'], content_hash(path))
+        self.assertFalse(Path('data/excel/input_files/JPM_securities_24_07_2025.xlsx').exists())
+        self.assertEqual(list((upload_dir() / 'staging').iterdir()), [])
+
+    def test_duplicates(self):
+        """Test that re-uploads link to the existing file and renamed copies are kept with a warning."""
+        content = workbook_bytes('hsbc')
+        self.upload([('HSBC_securities_24_07_2025.xlsx', content)])
+        path = Path('data/excel/input_files/hsbc/HSBC_securities_24_07_2025.xlsx')
+        mtime = path.stat().st_mtime_ns
+
+        response = self.upload([('HSBC_securities_24_07_2025.xlsx', content),
+                                ('HSBC_securities_25_07_2025.xlsx', content)])
+        linked, renamed = response.data['results']
+        self.assertEqual((linked['success'], linked['status'], linked['duplicate_of']), (True, 'duplicate', str(path)))
+        self.assertEqual(linked['organized_path'], 'hsbc')
+        self.assertEqual((renamed['success'], renamed['status'], renamed['duplicate_of']), (True, 'success', str(path)))
+        self.assertIn('HSBC_securities_24_07_2025.xlsx', renamed['warning'])
+        self.assertEqual(response.data['duplicates'], 1)
+
+        self.assertEqual(path.stat().st_mtime_ns, mtime)
+        renamed_path = Path('data/excel/input_files/hsbc/HSBC_securities_25_07_2025.xlsx')
+        self.assertEqual(renamed_path.read_bytes(), content)
+        self.assertEqual(BankFile.objects.filter(content_hash=content_hash(path)).count(), 2)
+
+    def test_streamed_results(self):
+        """Test that ?stream=1 returns one NDJSON line per file and a summary."""
+        response = self.upload([('JB_AA_001_securities_24_07_2025.xlsx', workbook_bytes(1)),
+                                ('JB_AA_001_transactions_24_07_2025.xlsx', workbook_bytes(2))], stream=True)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+
+        self.assertEqual([line['type'] for line in lines], ['file', 'file', 'summary'])
+        self.assertEqual({line['filename'] for line in lines[:2]},
+                         {'JB_AA_001_securities_24_07_2025.xlsx', 'JB_AA_001_transactions_24_07_2025.xlsx'})
+        self.assertEqual(lines[2]['successful_uploads'], 2)
+        self.assertTrue(Path('data/excel/input_files/jb/JB_AA_001_transactions_24_07_2025.xlsx').exists())
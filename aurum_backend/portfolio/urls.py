@@ -11,6 +11,8 @@ app_name = 'portfolio'
 urlpatterns = [
     # Health check
     path('health/', views.health_check, name='health_check'),
+    path('health/performance/', views.request_performance_stats, name='request_performance_stats'),
+    path('admin/cache-stats/', views.response_cache_stats, name='response_cache_stats'),
     
     # Portfolio data endpoints
     path('summary/', views.portfolio_summary, name='portfolio_summary'),
@@ -39,9 +41,11 @@ urlpatterns = [
     
     # Dashboard data endpoints
     path('admin/dashboard/', views.admin_dashboard_data, name='admin_dashboard_data'),
+    path('admin/equity-lookthrough/', views.firm_equity_lookthrough, name='firm_equity_lookthrough'),
     path('client/dashboard/', views.client_dashboard_data, name='client_dashboard_data'),
     path('client/dashboard/<str:client_code>/', views.client_dashboard_data, name='client_dashboard_data_specific'),
     path('client/dashboard-with-charts/', views.client_dashboard_with_charts, name='client_dashboard_with_charts'),
+    path('dashboard/portfolio-evolution/', views.portfolio_evolution_series, name='portfolio_evolution_series'),
     
     # File management endpoints (admin only)
     path('files/upload/', views.upload_files, name='upload_files'),
@@ -66,6 +70,8 @@ urlpatterns = [
     # Excel Export endpoints (admin only)
     path('export/positions/', views.export_positions_excel, name='export_positions'),
     path('export/transactions/', views.export_transactions_excel, name='export_transactions'),
+    path('export/jobs/<uuid:job_id>/', views.get_export_job, name='export_job'),
+    path('export/jobs/<uuid:job_id>/download/', views.download_export_job, name='export_job_download'),
     path('export/monthly-returns/', views.export_monthly_returns_excel, name='export_monthly_returns'),
     path('export/available-dates/', views.get_export_available_dates, name='export_dates'),
     
@@ -0,0 +1,221 @@
+"""
+Result cache for Modified Dietz calculations.
+
+The same (client, start, end) return is computed by the metrics calculation, the
+dashboard cache aggregation, the reports and the charts. Results are memoized in a
+per-process LRU in front of the shared Django cache, keyed by
+
+    (client, start, end, classification version, client data version)
+
+- The classification version is a digest of the CashFlowService rule tables, so
+  changing which transactions count as external flows retires every cached result.
+- The client data version is a counter per client (plus a global one) bumped by
+  population, rollover and restores once their transaction commits. Keys are never
+  deleted: a bump makes every key built from the old version unreachable, as with
+  the response cache generations. Versions read from the shared cache are kept in
+  the process for VERSION_TTL seconds, so a local hit costs no cache round trip;
+  another process's bump is seen within that time, this process's own at once.
+
+Configured by DIETZ_CACHE_SETTINGS.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {
+    'ENABLED': True,
+    'LOCAL_SIZE': 4096,          # Results kept in each process
+    'TIMEOUT': 7 * 24 * 60 * 60,  # Shared cache expiry (safety net; invalidation is version based)
+    'VERSION_TTL': 5,            # Seconds a process reuses data versions before re-reading them
+}
+
+KEY_PREFIX = 'aurum:dietz'
+VERSION_PREFIX = 'aurum:client_data_version'
+ALL_CLIENTS = '*'
+
+# Data versions read by this process: key -> (version, monotonic time read)
+_local_versions: Dict[str, Tuple[int, float]] = {}
+_local_versions_lock = threading.Lock()
+
+
+def get_settings() -> Dict:
+    return {**DEFAULT_SETTINGS, **getattr(settings, 'DIETZ_CACHE_SETTINGS', {})}
+
+
+@lru_cache(maxsize=1)
+def classification_version() -> str:
+    """Digest of the cash flow classification rules the results depend on."""
+    from ..services.cash_flow_service import CashFlowService
+    rules = {
+        'inflows': CashFlowService.INFLOW_TYPES,
+        'outflows': CashFlowService.OUTFLOW_TYPES,
+        'problematic': CashFlowService.PROBLEMATIC_TYPES,
+        'enhanced': CashFlowService.ENHANCED_TRANSACTION_MAPPINGS,
+    }
+    raw = json.dumps(rules, sort_keys=True, default=str)
+    return hashlib.md5(raw.encode('utf-8')).hexdigest()[:12]
+
+
+def _version_key(client: str) -> str:
+    return f"{VERSION_PREFIX}:{client}"
+
+
+def client_data_versions(client: str) -> Tuple[int, int]:
+    """
+    Current (global, client) data versions.
+
+    A missing counter is seeded from the clock so that it can never collide with a
+    version that was used before it was evicted. Versions read within the last
+    VERSION_TTL seconds are reused without asking the shared cache.
+    """
+    keys = [_version_key(ALL_CLIENTS), _version_key(client)]
+    now = time.monotonic()
+    ttl = get_settings()['VERSION_TTL']
+    versions = {}
+    with _local_versions_lock:
+        for key in keys:
+            local = _local_versions.get(key)
+            if local is not None and now - local[1] < ttl:
+                versions[key] = local[0]
+
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        stored = cache.get_many(missing)
+        for key in missing:
+            if key not in stored:
+                cache.add(key, int(time.time() * 1000), timeout=None)
+                stored[key] = cache.get(key)
+            versions[key] = stored[key]
+        with _local_versions_lock:
+            for key in missing:
+                _local_versions[key] = (versions[key], now)
+    return versions[keys[0]], versions[keys[1]]
+
+
+def forget_local_versions(keys: Optional[Iterable[str]] = None) -> None:
+    """Make this process re-read the given version keys (all when None) on next use."""
+    with _local_versions_lock:
+        if keys is None:
+            _local_versions.clear()
+        else:
+            for key in keys:
+                _local_versions.pop(key, None)
+
+
+def _bump(keys: Iterable[str]) -> None:
+    keys = list(keys)
+    for key in keys:
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, int(time.time() * 1000), timeout=None)
+    forget_local_versions(keys)
+
+
+def bump_client_data_version(*clients: str) -> None:
+    """
+    Retire cached Dietz results of the given clients (all clients when none given).
+
+    Runs when the current transaction commits (immediately outside one), so a
+    result computed from the uncommitted data is never stored under the new version.
+
+    Example:
+        bump_client_data_version('JN')    # after rolling JN's accounts over
+        bump_client_data_version()        # after a population run or restore
+    """
+    keys = [_version_key(client) for client in clients] or [_version_key(ALL_CLIENTS)]
+
+    def bump():
+        _bump(keys)
+        logger.debug(f"Dietz cache data versions bumped: {', '.join(clients) or 'all clients'}")
+
+    transaction.on_commit(bump)
+
+
+class DietzResultCache:
+    """Per-process LRU in front of the shared cache for Modified Dietz results."""
+
+    def __init__(self, local_size: Optional[int] = None):
+        self.local_size = local_size or get_settings()['LOCAL_SIZE']
+        self._local: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'local_hits': 0, 'shared_hits': 0, 'misses': 0}
+
+    def build_key(self, client: str, start_date: date, end_date: date) -> str:
+        global_version, client_version = client_data_versions(client)
+        return (f"{KEY_PREFIX}:{client}:{start_date.isoformat()}:{end_date.isoformat()}:"
+                f"{classification_version()}:{global_version}.{client_version}")
+
+    def get_or_compute(self, client: str, start_date: date, end_date: date,
+                       compute: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Cached result for the period, computed and stored on a miss.
+
+        Results carrying an 'error' are returned but not stored. Callers get a copy,
+        so mutating it does not affect the cache.
+        """
+        if not get_settings()['ENABLED']:
+            return compute()
+
+        try:
+            key = self.build_key(client, start_date, end_date)
+        except Exception as e:
+            logger.warning(f"Dietz cache unavailable: {e}")
+            return compute()
+
+        with self._lock:
+            result = self._local.get(key)
+            if result is not None:
+                self._local.move_to_end(key)
+                self.stats['local_hits'] += 1
+                return dict(result)
+
+        try:
+            result = cache.get(key)
+        except Exception as e:
+            logger.warning(f"Could not read cached Dietz result for {client}: {e}")
+            result = None
+
+        if result is not None:
+            self.stats['shared_hits'] += 1
+        else:
+            self.stats['misses'] += 1
+            result = compute()
+            if 'error' in result:
+                return result
+            try:
+                cache.set(key, result, get_settings()['TIMEOUT'])
+            except Exception as e:
+                logger.warning(f"Could not store cached Dietz result for {client}: {e}")
+
+        self._remember(key, result)
+        return dict(result)
+
+    def _remember(self, key: str, result: Dict[str, Any]) -> None:
+        with self._lock:
+            self._local[key] = result
+            self._local.move_to_end(key)
+            while len(self._local) > self.local_size:
+                self._local.popitem(last=False)
+
+    def clear_local(self) -> None:
+        """Drop this process's entries and data versions (the shared cache is left untouched)."""
+        with self._lock:
+            self._local.clear()
+        forget_local_versions()
+
+
+dietz_result_cache = DietzResultCache()
@@ -0,0 +1,55 @@
+"""
+HTTP validator helpers for conditional GET support.
+Lets views answer If-None-Match / If-Modified-Since with 304 before doing any heavy work.
+"""
+
+import hashlib
+from datetime import datetime
+from typing import Optional
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+def make_etag(*parts) -> str:
+    """
+    Build a quoted, strong ETag from arbitrary version parts.
+
+    Example:
+        make_etag('ALL', 42, '2025-07-10T12:00:00') -> '"5d41402abc4b2a76"'
+    """
+    raw = ':'.join(str(part) for part in parts)
+    return quote_etag(hashlib.md5(raw.encode('utf-8')).hexdigest()[:16])
+
+
+def not_modified_response(request, etag: Optional[str] = None,
+                          last_modified: Optional[datetime] = None):
+    """
+    Return a 304 response when the client's cached copy is still valid, else None.
+
+    Args:
+        request: DRF or Django request
+        etag: Quoted ETag for the current representation
+        last_modified: Timestamp of the last change to the representation
+    """
+    django_request = request._request if hasattr(request, '_request') else request
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(django_request, etag=etag, last_modified=timestamp)
+    if response is not None:
+        apply_validators(response, etag, last_modified)
+    return response
+
+
+def apply_validators(response, etag: Optional[str] = None,
+                     last_modified: Optional[datetime] = None,
+                     cache_control: str = 'private, no-cache'):
+    """
+    Attach ETag / Last-Modified headers so the browser revalidates instead of refetching.
+    """
+    if etag:
+        response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    if cache_control:
+        response['Cache-Control'] = cache_control
+    return response
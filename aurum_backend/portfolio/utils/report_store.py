@@ -0,0 +1,256 @@
+"""
+Content-addressed, compressed storage for generated HTML reports.
+
+Each distinct report body is stored once under
+REPORTS_DIR/_store/objects/<aa>/<sha256>.html.gz (plus .html.br when brotli is
+installed). The logical path kept in Report.file_path gets a small JSON reference
+file next to it (<path>.ref) that points at the object, so regenerating an
+unchanged report costs no extra disk and the serving views can send the stored
+bytes as-is with a matching Content-Encoding.
+
+Shared static assets (the logo every report inlines as a data URI) are replaced by
+a URL reference when AURUM_SETTINGS['REPORT_STATIC_URL'] is configured, so they
+are downloaded and cached once by the browser instead of once per report.
+"""
+
+import base64
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from django.conf import settings
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+STORE_DIRNAME = '_store'
+REFERENCE_SUFFIX = '.ref'
+ENCODING_EXTENSIONS = {'br': '.html.br', 'gzip': '.html.gz'}
+STATIC_ASSET_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.gif', '.svg', '.webp'}
+
+DATA_URI_PATTERN = re.compile(r'data:image/[\w.+-]+;base64,([A-Za-z0-9+/=]+)')
+
+
+@dataclass
+class StoredReport:
+    """Reference to one stored report object."""
+    sha256: str
+    size: int
+    encodings: List[str] = field(default_factory=list)
+    stored_at: str = ''
+
+    def etag(self, encoding: Optional[str] = None) -> str:
+        """Strong validator of the bytes sent in an encoding (None for identity)."""
+        return f'"{self.sha256}-{encoding or "identity"}"'
+
+
+def available_encodings() -> List[str]:
+    """Encodings written for new objects, best first."""
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+
+def get_store_root() -> Path:
+    return settings.AURUM_SETTINGS['REPORTS_DIR'] / STORE_DIRNAME
+
+
+def get_object_path(sha256: str, encoding: str) -> Path:
+    return get_store_root() / 'objects' / sha256[:2] / f"{sha256}{ENCODING_EXTENSIONS[encoding]}"
+
+
+def _compress(data: bytes, encoding: str) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(data, mode=brotli.MODE_TEXT, quality=11)
+    # mtime=0 keeps the gzip bytes identical for identical content
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as tmp:
+            tmp.write(data)
+        os.replace(tmp_name, path)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+
+
+@lru_cache(maxsize=1)
+def _shared_static_assets() -> Dict[str, str]:
+    """Map base64 payloads of files in STATICFILES_DIRS to their static path."""
+    assets = {}
+    for static_dir in getattr(settings, 'STATICFILES_DIRS', []):
+        static_dir = Path(static_dir)
+        if not static_dir.is_dir():
+            continue
+        for path in static_dir.rglob('*'):
+            if path.suffix.lower() in STATIC_ASSET_EXTENSIONS and path.is_file():
+                payload = base64.b64encode(path.read_bytes()).decode('ascii')
+                assets[payload] = path.relative_to(static_dir).as_posix()
+    return assets
+
+
+def externalize_shared_assets(html_content: str) -> str:
+    """
+    Replace inlined copies of public static files with a URL reference.
+
+    Only byte-identical copies of files under STATICFILES_DIRS are replaced, so no
+    client data ever leaves the report body. Does nothing unless
+    AURUM_SETTINGS['REPORT_STATIC_URL'] is set (it must be an absolute URL because
+    reports are opened from the frontend origin).
+    """
+    base_url = settings.AURUM_SETTINGS.get('REPORT_STATIC_URL')
+    if not base_url or 'base64,' not in html_content:
+        return html_content
+
+    assets = _shared_static_assets()
+    if not assets:
+        return html_content
+
+    def replace(match):
+        static_path = assets.get(match.group(1))
+        return f"{base_url.rstrip('/')}/{static_path}" if static_path else match.group(0)
+
+    return DATA_URI_PATTERN.sub(replace, html_content)
+
+
+def put(html_content: str) -> StoredReport:
+    """
+    Store report HTML and return its reference; existing objects are reused.
+    """
+    data = externalize_shared_assets(html_content).encode('utf-8')
+    sha256 = hashlib.sha256(data).hexdigest()
+
+    encodings = available_encodings()
+    for encoding in encodings:
+        path = get_object_path(sha256, encoding)
+        if not path.exists():
+            _atomic_write(path, _compress(data, encoding))
+
+    return StoredReport(
+        sha256=sha256,
+        size=len(data),
+        encodings=encodings,
+        stored_at=datetime.now().isoformat()
+    )
+
+
+def write_reference(report_path: Path, stored: StoredReport) -> Path:
+    """Point a logical report path at a stored object."""
+    reference_path = Path(f"{report_path}{REFERENCE_SUFFIX}")
+    _atomic_write(reference_path, json.dumps({
+        'sha256': stored.sha256,
+        'size': stored.size,
+        'encodings': stored.encodings,
+        'stored_at': stored.stored_at,
+    }).encode('utf-8'))
+    return reference_path
+
+
+def read_reference(report_path: Path) -> Optional[StoredReport]:
+    """Return the stored object for a logical report path, or None for legacy files."""
+    reference_path = Path(f"{report_path}{REFERENCE_SUFFIX}")
+    if not reference_path.exists():
+        return None
+
+    with open(reference_path, 'r', encoding='utf-8') as f:
+        reference = json.load(f)
+
+    # Only advertise encodings whose object is actually on disk
+    encodings = [
+        encoding for encoding in reference.get('encodings', ['gzip'])
+        if encoding in ENCODING_EXTENSIONS
+        and (encoding != 'br' or brotli is not None)
+        and get_object_path(reference['sha256'], encoding).exists()
+    ]
+    return StoredReport(
+        sha256=reference['sha256'],
+        size=reference.get('size', 0),
+        encodings=encodings,
+        stored_at=reference.get('stored_at', '')
+    )
+
+
+def load(stored: StoredReport) -> str:
+    """Decompress a stored report to HTML text."""
+    if 'gzip' in stored.encodings:
+        with gzip.open(get_object_path(stored.sha256, 'gzip'), 'rb') as f:
+            return f.read().decode('utf-8')
+    if 'br' in stored.encodings:
+        with open(get_object_path(stored.sha256, 'br'), 'rb') as f:
+            return brotli.decompress(f.read()).decode('utf-8')
+    raise FileNotFoundError(f"Stored report object missing: {stored.sha256}")
+
+
+def negotiate_encoding(accept_encoding: str, encodings: List[str]) -> Optional[str]:
+    """
+    Pick the best stored encoding the client accepts, or None for identity.
+
+    Example:
+        negotiate_encoding('gzip, deflate, br', ['br', 'gzip']) -> 'br'
+    """
+    accepted = set()
+    for token in (accept_encoding or '').split(','):
+        name, _, params = token.strip().partition(';')
+        if params.replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            continue
+        accepted.add(name.strip().lower())
+
+    for encoding in encodings:
+        if encoding in accepted or '*' in accepted:
+            return encoding
+    return None
+
+
+def prune_unreferenced_objects(min_age_seconds: int = 3600, dry_run: bool = False) -> int:
+    """
+    Delete stored objects that no reference file points at.
+
+    Run by the prune_report_store management command.
+
+    Args:
+        min_age_seconds: Keep younger objects (a report being saved writes its object
+            before its reference)
+        dry_run: Count the objects without deleting them
+
+    Returns:
+        int: Number of object files removed (or that would be)
+    """
+    reports_dir = settings.AURUM_SETTINGS['REPORTS_DIR']
+    referenced = set()
+    for reference_path in reports_dir.rglob(f"*{REFERENCE_SUFFIX}"):
+        try:
+            with open(reference_path, 'r', encoding='utf-8') as f:
+                referenced.add(json.load(f)['sha256'])
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Skipping unreadable report reference {reference_path}: {e}")
+
+    removed = 0
+    objects_dir = get_store_root() / 'objects'
+    if not objects_dir.exists():
+        return 0
+    cutoff = datetime.now().timestamp() - min_age_seconds
+    for object_path in objects_dir.rglob('*.html.*'):
+        if object_path.name.split('.', 1)[0] in referenced or object_path.stat().st_mtime > cutoff:
+            continue
+        if not dry_run:
+            object_path.unlink()
+        removed += 1
+
+    logger.info(f"{'Found' if dry_run else 'Pruned'} {removed} unreferenced report objects")
+    return removed
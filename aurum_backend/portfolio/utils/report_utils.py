@@ -8,6 +8,8 @@ from pathlib import Path
 from django.conf import settings
 from typing import Optional
 
+from . import report_store
+
 logger = logging.getLogger(__name__)
 
 
@@ -93,7 +95,7 @@ def get_absolute_report_path(relative_path: str) -> Path:
 
 def report_exists(client_code: Optional[str], report_type: str, report_date: str) -> bool:
     """
-    Check if a report file already exists.
+    Check if a report (stored or legacy plain file) already exists.
     
     Args:
         client_code: Client code or None for all clients
@@ -107,14 +109,17 @@ def report_exists(client_code: Optional[str], report_type: str, report_date: str
     filename = get_report_filename(report_type, report_date)
     file_path = directory / filename
     
-    exists = file_path.exists()
+    exists = file_path.exists() or Path(f"{file_path}{report_store.REFERENCE_SUFFIX}").exists()
     logger.info(f"Report existence check: {file_path} -> {exists}")
     return exists
 
 
 def save_report_html(client_code: Optional[str], report_type: str, report_date: str, html_content: str) -> tuple[str, int]:
     """
-    Save HTML report content to organized file structure.
+    Save HTML report content to the compressed report store.
+
+    The content is stored once per distinct hash and the organized report path
+    gets a reference file pointing at it (see report_store).
     
     Args:
         client_code: Client code or None for all clients
@@ -123,25 +128,26 @@ def save_report_html(client_code: Optional[str], report_type: str, report_date:
         html_content: HTML content to save
     
     Returns:
-        tuple: (relative_path, file_size_bytes)
+        tuple: (relative_path, file_size_bytes) where the size is the uncompressed size
     """
     # Get directory and filename
     directory = get_report_directory(client_code, report_type)
     filename = get_report_filename(report_type, report_date)
     file_path = directory / filename
     
-    # Save HTML content
-    with open(file_path, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+    # Store compressed content and point the report path at it
+    stored = report_store.put(html_content)
+    report_store.write_reference(file_path, stored)
     
-    # Get file size
-    file_size = file_path.stat().st_size
+    # Drop a plain file left by an earlier save so it cannot shadow the stored one
+    if file_path.exists():
+        file_path.unlink()
     
     # Return relative path for database storage
     relative_path = get_report_relative_path(client_code, report_type, report_date)
     
-    logger.info(f"Report saved: {file_path} ({file_size} bytes)")
-    return relative_path, file_size
+    logger.info(f"Report saved: {file_path} ({stored.size} bytes, object {stored.sha256[:12]})")
+    return relative_path, stored.size
 
 
 def load_report_html(relative_path: str) -> str:
@@ -159,6 +165,12 @@ def load_report_html(relative_path: str) -> str:
     """
     file_path = get_absolute_report_path(relative_path)
     
+    stored = report_store.read_reference(file_path)
+    if stored is not None:
+        html_content = report_store.load(stored)
+        logger.info(f"Report loaded from store: {file_path}")
+        return html_content
+    
     if not file_path.exists():
         raise FileNotFoundError(f"Report file not found: {file_path}")
     
@@ -0,0 +1,191 @@
+"""
+Response cache for read-heavy API endpoints.
+
+Cached payloads are keyed by (endpoint, user scope, params) plus the current
+generation of every data dependency the endpoint declares. Writers never delete
+keys: they bump a dependency's generation counter, which makes every key built
+from the old generation unreachable. Works with the Redis cache in production and
+the locmem cache in development and tests.
+"""
+
+import hashlib
+import json
+import logging
+import time
+from functools import wraps
+from typing import Dict, Iterable
+
+from django.core.cache import cache
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+# Data dependencies that endpoints can declare
+PORTFOLIO_DATA = 'portfolio_data'  # snapshots, positions, transactions, metrics
+REPORTS = 'reports'                # generated Report records
+ALL_DEPENDENCIES = (PORTFOLIO_DATA, REPORTS)
+
+KEY_PREFIX = 'aurum:response'
+GENERATION_PREFIX = 'aurum:generation'
+STATS_PREFIX = 'aurum:cache_stats'
+DEFAULT_TIMEOUT = 60 * 60  # 1 hour safety net; invalidation is generation based
+
+_tracked_endpoints = set()
+
+
+def _generation_key(dependency: str) -> str:
+    return f"{GENERATION_PREFIX}:{dependency}"
+
+
+def get_generations(dependencies: Iterable[str]) -> Dict[str, int]:
+    """
+    Read the current generation of each dependency.
+
+    A missing counter (cold or evicted cache) is seeded from the clock so that it can
+    never collide with a generation that was used before the eviction.
+    """
+    keys = {dependency: _generation_key(dependency) for dependency in dependencies}
+    stored = cache.get_many(list(keys.values()))
+
+    generations = {}
+    for dependency, key in keys.items():
+        if key not in stored:
+            cache.add(key, int(time.time() * 1000), timeout=None)
+            stored[key] = cache.get(key)
+        generations[dependency] = stored[key]
+    return generations
+
+
+def bump_generation(*dependencies: str) -> None:
+    """
+    Invalidate every cached response that depends on the given data.
+
+    Example:
+        bump_generation(PORTFOLIO_DATA)          # after update_database
+        bump_generation(*ALL_DEPENDENCIES)       # after a database restore
+    """
+    for dependency in dependencies or ALL_DEPENDENCIES:
+        key = _generation_key(dependency)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Counter missing: seed it past any value that may still be referenced
+            cache.set(key, int(time.time() * 1000), timeout=None)
+    logger.debug(f"Response cache generations bumped: {', '.join(dependencies or ALL_DEPENDENCIES)}")
+
+
+def _user_scope(request) -> str:
+    """Client users only ever share cache entries with themselves; admins share one scope."""
+    user = getattr(request, 'user', None)
+    if getattr(user, 'role', None) == 'client':
+        return f"client:{user.client_code}"
+    return 'admin'
+
+
+def build_cache_key(endpoint: str, request, view_kwargs: dict, generations: Dict[str, int]) -> str:
+    """Build the cache key for one endpoint invocation."""
+    params = sorted((key, request.GET.getlist(key)) for key in request.GET.keys())
+    raw = json.dumps({
+        'scope': _user_scope(request),
+        'params': params,
+        'kwargs': sorted(view_kwargs.items()),
+        'generations': sorted(generations.items()),
+    }, default=str)
+    digest = hashlib.md5(raw.encode('utf-8')).hexdigest()
+    return f"{KEY_PREFIX}:{endpoint}:{digest}"
+
+
+def _record(endpoint: str, outcome: str) -> None:
+    key = f"{STATS_PREFIX}:{endpoint}:{outcome}"
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        pass
+
+
+def cached_response(endpoint: str, depends_on: Iterable[str] = (PORTFOLIO_DATA,),
+                    timeout: int = DEFAULT_TIMEOUT):
+    """
+    Cache successful GET responses of a DRF function view.
+
+    Place it below @api_view / @permission_classes so authentication and
+    permission checks still run on every request.
+
+    Args:
+        endpoint: Stable name used in cache keys and hit/miss stats
+        depends_on: Data dependencies whose generation bump invalidates the entry
+        timeout: Expiry in seconds (safety net only)
+    """
+    depends_on = tuple(depends_on)
+    _tracked_endpoints.add(endpoint)
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET':
+                return view_func(request, *args, **kwargs)
+
+            try:
+                cache_key = build_cache_key(endpoint, request, kwargs, get_generations(depends_on))
+                cached = cache.get(cache_key)
+            except Exception as e:
+                logger.warning(f"Response cache unavailable for {endpoint}: {e}")
+                return view_func(request, *args, **kwargs)
+
+            if cached is not None:
+                _record(endpoint, 'hits')
+                response = Response(cached)
+                response['X-Cache'] = 'HIT'
+                return response
+
+            _record(endpoint, 'misses')
+            response = view_func(request, *args, **kwargs)
+
+            if getattr(response, 'status_code', None) == 200 and hasattr(response, 'data'):
+                try:
+                    cache.set(cache_key, response.data, timeout)
+                except Exception as e:
+                    logger.warning(f"Could not store cached response for {endpoint}: {e}")
+                response['X-Cache'] = 'MISS'
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def get_cache_stats() -> Dict:
+    """
+    Hit/miss counters per cached endpoint plus current dependency generations.
+    """
+    endpoints = sorted(_tracked_endpoints)
+    keys = [
+        f"{STATS_PREFIX}:{endpoint}:{outcome}"
+        for endpoint in endpoints for outcome in ('hits', 'misses')
+    ]
+    counters = cache.get_many(keys)
+
+    stats = {}
+    for endpoint in endpoints:
+        hits = counters.get(f"{STATS_PREFIX}:{endpoint}:hits", 0)
+        misses = counters.get(f"{STATS_PREFIX}:{endpoint}:misses", 0)
+        total = hits + misses
+        stats[endpoint] = {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / total * 100, 2) if total else 0.0
+        }
+
+    return {
+        'endpoints': stats,
+        'generations': get_generations(ALL_DEPENDENCIES)
+    }
+
+
+def reset_cache_stats() -> None:
+    """Clear hit/miss counters (generations are left untouched)."""
+    cache.delete_many([
+        f"{STATS_PREFIX}:{endpoint}:{outcome}"
+        for endpoint in _tracked_endpoints for outcome in ('hits', 'misses')
+    ])
@@ -3,7 +3,7 @@ Django views for AurumFinance portfolio management.
 Clean Django-only implementation with no ProjectAurum imports.
 """
 
-from django.http import JsonResponse, HttpResponse
+from django.http import JsonResponse, HttpResponse, StreamingHttpResponse, FileResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.contrib.auth.decorators import login_required
@@ -13,18 +13,30 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 
-from .models import Client, PortfolioSnapshot, Position, Transaction, Report, ProcessingStatus
+from .models import Client, PortfolioSnapshot, Position, Transaction, Report, ProcessingStatus, ExportJob
 from .services.portfolio_population_service import PortfolioPopulationService
 from .services.portfolio_calculation_service import PortfolioCalculationService
 from .services.enhanced_report_service import EnhancedReportService
 from .services.processing_service import ProcessingService
-from .services.excel_export_service import ExcelExportService
+from .services.excel_export_service import ExcelExportService, EXPORT_CONTENT_TYPES
+from .services.portfolio_evolution_service import PortfolioEvolutionService
+from .services.consolidated_data_service import ConsolidatedDataLoader
+from .services.position_frame import PositionFrame
+from .services.file_catalog_service import FileCatalogService
+from .services.upload_pipeline_service import UploadPipeline, UPLOAD_DESTINATIONS
+from .services.client_dashboard_service import ClientDashboardService
+from .services.export_job_service import ExportJobService
+from .utils.http_cache import make_etag, not_modified_response, apply_validators
+from .utils.response_cache import (
+    cached_response, bump_generation, get_cache_stats, PORTFOLIO_DATA, REPORTS
+)
 from .permissions import IsAdminUser, IsClientUser
+from core import db_router
 
+import hashlib
 import json
 import logging
 import os
-import re
 from datetime import datetime
 from pathlib import Path
 from django.conf import settings
@@ -61,6 +73,8 @@ def generate_all_bond_issuer_weight_reports():
         
         # Initialize report service
         report_service = BondIssuerReportService()
+        # Every client's latest snapshot and positions, loaded once for all reports
+        report_service.data_loader = ConsolidatedDataLoader()
         
         generated_reports = []
         failed_reports = []
@@ -142,6 +156,8 @@ def generate_all_bond_maturity_reports():
         
         # Initialize report service
         report_service = BondMaturityReportService()
+        # Every client's latest snapshot and positions, loaded once for all reports
+        report_service.data_loader = ConsolidatedDataLoader()
         
         generated_reports = []
         failed_reports = []
@@ -277,6 +293,9 @@ def generate_all_cash_position_reports():
         
         # Initialize report service
         report_service = CashReportService()
+        # Every client's latest snapshot and positions (ALL included, as the consolidated
+        # cash report always has), loaded once for all reports
+        report_service.data_loader = ConsolidatedDataLoader(exclude_codes=())
         
         generated_reports = []
         failed_reports = []
@@ -407,6 +426,8 @@ def generate_all_total_positions_reports():
         
         # Initialize report service
         report_service = TotalPositionsReportService()
+        # Every client's latest snapshot and positions, loaded once for all reports
+        report_service.data_loader = ConsolidatedDataLoader()
         
         generated_reports = []
         failed_reports = []
@@ -491,6 +512,8 @@ def generate_all_equity_breakdown_reports():
 
         # Initialize report service
         report_service = EquityBreakdownReportService()
+        # Every client's latest snapshot and positions, loaded once for all reports
+        report_service.data_loader = ConsolidatedDataLoader()
 
         generated_reports = []
         failed_reports = []
@@ -505,7 +528,7 @@ def generate_all_equity_breakdown_reports():
                 equity_count = Position.objects.filter(
                     snapshot__client=client,
                     asset__asset_type='Equities'
-                ).exclude(asset__bank='ALT').count()
+                ).exclude_alt().count()
 
                 if equity_count == 0:
                     skipped_reports.append({
@@ -919,6 +942,7 @@ def portfolio_metrics(request, client_code, snapshot_date):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@cached_response('available_snapshots')
 def available_snapshots(request, client_code=None):
     """Get list of available portfolio snapshots."""
     try:
@@ -1129,6 +1153,9 @@ def update_database(request):
         
         logger.info(f"✅ Rollover tracking updated for {len(clients_with_rollover)} clients")
         
+        # Rollover and cleanup changed positions after population
+        bump_generation(PORTFOLIO_DATA)
+        
         # Step 5: Calculate metrics for all clients (AFTER rollover and cleanup)
         processing_status.progress_message = 'Calculating portfolio metrics...'
         processing_status.save()
@@ -1182,11 +1209,18 @@ def update_database(request):
         except Exception as e:
             logger.error(f"⚠️  Dashboard cache aggregation error: {str(e)}")
         
+        # Aggregated dashboard rows changed too - drop responses built from the old data
+        bump_generation(PORTFOLIO_DATA)
+        
+        # Step 6: Precompute the client dashboards served on client login
+        client_dashboards = _publish_client_dashboards()
+        
         return Response({
             'success': True,
             'snapshot_date': snapshot_date,
             'population_results': population_results,
             'calculation_results': calculation_results,
+            'client_dashboards': client_dashboards,
             'rollover': {
                 'applied': len(rollover_results) > 0 if 'rollover_results' in locals() else False,
                 'summary': rollover_summary,
@@ -1299,6 +1333,7 @@ def recalculate_metrics(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@cached_response('available_dates_by_type', depends_on=(PORTFOLIO_DATA, REPORTS))
 def get_available_dates_by_type(request, report_type):
     """Get available dates for any report type, filtered by client."""
     client_code = request.GET.get('client_code')
@@ -1346,6 +1381,7 @@ def get_available_dates_by_type(request, report_type):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@cached_response('list_reports_by_type', depends_on=(REPORTS,))
 def list_generated_reports_by_type(request, report_type):
     """List generated reports for any report type."""
     client_code = request.GET.get('client_code')
@@ -1945,7 +1981,8 @@ def serve_report_file(request, report_id):
     """Serve HTML content of a saved report file."""
     try:
         from .models import Report
-        from .utils.report_utils import load_report_html
+        from .utils.report_utils import load_report_html, get_absolute_report_path
+        from .utils.report_store import read_reference
         
         # Get report record
         try:
@@ -1960,6 +1997,14 @@ def serve_report_file(request, report_id):
                 return Response({'error': 'Access denied'}, 
                               status=status.HTTP_403_FORBIDDEN)
         
+        # Stored reports are immutable per hash, so the hash is a strong validator
+        stored = read_reference(get_absolute_report_path(report.file_path))
+        etag = make_etag(report.id, stored.sha256) if stored else None
+        if etag:
+            not_modified = not_modified_response(request, etag=etag)
+            if not_modified is not None:
+                return not_modified
+        
         # Load HTML content from file
         try:
             html_content = load_report_html(report.file_path)
@@ -1967,7 +2012,7 @@ def serve_report_file(request, report_id):
             return Response({'error': 'Report file not found on disk'}, 
                           status=status.HTTP_404_NOT_FOUND)
         
-        return Response({
+        response = Response({
             'success': True,
             'html_content': html_content,
             'report_id': report.id,
@@ -1977,6 +2022,7 @@ def serve_report_file(request, report_id):
             'report_type': report.report_type,
             'file_path': report.file_path
         })
+        return apply_validators(response, etag=etag)
         
     except Exception as e:
         logger.error(f"Error serving report file: {e}")
@@ -1992,7 +2038,8 @@ def serve_report_html_direct(request, report_id):
     """Serve report HTML directly for mobile browsers."""
     try:
         from .models import Report
-        from .utils.report_utils import load_report_html
+        from .utils.report_utils import load_report_html, get_absolute_report_path
+        from .utils.report_store import read_reference, get_object_path, negotiate_encoding
         
         # Get report record
         try:
@@ -2005,13 +2052,37 @@ def serve_report_html_direct(request, report_id):
             if request.user.client_code != report.client.code:
                 return HttpResponse('Access denied', status=403)
         
-        # Load HTML content from file
+        stored = read_reference(get_absolute_report_path(report.file_path))
+        if stored is not None:
+            # Send the pre-compressed object as-is when the client accepts its encoding;
+            # each encoding's bytes get their own validator
+            encoding = negotiate_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''), stored.encodings)
+            not_modified = not_modified_response(request, etag=stored.etag(encoding))
+            if not_modified is not None:
+                return not_modified
+            
+            # The object may have been pruned while its reference survived
+            try:
+                if encoding:
+                    response = FileResponse(
+                        open(get_object_path(stored.sha256, encoding), 'rb'),
+                        content_type='text/html; charset=utf-8'
+                    )
+                    response['Content-Encoding'] = encoding
+                else:
+                    response = HttpResponse(load_report_html(report.file_path),
+                                            content_type='text/html; charset=utf-8')
+            except FileNotFoundError:
+                return HttpResponse('Report file not found on disk', status=404)
+            response['Vary'] = 'Accept-Encoding'
+            return apply_validators(response, etag=stored.etag(encoding))
+        
+        # Legacy plain HTML file
         try:
             html_content = load_report_html(report.file_path)
         except FileNotFoundError:
             return HttpResponse('Report file not found on disk', status=404)
         
-        # Return raw HTML with proper headers
         response = HttpResponse(html_content, content_type='text/html; charset=utf-8')
         response['Cache-Control'] = 'no-cache, no-store, must-revalidate'
         response['Pragma'] = 'no-cache'
@@ -2050,6 +2121,7 @@ def available_reports(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsAdminUser])
+@cached_response('admin_dashboard_data')
 def admin_dashboard_data(request):
     """
     ULTRA-FAST admin dashboard using CORRECT pre-aggregated cache.
@@ -2095,6 +2167,37 @@ def admin_dashboard_data(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdminUser])
+@cached_response('firm_equity_lookthrough')
+def firm_equity_lookthrough(request):
+    """
+    Firm-wide equity look-through across every client's latest snapshot.
+    Served from the local ETF holdings store; no FMP calls on the request path.
+    Supports ?top=N for the number of holdings listed per client (default 25).
+    """
+    try:
+        top_n = int(request.GET.get('top', 25))
+    except ValueError:
+        return Response({
+            'success': False,
+            'error': 'top must be an integer'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        from .services.equity_analysis_service import EquityAnalysisService
+
+        result = EquityAnalysisService().analyze_firm_lookthrough(top_n=top_n)
+        return Response({'success': True, **result})
+
+    except Exception as e:
+        logger.error(f"Error computing firm-wide equity look-through: {e}")
+        return Response({
+            'success': False,
+            'error': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsAdminUser])
 def admin_dashboard_data_original(request, client_filter=None):
@@ -2292,12 +2395,24 @@ def client_dashboard_with_charts(request):
     Client dashboard with full metrics and chart data.
     Returns same structure as admin dashboard but filtered to client's own data only.
     Uses identical calculation logic as admin dashboard for consistency.
+    
+    Served from the document precomputed by update_database (conditional GET via
+    ETag / Last-Modified); calculated live only when that document is stale.
     """
     try:
         # Security: Force client_code to authenticated user's client_code
         client_code = request.user.client_code
         logger.info(f"Client dashboard request for client: {client_code}")
         
+        dashboard_service = ClientDashboardService()
+        document = dashboard_service.current(client_code)
+        if document is not None:
+            etag = dashboard_service.etag(document)
+            not_modified = not_modified_response(request, etag, document.generated_at)
+            if not_modified is not None:
+                return not_modified
+            return apply_validators(Response(document.payload['dashboard']), etag, document.generated_at)
+        
         # Get the specific client
         try:
             client = Client.objects.get(code=client_code)
@@ -2318,99 +2433,129 @@ def client_dashboard_with_charts(request):
                 'error': f'No portfolio data found for client {client_code}'
             }, status=status.HTTP_404_NOT_FOUND)
         
-        # Extract metrics from snapshot (using same logic as admin dashboard)
-        metrics = latest_snapshot.portfolio_metrics
+        # Live fallback - store the result so the next login is served from the document
+        data_version = dashboard_service.data_version(client_code)
+        payload = _build_client_dashboard_document(client, latest_snapshot)
+        try:
+            dashboard_service.publish(client_code, latest_snapshot, payload, data_version)
+        except Exception as e:
+            logger.warning(f"Could not store dashboard document for {client_code}: {e}")
         
-        # Individual client metrics (same field names as admin dashboard)
-        total_aum = float(metrics.get('total_value', 0))
-        inception_dollar = float(metrics.get('inception_gain_loss_dollar', 0))
-        inception_percent = float(metrics.get('inception_gain_loss_percent', 0))
-        annual_income = float(metrics.get('estimated_annual_income', 0))
+        logger.info(f"Client dashboard data generated for {client_code}: ${payload['dashboard']['summary']['total_aum']:,.2f} AUM")
+        return Response(payload['dashboard'])
+        
+    except Exception as e:
+        logger.error(f"Error getting client dashboard data for {request.user.client_code}: {e}")
+        return Response({
+            'success': False,
+            'error': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-        # Extract this period returns from metrics
-        period_dollar = float(metrics.get('real_gain_loss_dollar', 0))
-        period_percent = float(metrics.get('real_gain_loss_percent', 0))
 
-        # Calculate monthly returns
-        from portfolio.services.portfolio_calculation_service import PortfolioCalculationService
-        calc_service = PortfolioCalculationService()
-        monthly_result = calc_service.calculate_monthly_return(client.code, latest_snapshot.snapshot_date)
-        monthly_dollar = float(monthly_result['monthly_return_dollar'])
-        monthly_percent = float(monthly_result['monthly_return_percent'])
+def _build_client_dashboard(client, latest_snapshot):
+    """Body of client_dashboard_with_charts for a client's latest snapshot."""
+    client_code = client.code
+    
+    # Extract metrics from snapshot (using same logic as admin dashboard)
+    metrics = latest_snapshot.portfolio_metrics
+    
+    # Individual client metrics (same field names as admin dashboard)
+    total_aum = float(metrics.get('total_value', 0))
+    inception_dollar = float(metrics.get('inception_gain_loss_dollar', 0))
+    inception_percent = float(metrics.get('inception_gain_loss_percent', 0))
+    annual_income = float(metrics.get('estimated_annual_income', 0))
+
+    # Extract this period returns from metrics
+    period_dollar = float(metrics.get('real_gain_loss_dollar', 0))
+    period_percent = float(metrics.get('real_gain_loss_percent', 0))
+
+    # Calculate monthly returns
+    from portfolio.services.portfolio_calculation_service import PortfolioCalculationService
+    calc_service = PortfolioCalculationService()
+    monthly_result = calc_service.calculate_monthly_return(client.code, latest_snapshot.snapshot_date)
+    monthly_dollar = float(monthly_result['monthly_return_dollar'])
+    monthly_percent = float(monthly_result['monthly_return_percent'])
+
+    # Get previous snapshot for period comparison label
+    previous_snapshot = PortfolioSnapshot.objects.filter(
+        client=client,
+        snapshot_date__lt=latest_snapshot.snapshot_date
+    ).order_by('-snapshot_date').first()
+
+    # Format period comparison label
+    if previous_snapshot:
+        period_label = f"{previous_snapshot.snapshot_date.strftime('%b %d')} → {latest_snapshot.snapshot_date.strftime('%b %d')}"
+    else:
+        period_label = latest_snapshot.snapshot_date.strftime('%b %d')
 
-        # Get previous snapshot for period comparison label
-        previous_snapshot = PortfolioSnapshot.objects.filter(
-            client=client,
-            snapshot_date__lt=latest_snapshot.snapshot_date
-        ).order_by('-snapshot_date').first()
+    # Format monthly return label (current month)
+    monthly_label = latest_snapshot.snapshot_date.strftime('%B')
 
-        # Format period comparison label
-        if previous_snapshot:
-            period_label = f"{previous_snapshot.snapshot_date.strftime('%b %d')} → {latest_snapshot.snapshot_date.strftime('%b %d')}"
-        else:
-            period_label = latest_snapshot.snapshot_date.strftime('%b %d')
+    # Asset allocation for charts
+    client_asset_allocation = metrics.get('asset_allocation', {})
+    asset_allocation_aggregated = {}
+    for asset_type, allocation_data in client_asset_allocation.items():
+        if isinstance(allocation_data, dict) and 'value' in allocation_data:
+            asset_allocation_aggregated[asset_type] = float(allocation_data['value'])
+    
+    # Prepare client data structure for chart generation (single client)
+    clients_data = [{
+        'client_code': client.code,
+        'client_name': client.name,
+        'total_value': total_aum,
+        'inception_dollar': inception_dollar,
+        'inception_percent': inception_percent,
+        'annual_income': annual_income,
+        'asset_allocation': client_asset_allocation
+    }]
+    
+    # Generate chart data using same function as admin dashboard
+    chart_data = _generate_admin_chart_data(clients_data, asset_allocation_aggregated, client_code)
+    
+    # Prepare summary in exact same format as admin dashboard
+    summary = {
+        'total_aum': total_aum,
+        'inception_dollar_performance': inception_dollar,
+        'inception_return_pct': inception_percent,
+        'estimated_annual_income': annual_income,
 
-        # Format monthly return label (current month)
-        monthly_label = latest_snapshot.snapshot_date.strftime('%B')
+        # This Period Returns
+        'period_return_dollar': period_dollar,
+        'period_return_percent': period_percent,
+        'period_comparison_label': period_label,
 
-        # Asset allocation for charts
-        client_asset_allocation = metrics.get('asset_allocation', {})
-        asset_allocation_aggregated = {}
-        for asset_type, allocation_data in client_asset_allocation.items():
-            if isinstance(allocation_data, dict) and 'value' in allocation_data:
-                asset_allocation_aggregated[asset_type] = float(allocation_data['value'])
-        
-        # Prepare client data structure for chart generation (single client)
-        clients_data = [{
-            'client_code': client.code,
-            'client_name': client.name,
-            'total_value': total_aum,
-            'inception_dollar': inception_dollar,
-            'inception_percent': inception_percent,
-            'annual_income': annual_income,
-            'asset_allocation': client_asset_allocation
-        }]
-        
-        # Generate chart data using same function as admin dashboard
-        chart_data = _generate_admin_chart_data(clients_data, asset_allocation_aggregated, client_code)
-        
-        # Prepare summary in exact same format as admin dashboard
-        summary = {
-            'total_aum': total_aum,
-            'inception_dollar_performance': inception_dollar,
-            'inception_return_pct': inception_percent,
-            'estimated_annual_income': annual_income,
+        # Monthly Returns
+        'monthly_return_dollar': monthly_dollar,
+        'monthly_return_percent': monthly_percent,
+        'monthly_return_month': monthly_label,
 
-            # This Period Returns
-            'period_return_dollar': period_dollar,
-            'period_return_percent': period_percent,
-            'period_comparison_label': period_label,
+        'client_count': 1,  # Always 1 for client dashboard
+        'filter_applied': client_code
+    }
+    
+    # Return identical structure as admin dashboard
+    return {
+        'summary': summary,
+        'charts': chart_data,
+        'last_updated': datetime.now().isoformat()
+    }
 
-            # Monthly Returns
-            'monthly_return_dollar': monthly_dollar,
-            'monthly_return_percent': monthly_percent,
-            'monthly_return_month': monthly_label,
 
-            'client_count': 1,  # Always 1 for client dashboard
-            'filter_applied': client_code
-        }
-        
-        # Return identical structure as admin dashboard
-        response_data = {
-            'summary': summary,
-            'charts': chart_data,
-            'last_updated': datetime.now().isoformat()
-        }
-        
-        logger.info(f"Client dashboard data generated for {client_code}: ${total_aum:,.2f} AUM")
-        return Response(response_data)
-        
+def _build_client_dashboard_document(client, latest_snapshot):
+    """Both client dashboard bodies, as stored in the precomputed ClientDashboardDocument."""
+    return {
+        'dashboard': _build_client_dashboard(client, latest_snapshot),
+        'data': _build_client_dashboard_data(client, latest_snapshot)
+    }
+
+
+def _publish_client_dashboards():
+    """Precompute every client's dashboard document (end of update_database)."""
+    try:
+        return ClientDashboardService().publish_all(_build_client_dashboard_document)
     except Exception as e:
-        logger.error(f"Error getting client dashboard data for {request.user.client_code}: {e}")
-        return Response({
-            'success': False,
-            'error': str(e)
-        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        logger.error(f"Client dashboard documents not published: {e}")
+        return {'published': 0, 'failed': 0, 'error': str(e)}
 
 
 def _generate_admin_chart_data(clients_data, asset_allocation_aggregated, client_filter):
@@ -2448,7 +2593,8 @@ def _generate_single_client_charts(client_code, report_service):
         if not latest_snapshot:
             return _get_empty_chart_data()
         
-        positions = latest_snapshot.positions.select_related('asset').exclude(asset__bank='ALT').all()
+        # One values_list query shared by the allocation and maturity charts
+        positions = PositionFrame.from_queryset(latest_snapshot.positions.exclude_alt())
         
         # 1. Asset Allocation - REUSE existing method
         asset_allocation_data = report_service._calculate_asset_allocation(positions)
@@ -2561,9 +2707,14 @@ def _generate_aggregated_charts(clients_data, asset_allocation_aggregated, repor
 def _generate_aggregated_portfolio_evolution(clients_data, report_service):
     """
     Generate aggregated portfolio evolution across all clients.
-    Combines individual client portfolio histories by summing total values for each date.
+    Served from the pre-computed firm-wide series; falls back to summing
+    individual client portfolio histories when the series is empty.
     """
     try:
+        evolution_chart = PortfolioEvolutionService().build_evolution_chart('ALL')
+        if evolution_chart:
+            return evolution_chart
+
         from collections import defaultdict
         all_client_histories = {}
         
@@ -3023,7 +3174,7 @@ def _get_empty_portfolio_metrics():
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def client_dashboard_data(request, client_code=None):
-    """Get data for client dashboard."""
+    """Get data for client dashboard (precomputed document when current, else live)."""
     try:
         # Determine client code
         if request.user.role == 'client':
@@ -3036,52 +3187,107 @@ def client_dashboard_data(request, client_code=None):
         if request.user.role == 'client' and request.user.client_code != client_code:
             return Response({'error': 'Access denied'}, status=status.HTTP_403_FORBIDDEN)
         
+        dashboard_service = ClientDashboardService()
+        document = dashboard_service.current(client_code)
+        if document is not None:
+            etag = dashboard_service.etag(document)
+            not_modified = not_modified_response(request, etag, document.generated_at)
+            if not_modified is not None:
+                return not_modified
+            return apply_validators(Response(document.payload['data']), etag, document.generated_at)
+        
         # Get client data
         client = Client.objects.get(code=client_code)
         latest_snapshot = PortfolioSnapshot.objects.filter(
             client=client
         ).order_by('-snapshot_date').first()
         
-        if not latest_snapshot:
-            return Response({
-                'client_code': client_code,
-                'client_name': client.name,
-                'has_data': False,
-                'message': 'No portfolio data available'
-            })
-        
-        metrics = latest_snapshot.portfolio_metrics
+        return Response(_build_client_dashboard_data(client, latest_snapshot))
         
+    except Client.DoesNotExist:
+        return Response({'error': 'Client not found'}, status=status.HTTP_404_NOT_FOUND)
+    except Exception as e:
+        logger.error(f"Error getting client dashboard data: {e}")
         return Response({
-            'client_code': client_code,
+            'success': False,
+            'error': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+def _build_client_dashboard_data(client, latest_snapshot):
+    """Body of client_dashboard_data for a client's latest snapshot (None when it has no data yet)."""
+    if not latest_snapshot:
+        return {
+            'client_code': client.code,
             'client_name': client.name,
-            'has_data': True,
-            'snapshot_date': latest_snapshot.snapshot_date,
-            'total_value': metrics.get('total_value', 0),
-            'unrealized_gain_loss': metrics.get('unrealized_gain_loss', 0),
-            'unrealized_gain_loss_pct': metrics.get('unrealized_gain_loss_pct', 0),
-            'estimated_annual_income': metrics.get('estimated_annual_income', 0),
+            'has_data': False,
+            'message': 'No portfolio data available'
+        }
+    
+    metrics = latest_snapshot.portfolio_metrics
+    monthly_result = PortfolioCalculationService().calculate_monthly_return(client.code, latest_snapshot.snapshot_date)
+    
+    return {
+        'client_code': client.code,
+        'client_name': client.name,
+        'has_data': True,
+        'snapshot_date': latest_snapshot.snapshot_date,
+        'total_value': metrics.get('total_value', 0),
+        'unrealized_gain_loss': metrics.get('unrealized_gain_loss', 0),
+        'unrealized_gain_loss_pct': metrics.get('unrealized_gain_loss_pct', 0),
+        'estimated_annual_income': metrics.get('estimated_annual_income', 0),
 
-            # This Period Returns
-            'period_return_dollar': metrics.get('real_gain_loss_dollar', 0),
-            'period_return_percent': metrics.get('real_gain_loss_percent', 0),
+        # This Period Returns
+        'period_return_dollar': metrics.get('real_gain_loss_dollar', 0),
+        'period_return_percent': metrics.get('real_gain_loss_percent', 0),
 
-            # Monthly Returns
-            'monthly_return_dollar': PortfolioCalculationService().calculate_monthly_return(client_code, latest_snapshot.snapshot_date)['monthly_return_dollar'],
-            'monthly_return_percent': PortfolioCalculationService().calculate_monthly_return(client_code, latest_snapshot.snapshot_date)['monthly_return_percent'],
-
-            'position_count': metrics.get('position_count', 0),
-            'asset_allocation': metrics.get('asset_allocation', {}),
-            'custody_allocation': metrics.get('custody_allocation', {}),
-            'bank_allocation': metrics.get('bank_allocation', {}),
-            'chart_data': metrics.get('chart_data', {}),
-            'last_updated': latest_snapshot.updated_at.isoformat()
+        # Monthly Returns
+        'monthly_return_dollar': monthly_result['monthly_return_dollar'],
+        'monthly_return_percent': monthly_result['monthly_return_percent'],
+
+        'position_count': metrics.get('position_count', 0),
+        'asset_allocation': metrics.get('asset_allocation', {}),
+        'custody_allocation': metrics.get('custody_allocation', {}),
+        'bank_allocation': metrics.get('bank_allocation', {}),
+        'chart_data': metrics.get('chart_data', {}),
+        'last_updated': latest_snapshot.updated_at.isoformat()
+    }
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def portfolio_evolution_series(request):
+    """
+    Pre-computed portfolio value series as compact parallel arrays.
+    Admins may pass ?client_code=ABC or ?client_code=ALL; client users always get their own series.
+    Supports conditional GET via ETag / Last-Modified.
+    """
+    try:
+        if request.user.role == 'client':
+            client_filter = request.user.client_code
+        else:
+            client_filter = request.GET.get('client_code', 'ALL')
+
+        evolution_service = PortfolioEvolutionService()
+        version = evolution_service.get_series_version(client_filter)
+        etag = make_etag('evolution', client_filter, version['count'], version['last_updated'])
+
+        not_modified = not_modified_response(request, etag, version['last_updated'])
+        if not_modified is not None:
+            return not_modified
+
+        series = evolution_service.get_series(client_filter)
+        response = Response({
+            'success': True,
+            'client_filter': client_filter,
+            'dates': series['dates'],
+            'values': series['values'],
+            'last_updated': version['last_updated'].isoformat() if version['last_updated'] else None
         })
-        
-    except Client.DoesNotExist:
-        return Response({'error': 'Client not found'}, status=status.HTTP_404_NOT_FOUND)
+        return apply_validators(response, etag, version['last_updated'])
+
     except Exception as e:
-        logger.error(f"Error getting client dashboard data: {e}")
+        logger.error(f"Error getting portfolio evolution series: {e}")
         return Response({
             'success': False,
             'error': str(e)
@@ -3089,7 +3295,30 @@ def client_dashboard_data(request, client_code=None):
 
 # File Management API Endpoints
 
-def organize_uploaded_file(uploaded_file, bank_code, extracted_date):
+def _write_uploaded_file(uploaded_file, file_path, staged=None):
+    """Write an uploaded file to disk, returning its SHA-256 (computed while writing).
+
+    A file already staged by the upload pipeline is moved into place instead.
+    """
+    if staged is not None and staged.path is not None:
+        os.replace(staged.path, file_path)
+        staged.path = None
+        return staged.content_hash
+    digest = hashlib.sha256()
+    with open(file_path, 'wb+') as destination:
+        for chunk in uploaded_file.chunks():
+            destination.write(chunk)
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _catalog_file(file_path, stage, digest=None):
+    """Record a written file in the file catalog; reconcile_file_catalog repairs misses."""
+    try:
+        FileCatalogService().record(file_path, stage, digest)
+    except Exception as e:
+        logger.warning(f"Could not catalog {file_path}: {e}")
+
+def organize_uploaded_file(uploaded_file, bank_code, extracted_date, staged=None):
     """Organize uploaded file directly to correct bank processing location."""
     try:
         # Base directory for all processing files
@@ -3102,9 +3331,8 @@ def organize_uploaded_file(uploaded_file, bank_code, extracted_date):
             fallback_dir.mkdir(parents=True, exist_ok=True)
             final_file_path = fallback_dir / uploaded_file.name
             
-            with open(final_file_path, 'wb+') as destination:
-                for chunk in uploaded_file.chunks():
-                    destination.write(chunk)
+            digest = _write_uploaded_file(uploaded_file, final_file_path, staged)
+            _catalog_file(final_file_path, 'upload', digest)
             
             return {
                 'status': 'warning',
@@ -3113,47 +3341,16 @@ def organize_uploaded_file(uploaded_file, bank_code, extracted_date):
                 'message': f'Bank not detected - saved to unidentified folder'
             }
         
-        # Determine correct destination based on bank processing requirements
-        bank_destinations = {
-            # Special processing banks (enrichment + combination)
-            'Pershing': base_processing_dir / 'pershing' / 'nonenriched_pershing',
-            'LO': base_processing_dir / 'lombard' / 'nonenriched_lombard',
-            'STDSZ': base_processing_dir / 'santander_switzerland' / 'nonenriched_santander_switzerland',
-
-            # Combination processing banks
-            'Banchile': base_processing_dir / 'banchile',
-            'CS': base_processing_dir / 'cs',
-            'CSC': base_processing_dir / 'csc',
-            'JB': base_processing_dir / 'jb',
-            'Valley': base_processing_dir / 'valley',
-            'IDB': base_processing_dir / 'idb',  # Fixed: IDB needs combination processing
-            'Pictet': base_processing_dir / 'pictet',
-            'Gonet': base_processing_dir / 'gonet',
-
-            # Enrichment processing banks
-            'HSBC': base_processing_dir / 'hsbc',
-
-            # Alternative assets - ready for combination
-            'ALT': base_processing_dir / 'alternatives',
-
-            # Simple processing banks (ready for transform)
-            'JPM': base_processing_dir,  # Root directory
-            'MS': base_processing_dir,   # Root directory
-            'Safra': base_processing_dir, # Root directory
-            'Citi': base_processing_dir  # Root directory
-        }
-        
         # Get destination directory for this bank
-        destination_dir = bank_destinations.get(bank_code)
+        destination_dir = UPLOAD_DESTINATIONS.get(bank_code)
         if not destination_dir:
             # Unknown bank - save to uploads fallback
             fallback_dir = Path(settings.BASE_DIR) / 'aurum_backend' / 'uploads' / 'unknown_banks'
             fallback_dir.mkdir(parents=True, exist_ok=True)
             final_file_path = fallback_dir / uploaded_file.name
             
-            with open(final_file_path, 'wb+') as destination:
-                for chunk in uploaded_file.chunks():
-                    destination.write(chunk)
+            digest = _write_uploaded_file(uploaded_file, final_file_path, staged)
+            _catalog_file(final_file_path, 'upload', digest)
             
             return {
                 'status': 'warning',
@@ -3170,13 +3367,12 @@ def organize_uploaded_file(uploaded_file, bank_code, extracted_date):
         final_file_path = destination_dir / uploaded_file.name
         logger.info(f"💾 Saving {bank_code} file to: {final_file_path}")
         
-        with open(final_file_path, 'wb+') as destination:
-            for chunk in uploaded_file.chunks():
-                destination.write(chunk)
+        digest = _write_uploaded_file(uploaded_file, final_file_path, staged)
         
         # Verify file was saved
         if final_file_path.exists():
             logger.info(f"✅ File successfully saved: {final_file_path}")
+            _catalog_file(final_file_path, 'input', digest)
         else:
             logger.error(f"❌ File save failed: {final_file_path}")
         
@@ -3207,9 +3403,8 @@ def organize_uploaded_file(uploaded_file, bank_code, extracted_date):
         fallback_dir.mkdir(parents=True, exist_ok=True)
         fallback_path = fallback_dir / uploaded_file.name
         
-        with open(fallback_path, 'wb+') as destination:
-            for chunk in uploaded_file.chunks():
-                destination.write(chunk)
+        digest = _write_uploaded_file(uploaded_file, fallback_path, staged)
+        _catalog_file(fallback_path, 'upload', digest)
         
         return {
             'status': 'error',
@@ -3221,7 +3416,13 @@ def organize_uploaded_file(uploaded_file, bank_code, extracted_date):
 @api_view(['POST'])
 @permission_classes([IsAuthenticated, IsAdminUser])
 def upload_files(request):
-    """Enhanced upload with smart organization."""
+    """Enhanced upload with smart organization.
+
+    Files are staged, hashed and validated concurrently (UploadPipeline); exact
+    re-uploads are linked to the existing file instead of being rewritten. With
+    ?stream=1 results are streamed as NDJSON lines as each file finishes, followed
+    by a summary line.
+    """
     try:
         uploaded_files = request.FILES.getlist('files')
         if not uploaded_files:
@@ -3230,75 +3431,40 @@ def upload_files(request):
                 'error': 'No files provided'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        processing_service = ProcessingService()
-        results = []
-        total_size = 0
+        pipeline = UploadPipeline()
         start_time = datetime.now()
         
-        for uploaded_file in uploaded_files:
-            try:
-                # Validate file type
-                if not uploaded_file.name.lower().endswith(('.xlsx', '.xls')):
-                    results.append({
-                        'filename': uploaded_file.name,
-                        'success': False,
-                        'error': 'Invalid file type. Only .xlsx and .xls files are allowed.',
-                        'bank_detected': None,
-                        'date_detected': None,
-                        'size': uploaded_file.size,
-                        'organized_path': None
-                    })
-                    continue
-                
-                # Detect bank and date
-                bank_code = processing_service.detect_bank(uploaded_file.name)
-                extracted_date = processing_service.extract_date_from_filename(uploaded_file.name)
-                
-                # Organize file
-                organization_result = organize_uploaded_file(uploaded_file, bank_code, extracted_date)
-                
-                total_size += uploaded_file.size
-                
-                results.append({
-                    'filename': uploaded_file.name,
-                    'success': organization_result['status'] == 'success',
-                    'status': organization_result['status'],
-                    'bank_detected': bank_code,
-                    'date_detected': extracted_date,
-                    'size': uploaded_file.size,
-                    'final_location': organization_result['final_location'],
-                    'organized_path': organization_result['organized_path'],
-                    'message': organization_result['message']
-                })
-                
-                logger.info(f"Successfully uploaded {uploaded_file.name} (Bank: {bank_code}, Date: {extracted_date})")
-                
-            except Exception as e:
-                logger.error(f"Error processing file {uploaded_file.name}: {e}")
-                results.append({
-                    'filename': uploaded_file.name,
-                    'success': False,
-                    'status': 'error',
-                    'error': str(e),
-                    'bank_detected': None,
-                    'date_detected': None,
-                    'size': uploaded_file.size if hasattr(uploaded_file, 'size') else 0,
-                    'organized_path': None
-                })
+        def summary(results):
+            processing_time = (datetime.now() - start_time).total_seconds()
+            successful_uploads = len([r for r in results if r['success']])
+            total_size = sum(r['size'] for r in results if r.get('final_location'))
+            return {
+                'success': True,
+                'files_processed': len(uploaded_files),
+                'successful_uploads': successful_uploads,
+                'failed_uploads': len(uploaded_files) - successful_uploads,
+                'duplicates': len([r for r in results if r.get('status') == 'duplicate']),
+                'total_size': total_size,
+                'processing_time': processing_time,
+                'message': f'Processed {len(uploaded_files)} files, {successful_uploads} successful'
+            }
         
-        processing_time = (datetime.now() - start_time).total_seconds()
-        successful_uploads = len([r for r in results if r['success']])
+        if request.query_params.get('stream') in ('1', 'true'):
+            def lines():
+                results = []
+                for result in pipeline.run(uploaded_files, organize_uploaded_file):
+                    results.append(result)
+                    yield json.dumps({'type': 'file', **result}, default=str) + '\n'
+                yield json.dumps({'type': 'summary', **summary(results)}, default=str) + '\n'
+            
+            return StreamingHttpResponse(lines(), content_type='application/x-ndjson')
         
-        return Response({
-            'success': True,
-            'files_processed': len(uploaded_files),
-            'successful_uploads': successful_uploads,
-            'failed_uploads': len(uploaded_files) - successful_uploads,
-            'results': results,
-            'total_size': total_size,
-            'processing_time': processing_time,
-            'message': f'Processed {len(uploaded_files)} files, {successful_uploads} successful'
-        })
+        results = list(pipeline.run(uploaded_files, organize_uploaded_file))
+        names = [uploaded_file.name for uploaded_file in uploaded_files]
+        # Report in upload order; the pipeline finishes files out of order
+        results.sort(key=lambda r: names.index(r['filename']) if r['filename'] in names else len(names))
+        
+        return Response({**summary(results), 'results': results})
         
     except Exception as e:
         logger.error(f"Error in file upload: {e}")
@@ -3323,69 +3489,36 @@ def list_files(request):
                 'message': 'Upload directory does not exist'
             })
         
-        processing_service = ProcessingService()
         files_data = []
         total_size = 0
         
         # Group files by bank and date
         banks_data = {}
         
-        for file_path in upload_dir.glob('*.xlsx'):
-            try:
-                file_stat = file_path.stat()
-                bank_code = processing_service.detect_bank(file_path.name)
-                date_str = processing_service.extract_date_from_filename(file_path.name)
-                
-                file_info = {
-                    'filename': file_path.name,
-                    'size': file_stat.st_size,
-                    'modified': datetime.fromtimestamp(file_stat.st_mtime).isoformat(),
-                    'bank_detected': bank_code,
-                    'date_detected': date_str,
-                    'path': str(file_path)
-                }
-                
-                files_data.append(file_info)
-                total_size += file_stat.st_size
-                
-                # Group by bank
-                if bank_code:
-                    if bank_code not in banks_data:
-                        banks_data[bank_code] = []
-                    banks_data[bank_code].append(file_info)
-                
-            except Exception as e:
-                logger.error(f"Error processing file {file_path.name}: {e}")
-                continue
+        # Files come from the file catalog (.xlsx before .xls, as listed before)
+        entries = FileCatalogService().files('upload', [upload_dir]).order_by('filename')
+        entries = sorted(entries, key=lambda entry: not entry.filename.endswith('.xlsx'))
         
-        # Also check for .xls files
-        for file_path in upload_dir.glob('*.xls'):
-            try:
-                file_stat = file_path.stat()
-                bank_code = processing_service.detect_bank(file_path.name)
-                date_str = processing_service.extract_date_from_filename(file_path.name)
-                
-                file_info = {
-                    'filename': file_path.name,
-                    'size': file_stat.st_size,
-                    'modified': datetime.fromtimestamp(file_stat.st_mtime).isoformat(),
-                    'bank_detected': bank_code,
-                    'date_detected': date_str,
-                    'path': str(file_path)
-                }
-                
-                files_data.append(file_info)
-                total_size += file_stat.st_size
-                
-                # Group by bank
-                if bank_code:
-                    if bank_code not in banks_data:
-                        banks_data[bank_code] = []
-                    banks_data[bank_code].append(file_info)
-                
-            except Exception as e:
-                logger.error(f"Error processing file {file_path.name}: {e}")
-                continue
+        for entry in entries:
+            bank_code = entry.bank or None
+            
+            file_info = {
+                'filename': entry.filename,
+                'size': entry.size,
+                'modified': datetime.fromtimestamp(entry.mtime.timestamp()).isoformat(),
+                'bank_detected': bank_code,
+                'date_detected': entry.file_date or None,
+                'path': entry.path
+            }
+            
+            files_data.append(file_info)
+            total_size += entry.size
+            
+            # Group by bank
+            if bank_code:
+                if bank_code not in banks_data:
+                    banks_data[bank_code] = []
+                banks_data[bank_code].append(file_info)
         
         return Response({
             'success': True,
@@ -3437,6 +3570,7 @@ def delete_file(request, filename):
         
         # Delete the file
         file_path.unlink()
+        FileCatalogService().remove(file_path)
         
         logger.info(f"Successfully deleted file: {filename}")
         
@@ -3548,13 +3682,15 @@ def get_clients(request):
             'error': str(e)
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-def scan_bank_files(bank_code, base_processing_dir, target_date=None):
+def scan_bank_files(bank_code, base_processing_dir, target_date=None, catalog_files=None):
     """Scan bank processing directories for files and return comprehensive status.
     
     Args:
         bank_code: Bank code to scan for
         base_processing_dir: Base directory to scan
         target_date: Optional specific date to filter files by (DD_MM_YYYY format)
+        catalog_files: Optional (directory, filename, file_date) rows of the input file
+            catalog, so several banks can share one query (queried when None)
     """
     from collections import defaultdict
     
@@ -3639,53 +3775,54 @@ def scan_bank_files(bank_code, base_processing_dir, target_date=None):
     }
     
     # Get scan locations for this bank
-    locations = scan_locations.get(bank_code, [])
+    locations = {str(location) for location in scan_locations.get(bank_code, [])}
+    if catalog_files is None:
+        catalog_files = (FileCatalogService().files('input', locations)
+                         .values_list('directory', 'filename', 'file_date'))
     
-    for location in locations:
-        if not location.exists():
+    for directory, filename, extracted_date in catalog_files:
+        if directory not in locations or not filename.endswith('.xlsx'):
             continue
-            
+        
         # Find all files for this bank in this location
         if bank_code == 'ALT':
-            # ALT files use lowercase prefix, scan case-insensitively
-            bank_files = list(location.glob(f"*alt*.xlsx")) + list(location.glob(f"*ALT*.xlsx"))
-        else:
-            bank_files = list(location.glob(f"*{bank_code}*.xlsx"))
-        
-        # Process found files
-        for file_path in bank_files:
-            # Extract date using filename (never file modification time)
-            processing_service = ProcessingService()
-            extracted_date = processing_service.extract_date_from_filename(file_path.name)
-            if extracted_date:
-                file_info['dates_available'].add(extracted_date)
-                
-                # Track latest date (not file timestamp)
-                if not file_info['last_upload_date'] or extracted_date > file_info['last_upload_date']:
-                    file_info['last_upload_date'] = extracted_date
-            
-            # If target_date is specified, only count files for that date
-            if target_date and extracted_date != target_date:
-                continue  # Skip files not matching target date
-            
-            # Determine file type with enhanced detection
-            filename_lower = file_path.name.lower()
-            
-            # Special handling for Banchile - client files contain both securities and transactions in sheets
-            if bank_code == 'Banchile' and not any(keyword in filename_lower for keyword in ['securities', 'transactions', 'unitcost', 'cashmovements']):
-                # Banchile client files (e.g., Banchile_CI_CI_31_07_2025.xlsx) contain both data types
-                file_info['file_types']['securities'] += 1
-                file_info['file_types']['transactions'] += 1
-            elif 'securities' in filename_lower:
-                file_info['file_types']['securities'] += 1
-            elif 'transactions' in filename_lower:
-                file_info['file_types']['transactions'] += 1
-            elif 'unitcost' in filename_lower:
-                file_info['file_types']['unitcost'] += 1
-            elif 'cashmovements' in filename_lower:
-                file_info['file_types']['cashmovements'] += 1
+            # ALT files use lowercase prefix, match case-insensitively
+            if 'alt' not in filename and 'ALT' not in filename:
+                continue
+        elif bank_code not in filename:
+            continue
+        
+        # Date cataloged from the filename (never file modification time)
+        extracted_date = extracted_date or None
+        if extracted_date:
+            file_info['dates_available'].add(extracted_date)
             
-            file_info['total_files'] += 1
+            # Track latest date (not file timestamp)
+            if not file_info['last_upload_date'] or extracted_date > file_info['last_upload_date']:
+                file_info['last_upload_date'] = extracted_date
+        
+        # If target_date is specified, only count files for that date
+        if target_date and extracted_date != target_date:
+            continue  # Skip files not matching target date
+        
+        # Determine file type with enhanced detection
+        filename_lower = filename.lower()
+        
+        # Special handling for Banchile - client files contain both securities and transactions in sheets
+        if bank_code == 'Banchile' and not any(keyword in filename_lower for keyword in ['securities', 'transactions', 'unitcost', 'cashmovements']):
+            # Banchile client files (e.g., Banchile_CI_CI_31_07_2025.xlsx) contain both data types
+            file_info['file_types']['securities'] += 1
+            file_info['file_types']['transactions'] += 1
+        elif 'securities' in filename_lower:
+            file_info['file_types']['securities'] += 1
+        elif 'transactions' in filename_lower:
+            file_info['file_types']['transactions'] += 1
+        elif 'unitcost' in filename_lower:
+            file_info['file_types']['unitcost'] += 1
+        elif 'cashmovements' in filename_lower:
+            file_info['file_types']['cashmovements'] += 1
+        
+        file_info['total_files'] += 1
     
     return file_info
 
@@ -3785,6 +3922,10 @@ def get_bank_status(request):
         # Base processing directory for scanning
         base_processing_dir = Path('data/excel/input_files')
         
+        # One file catalog query shared by every bank's scan
+        catalog_files = list(FileCatalogService().files('input')
+                             .values_list('directory', 'filename', 'file_date'))
+        
         # Get the latest available date to show status for
         # First scan all files to find the latest date with uploads
         latest_date = None
@@ -3792,7 +3933,7 @@ def get_bank_status(request):
         
         # Quick scan to find all available dates
         for bank in PROJECTAURUM_BANKS:
-            temp_info = scan_bank_files(bank['code'], base_processing_dir)  # No target_date = get all
+            temp_info = scan_bank_files(bank['code'], base_processing_dir, catalog_files=catalog_files)  # No target_date = get all
             all_dates.update(temp_info['dates_available'])
         
         # Get latest date that has uploaded files
@@ -3806,7 +3947,7 @@ def get_bank_status(request):
             processing_type = bank['type']
             
             # Scan for files using date-specific logic
-            bank_info = scan_bank_files(bank_code, base_processing_dir, latest_date)
+            bank_info = scan_bank_files(bank_code, base_processing_dir, latest_date, catalog_files)
             
             # Determine status using corrected requirements
             status_info = determine_bank_status(bank_info, bank_code, processing_type)
@@ -3863,68 +4004,23 @@ def get_available_dates(request):
             'status': 'unknown'
         })
         
-        # Scan input_files directories (where files actually get organized)
-        input_files_dir = Path('data/excel/input_files')
-        if input_files_dir.exists():
-            processing_service = ProcessingService()
-            
-            # Scan all files in input_files directory and subdirectories
-            all_files = []
-            
-            # Get files from root directory (JPM, MS, IDB, Safra)
-            all_files.extend(input_files_dir.glob("*.xlsx"))
-            
-            # Get files from bank subdirectories
-            for bank_dir in input_files_dir.glob("*/"):
-                if bank_dir.is_dir():
-                    # Regular bank directories
-                    all_files.extend(bank_dir.glob("*.xlsx"))
-                    
-                    # Special case: nonenriched subdirectories (Lombard, Pershing)
-                    for subdir in bank_dir.glob("nonenriched_*/"):
-                        if subdir.is_dir():
-                            all_files.extend(subdir.glob("*.xlsx"))
-            
-            # Extract dates from all found files
-            for file_path in all_files:
-                # Skip the Mappings.xlsx file
-                if file_path.name == 'Mappings.xlsx':
-                    continue
-                    
-                extracted_date = processing_service.extract_date_from_filename(file_path.name)
-                bank_code = processing_service.detect_bank(file_path.name)
-                
-                if extracted_date and bank_code:
-                    date_info[extracted_date]['upload_files'] += 1
-                    date_info[extracted_date]['banks_with_uploads'].add(bank_code)
-        
-        # Scan for final processed files to determine which dates are already processed
-        excel_dir = Path('data/excel')
-        processed_dates = set()
-        
-        if excel_dir.exists():
-            # Check for both securities and transactions files (both must exist for date to be processed)
-            securities_files = list(excel_dir.glob("securities_*.xlsx"))
-            transactions_files = list(excel_dir.glob("transactions_*.xlsx"))
-            
-            # Extract dates from securities files
-            securities_dates = set()
-            for file_path in securities_files:
-                processing_service = ProcessingService()
-                extracted_date = processing_service.extract_date_from_filename(file_path.name)
-                if extracted_date:
-                    securities_dates.add(extracted_date)
-            
-            # Extract dates from transactions files  
-            transactions_dates = set()
-            for file_path in transactions_files:
-                processing_service = ProcessingService()
-                extracted_date = processing_service.extract_date_from_filename(file_path.name)
-                if extracted_date:
-                    transactions_dates.add(extracted_date)
+        file_catalog = FileCatalogService()
+        
+        # Uploaded files organized under input_files (root, bank directories and their
+        # nonenriched_* folders), from the file catalog
+        for filename, extracted_date, bank_code in (file_catalog.files('input')
+                                                    .values_list('filename', 'file_date', 'bank')):
+            # Skip the Mappings.xlsx file
+            if filename == 'Mappings.xlsx':
+                continue
             
-            # Only dates that have BOTH securities AND transactions are fully processed
-            processed_dates = securities_dates.intersection(transactions_dates)
+            if extracted_date and bank_code:
+                date_info[extracted_date]['upload_files'] += 1
+                date_info[extracted_date]['banks_with_uploads'].add(bank_code)
+        
+        # Final processed files determine which dates are already processed
+        # (both securities and transactions must exist for date to be processed)
+        processed_dates = file_catalog.processed_dates()
         
         # Build available dates list - only include dates that are NOT fully processed
         formatted_dates = []
@@ -4005,6 +4101,7 @@ def promote_files_for_processing(request):
             
             files_moved = 0
             files_failed = 0
+            promoted_files = []
             
             # Move each file
             for file_path in bank_dir.glob("*.xlsx"):
@@ -4014,12 +4111,19 @@ def promote_files_for_processing(request):
                     # Copy file (don't move in case of issues)
                     import shutil
                     shutil.copy2(str(file_path), str(dest_file_path))
+                    promoted_files.append(dest_file_path)
                     files_moved += 1
                     
                 except Exception as e:
                     logger.error(f"Failed to promote {file_path}: {e}")
                     files_failed += 1
             
+            # Catalog the bank's promoted files together
+            try:
+                FileCatalogService().record_many(promoted_files, 'input')
+            except Exception as e:
+                logger.warning(f"Could not catalog promoted {bank_code} files: {e}")
+            
             if files_moved > 0:
                 promotion_results.append({
                     'bank_code': bank_code,
@@ -4047,27 +4151,8 @@ def promote_files_for_processing(request):
 def get_population_ready_dates(request):
     """Get dates with processed files but no database snapshots."""
     try:
-        # 1. Scan for processed Excel files
-        excel_dir = Path("data/excel")
-        securities_files = list(excel_dir.glob("securities_*.xlsx"))
-        transactions_files = list(excel_dir.glob("transactions_*.xlsx"))
-        
-        # 2. Extract dates from filenames (DD_MM_YYYY format)
-        securities_dates = set()
-        for file_path in securities_files:
-            # Extract date from "securities_24_07_2025.xlsx"
-            date_match = re.search(r'securities_(\d{2}_\d{2}_\d{4})\.xlsx', file_path.name)
-            if date_match:
-                securities_dates.add(date_match.group(1))
-        
-        transactions_dates = set()
-        for file_path in transactions_files:
-            date_match = re.search(r'transactions_(\d{2}_\d{2}_\d{4})\.xlsx', file_path.name)
-            if date_match:
-                transactions_dates.add(date_match.group(1))
-        
-        # 3. Find dates with BOTH securities and transactions files
-        complete_file_dates = securities_dates.intersection(transactions_dates)
+        # 1-3. Dates with BOTH securities and transactions files, from the file catalog
+        complete_file_dates = FileCatalogService().processed_dates()
         
         # 4. Convert to YYYY-MM-DD format for snapshot comparison
         def file_to_snapshot_format(file_date):
@@ -4125,6 +4210,54 @@ def health_check(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdminUser])
+def response_cache_stats(request):
+    """Hit/miss counters for cached API responses and current invalidation generations."""
+    try:
+        return Response({
+            'success': True,
+            'timestamp': datetime.now().isoformat(),
+            **get_cache_stats()
+        })
+    except Exception as e:
+        logger.error(f"Error getting response cache stats: {e}")
+        return Response({
+            'success': False,
+            'error': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['GET', 'DELETE'])
+@permission_classes([IsAuthenticated, IsAdminUser])
+def request_performance_stats(request):
+    """
+    Rolling per-view timing and SQL stats from the request instrumentation middleware.
+    GET ?profiles=1 also returns the most recent sampled profiles; DELETE resets all stats.
+    """
+    from core import instrumentation
+
+    try:
+        if request.method == 'DELETE':
+            instrumentation.reset_request_stats()
+            return Response({'success': True, 'message': 'Request stats reset'})
+
+        data = {
+            'success': True,
+            'timestamp': datetime.now().isoformat(),
+            **instrumentation.get_request_stats()
+        }
+        if request.GET.get('profiles'):
+            data['profiles'] = instrumentation.get_profiles()
+        return Response(data)
+    except Exception as e:
+        logger.error(f"Error getting request performance stats: {e}")
+        return Response({
+            'success': False,
+            'error': str(e)
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 # Excel Export Endpoints (Admin Only)
 
 @api_view(['POST'])
@@ -4135,15 +4268,17 @@ def export_positions_excel(request):
     
     POST body: {
         "client_code": "ALL" or specific client code like "BK",
-        "snapshot_date": "2025-07-31"
+        "snapshot_date": "2025-07-31",
+        "format": "xlsx" (default), "csv" or "parquet"
     }
     
-    Returns: Excel file download
+    Returns: Streaming file download
     """
     try:
         data = json.loads(request.body)
         client_code = data.get('client_code', 'ALL')
         snapshot_date = data.get('snapshot_date')
+        export_format = data.get('format', 'xlsx')
         
         if not snapshot_date:
             return Response({
@@ -4160,15 +4295,14 @@ def export_positions_excel(request):
                 'error': 'snapshot_date must be in YYYY-MM-DD format'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        # Initialize export service and generate Excel
+        # Stream the export straight from the database cursor
         export_service = ExcelExportService()
-        excel_bytes, filename = export_service.export_positions_excel(client_code, snapshot_date)
+        chunks, filename, content_type = export_service.stream_positions_export(
+            client_code, snapshot_date, export_format
+        )
         
         # Return file as download
-        response = HttpResponse(
-            excel_bytes,
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
+        response = StreamingHttpResponse(chunks, content_type=content_type)
         response['Content-Disposition'] = f'attachment; filename="{filename}"'
         
         logger.info(f"Positions Excel export successful: {filename} for client={client_code}")
@@ -4198,16 +4332,19 @@ def export_transactions_excel(request):
     POST body: {
         "client_code": "ALL" or specific client code like "BK",
         "start_date": "2025-07-11", 
-        "end_date": "2025-07-27"
+        "end_date": "2025-07-27",
+        "format": "xlsx" (default), "csv" or "parquet",
+        "background": true to always run as a background job (default: only large exports)
     }
     
-    Returns: Excel file download
+    Returns: Streaming file download, or 202 with the export job's status
     """
     try:
         data = json.loads(request.body)
         client_code = data.get('client_code', 'ALL')
         start_date = data.get('start_date')
         end_date = data.get('end_date')
+        export_format = data.get('format', 'xlsx')
         
         if not start_date or not end_date:
             return Response({
@@ -4225,15 +4362,31 @@ def export_transactions_excel(request):
                 'error': 'Dates must be in YYYY-MM-DD format'
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        # Initialize export service and generate Excel
+        # Large ranges are written by a background job instead of holding the request open
+        job_service = ExportJobService()
+        background = data.get('background')
+        total_rows = None
+        if background is None:
+            total_rows = job_service.count_transactions(client_code, start_date, end_date)
+            background = job_service.should_run_in_background(total_rows)
+        if background:
+            job = job_service.create_transactions_job(client_code, start_date, end_date, export_format,
+                                                      user=request.user, total_rows=total_rows)
+            return Response({
+                'success': True,
+                'job': job_service.describe(job),
+                'status_url': f'/api/portfolio/export/jobs/{job.job_id}/',
+                'download_url': f'/api/portfolio/export/jobs/{job.job_id}/download/'
+            }, status=status.HTTP_202_ACCEPTED)
+        
+        # Stream the export straight from the database
         export_service = ExcelExportService()
-        excel_bytes, filename = export_service.export_transactions_excel(client_code, start_date, end_date)
+        chunks, filename, content_type = export_service.stream_transactions_export(
+            client_code, start_date, end_date, export_format
+        )
         
         # Return file as download
-        response = HttpResponse(
-            excel_bytes,
-            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-        )
+        response = StreamingHttpResponse(chunks, content_type=content_type)
         response['Content-Disposition'] = f'attachment; filename="{filename}"'
         
         logger.info(f"Transactions Excel export successful: {filename} for client={client_code}")
@@ -4256,6 +4409,58 @@ def export_transactions_excel(request):
 
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
+def get_export_job(request, job_id):
+    """Status and progress of a background export job."""
+    try:
+        # The job row was just created and its progress is written by the worker: a lagging
+        # replica would report a missing or stale job
+        with db_router.replica_scope(allowed=False):
+            job = ExportJob.objects.get(job_id=job_id)
+    except ExportJob.DoesNotExist:
+        return Response({
+            'success': False,
+            'error': 'Export job not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+    
+    job_service = ExportJobService()
+    if job_service.is_stale(job):
+        job_service.fail_stale(ExportJob.objects.filter(pk=job.pk))
+        job.refresh_from_db()
+    return Response({'success': True, 'job': job_service.describe(job)})
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def download_export_job(request, job_id):
+    """Download the file of a completed background export job."""
+    try:
+        with db_router.replica_scope(allowed=False):
+            job = ExportJob.objects.get(job_id=job_id)
+    except ExportJob.DoesNotExist:
+        return Response({
+            'success': False,
+            'error': 'Export job not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+    
+    if job.status != 'COMPLETED':
+        return Response({
+            'success': False,
+            'error': f'Export job is {job.status.lower()}',
+            'job': ExportJobService().describe(job)
+        }, status=status.HTTP_409_CONFLICT)
+    if not os.path.exists(job.file_path):
+        return Response({
+            'success': False,
+            'error': 'Export file has expired'
+        }, status=status.HTTP_410_GONE)
+    
+    return FileResponse(open(job.file_path, 'rb'), as_attachment=True, filename=job.filename,
+                        content_type=EXPORT_CONTENT_TYPES.get(job.export_format))
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+@cached_response('export_available_dates')
 def get_export_available_dates(request):
     """
     Get available dates for export functionality.
@@ -10,7 +10,8 @@ sys.path.append('/Users/thomaskemeny/AurumFinance/aurum_backend')
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'aurum_backend.settings')
 django.setup()
 
-from portfolio.models import Transaction, Position, PortfolioSnapshot, Asset, Report
+from portfolio.models import Transaction, Position, PortfolioSnapshot, Asset, Report, PortfolioEvolutionPoint
+from portfolio.utils.dietz_cache import bump_client_data_version
 from django.db import transaction
 
 print('=== SAFE DATABASE AND REPORTS CLEARING ===')
@@ -43,6 +44,9 @@ def clear_portfolio_data():
         print(f'\\nClearing portfolio data...')
         
         # Delete in correct order
+        PortfolioEvolutionPoint.objects.all().delete()
+        print('  ✅ Portfolio evolution series cleared')
+        
         Position.objects.all().delete()
         print('  ✅ Positions cleared')
         
@@ -58,6 +62,9 @@ def clear_portfolio_data():
         Report.objects.all().delete()
         print('  ✅ Report records cleared')
         
+        # Retire every cached Dietz result once the clear commits
+        bump_client_data_version()
+        
         print('✅ Portfolio data cleared successfully')
 
 def clear_report_files():
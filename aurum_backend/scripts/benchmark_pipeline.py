@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the ingestion-to-dashboard pipeline on deterministic synthetic data.
+
+Generates --clients x --dates (weekly) x --positions per bank account, writes the
+securities/transactions Excel files the upload flow consumes, and times each stage
+against a throwaway test database:
+
+    parse_securities, parse_transactions   StatementParser / TransactionParser
+    populate                               PortfolioPopulationService.populate_from_excel
+    rollover                               AccountRolloverService (missing accounts + cleanup)
+    metrics                                PortfolioCalculationService.calculate_portfolio_metrics
+    aggregate                              CorrectDashboardCacheService.aggregate_date_data
+    dashboard_admin, dashboard_client      dashboard endpoints, response cache cleared
+    weekly_report                          EnhancedReportService.generate_weekly_report
+    export_positions, export_transactions  ExcelExportService
+
+Transaction types are drawn from the CashFlowService bank mappings, and a share of
+accounts is left out of later files so rollover has work to do.
+
+Results (seconds and SQL query counts per stage, with the commit and parameters)
+are written as JSON; --compare prints the change against an earlier result file.
+
+Usage:
+    python scripts/benchmark_pipeline.py --clients 20 --dates 4 --positions 15 --output bench.json
+    python scripts/benchmark_pipeline.py --postgres --compare bench.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import pandas as pd
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'aurum_backend.settings')
+
+EQUITY_TICKERS = ['AAPL', 'MSFT', 'NVDA', 'AMZN', 'GOOGL', 'META', 'JPM', 'V', 'XOM', 'UNH',
+                  'SPY', 'QQQ', 'IVV', 'VTI', 'KO', 'PEP', 'DIS', 'NKE', 'ORCL', 'TSLA']
+BOND_ISSUERS = ['US TREASURY', 'APPLE INC', 'FORD MOTOR CREDIT', 'BANK OF AMERICA', 'CITIGROUP INC',
+                'PETROBRAS GLOBAL', 'EDISON INTL', 'VERIZON COMM', 'CODELCO', 'BANCO SANTANDER']
+# Share of positions per asset type in each account (the cash position is extra)
+ASSET_MIX = [('Fixed Income', 0.45), ('Equities', 0.4), ('Money Market', 0.1), ('Alternatives', 0.05)]
+TRANSACTION_MIX = {'TRADING_EXCLUDED': 0.6, 'EXTERNAL_INFLOWS': 0.2, 'EXTERNAL_OUTFLOWS': 0.2}
+
+
+class SyntheticPortfolioGenerator:
+    """Deterministic clients, accounts, holdings and transactions for the benchmark."""
+
+    def __init__(self, clients: int, dates: int, positions: int, banks_per_client: int,
+                 transactions: int, missing_rate: float, start_date: date, seed: int):
+        from django.conf import settings
+        from portfolio.services.cash_flow_service import CashFlowService
+
+        self.rng = random.Random(seed)
+        self.dates = [start_date + timedelta(weeks=i) for i in range(dates)]
+        self.transactions = transactions
+        self.missing_rate = missing_rate
+        self.mappings = CashFlowService.ENHANCED_TRANSACTION_MAPPINGS
+        # Banks whose mapping has inflow, outflow and trading types to draw from
+        banks = [bank for bank in settings.AURUM_SETTINGS['SUPPORTED_BANKS']
+                 if all(self.mappings.get(bank, {}).get(category) for category in TRANSACTION_MIX)]
+        self.accounts = []  # (client, bank, account, holdings)
+        for c in range(clients):
+            client = f'BM{c:03d}'
+            for bank in self.rng.sample(banks, min(banks_per_client, len(banks))):
+                account = str(self.rng.randint(100000, 999999))
+                self.accounts.append((client, bank, account, self._holdings(client, bank, account, positions)))
+
+    def _holdings(self, client, bank, account, positions):
+        holdings = [{
+            'asset_type': 'Cash', 'name': f'CASH {bank}', 'ticker': '', 'cusip': f'CSH{client}{bank}{account}',
+            'coupon_rate': None, 'maturity_date': None, 'quantity': 1.0, 'price': 1.0,
+            'value': self.rng.uniform(10_000, 500_000), 'drift': 0.0,
+        }]
+        for i in range(positions):
+            asset_type = self.rng.choices([t for t, _ in ASSET_MIX], weights=[w for _, w in ASSET_MIX])[0]
+            holding = {'asset_type': asset_type, 'ticker': '', 'coupon_rate': None, 'maturity_date': None,
+                       'cusip': f'{self.rng.randint(10**8, 10**9 - 1)}', 'drift': self.rng.gauss(0.001, 0.01)}
+            if asset_type == 'Fixed Income':
+                coupon = round(self.rng.uniform(1, 8) * 8) / 8
+                maturity = date(self.rng.randint(2025, 2040), self.rng.randint(1, 12), self.rng.randint(1, 28))
+                holding.update(name=f'{self.rng.choice(BOND_ISSUERS)} {coupon}% {maturity:%m/%d/%y}',
+                               coupon_rate=coupon, maturity_date=maturity.strftime('%m/%d/%Y'), price=100.0)
+            elif asset_type == 'Equities':
+                holding['ticker'] = self.rng.choice(EQUITY_TICKERS)
+                holding.update(name=f"{holding['ticker']} COMMON STOCK {i}", price=self.rng.uniform(20, 800))
+            else:
+                holding.update(name=f'{asset_type.upper()} FUND {i} {bank}', price=self.rng.uniform(1, 200))
+            holding['value'] = self.rng.uniform(5_000, 1_000_000)
+            holding['quantity'] = holding['value'] / holding['price']
+            holdings.append(holding)
+        return holdings
+
+    def _transaction_type(self, bank):
+        mapping = self.mappings[bank]
+        category = self.rng.choices(list(TRANSACTION_MIX), weights=list(TRANSACTION_MIX.values()))[0]
+        return category, self.rng.choice(mapping[category])
+
+    def write_date(self, index: int, directory: Path):
+        """Write securities/transactions files for one date; returns (date, securities, transactions)."""
+        snapshot_date = self.dates[index]
+        securities, transactions = [], []
+        for client, bank, account, holdings in self.accounts:
+            if index > 0 and self.rng.random() < self.missing_rate:
+                continue  # Account missing from this file; rollover carries it forward
+            for holding in holdings:
+                value = holding['value'] * (1 + holding['drift']) ** index * self.rng.uniform(0.995, 1.005)
+                securities.append({
+                    'Client': client, 'Bank': bank, 'Account': account, 'Ticker': holding['ticker'],
+                    'Name': holding['name'], 'Asset Type': holding['asset_type'], 'CUSIP': holding['cusip'],
+                    'Quantity': round(holding['quantity'], 4), 'Price': round(value / holding['quantity'], 4),
+                    'Market Value': round(value, 2), 'Cost Basis': round(holding['value'], 2),
+                    'Coupon Rate': holding['coupon_rate'], 'Maturity Date': holding['maturity_date'],
+                })
+            for _ in range(self.transactions):
+                category, transaction_type = self._transaction_type(bank)
+                holding = self.rng.choice(holdings[1:] or holdings) if category == 'TRADING_EXCLUDED' else holdings[0]
+                amount = round(self.rng.uniform(1_000, 100_000), 2)
+                transactions.append({
+                    'Client': client, 'Bank': bank, 'Account': account,
+                    'Date': (snapshot_date - timedelta(days=self.rng.randint(0, 6))).strftime('%m/%d/%Y'),
+                    'Transaction Type': transaction_type, 'CUSIP': holding['cusip'],
+                    'Quantity': round(amount / holding['price'], 4), 'Price': holding['price'],
+                    'Amount': -amount if category == 'EXTERNAL_OUTFLOWS' else amount,
+                })
+
+        date_tag = snapshot_date.strftime('%d_%m_%Y')
+        securities_file = directory / f'securities_{date_tag}.xlsx'
+        transactions_file = directory / f'transactions_{date_tag}.xlsx'
+        pd.DataFrame(securities).to_excel(securities_file, index=False)
+        pd.DataFrame(transactions).to_excel(transactions_file, index=False)
+        return snapshot_date.strftime('%Y-%m-%d'), securities_file, transactions_file
+
+
+class StageTimings:
+    """Wall time and SQL query count per stage run."""
+
+    def __init__(self):
+        self.runs = defaultdict(list)  # stage -> [(seconds, queries)]
+
+    @contextmanager
+    def measure(self, stage: str):
+        from django.db import connections
+        from core.instrumentation import QueryRecorder
+
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            yield
+        self.runs[stage].append((time.perf_counter() - start, recorder.count))
+
+    def summary(self) -> dict:
+        result = {}
+        for stage, runs in self.runs.items():
+            seconds = [s for s, _ in runs]
+            result[stage] = {
+                'runs': len(runs),
+                'total_s': round(sum(seconds), 4),
+                'mean_s': round(statistics.mean(seconds), 4),
+                'p50_s': round(statistics.median(seconds), 4),
+                'max_s': round(max(seconds), 4),
+                'queries': sum(q for _, q in runs),
+            }
+        return result
+
+
+def run_pipeline(generator: SyntheticPortfolioGenerator, work_dir: Path, timings: StageTimings,
+                 report_clients: int = 3) -> dict:
+    """Run every stage over all generated dates; returns the resulting row counts."""
+    from django.core.cache import cache
+    from rest_framework.test import APIClient
+    from portfolio.models import Client, PortfolioSnapshot, Position, Transaction, User
+    from portfolio.parsers.excel_parser import StatementParser, TransactionParser
+    from portfolio.services.account_rollover_service import AccountRolloverService
+    from portfolio.services.correct_dashboard_cache_service import CorrectDashboardCacheService
+    from portfolio.services.enhanced_report_service import EnhancedReportService
+    from portfolio.services.excel_export_service import ExcelExportService
+    from portfolio.services.portfolio_calculation_service import PortfolioCalculationService
+    from portfolio.services.portfolio_population_service import PortfolioPopulationService
+
+    snapshot_dates = []
+    for index in range(len(generator.dates)):
+        snapshot_date, securities_file, transactions_file = generator.write_date(index, work_dir)
+        snapshot_dates.append(snapshot_date)
+
+        with timings.measure('parse_securities'):
+            StatementParser(str(securities_file)).parse()
+        with timings.measure('parse_transactions'):
+            TransactionParser(str(transactions_file)).parse()
+        with timings.measure('populate'):
+            PortfolioPopulationService().populate_from_excel(str(securities_file), str(transactions_file),
+                                                             snapshot_date)
+        with timings.measure('rollover'):
+            rollover_service = AccountRolloverService()
+            rollover_service.rollover_all_missing_accounts(snapshot_date)
+            rollover_service._cleanup_phantom_rollover_positions(snapshot_date, set())
+        with timings.measure('metrics'):
+            calculation_service = PortfolioCalculationService()
+            for client in Client.objects.all():
+                calculation_service.calculate_portfolio_metrics(client.code, snapshot_date)
+        with timings.measure('aggregate'):
+            CorrectDashboardCacheService().aggregate_date_data(datetime.strptime(snapshot_date, '%Y-%m-%d')
+                                                               .strftime('%d_%m_%Y'))
+
+    client_codes = list(Client.objects.exclude(code='ALL').order_by('code').values_list('code', flat=True))
+    sample = client_codes[:report_clients]
+
+    api = APIClient()
+    api.force_authenticate(User.objects.create_user(username='benchmark-admin', password='x', role='admin'))
+    for client_code in [None] + sample:
+        cache.clear()
+        with timings.measure('dashboard_admin'):
+            api.get('/api/portfolio/admin/dashboard/', {'client_code': client_code or 'ALL'})
+    for client_code in sample:
+        user = User.objects.create_user(username=f'benchmark-{client_code}', password='x',
+                                        role='client', client_code=client_code)
+        api.force_authenticate(user)
+        cache.clear()
+        with timings.measure('dashboard_client'):
+            api.get('/api/portfolio/client/dashboard-with-charts/')
+
+    report_service = EnhancedReportService()
+    comparison_date = snapshot_dates[-2] if len(snapshot_dates) > 1 else None
+    for client_code in sample:
+        with timings.measure('weekly_report'):
+            report_service.generate_weekly_report(client_code, snapshot_dates[-1], comparison_date)
+
+    export_service = ExcelExportService()
+    with timings.measure('export_positions'):
+        export_service.export_positions_excel('ALL', snapshot_dates[-1])
+    with timings.measure('export_transactions'):
+        export_service.export_transactions_excel('ALL', (generator.dates[0] - timedelta(days=7)).isoformat(),
+                                                 snapshot_dates[-1])
+
+    return {
+        'clients': len(client_codes),
+        'snapshots': PortfolioSnapshot.objects.count(),
+        'positions': Position.objects.count(),
+        'transactions': Transaction.objects.count(),
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=project_root,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return 'unknown'
+
+
+def print_results(result: dict, baseline: dict = None):
+    print(f"Commit {result['commit']} on {result['database']}: {result['parameters']}")
+    print(f"Dataset: {result['dataset']}")
+    print(f"{'stage':<22}{'runs':>6}{'total s':>11}{'mean s':>10}{'queries':>10}" +
+          (f"{'baseline s':>13}{'change':>9}" if baseline else ''))
+    for stage, stats in result['stages'].items():
+        line = f"{stage:<22}{stats['runs']:>6}{stats['total_s']:>11.3f}{stats['mean_s']:>10.4f}{stats['queries']:>10}"
+        if baseline and stage in baseline['stages']:
+            before = baseline['stages'][stage]['total_s']
+            change = f"{(stats['total_s'] / before - 1) * 100:+.0f}%" if before else 'n/a'
+            line += f"{before:>13.3f}{change:>9}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the ingestion-to-dashboard pipeline')
+    parser.add_argument('--clients', type=int, default=10)
+    parser.add_argument('--dates', type=int, default=3, help='Weekly snapshot dates')
+    parser.add_argument('--positions', type=int, default=10, help='Positions per bank account')
+    parser.add_argument('--banks', type=int, default=2, help='Bank accounts per client')
+    parser.add_argument('--transactions', type=int, default=5, help='Transactions per account per date')
+    parser.add_argument('--missing-rate', type=float, default=0.1,
+                        help='Chance an account is missing from a later file (exercises rollover)')
+    parser.add_argument('--start-date', default='2025-05-29')
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--postgres', action='store_true',
+                        help='Use a throwaway PostgreSQL test database (DB_* settings) instead of SQLite')
+    parser.add_argument('--output', help='Write results JSON to this file')
+    parser.add_argument('--compare', help='Results JSON from an earlier run to compare against')
+    args = parser.parse_args()
+
+    if args.postgres:
+        os.environ['USE_POSTGRESQL'] = 'true'
+
+    import django
+    django.setup()
+    from django.db import connection
+    from django.test.utils import setup_test_environment, teardown_test_environment
+
+    # Per-row pipeline logging would dominate the timings
+    logging.disable(logging.WARNING)
+
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    timings = StageTimings()
+    try:
+        generator = SyntheticPortfolioGenerator(
+            args.clients, args.dates, args.positions, args.banks, args.transactions,
+            args.missing_rate, date.fromisoformat(args.start_date), args.seed
+        )
+        with tempfile.TemporaryDirectory() as work_dir:
+            dataset = run_pipeline(generator, Path(work_dir), timings)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+    result = {
+        'commit': git_commit(),
+        'timestamp': datetime.now().isoformat(),
+        'database': connection.vendor,
+        'parameters': {k: v for k, v in vars(args).items() if k not in ('output', 'compare')},
+        'dataset': dataset,
+        'stages': timings.summary(),
+    }
+    baseline = json.loads(Path(args.compare).read_text()) if args.compare else None
+    print_results(result, baseline)
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2))
+        print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
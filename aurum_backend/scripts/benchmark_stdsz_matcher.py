@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Benchmark for STDSZ security-name -> ISIN matching.
+
+Builds a synthetic transactions file (--securities rows) and a list of cash-movement
+security names (--rows), then times the indexed STDSZSecurityMatcher against the
+reference full-scan implementation and checks that both return the same ISINs.
+
+The full scan is only run on --reference-sample names (it is O(rows x securities))
+and its total time is extrapolated.
+
+Usage:
+    python scripts/benchmark_stdsz_matcher.py --rows 10000 --securities 2000
+"""
+
+import argparse
+import logging
+import random
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+# Add the portfolio package to Python path (the enricher imports preprocessing.*)
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / 'portfolio'))
+
+from portfolio.preprocessing.combiners.stdsz_enricher import STDSZTransactionsEnricher
+
+ISSUER_WORDS = ['ALPHA', 'BETA', 'GAMMA', 'DELTA', 'OMEGA', 'ATLAS', 'NORTH', 'SOUTH', 'PACIFIC',
+                'GLOBAL', 'ENERGY', 'CAPITAL', 'HOLDINGS', 'FINANCE', 'MOTORS', 'MINING', 'TECH',
+                'HEALTH', 'POWER', 'UNION', 'FORD MOTOR', 'EDISON', 'PROSHARES', 'ISHARES', 'SPDR']
+SUFFIXES = ['CO', 'CORP', 'INC', 'INTL', 'LTD', 'PLC', 'SA', 'AG']
+MONTHS = ['JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN', 'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC']
+
+
+def build_transactions(securities: int, rng: random.Random) -> pd.DataFrame:
+    """Synthetic transactions file with SECURITY / ISIN/IDENTIFIER columns."""
+    names, isins = [], []
+    for i in range(securities):
+        name = ' '.join(rng.sample(ISSUER_WORDS, rng.randint(1, 3)) + [rng.choice(SUFFIXES)])
+        if rng.random() < 0.4:
+            name += f" {rng.randint(1, 9)}.{rng.randint(0, 999)} {rng.randint(10, 28)}{rng.choice(MONTHS)}{rng.randint(25, 40)}"
+        names.append(name)
+        isins.append('--' if rng.random() < 0.03 else f"US{i:09d}0")
+    return pd.DataFrame({'SECURITY': names, 'ISIN/IDENTIFIER': isins})
+
+
+def build_queries(transactions_df: pd.DataFrame, rows: int, rng: random.Random) -> list:
+    """Cash-movement names: exact copies, suffix variants and unknown names."""
+    names = transactions_df['SECURITY'].tolist()
+    queries = []
+    for _ in range(rows):
+        name = rng.choice(names)
+        roll = rng.random()
+        if roll < 0.4:
+            queries.append(name.lower())
+        elif roll < 0.8:
+            queries.append(f"{name} - {rng.choice(['USD', 'ADR', 'NEW'])}")
+        else:
+            queries.append(' '.join(rng.sample(ISSUER_WORDS, 2)) + ' UNLISTED')
+    return queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark STDSZ ISIN matching')
+    parser.add_argument('--rows', type=int, default=10000, help='Cash-movement rows to match')
+    parser.add_argument('--securities', type=int, default=2000, help='Rows in the transactions file')
+    parser.add_argument('--reference-sample', type=int, default=100,
+                        help='Names to run through the full-scan reference implementation')
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    # Per-name match/no-match logging would dominate the timings
+    logging.basicConfig(level=logging.ERROR)
+
+    rng = random.Random(args.seed)
+    transactions_df = build_transactions(args.securities, rng)
+    queries = build_queries(transactions_df, args.rows, rng)
+    enricher = STDSZTransactionsEnricher()
+
+    start = time.perf_counter()
+    matcher = enricher.build_isin_matcher(transactions_df)
+    build_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    indexed = [matcher.find(name) for name in queries]
+    indexed_seconds = time.perf_counter() - start
+
+    sample = queries[:args.reference_sample]
+    start = time.perf_counter()
+    reference = [enricher._find_matching_isin_linear(name, transactions_df) for name in sample]
+    sample_seconds = time.perf_counter() - start
+    reference_seconds = sample_seconds / max(len(sample), 1) * len(queries)
+
+    mismatches = sum(1 for a, b in zip(indexed, reference) if a != b)
+    indexed_total = build_seconds + indexed_seconds
+
+    print(f"Transactions: {args.securities} securities, cash movements: {args.rows} rows")
+    print(f"Indexed matcher: build {build_seconds:.3f}s + match {indexed_seconds:.3f}s = {indexed_total:.3f}s")
+    print(f"Full scan:       {sample_seconds:.3f}s for {len(sample)} names "
+          f"(~{reference_seconds:.1f}s extrapolated)")
+    print(f"Speedup:         ~{reference_seconds / indexed_total:.0f}x")
+    print(f"Matched:         {sum(1 for isin in indexed if isin)}/{len(indexed)}")
+    print(f"Mismatches vs reference on sample: {mismatches}")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
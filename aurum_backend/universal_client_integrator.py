@@ -12,6 +12,9 @@ Usage:
     
     # Batch processing
     python universal_client_integrator.py --client EI --bank STDSZ --date-range 29_05_2025:11_09_2025
+
+    # Batch processing in one pass (dates parsed concurrently, written in one transaction)
+    python universal_client_integrator.py --client EI --bank STDSZ --date-range 29_05_2025:11_09_2025 --batch
 """
 
 import os
@@ -19,9 +22,13 @@ import sys
 import django
 import argparse
 import logging
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from django.db import transaction
+from django.db import connection, transaction
+from django.db.models import Count
+from django.utils import timezone
 
 # Setup Django
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'aurum_backend.settings')
@@ -31,6 +38,31 @@ from portfolio.models import Client, Asset, Position, Transaction, PortfolioSnap
 from portfolio.parsers.excel_parser import StatementParser, TransactionParser
 from portfolio.services.portfolio_calculation_service import PortfolioCalculationService
 from portfolio.services.correct_dashboard_cache_service import CorrectDashboardCacheService
+from portfolio.services.portfolio_population_service import PortfolioPopulationService
+from portfolio.preprocessing.combiners.combiner_runtime import CombinerRuntime
+from portfolio.utils.response_cache import bump_generation, PORTFOLIO_DATA
+from portfolio.utils.dietz_cache import bump_client_data_version
+
+ASSET_KEY_FIELDS = ('ticker', 'cusip', 'name', 'bank', 'account', 'client')
+
+
+def _processed_files(date_str: str) -> tuple:
+    """Processed securities and transactions files of a date (DD_MM_YYYY)"""
+    return (Path(f"data/excel/securities_{date_str}.xlsx"),
+            Path(f"data/excel/transactions_{date_str}.xlsx"))
+
+
+def _parse_client_files(job: tuple) -> tuple:
+    """Worker entry point: parse one date's securities and transactions of a single client"""
+    date_str, client_code = job
+    securities_file, transactions_file = _processed_files(date_str)
+    if not securities_file.exists() or not transactions_file.exists():
+        raise FileNotFoundError(f"Missing processed files for {date_str}: {securities_file}, {transactions_file}")
+    
+    securities = StatementParser(str(securities_file)).parse(client_code).get(client_code, [])
+    transactions = TransactionParser(str(transactions_file)).parse(client_code).get(client_code, [])
+    return securities, transactions
+
 
 class UniversalClientIntegrator:
     """Universal integration system supporting all client-bank scenarios"""
@@ -71,8 +103,7 @@ class UniversalClientIntegrator:
         self.logger.info(f"🔧 Using {self.mode.upper()} integration mode")
         
         # Step 1: Validate processed files exist
-        securities_file = Path(f"data/excel/securities_{date_str}.xlsx")
-        transactions_file = Path(f"data/excel/transactions_{date_str}.xlsx")
+        securities_file, transactions_file = _processed_files(date_str)
         
         if not securities_file.exists() or not transactions_file.exists():
             raise FileNotFoundError(f"Missing processed files for {date_str}: {securities_file}, {transactions_file}")
@@ -308,41 +339,29 @@ class UniversalClientIntegrator:
         
         Keep the first one found and delete others.
         """
-        from portfolio.models import Transaction
-        from collections import defaultdict
-        
-        # Get all transactions for this client
-        transactions = Transaction.objects.filter(client__code=client_code).order_by('id')
+        # Get all transactions for this client (business fields only, in id order)
+        transactions = (Transaction.objects.filter(client__code=client_code).order_by('id')
+                        .values_list('id', 'bank', 'account', 'date', 'transaction_type', 'amount', 'asset__cusip'))
         
         # Group by business characteristics (excluding row-dependent transaction_id)
         groups = defaultdict(list)
         
-        for tx in transactions:
+        for tx_id, bank, account, tx_date, transaction_type, amount, cusip in transactions:
             # Create business key without row index influence
-            key = (
-                tx.client.code,
-                tx.bank,
-                tx.account, 
-                tx.date,
-                tx.transaction_type,
-                str(tx.amount),
-                tx.asset.cusip if tx.asset else ''
-            )
-            groups[key].append(tx)
+            key = (client_code, bank, account, tx_date, transaction_type, str(amount), cusip or '')
+            groups[key].append(tx_id)
         
         # Remove duplicates (keep first, delete rest)
-        duplicates_removed = 0
-        for key, tx_list in groups.items():
-            if len(tx_list) > 1:
+        duplicate_ids = []
+        for key, tx_ids in groups.items():
+            if len(tx_ids) > 1:
                 # Keep the first transaction, delete the rest
-                for tx in tx_list[1:]:
-                    tx.delete()
-                    duplicates_removed += 1
-                
-                self.logger.info(f"   🗑️ Removed {len(tx_list)-1} duplicate transactions for {key[3]} {key[4]} ${key[5]}")
+                duplicate_ids.extend(tx_ids[1:])
+                self.logger.info(f"   🗑️ Removed {len(tx_ids)-1} duplicate transactions for {key[3]} {key[4]} ${key[5]}")
         
-        if duplicates_removed > 0:
-            self.logger.info(f"   ✅ Total duplicates removed: {duplicates_removed}")
+        if duplicate_ids:
+            Transaction.objects.filter(id__in=duplicate_ids).delete()
+            self.logger.info(f"   ✅ Total duplicates removed: {len(duplicate_ids)}")
         else:
             self.logger.info(f"   ✅ No duplicate transactions found")
     
@@ -389,6 +408,305 @@ class UniversalClientIntegrator:
         
         return results
     
+    def integrate_date_range_batch(self, start_date: str, end_date: str, workers: int = None) -> list:
+        """
+        Integrate multiple dates in one pass.
+        
+        Every date's files are parsed concurrently (only the target client's rows), the
+        assets, positions and transactions of all dates are bulk-written in a single
+        transaction, then metrics are recalculated and the dashboard cache aggregated
+        once per date. Nothing is written if any date fails to parse.
+        
+        Args:
+            start_date: First date (DD_MM_YYYY)
+            end_date: Last date (DD_MM_YYYY)
+            workers: Parse and aggregation pool size (default: COMBINER_MAX_WORKERS, capped by CPUs)
+            
+        Returns:
+            One result per integrated date, in date order
+        """
+        target_dates = self._generate_date_range(start_date, end_date)
+        
+        print(f"🚀 Starting {self.client_code} + {self.bank_code} batch integration")
+        print(f"📅 Processing {len(target_dates)} dates: {start_date} → {end_date}")
+        print(f"🔧 Mode: {self.mode.upper()}")
+        
+        # Step 1: Parse all dates concurrently
+        runtime = CombinerRuntime(self.bank_code, max_workers=workers)
+        parsed = runtime.read_all([(date_str, self.client_code) for date_str in target_dates],
+                                  _parse_client_files, 'statements')
+        failed = [f"{result.file_info[0]}: {result.error}" for result in parsed if not result.ok]
+        if failed:
+            raise ValueError(f"Could not parse {len(failed)} dates, nothing was written: {'; '.join(failed)}")
+        
+        # Step 2: Write every date in one transaction
+        with transaction.atomic():
+            results = self._bulk_integrate([(result.file_info[0], *result.data) for result in parsed])
+        
+        # Step 3: Metrics in date order - each period return reads the previous snapshot's total
+        for result in results:
+            metrics = self.calculation_service.calculate_portfolio_metrics(
+                client_code=self.client_code,
+                snapshot_date=self._convert_date_format(result['date'])
+            )
+            result['portfolio_metrics'] = {
+                'total_value': metrics['total_value'],
+                'position_count': metrics['position_count'],
+                'estimated_annual_income': metrics['estimated_annual_income']
+            }
+            self.logger.info(f"   📊 {result['date']} Portfolio Value: ${metrics['total_value']:,.2f}")
+        
+        # Step 4: Dashboard cache, one independent aggregation per date
+        integrated_dates = [result['date'] for result in results]
+        cache_results = self._aggregate_dashboard_cache(integrated_dates, runtime.workers_for(len(integrated_dates)))
+        for result in results:
+            cache_result = cache_results[result['date']]
+            result['cache_updated'] = cache_result['success']
+            if not cache_result['success']:
+                self.logger.warning(f"   ⚠️ Dashboard cache warning for {result['date']}: {cache_result.get('error')}")
+        
+        self._print_integration_summary(results)
+        return results
+    
+    def _in_scope(self, row: dict) -> bool:
+        """Replacement mode takes all of the client's banks, additive mode only the target bank"""
+        return self.mode == "replacement" or (row.get('bank') or '') == self.bank_code
+    
+    def _bulk_integrate(self, parsed: list) -> list:
+        """
+        Bulk-write parsed dates: [(date_str, securities, transactions)] of the target client.
+        Same rules as PortfolioPopulationService, restricted to the client (and bank in
+        additive mode): assets are created or refreshed, the snapshots' in-scope positions
+        replaced and new transactions added. Dates without in-scope securities are skipped
+        and get no result.
+        """
+        population = PortfolioPopulationService()
+        client, _ = Client.objects.get_or_create(
+            code=self.client_code,
+            defaults={'name': f'Client {self.client_code}'}
+        )
+        
+        # Dates without in-scope securities are skipped: an empty snapshot would be valued
+        # at 0 and break period returns (the per-date replacement path refuses them too)
+        skipped = [date_str for date_str, securities, _ in parsed
+                   if not any(self._in_scope(security) for security in securities)]
+        if skipped:
+            self.logger.warning(f"   ⚠️ No {self.client_code} securities in scope for {', '.join(skipped)}, skipping")
+        parsed = [entry for entry in parsed if entry[0] not in skipped]
+        
+        # Snapshots: create missing dates in one insert
+        snapshot_dates = {date_str: self._convert_date_format(date_str) for date_str, _, _ in parsed}
+        existing_dates = {
+            d.isoformat() for d in PortfolioSnapshot.objects.filter(
+                client=client, snapshot_date__in=snapshot_dates.values()
+            ).values_list('snapshot_date', flat=True)
+        }
+        PortfolioSnapshot.objects.bulk_create([
+            PortfolioSnapshot(client=client, snapshot_date=snapshot_date, portfolio_metrics={})
+            for snapshot_date in snapshot_dates.values() if snapshot_date not in existing_dates
+        ])
+        snapshots = {
+            s.snapshot_date.isoformat(): s
+            for s in PortfolioSnapshot.objects.filter(client=client, snapshot_date__in=snapshot_dates.values())
+        }
+        
+        # Assets: first sighting's defaults, refreshed with later non-null values (in date order)
+        asset_values = {}
+        for _, securities, _ in parsed:
+            for security in securities:
+                if not self._in_scope(security):
+                    continue
+                asset_name = str(security.get('name', '')).strip()
+                if not asset_name or asset_name.lower() in ['', 'none', 'nan', 'null']:
+                    continue
+                key, defaults = self._asset_key(security), self._asset_defaults(population, security)
+                values = asset_values.setdefault(key, dict(defaults))
+                values.update({field: value for field, value in defaults.items() if value is not None})
+        
+        assets = {self._asset_key(asset): asset for asset in Asset.objects.filter(client=self.client_code)}
+        changed = []
+        for key, values in asset_values.items():
+            asset = assets.get(key)
+            if asset is not None:
+                for field, value in values.items():
+                    if value is not None:
+                        setattr(asset, field, value)
+                asset.updated_at = timezone.now()
+                changed.append(asset)
+        Asset.objects.bulk_update(changed, fields=[*self._asset_defaults(population, {}), 'updated_at'],
+                                  batch_size=500)
+        Asset.objects.bulk_create([
+            Asset(**{**dict(zip(ASSET_KEY_FIELDS, key)), **values})
+            for key, values in asset_values.items() if key not in assets
+        ], batch_size=500)
+        self.logger.info(f"   ✅ Assets: {len(asset_values) - len(changed)} created, {len(changed)} updated")
+        
+        # Asset lookups for positions and transaction linking (first match is the lowest id)
+        asset_ids, by_custody, by_cusip, by_ticker = {}, {}, {}, {}
+        for asset in Asset.objects.filter(client=self.client_code).order_by('id'):
+            asset_ids[self._asset_key(asset)] = asset.id
+            by_custody.setdefault((asset.ticker, asset.bank, asset.account), asset.id)
+            if asset.cusip:
+                by_cusip.setdefault(asset.cusip, asset.id)
+            if asset.ticker:
+                by_ticker.setdefault(asset.ticker, asset.id)
+        
+        # Positions: replace the in-scope positions of every snapshot
+        scope = Position.objects.filter(snapshot__in=snapshots.values())
+        if self.mode != "replacement":
+            scope = scope.filter(asset__bank=self.bank_code)
+        removed = dict(scope.values_list('snapshot_id').annotate(count=Count('id')).order_by())
+        scope.delete()
+        
+        positions = {}
+        for date_str, securities, _ in parsed:
+            snapshot = snapshots[snapshot_dates[date_str]]
+            for security in securities:
+                key = self._asset_key(security)
+                asset_id = asset_ids.get(key)
+                if asset_id is None or not self._in_scope(security):
+                    continue
+                # The same asset twice in a file: the last row wins, as with get_or_create + update
+                position = Position(
+                    snapshot=snapshot,
+                    asset_id=asset_id,
+                    quantity=population._safe_decimal(security.get('quantity', 0)),
+                    market_value=population._safe_decimal(security.get('market_value', 0)),
+                    cost_basis=population._safe_decimal(security.get('cost_basis', 0)),
+                    price=population._safe_decimal(security.get('price', 0)),
+                    bank=security.get('bank') or '',
+                    account=security.get('account') or '',
+                    coupon_rate=security.get('coupon_rate'),
+                    maturity_date=population._safe_date(security.get('maturity_date'))
+                )
+                # bulk_create skips Position.save(), which fills this on the per-date path
+                position.calculate_estimated_annual_income()
+                positions[(snapshot.id, asset_id)] = position
+        Position.objects.bulk_create(positions.values(), batch_size=1000)
+        
+        # Transactions: same deterministic ids as the per-date path (row index within the client)
+        existing_ids = set(Transaction.objects.filter(client=client).values_list('transaction_id', flat=True))
+        cash_assets = {}
+        new_transactions = {}
+        transactions_by_date = defaultdict(int)
+        for date_str, _, transactions in parsed:
+            for row_idx, tx in enumerate(transactions):
+                if not self._in_scope(tx):
+                    continue
+                asset_id = self._transaction_asset(tx, by_custody, by_cusip, by_ticker)
+                if asset_id is None:
+                    if tx.get('transaction_type', '') not in population.CASH_TRANSACTION_TYPES:
+                        continue
+                    custody = (tx.get('bank', ''), tx.get('account', ''))
+                    if custody not in cash_assets:
+                        cash_assets[custody] = population._get_or_create_cash_asset(self.client_code, *custody).id
+                    asset_id = cash_assets[custody]
+                
+                transaction_id = tx.get('id', population._generate_deterministic_transaction_id(
+                    self.client_code, tx, row_idx))
+                if transaction_id in existing_ids or transaction_id in new_transactions:
+                    continue
+                new_transactions[transaction_id] = Transaction(
+                    client=client,
+                    transaction_id=transaction_id,
+                    asset_id=asset_id,
+                    date=tx.get('date'),
+                    transaction_type=tx.get('transaction_type', ''),
+                    quantity=population._safe_decimal(tx.get('quantity')),
+                    price=population._safe_decimal(tx.get('price')),
+                    amount=population._safe_decimal(tx.get('amount', 0)),
+                    bank=tx.get('bank', ''),
+                    account=tx.get('account', '')
+                )
+                transactions_by_date[date_str] += 1
+        Transaction.objects.bulk_create(new_transactions.values(), batch_size=1000)
+        self._remove_duplicate_transactions(self.client_code)
+        
+        # Positions were replaced - drop cached data built from them once they are committed
+        transaction.on_commit(lambda: bump_generation(PORTFOLIO_DATA))
+        bump_client_data_version(self.client_code)
+        
+        results = []
+        positions_by_snapshot = defaultdict(int)
+        for snapshot_id, _ in positions:
+            positions_by_snapshot[snapshot_id] += 1
+        for date_str, securities, transactions in parsed:
+            snapshot = snapshots[snapshot_dates[date_str]]
+            added = positions_by_snapshot[snapshot.id]
+            results.append({
+                'mode': self.mode,
+                'client': self.client_code,
+                'bank': self.bank_code,
+                'date': date_str,
+                'snapshot_created': snapshot_dates[date_str] not in existing_dates,
+                'positions_removed': removed.get(snapshot.id, 0),
+                'positions_added': added,
+                'positions_created': added,
+                'transactions_added': transactions_by_date[date_str],
+                'securities_processed': sum(1 for security in securities if self._in_scope(security)),
+                'transactions_processed': sum(1 for tx in transactions if self._in_scope(tx))
+            })
+            self.logger.info(f"   ✅ {date_str}: {added} positions, {transactions_by_date[date_str]} new transactions")
+        return results
+    
+    def _asset_key(self, row) -> tuple:
+        """Asset uniqueness key (ticker, cusip, name, bank, account, client) of an asset or parsed security"""
+        if isinstance(row, Asset):
+            return tuple(getattr(row, field) or '' for field in ASSET_KEY_FIELDS)
+        return (row.get('ticker') or '', row.get('cusip') or '', row.get('name') or '',
+                row.get('bank') or '', row.get('account') or '', self.client_code)
+    
+    def _asset_defaults(self, population: PortfolioPopulationService, security: dict) -> dict:
+        """Asset fields set from a parsed security (as PortfolioPopulationService does)"""
+        isin = security.get('isin', '')
+        cusip = security.get('cusip', '')
+        return {
+            'asset_type': security.get('asset_type', 'Unknown'),
+            'currency': security.get('currency', 'USD'),
+            'isin': isin if isin else None,
+            'cusip': cusip if cusip else None,
+            'coupon_rate': population._safe_decimal(security.get('coupon_rate')),
+            'maturity_date': population._safe_date(security.get('maturity_date'))
+        }
+    
+    def _transaction_asset(self, tx: dict, by_custody: dict, by_cusip: dict, by_ticker: dict):
+        """Asset id of a transaction: ticker + custody, then CUSIP, then ticker within the client"""
+        ticker = tx.get('ticker', '')
+        bank = tx.get('bank', '')
+        account = tx.get('account', '')
+        cusip = tx.get('cusip', '')
+        
+        asset_id = None
+        if ticker and bank and account:
+            asset_id = by_custody.get((ticker, bank, account))
+        if asset_id is None and cusip:
+            asset_id = by_cusip.get(cusip)
+        if asset_id is None and ticker:
+            asset_id = by_ticker.get(ticker)
+        return asset_id
+    
+    def _aggregate_dashboard_cache(self, dates: list, workers: int) -> dict:
+        """Aggregate the dashboard cache of each date concurrently"""
+        def aggregate(date_str):
+            try:
+                return self.cache_service.aggregate_date_data(date_str)
+            except Exception as e:
+                return {'success': False, 'error': str(e)}
+        
+        def aggregate_in_thread(date_str):
+            try:
+                return aggregate(date_str)
+            finally:
+                # Each worker thread has its own database connection
+                connection.close()
+        
+        if connection.vendor == 'sqlite' or workers <= 1:
+            # SQLite takes one writer at a time: aggregate inline
+            return {date_str: aggregate(date_str) for date_str in dates}
+        
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='dashboard-cache') as pool:
+            return dict(zip(dates, pool.map(aggregate_in_thread, dates)))
+    
     def _print_integration_summary(self, results: list):
         """Print comprehensive integration summary"""
         print(f"\n📈 INTEGRATION SUMMARY")
@@ -426,6 +744,9 @@ def main():
                        help='Integration mode (auto-detects by default)')
     parser.add_argument('--interactive', action='store_true', default=True,
                        help='Pause between dates for verification')
+    parser.add_argument('--batch', action='store_true',
+                       help='Integrate the date range in one pass (concurrent parsing, one transaction)')
+    parser.add_argument('--workers', type=int, help='Batch parse/aggregation workers')
     
     args = parser.parse_args()
     
@@ -440,7 +761,10 @@ def main():
     elif args.date_range:
         # Date range integration
         start_date, end_date = args.date_range.split(':')
-        results = integrator.integrate_date_range(start_date, end_date, args.interactive)
+        if args.batch:
+            results = integrator.integrate_date_range_batch(start_date, end_date, args.workers)
+        else:
+            results = integrator.integrate_date_range(start_date, end_date, args.interactive)
         print(f"Batch integration completed! Processed {len(results)} dates.")
         
     else: